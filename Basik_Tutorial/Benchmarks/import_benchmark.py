@@ -0,0 +1,64 @@
+'''
+Measures how long it takes a fresh Python process to import __basik__.
+
+Each statement is timed in its own interpreter (started from a temporary
+directory, not the tutorial folder) such that nothing is cached between runs.
+It also reports which of the heavy optional libraries ended up being imported.
+
+Run from anywhere:
+    python Benchmarks/import_benchmark.py
+'''
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('matplotlib.pyplot','scipy','pandas','PyQt5')
+
+STATEMENTS = {'core':'import __basik__.core',
+              'full':'import __basik__',
+              # Also loads Matplotlib and reads an image once a display is used.
+              'display':'import __basik__ as bk; bk.Node.camera'}
+
+TIMER = '''
+import sys,time
+sys.path.insert(0,{root!r})
+sys.argv.append('benchmark.json')  # no Qt5Agg backend. See lazy_imports.py
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print('{{0}}|{{1}}'.format(elapsed,','.join(loaded)))
+'''
+
+#------------------------------------------------------------------------------
+
+def time_import(statement,repeats=5):
+
+    code = TIMER.format(root=ROOT,statement=statement,heavy=HEAVY_MODULES)
+    env = dict(os.environ,MPLBACKEND='Agg')
+    times = []
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(repeats):
+            output = subprocess.run([sys.executable,'-c',code],
+                                    cwd=directory,env=env,
+                                    capture_output=True,text=True,
+                                    check=True).stdout
+            elapsed,loaded = output.strip().splitlines()[-1].split('|')
+            times.append(float(elapsed))
+
+    return float(np.median(times)),loaded
+
+#------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print('{0:>10} {1:>12}  {2}'.format('import','median (s)','heavy modules loaded'))
+    for name,statement in STATEMENTS.items():
+        elapsed,loaded = time_import(statement)
+        print('{0:>10} {1:>12.3f}  {2}'.format(name,elapsed,loaded or '-'))
@@ -0,0 +1,79 @@
+'''
+Measures the throughput (events per second) of GlobalQueue and IndexedQueue
+as the number of pending events in the heap grows.
+
+The classic hold model is used: the earliest event is extracted, its time is
+advanced by an exponentially distributed increment and it is placed back into
+the heap. Before each extraction the queue performs the same maintenance that
+GlobalQueue.run_single_event performs.
+
+Run from anywhere:
+    python Benchmarks/queue_benchmark.py
+'''
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,ROOT)
+os.chdir(ROOT)  # __basik__ loads its images relative to this directory.
+
+import numpy as np
+from __basik__.global_queue import GlobalQueue,IndexedQueue
+
+#------------------------------------------------------------------------------
+
+class Event(object):
+
+    '''Stand-in for a vehicle. Events are ordered by time.'''
+
+    def __init__(self,time):
+        self.time = time
+
+    def __lt__(self,other):
+        return self.time < other.time
+
+    def __eq__(self,other):
+        return self.time == other.time
+
+#------------------------------------------------------------------------------
+
+def events_per_second(queue_class,heap_size,n_events,seed=0):
+
+    rng = np.random.default_rng(seed)
+    queue = queue_class()
+    queue.clear()
+    for t in rng.exponential(1.0,size=heap_size).cumsum():
+        queue.push(Event(t))
+    increments = rng.exponential(heap_size,size=n_events)
+
+    start = time.perf_counter()
+    for increment in increments:
+        queue._restore_heap()
+        event = queue.pop()
+        event.time += increment
+        queue.push(event)
+    elapsed = time.perf_counter() - start
+
+    return n_events/elapsed
+
+#------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    heap_sizes = [10,100,1000,10000]
+
+    print('{0:>10} {1:>18} {2:>18} {3:>10}'.format('heap size',
+                                                  'GlobalQueue ev/s',
+                                                  'IndexedQueue ev/s',
+                                                  'speed-up'))
+    for heap_size in heap_sizes:
+        # GlobalQueue is O(n log n) per event. Keep its run time bounded.
+        n_legacy = max(50,min(5000,500000//heap_size))
+        legacy = events_per_second(GlobalQueue,heap_size,n_legacy)
+        indexed = events_per_second(IndexedQueue,heap_size,50000)
+        print('{0:>10} {1:>18.0f} {2:>18.0f} {3:>9.1f}x'.format(heap_size,
+                                                              legacy,
+                                                              indexed,
+                                                              indexed/legacy))
@@ -0,0 +1,41 @@
+'''
+Measures the cost of the scalar draws that vehicles make for nearly every
+move: numpy.random.normal(mean,std) and numpy.random.uniform(1e-3,delay_time).
+
+The global numpy.random stream, a numpy.random.Generator and a BufferedStream
+(the streams handed out by a seeded Session) are compared.
+
+Run from anywhere:
+    python Benchmarks/rng_benchmark.py
+'''
+
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,ROOT)
+
+from __basik__.random_streams import GLOBAL_RNG,make_rng
+
+#------------------------------------------------------------------------------
+
+STREAMS = {'numpy.random':GLOBAL_RNG,
+           'Generator':make_rng(0,'benchmark',buffered=False),
+           'BufferedStream':make_rng(0,'benchmark')}
+
+#------------------------------------------------------------------------------
+
+def microseconds_per_draw(draw,n_draws=200000,repeats=5):
+
+    return 1e6*min(timeit.repeat(draw,number=n_draws,repeat=repeats))/n_draws
+
+#------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print('{0:>16} {1:>12} {2:>12}'.format('stream','normal (us)','uniform (us)'))
+    for name,rng in STREAMS.items():
+        normal = microseconds_per_draw(lambda: rng.normal(16.67,0.1))
+        uniform = microseconds_per_draw(lambda: rng.uniform(1e-3,0.1))
+        print('{0:>16} {1:>12.3f} {2:>12.3f}'.format(name,normal,uniform))
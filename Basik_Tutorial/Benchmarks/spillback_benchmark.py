@@ -0,0 +1,111 @@
+'''
+Measures the events, heap size and run time of a traffic light whose short
+approach lanes cannot take up all arrivals, with and without spillback
+sources (see Source.setup_arrivals).
+
+Without spillback every arrival that cannot enter its lane waits on its own
+temporary node and is rescheduled until it can. With spillback the arrivals
+are held as time-stamps and only a single vehicle per source waits to enter.
+
+Run from anywhere:
+    python Benchmarks/spillback_benchmark.py
+'''
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,ROOT)
+
+import numpy as np
+import __basik__.core as bk
+from __basik__.FlowFunctions import non_flared
+
+#------------------------------------------------------------------------------
+
+END_TIME = 300
+LANE_LENGTH = 15
+DIRECTIONS = 'NESW'
+
+#------------------------------------------------------------------------------
+
+def traffic_light(rate,spillback):
+
+    sources = []
+    in_nodes = {}
+    out_nodes = {}
+    for direction in DIRECTIONS:
+        in_lane = bk.Lane(LANE_LENGTH,overflow_protection=False)
+        out_lane = bk.Lane(LANE_LENGTH)
+        source = bk.Source(vehicle_velocity=16.67,
+                           target_node=in_lane.IN,
+                           rate_schedule={END_TIME:bk.Rate(rate)})
+        source.setup_arrivals(END_TIME,spillback=spillback)
+        sources.append(source)
+        bk.Record(out_lane.OUT)
+        in_nodes[direction] = in_lane.OUT
+        out_nodes[direction] = out_lane.IN
+
+    cycle_schedule = [non_flared.N_S_flow(20,0.8,0.8),
+                      non_flared.N_S_overwash(3),
+                      non_flared.W_E_flow(20,0.8,0.8),
+                      non_flared.W_E_overwash(3)]
+    light = bk.TrafficLight(in_nodes=in_nodes,
+                            out_nodes=out_nodes,
+                            cycle_schedule=cycle_schedule)
+    light.setup_cycles(2*END_TIME)
+
+    return sources
+
+#------------------------------------------------------------------------------
+
+def run(rate,spillback,seed=3):
+
+    np.random.seed(seed)
+    queue = bk.GlobalQueue.new(bk.IndexedQueue())
+    bk.reset_source_count(0)
+    sources = traffic_light(rate,spillback)
+
+    # The set up that GlobalQueue.run performs.
+    queue.t = 0
+    queue.start_time = 0
+    queue.end_time = END_TIME
+
+    n_events = 0
+    heap_size = len(queue.Q)
+    start = time.perf_counter()
+    while queue.Q and queue.run_single_event():
+        n_events += 1
+        heap_size = max(heap_size,len(queue.Q))
+    elapsed = time.perf_counter() - start
+
+    return n_events,heap_size,elapsed,sources
+
+#------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    print('{0:>6} {1:>10} {2:>10} {3:>10} {4:>10} {5:>16} {6:>14}'.format('rate',
+                                                                   'spillback',
+                                                                   'events',
+                                                                   'max heap',
+                                                                   'time (s)',
+                                                                   'mean spillback',
+                                                                   'entry delay'))
+    for rate in [0.25,0.5,1.0]:
+        for spillback in [False,True]:
+            n_events,heap_size,elapsed,sources = run(rate,spillback)
+            if spillback:
+                statistics = sources[0].spillback_statistics(END_TIME)
+                length = '{0:.2f}'.format(statistics['mean spillback'])
+                delay = '{0:.2f}'.format(statistics['mean entry delay'])
+            else:
+                length = delay = '-'
+            print('{0:>6} {1:>10} {2:>10} {3:>10} {4:>10.2f} {5:>16} {6:>14}'.format(rate,
+                                                                               str(spillback),
+                                                                               n_events,
+                                                                               heap_size,
+                                                                               elapsed,
+                                                                               length,
+                                                                               delay))
@@ -3,6 +3,8 @@ import numpy as np
 #from Types import Lane,Node,Vehicle
 from ..RoadObject import Lane
 from ..node import Node
+from ..utils import TransitionMatrix,choose_index
+from ..random_streams import GLOBAL_RNG
 from collections import namedtuple
 
 #-------------------------------------------------------------------------------       
@@ -22,15 +24,6 @@ default_transitions = {'N':{'N':0.25,'E':0.25,'S':0.25,'W':0.25},
 _Size = namedtuple('sizes','small medium large')
 size = _Size(small=3,medium=5,large=7)       
 
-#-------------------------------------------------------------------------------
-
-
-default_in = {'N':Node(),'E':Node(),'S':Node(),'W':Node()}
-
-#-------------------------------------------------------------------------------       
- 
-default_out = {'N':Node(),'E':Node(),'S':Node(),'W':Node()} 
-
 #-------------------------------------------------------------------------------  
 
 
@@ -60,16 +53,20 @@ class Circle(object):
         Allows one to check which index corresonds to which direction.
     tpm: numpy.ndarray
         A transition probability matrix. It is row stochastic.
+    tpm_cdf: list
+        The cumulative probabilities of every row of tpm from which exits 
+        are chosen. They are prepared whenever tpm is set.
     '''
     
     INTERNAL = True
+    tpm = TransitionMatrix()
     
     entrance_size = 2
     delay_time = 0.1
     
     
-    def __init__(self,in_nodes=default_in,
-                      out_nodes=default_out,
+    def __init__(self,in_nodes=None,
+                      out_nodes=None,
                       transitions=default_transitions,
                       size=size.medium,
                       right_of_way_count:int=2,
@@ -79,12 +76,14 @@ class Circle(object):
         '''
         Parameters:
         -----------
-        in_nodes: dict()
+        in_nodes: dict() or None
             A dictionary of nodes that serve as entrances.
             e.g. {'N':Node(),'E':Node(),'S':Node(),'W':Node()}
-        out_nodes: dict()
+            If None, then new nodes are created as in the example.
+        out_nodes: dict() or None
             A dictionary of nodes that serve as exits.
             e.g. {'N':Node(),'E':Node(),'S':Node(),'W':Node()}
+            If None, then new nodes are created as in the example.
         transitions: dict()
             A dictionary that will be converted to a 2d numpy.ndarray.
             It must be row stochastic. It determines which exit will be selected
@@ -108,8 +107,15 @@ class Circle(object):
             This is the velocity in meters per second that a vehicle will travel
             withing the circle. 
         '''
+
+        self.rng = GLOBAL_RNG  # See __basik__.random_streams
+        
         
         
+        if in_nodes is None:
+            in_nodes = {'N':Node(),'E':Node(),'S':Node(),'W':Node()}
+        if out_nodes is None:
+            out_nodes = {'N':Node(),'E':Node(),'S':Node(),'W':Node()}
         
         # Asses that all transition probabilties sum up to one
         self._check_transitions(transitions)
@@ -169,7 +175,7 @@ class Circle(object):
         Converts the dictionary into a numoy array.
         Creates self.tpm
         '''
-        self.tpm = np.zeros((4,4))
+        tpm = np.zeros((4,4))
         self.idx = {'N':0,'E':1,'S':2,'W':3}
         self.exit_idx = {'N':3,'E':0,'S':2,'W':2}
         for key1 in self.keys:
@@ -177,9 +183,10 @@ class Circle(object):
             for key2 in self.transitions[key1].keys():
                 try:
                     idx2 = self.idx[key2]
-                    self.tpm[idx1,idx2] = self.transitions[key1][key2]
+                    tpm[idx1,idx2] = self.transitions[key1][key2]
                 except KeyError:
                     pass
+        self.tpm = tpm
         return None
     
     #--------------------------------------------------------------------------
@@ -298,14 +305,14 @@ class Circle(object):
                 if aranged_time < time and count >= 1: 
                     # The two above criteria allow for a risk to be taken
                     # without a crash.
-                    take_chance = np.random.uniform(0,1) <= self.p_risk
+                    take_chance = self.rng.uniform(0,1) <= self.p_risk
                 if take_chance:
                     has_right_of_way = True
                     return has_right_of_way,aranged_time
                 else:
 #                    retry_time = time + 1e-6
                     retry_time = time +\
-                                 np.random.uniform(1e-3,self.delay_time)
+                                 self.rng.uniform(1e-3,self.delay_time)
                     return has_right_of_way,retry_time
 
                 
@@ -321,7 +328,7 @@ class Circle(object):
         
         
         
-        chosen_exit_idx = np.random.choice(a=self.idxs,p=self.tpm[idx])
+        chosen_exit_idx = choose_index(self.tpm_cdf[idx],self.rng)
         chosen_exit = self.exits[chosen_exit_idx]
         
         self.entrance_idx = idx
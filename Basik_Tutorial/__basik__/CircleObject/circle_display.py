@@ -1,6 +1,6 @@
 
 import numpy as np
-import matplotlib.pyplot as plt
+from ..lazy_imports import plt,Image
 
 from ..utils import quarter_circle
 from .circle import Circle
@@ -47,7 +47,7 @@ class CircleDisplay(object):
     small_standard_car_length = 10
     small_standard_car_width = 5
     
-    circle_image = plt.imread('__basik__/Images/circle_trees.jpg')
+    circle_image = Image('circle_trees.jpg')
     
     #--------------------------------------------------------------------------
 
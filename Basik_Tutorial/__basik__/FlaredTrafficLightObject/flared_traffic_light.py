@@ -1,11 +1,12 @@
 import numpy as np
 from .flared_traffic_light_cycle import FlaredTrafficLightCycle,default_cycle
-from ..utils import cycle_list,shuffle_list
+from ..utils import cycle_list,shuffle_list,TransitionMatrix,choose_index,CycleSequence
 from ..global_queue import Queue
 #from ..__init__ import Queue
 
 
 from ..node import Node
+from ..random_streams import GLOBAL_RNG
 
 
 
@@ -42,12 +43,16 @@ class FlaredTrafficLight(object):
         Allows one to check which index corresonds to which direction.
     tpm: numpy.ndarray
         A transition probability matrix. It is row stochastic.
+    tpm_cdf: list
+        The cumulative probabilities of every row of tpm from which exits 
+        are chosen. They are prepared whenever tpm is set.
     active_entrance: list
         A list that contains all the entrances which currently have a
         green light/right to proceed.
     '''
     
     INTERNAL = True
+    tpm = TransitionMatrix()  # set by every FlaredTrafficLightCycle
     SETUP_CYCLES = True
     
     size = 2  
@@ -83,6 +88,8 @@ class FlaredTrafficLight(object):
             in __basik__.FlowFunction.flared or 
             __basik__.FlaredTrafficLightObject.flared_traffic_light_cycle.
         '''
+
+        self.rng = GLOBAL_RNG  # See __basik__.random_streams
         
         self.keys = ['N','E','S','W']
         self.idxs = [0,1,2,3]
@@ -96,12 +103,14 @@ class FlaredTrafficLight(object):
         self.n_requests = 0
         self.active_entrances = []
         self.display = None
+        self.pending_cycles = None
         
     #--------------------------------------------------------------------------
           
     def setup_cycles(self,end_time,
                           start_time=0,
-                          fixed_cycle=True):
+                          fixed_cycle=True,
+                          lazy=False):
         
         '''Use the provided cycle_schedule to schedule the various states that
         the traffic light will take through the simulation.
@@ -123,6 +132,14 @@ class FlaredTrafficLight(object):
             If makes this list cyclic.
             If set to False, it will draw with uniform probability a flow
             function from the cycle_schedule.
+        lazy: bool
+            If True then only the first cycle is placed into the global queue.
+            Each following cycle is placed into it once the one before it is
+            activated. The global queue then only ever holds a single cycle of
+            the traffic light. A fixed cycle keeps the same order. Shuffled
+            cycles are drawn from rng one at a time, in between its other 
+            draws (e.g. of exits), and hence in a different order.
+            See __basik__.utils.CycleSequence
             
         Raises:
         -------
@@ -139,6 +156,14 @@ class FlaredTrafficLight(object):
         assert end_time > start_time
         assert end_time < np.inf
         
+        if lazy:
+            self.pending_cycles = CycleSequence(self,FlaredTrafficLightCycle,end_time,
+                                                start_time,fixed_cycle)
+            self.schedule_next_cycle()
+            return None
+        
+        self.pending_cycles = None
+        
         # Initial time set to zero
         T = end_time
         t = start_time
@@ -165,8 +190,35 @@ class FlaredTrafficLight(object):
                 cycle_specs = cycle_list(self.cycle_schedule)
             else:
                 cycle_specs = shuffle_list(self.cycle_schedule,
-                                           repeats_allowed=False)
+                                           repeats_allowed=False,
+                                           rng=self.rng)
         return None
+    
+    #--------------------------------------------------------------------------
+    
+    def schedule_next_cycle(self):
+        
+        '''Places the next cycle of a lazy traffic light into the current
+        global queue. This is called whenever a cycle is activated.
+        
+        Returns:
+        --------
+        bool
+            False if the traffic light has no further cycles.
+        '''
+        
+        if self.pending_cycles is None:
+            return False
+        
+        try:
+            cycle = next(self.pending_cycles)
+        except StopIteration:
+            self.pending_cycles = None
+            return False
+        
+        Queue.push(cycle)
+        
+        return True
             
     
     #--------------------------------------------------------------------------
@@ -319,7 +371,7 @@ class FlaredTrafficLight(object):
         
         chosen_entrance = self.entrances[idx]
         print('TPM: ',self.tpm[idx])
-        chosen_exit_idx = np.random.choice(a=self.idxs,p=self.tpm[idx])
+        chosen_exit_idx = choose_index(self.tpm_cdf[idx],self.rng)
         
         if self.allocate_left_buffer(idx,chosen_exit_idx):
 
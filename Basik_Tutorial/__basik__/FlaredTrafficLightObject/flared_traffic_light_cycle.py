@@ -25,6 +25,8 @@ class FlaredTrafficLightCycle(object):
     of the traffic light to the extacted cycle.
     '''
     
+    EVENT_KIND = 'cycle'
+    
     def __init__(self,start_time,cycle_specs,traffic_light=None):
         self.time = start_time
         assert len(cycle_specs) == 5 # (duration,to_unlock,tpm,to_lock,display)
@@ -53,6 +55,17 @@ class FlaredTrafficLightCycle(object):
             traffic_light_display.show_signals(signal_specs)
         print('...calling complete')
         return None        
+    
+    #--------------------------------------------------------------------------
+    
+    def fire(self,queue):
+        '''Changes the signal of the traffic light. See GlobalQueue.run_single_event
+        '''
+        self.activate()
+        queue.t = self.start_time
+        # A lazy traffic light only places its next cycle into the queue now.
+        self.traffic_light.schedule_next_cycle()
+        return True
 
     
     #--------------------------------------------------------------------------
@@ -2,7 +2,7 @@
 
 
 import numpy as np
-import matplotlib.pyplot as plt
+from ..lazy_imports import plt,Image
 
 from .flared_traffic_light import FlaredTrafficLight
 
@@ -244,23 +244,23 @@ class FlaredTrafficLightDisplay(object):
     # own each time. This would be wasteful in terms of memory.
     
     # N
-    block_N_image = plt.imread('__basik__/Images/flared_traffic_light/block_N.jpg')
-    block_N_buffer_image = plt.imread('__basik__/Images/flared_traffic_light/block_N_turn.jpg')
+    block_N_image = Image('flared_traffic_light/block_N.jpg')
+    block_N_buffer_image = Image('flared_traffic_light/block_N_turn.jpg')
     
     # E
-    block_E_image = plt.imread('__basik__/Images/flared_traffic_light/block_E.jpg')
-    block_E_buffer_image = plt.imread('__basik__/Images/flared_traffic_light/block_E_turn.jpg')
+    block_E_image = Image('flared_traffic_light/block_E.jpg')
+    block_E_buffer_image = Image('flared_traffic_light/block_E_turn.jpg')
     
     # S
-    block_S_image = plt.imread('__basik__/Images/flared_traffic_light/block_S.jpg')
-    block_S_buffer_image = plt.imread('__basik__/Images/flared_traffic_light/block_S_turn.jpg')
+    block_S_image = Image('flared_traffic_light/block_S.jpg')
+    block_S_buffer_image = Image('flared_traffic_light/block_S_turn.jpg')
     
     # 
-    block_W_image = plt.imread('__basik__/Images/flared_traffic_light/block_W.jpg')
-    block_W_buffer_image = plt.imread('__basik__/Images/flared_traffic_light/block_W_turn.jpg')
+    block_W_image = Image('flared_traffic_light/block_W.jpg')
+    block_W_buffer_image = Image('flared_traffic_light/block_W_turn.jpg')
     
     
-    flared_traffic_light_image = plt.imread('__basik__/Images/flared_traffic_light/all_entrances.jpg')
+    flared_traffic_light_image = Image('flared_traffic_light/all_entrances.jpg')
     
     
     #--------------------------------------------------------------------------
@@ -4,7 +4,8 @@
 # schedule_on_ramp_move
 
 import numpy as np
-from ..utils import dict_to_array,check_tpm
+from ..utils import dict_to_array,check_tpm,TransitionMatrix,choose_index
+from ..random_streams import GLOBAL_RNG
 
 
 
@@ -75,6 +76,7 @@ class Intersection(object):
     '''
     
     INTERNAL = True
+    tpm = TransitionMatrix()
     
     main_flow_lookup = [True,False,True,False]
     idxs = [0,1,2,3]
@@ -140,6 +142,8 @@ class Intersection(object):
             of way.
         
         '''
+
+        self.rng = GLOBAL_RNG  # See __basik__.random_streams
         
         self.N_main_flow_entrance = N_main_flow_entrance
         self.S_main_flow_entrance = S_main_flow_entrance
@@ -205,8 +209,7 @@ class Intersection(object):
         
         self.current_entrance_idx = idx
         self.current_entrance = self.entrances[idx]
-        self.current_exit_idx = np.random.choice(a=self.idxs,
-                                                 p=self.tpm[idx])
+        self.current_exit_idx = choose_index(self.tpm_cdf[idx],self.rng)
         self.current_exit = self.exits[self.current_exit_idx]
         
         return None
@@ -397,7 +400,7 @@ class Intersection(object):
                 if entrance.occupied:
                     if aranged_time > entrance.vehicle.time:
                         retry_time = entrance.vehicle.time +\
-                                     np.random.uniform(1e-3,self.delay_time)
+                                     self.rng.uniform(1e-3,self.delay_time)
                         return False,retry_time
                 else:
                     pass
@@ -433,7 +436,7 @@ class Intersection(object):
                     # The chance-taker should also have the knowledge that 
                     # it will move before the vehicle occupying the node
                     # in question
-                    take_chance = np.random.uniform(0,1) <= self.p_risk
+                    take_chance = self.rng.uniform(0,1) <= self.p_risk
                 
                 
                 # CASE 1: Successfully takes a chance at the original aranged time
@@ -445,7 +448,7 @@ class Intersection(object):
                 # Returns (false,rescheduled time)
                 else:
                     retry_time = time +\
-                                 np.random.uniform(1e-3,self.delay_time)
+                                 self.rng.uniform(1e-3,self.delay_time)
                     return has_right_of_way,retry_time
             
             # An additional node has been verified to be un-occupid
@@ -1,7 +1,7 @@
 
 
 import numpy as np
-import matplotlib.pyplot as plt
+from ..lazy_imports import plt,Image
 from .intersection import Intersection
 
 
@@ -106,23 +106,23 @@ class IntersectionDisplay(object):
     # Images pre-loaded to block.
     
     # North
-    block_N_image = plt.imread('__basik__/Images/intersection/block_N.jpg')
+    block_N_image = Image('intersection/block_N.jpg')
     block_N_extent0 = np.array([26,74,67.7,100])
     
     # East
-    block_E_image = plt.imread('__basik__/Images/intersection/block_E.jpg')
+    block_E_image = Image('intersection/block_E.jpg')
     block_E_extent0 = np.array([68.5,100,27,74])
     
     # South
-    block_S_image = plt.imread('__basik__/Images/intersection/block_S.jpg')
+    block_S_image = Image('intersection/block_S.jpg')
     block_S_extent0 = np.array([26,74,0,32.4])
 
     # West
-    block_W_image = plt.imread('__basik__/Images/intersection/block_W.jpg')
+    block_W_image = Image('intersection/block_W.jpg')
     block_W_extent0 = np.array([0,31.5,26,74])
     
 
-    intersection_image = plt.imread('__basik__/Images/intersection/all_entrances.png')
+    intersection_image = Image('intersection/all_entrances.png')
     
     
     #--------------------------------------------------------------------------
@@ -1,6 +1,8 @@
 
 
 import numpy as np
+from ..utils import TransitionMatrix,choose_index
+from ..random_streams import GLOBAL_RNG
 
 
 
@@ -15,6 +17,7 @@ class OffRamp(object):
     size = 2 # The equivalent amount of nodes traversed
     
     INTERNAL = True
+    tpm = TransitionMatrix()
     
     #--------------------------------------------------------------------------
     
@@ -55,6 +58,8 @@ class OffRamp(object):
             be less than 0.5, however, any values between zero and one is
             permitted.
         '''
+
+        self.rng = GLOBAL_RNG  # See __basik__.random_streams
         
         self._create_tpm(off_prob)
         self._setup_entrance_and_exits(offramp_lane_entrance,
@@ -130,7 +135,7 @@ class OffRamp(object):
     #--------------------------------------------------------------------------
     
     def choose_exit(self):
-        self.chosen_exit_idx =  int(np.random.choice(a=self.idxs,p=self.tpm))
+        self.chosen_exit_idx = choose_index(self.tpm_cdf,self.rng)
         self.chosen_exit_key = self.keys[self.chosen_exit_idx]
         self.chosen_exit = self.exits[self.chosen_exit_idx]
         
@@ -1,12 +1,11 @@
 
 import numpy as np
-import matplotlib.pyplot as plt
+from ..lazy_imports import plt,rotate,Image
 
 from .off_ramp import OffRamp
 
 # Use these to rotate the off ramp
 from ..utils import rotate_coord
-import scipy.ndimage as im
 
 #------------------------------------------------------------------------------
 
@@ -52,7 +51,7 @@ class OffRampDisplay(object):
     
     origin0 = np.array([50,50])   # in the center of extent0
     
-    off_ramp_image = plt.imread('__basik__/Images/offramp.jpg')
+    off_ramp_image = Image('offramp.jpg')
 
     #--------------------------------------------------------------------------
 
@@ -240,7 +239,7 @@ class OffRampDisplay(object):
         
         # Rotate the image about its center
         self.hide()
-        self.image = im.rotate(self.image,-degrees,reshape=True)
+        self.image = rotate(self.image,-degrees,reshape=True)
         self.show()
         
         # Adjust the bearings
@@ -1,5 +1,6 @@
 
 import numpy as np
+from ..random_streams import GLOBAL_RNG
 
 
 
@@ -77,6 +78,8 @@ class OnRamp(object):
             that vehicles vehicles have of what is adequate to give them right
             of way.
         '''
+
+        self.rng = GLOBAL_RNG  # See __basik__.random_streams
         
         self._setup_entrance_and_exits(main_flow_entrance,
                                        sub_flow_entrance,
@@ -171,14 +174,14 @@ class OnRamp(object):
                     # The chance-taker should also have the knowledge that 
                     # it will move before the vehicle occupying the node
                     # in question
-                    take_chance = np.random.uniform(0,1) <= self.p_risk
+                    take_chance = self.rng.uniform(0,1) <= self.p_risk
                     
                 if take_chance:
                     has_right_of_way = True
                     return has_right_of_way,aranged_time
                 else:
                     retry_time = time +\
-                                 np.random.uniform(1e-3,self.delay_time)
+                                 self.rng.uniform(1e-3,self.delay_time)
                     return has_right_of_way,retry_time
             
             # An additional node has been verified to be un-occupid
@@ -1,10 +1,9 @@
 
 import numpy as np
-import matplotlib.pyplot as plt
+from ..lazy_imports import plt,rotate,Image
 
 from .on_ramp import OnRamp
 from ..utils import rotate_coord
-import scipy.ndimage as im
 
 #------------------------------------------------------------------------------
 
@@ -61,7 +60,7 @@ class OnRampDisplay(object):
     origin0 = np.array([50,50])   # in the center of extent0
     
     
-    on_ramp_image = plt.imread('__basik__/Images/onramp.jpg')
+    on_ramp_image = Image('onramp.jpg')
 
     #--------------------------------------------------------------------------
 
@@ -258,7 +257,7 @@ class OnRampDisplay(object):
         
         # Rotate the image about its center
         self.hide()
-        self.image = im.rotate(self.image,-degrees,reshape=True)
+        self.image = rotate(self.image,-degrees,reshape=True)
         self.show()
         
         # Adjust the bearings
@@ -4,12 +4,62 @@ import numpy as np
 from .pedestrian_crossing_event import PedestrianCrossingEvent
 from ..global_queue import Queue
 from ..node import Node
+from ..random_streams import GLOBAL_RNG
 
 from copy import deepcopy
 
 #-------------------------------------------------------------------------------       
 
 
+class _PedestrianCrossings(object):
+    
+    '''Iterates over the PedestrianCrossingEvents of a PedestrianCrossing.
+    
+    The two-state continuous-time Markov Process is simulated (by means of
+    uniformization) up to the end of each crossing of pedestrians i.e. a 
+    transition from the on state to the off state.
+    '''
+    
+    def __init__(self,pedestrian_crossing,end_time,start_time=0):
+        
+        self.pedestrian_crossing = pedestrian_crossing
+        self.end_time = end_time
+        self.t = start_time
+        self.state = None
+        self.pedestrian_crossing_starts = 0
+        
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        
+        crossing = self.pedestrian_crossing
+        rng = crossing.rng
+        
+        if self.state is None:
+            self.state = rng.choice(a=crossing.states,
+                                    p=[crossing.on_initial_probability,
+                                       1-crossing.on_initial_probability])
+        
+        while self.t < self.end_time:
+            
+            self.t += rng.exponential(scale=1/crossing.sample_rate)
+            state = self.state
+            self.state = rng.choice(a=crossing.states,
+                                    p=crossing.dtmc[state])
+            
+            if (state == 0 and self.state == 1):
+                return PedestrianCrossingEvent(start_time=self.pedestrian_crossing_starts,
+                                               end_time=self.t,
+                                               pedestrian_crossing=crossing)
+            if (state == 1 and self.state == 0):
+                self.pedestrian_crossing_starts = self.t
+        
+        raise StopIteration
+
+#-------------------------------------------------------------------------------       
+
+
 class PedestrianCrossing(object):
     
     '''Allows for the delay of vehicles due the crossing of pedestrians.
@@ -60,6 +110,8 @@ class PedestrianCrossing(object):
             The probability that the first state that the pedestrian crossing is
             found operaing in the on state at the start_time.
         '''
+
+        self.rng = GLOBAL_RNG  # See __basik__.random_streams
         
         
         self.on_duration = on_duration
@@ -87,11 +139,14 @@ class PedestrianCrossing(object):
         self.n_requests = 0
         
         self.display = None
+        self.pending_crossings = None
         
     #--------------------------------------------------------------------------
           
     def setup_cycles(self,end_time,
-                          start_time=0):
+                          start_time=0,
+                          fixed_cycle=True,
+                          lazy=False):
         
         '''
         Parameters:
@@ -102,6 +157,14 @@ class PedestrianCrossing(object):
         start_time: float
             The time at which an initial state for the pedestrian crossing
             is randomly selected.
+        fixed_cycle: bool
+            Not used. It allows __basik__.simulation_session.Session to set up
+            the cycles of pedestrian crossings and traffic lights alike.
+        lazy: bool
+            If True then only the first crossing of pedestrians is placed into
+            the global queue. Each following crossing is simulated and placed
+            into it once the one before it has ended. The random draws and
+            hence the crossings remain the same.
             
         Raises:
         -------
@@ -116,9 +179,6 @@ class PedestrianCrossing(object):
         assert end_time > start_time
         assert end_time < np.inf
         
-        # Initial time set to zero
-        T = end_time
-        t = start_time
         # Uniformization
         self.ctmc = np.array([[-self.on_rate,self.on_rate],
                               [self.off_rate,-self.off_rate]])
@@ -126,44 +186,43 @@ class PedestrianCrossing(object):
         self.dtmc = np.eye(2) + self.ctmc/self.sample_rate
         
         
-        pedestrian_crossing_starts = 0
-        pedestrians_crossing_ends = 0
+        crossings = _PedestrianCrossings(self,end_time,start_time)
         
-
-        state = np.random.choice(a=self.states,
-                                 p=[self.on_initial_probability,
-                                    1-self.on_initial_probability])
-                
+        if lazy:
+            self.pending_crossings = crossings
+            self.schedule_next_crossing()
+        else:
+            self.pending_crossings = None
+            for event in crossings:
+                Queue.push(event)
+        
+        return None
     
-        while True:
-            
-            delta = np.random.exponential(scale=1/self.sample_rate)
-            t += delta
-            
-            next_state = np.random.choice(a=self.states,
-                                          p=self.dtmc[state])
-            
-            if state == next_state:
-                # We remain in the state
-                pass
-            else:
-                if (state == 0 and next_state == 1):
-                    pedestrians_crossing_ends = t
-                    event = PedestrianCrossingEvent(start_time=pedestrian_crossing_starts,
-                                                    end_time=pedestrians_crossing_ends,
-                                                    pedestrian_crossing=self)
-                    Queue.push(event)
-                    
-                if (state == 1 and next_state == 0):
-                    pedestrian_crossing_starts = t
-                
-            if t >= T:
-                break
-            
-            state = next_state
+    #--------------------------------------------------------------------------
+    
+    def schedule_next_crossing(self):
         
+        '''Places the next crossing of pedestrians of a lazy pedestrian crossing
+        into the current global queue. This is called whenever a crossing ends.
         
-        return None
+        Returns:
+        --------
+        bool
+            False if the pedestrian crossing has no further crossings.
+        '''
+        
+        if self.pending_crossings is None:
+            return False
+        
+        try:
+            event = next(self.pending_crossings)
+        except StopIteration:
+            self.pending_crossings = None
+            return False
+        
+        Queue.push(event)
+        
+        return True
             
     
     #--------------------------------------------------------------------------
@@ -6,8 +6,7 @@
 
 
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.ndimage import rotate
+from ..lazy_imports import plt,rotate,Image
 
 from ..utils import rotate_all_coords,rotate_coord
 from .pedestrian_crossing import PedestrianCrossing
@@ -36,9 +35,9 @@ class PedestrianCrossingDisplay(object):
     origin0 = np.array([50,50]) # center of the standard image/extent
     
     # Pre-load umbrellas/pedestrians
-    u1 = plt.imread('__basik__/Images/umbrella1.png')
-    u2 = plt.imread('__basik__/Images/umbrella2.png')
-    u3 = plt.imread('__basik__/Images/umbrella3.png')
+    u1 = Image('umbrella1.png')
+    u2 = Image('umbrella2.png')
+    u3 = Image('umbrella3.png')
     
     u_coords0 = np.array([[45,55],
                           [52,52],
@@ -47,7 +46,7 @@ class PedestrianCrossingDisplay(object):
                           [47.5,47.5],
                           [50,64],
                           [57,37]])
-    u_image = [u1,u2,u3,u3,u2,u1,u1]
+    u_image_order = ('u1','u2','u3','u3','u2','u1','u1')
     u_size0 = 3
     
     
@@ -78,7 +77,7 @@ class PedestrianCrossingDisplay(object):
     E_to_W_bearings0 = 270
 
 
-    pedestrian_crossing_image = plt.imread('__basik__/Images/pedestrian_crossing.jpg')
+    pedestrian_crossing_image = Image('pedestrian_crossing.jpg')
     
     #--------------------------------------------------------------------------
     
@@ -133,6 +132,13 @@ class PedestrianCrossingDisplay(object):
         
             
     
+    #--------------------------------------------------------------------------
+    
+    @property
+    def u_image(self):
+        # The umbrella images are only read once they are displayed.
+        return [getattr(self,name) for name in self.u_image_order]
+    
     #--------------------------------------------------------------------------
     
     def turn_on_display(self):
@@ -15,6 +15,8 @@ class PedestrianCrossingEvent(object):
     Extract it from the heap at its start time to change the current cycle.
     '''
     
+    EVENT_KIND = 'obstruction'
+    
     def __init__(self,start_time,end_time,pedestrian_crossing=None):
         self.time = start_time
         self.start_time = start_time
@@ -59,6 +61,22 @@ class PedestrianCrossingEvent(object):
             pedestrian_crossing_display.hide_pedestrians()
         
         return None
+    
+    #--------------------------------------------------------------------------
+    
+    def fire(self,queue):
+        '''Pedestrians start or stop crossing. See GlobalQueue.run_single_event
+        '''
+        if self.do_activate:
+            self.activate()
+            queue.t = self.start_time
+        else:
+            self.deactivate()
+            queue.t = self.end_time
+            # A lazy pedestrian crossing only now places its next crossing
+            # into the queue.
+            self.pedestrian_crossing.schedule_next_crossing()
+        return True
 
     
     #--------------------------------------------------------------------------
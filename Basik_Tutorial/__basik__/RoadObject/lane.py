@@ -5,11 +5,48 @@
 
 
 
+from bisect import bisect_left,bisect_right,insort
+from collections.abc import Sequence
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.ndimage import rotate
 
 from ..node import Node
+from ..random_streams import GLOBAL_RNG
+
+#------------------------------------------------------------------------------
+
+class NodeOccupancy(Sequence):
+    
+    '''The occupation status of each node of a lane, read from the nodes
+    only when it is indexed or iterated. Making one is O(1).
+    '''
+    
+    __slots__ = ('lane',)
+    
+    def __init__(self,lane):
+        self.lane = lane
+    
+    def __getitem__(self,idx):
+        if isinstance(idx,slice):
+            return [node.occupied for node in self.lane.nodes[idx]]
+        return self.lane.nodes[idx].occupied
+    
+    def __len__(self):
+        return len(self.lane.nodes)
+    
+    def __contains__(self,value):
+        # True in occupancy is answered from the occupancy index.
+        if value is True:
+            return bool(self.lane.occupied_positions)
+        if value is False:
+            return self.lane.n_occupied < len(self.lane.nodes)
+        return False
+    
+    def __eq__(self,other):
+        return list(self) == list(other)
+    
+    def __repr__(self):
+        return repr(list(self))
 
 #------------------------------------------------------------------------------
 
@@ -41,7 +78,20 @@ class Lane(object):
         True if all nodes are occupied by a vehicle.
     is_empty: tuple
         (bool:has at least one occupied node,
-        list: a list of the occupation status of each node)
+        NodeOccupancy: the occupation status of each node). The bool is 
+        found in O(1). The statuses are only read from the nodes once they
+        are indexed or iterated. See occupied_list for a list.
+    n_occupied: int
+        The amount of nodes that are currently occupied by a vehicle.
+    occupied_positions: list
+        Sorted indices (into nodes) of the occupied nodes.
+    service_positions: list
+        Sorted indices (into nodes) of the service nodes. These are the
+        entrances and exits of components as well as obstructions.
+    queue_tail: int or None
+        Index of the last vehicle in the queue that reaches the out_node.
+    rng: numpy.random.Generator or __basik__.random_streams.GlobalStream
+        The stream from which obstructions on its nodes draw their durations.
     distance: float
         The distance that the Lane spans. The formula for this is
         len(nodes)*__basik__.node.Node.distance
@@ -82,6 +132,7 @@ class Lane(object):
         
         self.length = length
         self.circle_node_status = circle_node
+        self.rng = GLOBAL_RNG
         self.build()
         self.allocate_lanes(overflow_protection)
 
@@ -130,51 +181,196 @@ class Lane(object):
     
     def allocate_lanes(self,overflow_protection):
         
-        for node in self.nodes:
+        for position,node in enumerate(self.nodes):
             node.lane = self
+            node.lane_position = position
             node.overflow_protection = overflow_protection
         
+        self.build_occupancy_index()
+        
         return None
     
     #--------------------------------------------------------------------------
     
-    @property
-    def is_full(self):
+    def build_occupancy_index(self):
         
-        n_capacity = len(self.nodes)
-        n_occupied = 0
+        '''Builds the occupancy index from the current state of the nodes.
         
-        for node in self.nodes:
-            if node.service_node:
-                # Service nodes can be emptied
-                n_capacity -= 1  # reduce capacity as we don't count service node
-                continue
+        The index is updated incrementally by the nodes themselves whenever
+        __basik__.node.Node.occupied or __basik__.node.Node.service_node
+        changes. Hence, this only needs to be called once.
+        
+        Returns:
+        --------
+        None
+        '''
+        
+        self.occupied_positions = []
+        self.service_positions = []
+        # Vacant nodes are neither occupied nor service nodes.
+        self.n_vacant = 0
+        
+        for position,node in enumerate(self.nodes):
             if node.occupied:
-                n_occupied += 1
+                self.occupied_positions.append(position)
+            if node.service_node:
+                self.service_positions.append(position)
+            if not (node.occupied or node.service_node):
+                self.n_vacant += 1
         
-        if n_capacity == n_occupied:
-            return True
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def occupancy_changed(self,node):
+        
+        '''Called by a node of the lane when a vehicle enters or leaves it.'''
+        
+        position = node.lane_position
+        if node.occupied:
+            insort(self.occupied_positions,position)
+            if not node.service_node:
+                self.n_vacant -= 1
         else:
-            return False
+            del self.occupied_positions[bisect_left(self.occupied_positions,
+                                                    position)]
+            if not node.service_node:
+                self.n_vacant += 1
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def service_changed(self,node):
+        
+        '''Called by a node of the lane when it becomes or stops being a 
+        service node.'''
+        
+        position = node.lane_position
+        if node.service_node:
+            insort(self.service_positions,position)
+            if not node.occupied:
+                self.n_vacant -= 1
+        else:
+            del self.service_positions[bisect_left(self.service_positions,
+                                                   position)]
+            if not node.occupied:
+                self.n_vacant += 1
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    @property
+    def n_occupied(self):
+        return len(self.occupied_positions)
+    
+    #--------------------------------------------------------------------------
+    
+    @property
+    def is_full(self):
+        # Service nodes can be emptied and are not counted towards capacity.
+        return self.n_vacant == 0
     
     #--------------------------------------------------------------------------
     
     @property
     def is_empty(self):
+        return bool(self.occupied_positions),NodeOccupancy(self)
+    
+    #--------------------------------------------------------------------------
+    
+    def occupied_list(self)->list:
         
-        occupied_list = []
+        '''
+        Returns:
+        --------
+        list:
+            The occupation status (bool) of each node in O(n).
+        '''
         
-        for node in self.nodes:
-            occupied_list.append(node.occupied)
+        return [node.occupied for node in self.nodes]
+    
+    #--------------------------------------------------------------------------
+    
+    def next_occupied(self,position:int):
+        
+        '''
+        Parameters:
+        -----------
+        position: int
+            Index into nodes.
             
-        if True in occupied_list:
-            status = True
-        else:
-            status = False
+        Returns:
+        --------
+        int or None:
+            Index of the first occupied node in front of position. None if 
+            there is no vehicle in front of position in this lane.
+        '''
+        
+        idx = bisect_right(self.occupied_positions,position)
+        if idx == len(self.occupied_positions):
+            return None
+        return self.occupied_positions[idx]
+    
+    #--------------------------------------------------------------------------
+    
+    def next_service(self,position:int):
+        
+        '''Same as next_occupied but for service nodes.'''
+        
+        idx = bisect_right(self.service_positions,position)
+        if idx == len(self.service_positions):
+            return None
+        return self.service_positions[idx]
+    
+    #--------------------------------------------------------------------------
+    
+    def distance_ahead(self,node):
+        
+        '''
+        Parameters:
+        -----------
+        node: __basik__.node.Node
+            A node of this lane.
+            
+        Returns:
+        --------
+        float or None:
+            The distance in meters to the first vehicle in front of node
+            within this lane. None if there is no such vehicle.
+        '''
+        
+        position = self.next_occupied(node.lane_position)
+        if position is None:
+            return None
+        return (position - node.lane_position)*Node.distance
+    
+    #--------------------------------------------------------------------------
+    
+    @property
+    def queue_tail(self):
+        
+        # The queue is the longest run of occupied nodes that ends at the
+        # out_node. For the occupied positions p[j] of such a run we have
+        # p[j] - j == length - n_occupied and p[j] - j never decreases.
+        # Hence, the start of the run can be found with a binary search.
         
-        return status,occupied_list
+        positions = self.occupied_positions
+        n_occupied = len(positions)
+        if not n_occupied or positions[-1] != self.length - 1:
+            return None
         
+        offset = self.length - n_occupied
+        low,high = 0,n_occupied - 1
+        while low < high:
+            mid = (low + high)//2
+            if positions[mid] - mid < offset:
+                low = mid + 1
+            else:
+                high = mid
         
+        return positions[low]
     
     #--------------------------------------------------------------------------
     
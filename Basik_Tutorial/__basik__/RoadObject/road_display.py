@@ -2,8 +2,7 @@
 
 
 import numpy as np
-from scipy.ndimage import rotate
-import matplotlib.pyplot as plt
+from ..lazy_imports import plt,rotate,Image
 from copy import deepcopy
 
 from .lane import Lane
@@ -29,10 +28,10 @@ class RoadDisplay(object):
     prob_trees = 0.7  # probability of displaying trees
     
     
-    road_image = plt.imread('__basik__/Images/road.jpg')
-    trees_image = plt.imread('__basik__/Images/road_side_trees.jpg')
-    buildings_image = plt.imread('__basik__/Images/road_side_buildings.jpg')
-    field = plt.imread('__basik__/Images/farm_field.jpg')
+    road_image = Image('road.jpg')
+    trees_image = Image('road_side_trees.jpg')
+    buildings_image = Image('road_side_buildings.jpg')
+    field = Image('farm_field.jpg')
     
     #--------------------------------------------------------------------------
 
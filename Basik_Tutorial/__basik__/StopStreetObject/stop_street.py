@@ -1,6 +1,8 @@
 
 import numpy as np
 from ..node import Node
+from ..utils import TransitionMatrix,choose_index
+from ..random_streams import GLOBAL_RNG
 
 #-------------------------------------------------------------------------------       
 
@@ -41,9 +43,13 @@ class StopStreet(object):
         Allows one to check which index corresonds to which direction.
     tpm: numpy.ndarray
         A transition probability matrix. It is row stochastic.
+    tpm_cdf: list
+        The cumulative probabilities of every row of tpm from which exits 
+        are chosen. They are prepared whenever tpm is set.
     '''
     
     INTERNAL = True
+    tpm = TransitionMatrix()
     
     size = 2
     
@@ -69,6 +75,8 @@ class StopStreet(object):
             See __basik__.StopStreetObject.stop_street.StopStreet.default_transitions
             for an example.
         '''
+
+        self.rng = GLOBAL_RNG  # See __basik__.random_streams
         
         # Asses that all transition probabilties sum up to one
         self._check_transitions(transitions)
@@ -109,7 +117,7 @@ class StopStreet(object):
         Converts the dictionary into a numoy array.
         Creates self.tpm
         '''
-        self.tpm = np.zeros((4,4))
+        tpm = np.zeros((4,4))
         self.idx = {'N':0,'E':1,'S':2,'W':3}
         self.idxs = [0,1,2,3]
         for key1 in self.present_keys:
@@ -117,9 +125,10 @@ class StopStreet(object):
             for key2 in self.transitions[key1].keys():
                 try:
                     idx2 = self.idx[key2]
-                    self.tpm[idx1,idx2] = self.transitions[key1][key2]
+                    tpm[idx1,idx2] = self.transitions[key1][key2]
                 except KeyError:
                     pass
+        self.tpm = tpm
         return None
         
     #---------------------------------------------------------------------------
@@ -182,7 +191,7 @@ class StopStreet(object):
     def choose_exit(self,idx):
         # Choose a choice node that leads to an exit/out-node
         chosen_entrance = self.entrances[idx]
-        chosen_exit_idx = int(np.random.choice(a=self.idxs,p=self.tpm[idx]))
+        chosen_exit_idx = choose_index(self.tpm_cdf[idx],self.rng)
         chosen_exit = self.exits[chosen_exit_idx]
 #        chosen_exit = np.random.choice(a=self.exits,p=self.tpm[idx])
         chosen_entrance.front = chosen_exit
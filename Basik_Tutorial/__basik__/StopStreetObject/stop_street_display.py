@@ -1,7 +1,7 @@
 
 
 import numpy as np
-import matplotlib.pyplot as plt
+from ..lazy_imports import plt,Image
 
 from ..utils import quarter_circle,dist
 
@@ -60,22 +60,22 @@ class StopStreetDisplay(object):
     # Images pre-loaded to block.
     
     # North
-    block_N_image = plt.imread('__basik__/Images/stop_street/block_N.jpg')
+    block_N_image = Image('stop_street/block_N.jpg')
     block_N_extent0 = np.array([24,67,64,100])
     
     # East
-    block_E_image = plt.imread('__basik__/Images/stop_street/block_E.jpg')
+    block_E_image = Image('stop_street/block_E.jpg')
     block_E_extent0 = np.array([63,100,24,68])
     
     # South
-    block_S_image = plt.imread('__basik__/Images/stop_street/block_S.jpg')
+    block_S_image = Image('stop_street/block_S.jpg')
     block_S_extent0 = np.array([33,67,0,36.5])
 
     # West
-    block_W_image = plt.imread('__basik__/Images/stop_street/block_W.jpg')
+    block_W_image = Image('stop_street/block_W.jpg')
     block_W_extent0 = np.array([0,36,32,68.3])
     
-    stop_street_image = plt.imread('__basik__/Images/stop_street/all_entrances.png')
+    stop_street_image = Image('stop_street/all_entrances.png')
 
     
     #--------------------------------------------------------------------------
@@ -3,9 +3,10 @@
 
 import numpy as np
 from .traffic_light_cycle import TrafficLightCycle,default_cycle
-from ..utils import cycle_list,shuffle_list
+from ..utils import cycle_list,shuffle_list,TransitionMatrix,choose_index,CycleSequence
 from ..global_queue import Queue
 from ..node import Node
+from ..random_streams import GLOBAL_RNG
 
 from copy import deepcopy
 
@@ -39,6 +40,9 @@ class TrafficLight(object):
         Allows one to check which index corresonds to which direction.
     tpm: numpy.ndarray
         A transition probability matrix. It is row stochastic.
+    tpm_cdf: list
+        The cumulative probabilities of every row of tpm from which exits 
+        are chosen. They are prepared whenever tpm is set.
     active_entrance: list
         A list that contains all the entrances which currently have a
         green light/right to proceed.
@@ -46,6 +50,7 @@ class TrafficLight(object):
     '''
     
     INTERNAL = True
+    tpm = TransitionMatrix()  # set by every TrafficLightCycle
     SETUP_CYCLES = True
     
     size = 2  # 2 meters <==> two nodes
@@ -72,6 +77,8 @@ class TrafficLight(object):
             in __basik__.FlowFunction.non_flared or 
             __basik__.TrafficLightObject.traffic_light_cycle.
         '''
+
+        self.rng = GLOBAL_RNG  # See __basik__.random_streams
         
         self.keys = ['N','E','S','W']
         self.idxs = [0,1,2,3]
@@ -82,12 +89,14 @@ class TrafficLight(object):
         self.n_requests = 0
         self.active_entrances = []
         self.display = None
+        self.pending_cycles = None
         
     #--------------------------------------------------------------------------
           
     def setup_cycles(self,end_time,
                           start_time=0,
-                          fixed_cycle=True):
+                          fixed_cycle=True,
+                          lazy=False):
         
         '''Use the provided cycle_schedule to schedule the various states that
         the traffic light will take through the simulation.
@@ -109,6 +118,14 @@ class TrafficLight(object):
             If makes this list cyclic.
             If set to False, it will draw with uniform probability a flow
             function from the cycle_schedule.
+        lazy: bool
+            If True then only the first cycle is placed into the global queue.
+            Each following cycle is placed into it once the one before it is
+            activated. The global queue then only ever holds a single cycle of
+            the traffic light. A fixed cycle keeps the same order. Shuffled
+            cycles are drawn from rng one at a time, in between its other 
+            draws (e.g. of exits), and hence in a different order.
+            See __basik__.utils.CycleSequence
             
         Raises:
         -------
@@ -121,6 +138,14 @@ class TrafficLight(object):
         None
         '''
                 
+        if lazy:
+            self.pending_cycles = CycleSequence(self,TrafficLightCycle,end_time,
+                                                start_time,fixed_cycle)
+            self.schedule_next_cycle()
+            return None
+        
+        self.pending_cycles = None
+        
         # Initial time set to zero
         T = end_time
         t = start_time
@@ -147,8 +172,35 @@ class TrafficLight(object):
                 cycle_specs = cycle_list(self.cycle_schedule)
             else:
                 cycle_specs = shuffle_list(self.cycle_schedule,
-                                           repeats_allowed=False)
+                                           repeats_allowed=False,
+                                           rng=self.rng)
         return None
+    
+    #--------------------------------------------------------------------------
+    
+    def schedule_next_cycle(self):
+        
+        '''Places the next cycle of a lazy traffic light into the current
+        global queue. This is called whenever a cycle is activated.
+        
+        Returns:
+        --------
+        bool
+            False if the traffic light has no further cycles.
+        '''
+        
+        if self.pending_cycles is None:
+            return False
+        
+        try:
+            cycle = next(self.pending_cycles)
+        except StopIteration:
+            self.pending_cycles = None
+            return False
+        
+        Queue.push(cycle)
+        
+        return True
             
     
     #--------------------------------------------------------------------------
@@ -219,10 +271,8 @@ class TrafficLight(object):
         
         chosen_entrance = self.entrances[idx]
         assert chosen_entrance.locked == False
-        chosen_exit_idx = np.random.choice(a=self.idxs,p=self.tpm[idx])
+        chosen_exit_idx = choose_index(self.tpm_cdf[idx],self.rng)
         chosen_exit = self.exits[chosen_exit_idx]
-        
-        chosen_exit = np.random.choice(a=self.exits,p=self.tpm[idx])
         chosen_entrance.front = chosen_exit
         chosen_exit.behind = chosen_entrance
         
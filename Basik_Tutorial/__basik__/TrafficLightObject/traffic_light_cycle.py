@@ -15,6 +15,8 @@ class TrafficLightCycle(object):
     of the traffic light to the extacted cycle.
     '''
     
+    EVENT_KIND = 'cycle'
+    
     def __init__(self,start_time,cycle_specs,traffic_light=None):
         self.time = start_time
         assert len(cycle_specs) == 5 # (duration,to_unlock,tpm,to_lock,display)
@@ -41,6 +43,17 @@ class TrafficLightCycle(object):
 #            assert isinstance(traffic_light_display,TrafficLightDisplay)
             traffic_light_display.show_signals(signal_specs)
         return None        
+    
+    #--------------------------------------------------------------------------
+    
+    def fire(self,queue):
+        '''Changes the signal of the traffic light. See GlobalQueue.run_single_event
+        '''
+        self.activate()
+        queue.t = self.start_time
+        # A lazy traffic light only places its next cycle into the queue now.
+        self.traffic_light.schedule_next_cycle()
+        return True
 
     
     #--------------------------------------------------------------------------
@@ -1,6 +1,6 @@
 
 import numpy as np
-import matplotlib.pyplot as plt
+from ..lazy_imports import plt,Image
 from ..utils import quarter_circle,dist
 
 from .traffic_light import TrafficLight
@@ -67,24 +67,24 @@ class TrafficLightDisplay(object):
     # Images pre-loaded to block.
     
     # North
-    block_N_image = plt.imread('__basik__/Images/traffic_light/block_N.jpg')
+    block_N_image = Image('traffic_light/block_N.jpg')
     block_N_extent0 = np.array([32,62,58.7,100])
     
     # East
-    block_E_image = plt.imread('__basik__/Images/traffic_light/block_E.jpg')
+    block_E_image = Image('traffic_light/block_E.jpg')
     block_E_extent0 = np.array([58.5,100,38,62])
     
     # South
-    block_S_image = plt.imread('__basik__/Images/traffic_light/block_S.jpg')
+    block_S_image = Image('traffic_light/block_S.jpg')
     block_S_extent0 = np.array([38.6,62,0,42])
 
 
     # West
-    block_W_image = plt.imread('__basik__/Images/traffic_light/block_W.jpg')
+    block_W_image = Image('traffic_light/block_W.jpg')
     block_W_extent0 = np.array([0,41.7,37.8,62])
 
 
-    traffic_light_image = plt.imread('__basik__/Images/traffic_light/all_entrances.png')
+    traffic_light_image = Image('traffic_light/all_entrances.png')
     
     
     #--------------------------------------------------------------------------
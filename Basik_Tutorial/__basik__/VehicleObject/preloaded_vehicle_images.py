@@ -1,16 +1,25 @@
 
 
 
-import matplotlib.pyplot as plt
 from .vehicle_colors import color_list
+from ..lazy_imports import imread
 from ..utils import scale255
 
-vehicle_image_arrays = dict()
+#------------------------------------------------------------------------------
 
-for color in color_list:
-    if color == 'random':
-        continue
-    path = '__basik__/Images/cars/{0}.png'.format(color)
-    vehicle_image_arrays[color] = scale255(plt.imread(path))
+class VehicleImageArrays(dict):
+    
+    '''Maps a color to the image array of a vehicle. Each image is only read
+    once it is first requested.
+    '''
+    
+    def __missing__(self,color):
+        if color == 'random' or color not in color_list:
+            raise KeyError(color)
+        image = scale255(imread('cars/{0}.png'.format(color)))
+        self[color] = image
+        return image
 
+#------------------------------------------------------------------------------
 
+vehicle_image_arrays = VehicleImageArrays()
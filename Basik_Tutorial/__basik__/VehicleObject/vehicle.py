@@ -6,7 +6,7 @@ from ..global_queue import Queue
 
 from copy import deepcopy
 
-from .vehicle_display import VehicleDisplay
+from .vehicle_display import VehicleDisplay,choose_color,null_display
 
 from ..RoadObject.road_display import RoadDisplay
 
@@ -15,7 +15,7 @@ from ..CircleObject import CircleDisplay
 # Import these to extract default size information
 #from Types import (Node,OffRamp,OnRamp,TrafficLight,StopStreet,
 #                   FlaredTrafficLight,Intersection)
-from ..node import Node
+from ..node import Node,role_mask
 from ..CircleObject import Circle
 from ..OffRampObject import OffRamp
 from ..OnRampObject import OnRamp
@@ -24,12 +24,32 @@ from ..StopStreetObject import StopStreet
 #from source import Source
 from ..FlaredTrafficLightObject import FlaredTrafficLight
 from ..IntersectionObject import Intersection
+from ..random_streams import GLOBAL_RNG
 #from pedestrian_crossing import PedestrianCrossing
 
 
 #import matplotlib.pyplot as plt
 #-------------------------------------------------------------------------------
 
+# Roles of the node in front and of the current node that require something
+# other than a standard move. See Vehicle.schedule_move
+FRONT_ROLES = role_mask('stop_street_entrance',
+                        'traffic_light_entrance',
+                        'circle_entrance',
+                        'source_attached')
+CURRENT_ROLES = role_mask('off_ramp_entrance',
+                          'off_ramp_standard_entrance',
+                          'on_ramp_node',
+                          'on_ramp_standard_node',
+                          'flared_traffic_light_entrance',
+                          'buffer_node',
+                          'intersection_entrance',
+                          'pedestrian_crossing_entrance',
+                          'pedestrian_crossing_buffer_exit',
+                          'pedestrian_crossing_buffer_node')
+
+#-------------------------------------------------------------------------------
+
 # shake
 
 class Vehicle(object):
@@ -118,8 +138,20 @@ class Vehicle(object):
         ...                    'nodes':list,
         ...                    'move type':list,
         ...                    'velocity':list}
+        It is not produced if the vehicle records to a trajectory_store.
+    trajectory_store: __basik__.trajectory_store.TrajectoryStore or None
+        The session-wide table that the movement is recorded to instead. 
+        Its rows of this vehicle are found with 
+        trajectory_store.vehicle_view(trajectory_id).
+    trajectory_id: int or None
+        The ID of the vehicle in the trajectory_store. None if the vehicle
+        was not sampled by it.
     vehicle_display: __basik__.VehicleObject.vehicle_display.VehicleDisplay
-        The vehicle display component.
+        The vehicle display component. This is only created once the vehicle
+        is placed onto a display component. Until then it is the shared
+        __basik__.VehicleObject.vehicle_display.null_display
+    display_component: 
+        The display component (e.g. RoadDisplay) that the vehicle is on or None.
     '''
     
 
@@ -131,6 +163,8 @@ class Vehicle(object):
     smooth = True
     frames_per_move = 3
     is_vehicle = True
+    EVENT_KIND = 'vehicle'
+    rng = GLOBAL_RNG  # unless a source hands the vehicle its own stream
     
     INTERNAL = True
     
@@ -142,7 +176,9 @@ class Vehicle(object):
                       source_ID,
                       color='blue',
                       swivel_when_delayed=False,
-                      record_movement=False):
+                      record_movement=False,
+                      rng=None,
+                      trajectory_store=None):
         
         '''
         Parameters:
@@ -163,33 +199,55 @@ class Vehicle(object):
             arrival.
         color: str
             If set to 'random' the the actual display color can still be 
-            obtained by calling self.vehicle_display.color
+            obtained by calling self.display_color
         swivel_when_delayed: bool
             If set to True then the vehicle will swivel on its current display
             component if delayed.
         record_movement: bool
             If set to True then self.movement_record will be created and updated
             throughout the simulation.
+        rng: numpy.random.Generator or None
+            The stream that the vehicle draws from. None keeps the class 
+            attribute Vehicle.rng (the global numpy.random stream).
+            See __basik__.random_streams
+        trajectory_store: __basik__.trajectory_store.TrajectoryStore or None
+            If given (and the vehicle is sampled by it), then the movement is 
+            recorded to it regardless of record_movement.
         '''
                      
         assert velocity >= 0
         self.velocity = velocity
         self.record_movement = record_movement 
+        self.trajectory_store = None
+        self.trajectory_id = None
+        if trajectory_store is not None:
+            self.trajectory_id = trajectory_store.register()
+            if self.trajectory_id is not None:
+                self.trajectory_store = trajectory_store
+                self.record_movement = True
         # We must initialise a time of when it will reach the next node
         self.time = global_time 
         self.current_node = current_node
         self.current_node.vehicle = self
         self.source_ID = source_ID
+        self.source = None  # Only set by a lazy source (see Source.setup_arrivals)
+        self.entry_source = None  # Only set by a spillback source (idem)
         self.arrival = True
         self.wait = False
         self.designated_circle_exit = None
         self.do_exit_circle = False  # move to left instead of front
         self.last_time = None
         
-        self.display_component = None # The component it is one
+        self._display_component = None # The component it is one
+        
+        if rng is not None:
+            self.rng = rng
         
         self.color = color
-        self.vehicle_display = VehicleDisplay(color=color)  # display component of the vehicle
+        self.display_color = choose_color(color,self.rng)
+        # The display of the vehicle is only created once it is placed on a
+        # display component. See the vehicle_display property.
+        self._vehicle_display = None
         
         self.frames_per_move = 5
         
@@ -254,6 +312,33 @@ class Vehicle(object):
         
         
     
+    #---------------------------------------------------------------------------
+    
+    @property
+    def vehicle_display(self):
+        if self._vehicle_display is None:
+            return null_display
+        return self._vehicle_display
+    
+    @vehicle_display.setter
+    def vehicle_display(self,vehicle_display):
+        self._vehicle_display = vehicle_display
+        return None
+    
+    #---------------------------------------------------------------------------
+    
+    @property
+    def display_component(self):
+        return self._display_component
+    
+    @display_component.setter
+    def display_component(self,display_component):
+        self._display_component = display_component
+        if display_component is not None and self._vehicle_display is None:
+            # The vehicle has reached its first display component.
+            self._vehicle_display = VehicleDisplay(color=self.display_color)
+        return None
+    
     #---------------------------------------------------------------------------
          
         
@@ -311,7 +396,16 @@ class Vehicle(object):
                 self.time = current_node.front.end_time + 1e-3
                 Queue.push(self)
                 return None
-
+        
+        ######  STANDARD (fast path) ######
+        
+        # A single mask check instead of testing every component in turn.
+        if (not (current_node.front.roles & FRONT_ROLES or
+                 current_node.roles & CURRENT_ROLES or
+                 self.within_circle)):
+            self.schedule_standard_move()
+            self.move_type = 'standard'
+            return None
         
         ######  STOP STREET  ######
         
@@ -423,7 +517,7 @@ class Vehicle(object):
                     # !!!! We do not expect this to ever happen.
 
                     start_node = current_node.behind
-                aranged_time =self.time + np.random.uniform(1e-3,self.delay_time)
+                aranged_time =self.time + self.rng.uniform(1e-3,self.delay_time)
                 
                 if start_node.vehicle is not None:
                     self.calibrate_backward(start_node,
@@ -836,6 +930,15 @@ class Vehicle(object):
         # This means that current_time has been updated and that
         # self.move_duration has how long the move will take.
         
+        # Headless: display components can only be found on nodes that have
+        # components. If there are none here and the vehicle has not been
+        # displayed yet, there is nothing to show or to attach to.
+        if (self._vehicle_display is None and
+            self.current_node.components is None and
+            (self.current_node.front is None or
+             self.current_node.front.components is None)):
+            return None
+        
         #----------------------------------------------------------------------
         
         if self.move_type == 'standard':
@@ -2052,8 +2155,8 @@ class Vehicle(object):
         # are the same and are identical to schedule_standard_move()
         
         self.last_time = self.time
-        aranged_time = self.time + np.random.normal(self.mean,
-                                                    self.std)
+        aranged_time = self.time + self.rng.normal(self.mean,
+                                                   self.std)
         self.calibrate_forward(start_node=self.current_node,
                                aranged_time=aranged_time)
         Queue.push(self)
@@ -2071,12 +2174,12 @@ class Vehicle(object):
         if self.current_node.front.locked:
             pedestrian_crossing = self.current_node.front.pedestrian_crossing
             self.time = pedestrian_crossing.request_unlock_time() +\
-                        np.random.uniform(1e-3,self.delay_time)
+                        self.rng.uniform(1e-3,self.delay_time)
             self.wait = True
         
         else:
-            aranged_time = self.time + np.random.normal(self.mean,
-                                                        self.std)
+            aranged_time = self.time + self.rng.normal(self.mean,
+                                                       self.std)
             self.calibrate_forward(start_node=self.current_node,
                                    aranged_time=aranged_time)
             # calibrate_forward updates self.time within the function.
@@ -2092,8 +2195,8 @@ class Vehicle(object):
     def schedule_exit_pedestrian_crossing(self):
         
         self.last_time = self.time
-        aranged_time = self.time + np.random.normal(self.mean,
-                                                    self.std)
+        aranged_time = self.time + self.rng.normal(self.mean,
+                                                   self.std)
         self.calibrate_forward(start_node=self.current_node,
                                aranged_time=aranged_time)
         Queue.push(self)
@@ -2125,8 +2228,8 @@ class Vehicle(object):
         # designated_traffic_light_exit_idx will be used if the vehicle is
         # to enter a large buffer.
         
-        aranged_time = self.time + np.random.normal(self.mean,
-                                                    self.std)
+        aranged_time = self.time + self.rng.normal(self.mean,
+                                                   self.std)
         self.calibrate_forward(start_node=self.current_node,
                                aranged_time=aranged_time)
 
@@ -2150,9 +2253,9 @@ class Vehicle(object):
         else:
         
             self.current_node.front = self.designated_traffic_light_exit
-            aranged_time = self.time + np.random.normal(self.mean,
-                                                        self.std,
-                                                        size=FlaredTrafficLight.size).sum()
+            aranged_time = self.time + self.rng.normal(self.mean,
+                                                       self.std,
+                                                       size=FlaredTrafficLight.size).sum()
             self.calibrate_forward(start_node=self.current_node,
                                    aranged_time=aranged_time)
 
@@ -2167,8 +2270,8 @@ class Vehicle(object):
     def schedule_buffer_move(self):
         
         self.last_time = self.time
-        aranged_time = self.time + np.random.normal(self.mean,
-                                                    self.std)
+        aranged_time = self.time + self.rng.normal(self.mean,
+                                                   self.std)
         self.calibrate_forward(start_node=self.current_node,
                                aranged_time=aranged_time)
         Queue.push(self)
@@ -2182,6 +2285,7 @@ class Vehicle(object):
     def schedule_source_arrival(self):
         
         if (self.current_node.front.overflow_protection and 
+            self.entry_source is None and
             self.current_node.front.lane.is_full):
             
             lane = self.current_node.front.lane
@@ -2238,9 +2342,9 @@ class Vehicle(object):
             
             
         # Get aranged time to be calibrated
-        aranged_time = self.time + np.random.normal(self.mean,
-                                                    self.std,
-                                                    size=Intersection.size).sum()
+        aranged_time = self.time + self.rng.normal(self.mean,
+                                                   self.std,
+                                                   size=Intersection.size).sum()
         # Calibrate time: it might change.
         self.calibrate_forward(self.current_node,aranged_time)
         
@@ -2276,10 +2380,10 @@ class Vehicle(object):
                 if idx_to_move_first == 0:
                     self.time = aranged_time 
                     other_vehicle.time = aranged_time +\
-                                         np.random.uniform(1e-3,self.delay_time)
+                                         self.rng.uniform(1e-3,self.delay_time)
                 else:
                     self.time = other_vehicle.time +\
-                                np.random.uniform(1e-3,self.delay_time)
+                                self.rng.uniform(1e-3,self.delay_time)
                                 
                 self.move_type = 'partial cross intersection'
                 self.wait = False
@@ -2291,7 +2395,7 @@ class Vehicle(object):
                 self.object_type = Intersection
                 other_vehicle.object_type = Intersection
                 
-                Queue.heapify()
+                Queue.reschedule(other_vehicle)
                 Queue.push(self)
                 
                 return None
@@ -2337,9 +2441,9 @@ class Vehicle(object):
         self.last_time = self.time
         
         # The ideal time we expect
-        aranged_time = self.time + np.random.normal(self.mean,
-                                                    self.std,
-                                                    size=OnRamp.size).sum()
+        aranged_time = self.time + self.rng.normal(self.mean,
+                                                   self.std,
+                                                   size=OnRamp.size).sum()
         entrance = self.current_node
         on_ramp = self.current_node.on_ramp
         Exit = on_ramp.exit
@@ -2383,9 +2487,9 @@ class Vehicle(object):
 
         # A simple process. Just like a standard move except for the fact
         # That we have to choose an exit.
-        aranged_time = self.time + np.random.normal(self.mean,
-                                                    self.std,
-                                                    size=OffRamp.size).sum()
+        aranged_time = self.time + self.rng.normal(self.mean,
+                                                   self.std,
+                                                   size=OffRamp.size).sum()
 
 
         chosen_exit = self.current_node.off_ramp.choose_exit()
@@ -2416,9 +2520,9 @@ class Vehicle(object):
         
         
         
-        aranged_time = self.time + np.random.normal(self.mean,
-                                                    self.std,
-                                                    size=Circle.entrance_size).sum()
+        aranged_time = self.time + self.rng.normal(self.mean,
+                                                   self.std,
+                                                   size=Circle.entrance_size).sum()
         
         entrance = self.current_node.front
         
@@ -2500,8 +2604,8 @@ class Vehicle(object):
                 restore = True
 
         # We have set front to the appropraite exit such that we can use calibrate_forward
-        aranged_time = self.time + np.random.normal(self.mean,
-                                                    self.std)
+        aranged_time = self.time + self.rng.normal(self.mean,
+                                                   self.std)
         self.calibrate_forward(start_node=self.current_node,
                                aranged_time=aranged_time)
         # Now that calibrate_froward has been used, we can restore original front.
@@ -2539,9 +2643,9 @@ class Vehicle(object):
         
         
         
-        exit_time = self.time +  np.random.normal(self.mean,
-                                                  self.std,
-                                                  size=TrafficLight.size).sum()
+        exit_time = self.time +  self.rng.normal(self.mean,
+                                                 self.std,
+                                                 size=TrafficLight.size).sum()
         
         # Set corrected self.time
         self.calibrate_forward(start_node=self.current_node,
@@ -2594,9 +2698,9 @@ class Vehicle(object):
         # 3) stop_street.exit_idx is created. This way we can check which exit
         # was chosen
         stop_street.choose_exit(entrance_node.idx)
-        exit_time = self.time +  np.random.normal(self.mean,
-                                                  self.std,
-                                                  size=StopStreet.size).sum()
+        exit_time = self.time +  self.rng.normal(self.mean,
+                                                 self.std,
+                                                 size=StopStreet.size).sum()
         self.calibrate_forward(start_node=self.current_node,
                                aranged_time=exit_time)
         self.current_node.occupied = False
@@ -2626,8 +2730,8 @@ class Vehicle(object):
         self.last_time = self.time
         
         # Arange a time of when the vehicle moves to the next node.
-        aranged_time = self.time + np.random.normal(self.mean,
-                                                    self.std)
+        aranged_time = self.time + self.rng.normal(self.mean,
+                                                   self.std)
         time_before_calibration = aranged_time
         # Compensate/calibrate times for the possibility of a delay caused by
         # the nodes infront remaining occupied at the aranged time.
@@ -2707,11 +2811,10 @@ class Vehicle(object):
 #                print(current_node)
                 break
             behind_node.vehicle.time = current_node.vehicle.time +\
-                            np.random.uniform(1e-3,current_node.vehicle.delay_time)
-            # heapify runs in O(N) to perform the update.
-            Queue.heapify()
+                            current_node.vehicle.rng.uniform(1e-3,current_node.vehicle.delay_time)
             # Heap needs to be updated because we have tampered with vehicles
             # in it.
+            Queue.reschedule(behind_node.vehicle)
             current_node = behind_node
         
         return None
@@ -2761,6 +2864,32 @@ class Vehicle(object):
                 return (velocity - self.velocity)/count 
             return velocity - self.velocity
 
+        # Use the occupancy index of the lane to skip over empty nodes.
+        # Only service nodes (entrances and exits of components as well as
+        # obstructions) are subject to the special cases below. Hence, the
+        # index can be trusted up to the first service node ahead.
+        lane = start_node.lane
+        if lane is not None and not start_node.service_node:
+            position = start_node.lane_position
+            horizon = min(position + self.look_ahead,lane.length - 1)
+            service_position = lane.next_service(position)
+            if service_position is not None:
+                horizon = min(horizon,service_position - 1)
+            occupied_position = lane.next_occupied(position)
+            if (occupied_position is not None and
+                occupied_position <= horizon):
+                # standard calibration
+                velocity = lane.nodes[occupied_position].vehicle.velocity
+                delta = get_delta(velocity,occupied_position - position)
+                self.velocity += self.velocity_correction*delta
+                return None
+            if horizon == position + self.look_ahead:
+                # No vehicle within the look-ahead range.
+                return None
+            if horizon > position:
+                # Continue node by node from the last empty, ordinary node.
+                current_node = lane.nodes[horizon]
+                count = horizon - position
 
         while True:
             
@@ -2861,11 +2990,13 @@ class Vehicle(object):
         
         current_node = start_node
         time = aranged_time
+        altered_vehicles = []
         
         while True:
             
             
             current_node.vehicle.time = time
+            altered_vehicles.append(current_node.vehicle)
             # Select next node
             behind_node = current_node.behind
             # Update time with delay
@@ -2876,11 +3007,11 @@ class Vehicle(object):
             if behind_node.vehicle is None:
                 break
             
-            time += np.random.uniform(1e-3,current_node.vehicle.delay_time)
+            time += current_node.vehicle.rng.uniform(1e-3,current_node.vehicle.delay_time)
             current_node = behind_node
         
-        Queue.heapify()  # we have altered some times of vehicles already in
-        # the heap. This must be amended.
+        Queue.reschedule(*altered_vehicles)  # we have altered some times of
+        # vehicles already in the heap. This must be amended.
         return None
             
     
@@ -2889,7 +3020,8 @@ class Vehicle(object):
     
     def place_movement_record(self):
         
-        if not hasattr(self,'movement_record'):
+        if (self.trajectory_store is None and
+            not hasattr(self,'movement_record')):
             self.movement_record = {'time':[],
                                     'distance':[],
                                     'nodes':[],
@@ -2912,6 +3044,11 @@ class Vehicle(object):
             velocity = 0  
             
             
+        if self.trajectory_store is not None:
+            self.trajectory_store.append(self.trajectory_id,self.time,nodes,
+                                         distance,velocity,self.move_type)
+            return None
+            
         self.movement_record['time'].append(self.time)
         self.movement_record['nodes'].append(nodes)
         self.movement_record['distance'].append(distance)
@@ -3031,7 +3168,6 @@ class Vehicle(object):
                     self.move_type = 'wait'
                     self.move_display()
                     Queue.push(self)
-                    Queue.heapify()
                     return None
                   
         except AttributeError:
@@ -3145,6 +3281,55 @@ class Vehicle(object):
         
         return None
         
+    #---------------------------------------------------------------------------
+    
+    def fire(self,queue):
+        
+        '''Performs the scheduled move once extracted from the queue and then
+        schedules the next move.
+        
+        Parameters:
+        -----------
+        queue: __basik__.global_queue.GlobalQueue
+            The queue that the vehicle was extracted from.
+        
+        Returns:
+        --------
+        bool
+            False once the end time of the queue has been passed.
+        '''
+        
+        if self.arrival:
+            queue.last_arrival_time = self.time
+            self.arrival = False
+            if self.source is not None:
+                # A lazy source only has a single pending arrival at a time.
+                self.source.schedule_next_arrival()
+            
+        queue.t = self.time
+        
+        self.move()
+        if not self.dispose:
+            self.schedule_move()
+        
+        if self.entry_source is not None:
+            if self.current_node is self.entry_source.target_node:
+                # The vehicle has entered. Its next move has been scheduled 
+                # such that the next arrival of the source can follow it.
+                entry_source = self.entry_source
+                self.entry_source = None
+                entry_source.admit_next_arrival(queue.t)
+        
+        # NOTE: the end time is checked only after the move has been
+        # scheduled. Otherwise, not all the vehicles placed on the simulation
+        # can be found in the global queue. This leads to "dead" vehicles. The
+        # result is that certain nodes remain occupied indefinitely. This makes
+        # running another simulation on the same setup impossible.
+        if queue.t > queue.end_time:
+            return False
+        
+        return True
+        
     #--------------------------------------------------------------------------- 
         
     @property
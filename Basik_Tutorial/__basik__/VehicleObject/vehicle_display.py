@@ -1,8 +1,7 @@
 
-import matplotlib.pyplot as plt
 import numpy as np
+from ..lazy_imports import plt,rotate
 #import math as m
-from scipy.ndimage import rotate
 
 from ..utils import rotate_coord,get_bearings,orthogonal,bearings_to_vector
 
@@ -12,6 +11,47 @@ from .preloaded_vehicle_images import vehicle_image_arrays
 
 #------------------------------------------------------------------------------
 
+def choose_color(color='random',rng=None):
+    
+    '''
+    Parameters:
+    -----------
+    color: str
+        One of the colors in __basik__.VehicleObject.vehicle_colors.color_list
+    rng: numpy.random.Generator or None
+        The stream to draw a random color from. None uses numpy.random
+        
+    Raises:
+    -------
+    AssertionError:
+        If color is not a str.
+    Exception:
+        If color is not in color_list.
+        
+    Returns:
+    --------
+    str:
+        color itself or a randomly chosen color if color is 'random'.
+    '''
+    
+    assert isinstance(color,str)
+    if color not in color_list:
+        string = 'Please chose one of the colors:'+\
+        '\n{0}'.format(color_list)
+        raise Exception(string)
+    if color == 'random':
+        if rng is None:
+            rng = np.random
+        chosen_color = rng.choice(a=color_list)
+        while chosen_color == 'random':
+            # Pick until we do not choose random
+            chosen_color = rng.choice(a=color_list)
+        return chosen_color
+    
+    return color
+
+#------------------------------------------------------------------------------
+
 class VehicleDisplay(object):
     
     DISPLAY = True
@@ -39,18 +79,7 @@ class VehicleDisplay(object):
         self.coords = np.array(coords,dtype=np.float64)  # center of the object
         self.bearings = bearings
         
-        assert isinstance(color,str)
-        if color not in color_list:
-            string = 'Please chose one of the colors:'+\
-            '\n{0}'.format(color_list)
-            raise Exception(string)
-        if color == 'random':
-            self.color = np.random.choice(a=color_list)
-            while self.color == 'random':
-                # Pick until we do not choose random
-                self.color = np.random.choice(a=color_list)
-        else:
-            self.color = color
+        self.color = choose_color(color)
             
         
 #        self.path = './Images/cars/{0}.png'.format(self.color)
@@ -58,8 +87,8 @@ class VehicleDisplay(object):
         # Rotate 90 anti-clockwise
 #        self.image = rotate(plt.imread(self.path),90,reshape=True)
 #        self.image = scale255(self.image)
-        self.image = rotate(vehicle_image_arrays[self.color],
-                            90,reshape=True)
+        # See the image property. It is only read once the vehicle is shown.
+        self._image = None
         
         self.axes = axes
  
@@ -78,6 +107,22 @@ class VehicleDisplay(object):
         
         
         
+    #--------------------------------------------------------------------------
+    
+    @property
+    def image(self):
+        
+        if self._image is None:
+            self._image = rotate(vehicle_image_arrays[self.color],
+                                 90,reshape=True)
+        
+        return self._image
+    
+    @image.setter
+    def image(self,image):
+        self._image = image
+        return None
+            
     #--------------------------------------------------------------------------
     
     @property
@@ -449,40 +494,44 @@ class VehicleDisplay(object):
         return 'Car ({0})'.format(hex(id(self)))
     
     #--------------------------------------------------------------------------
+
+class NullVehicleDisplay(object):
     
+    '''Stands in for VehicleDisplay while a vehicle is not on any display
+    component. A single instance (null_display) is shared by all vehicles.
+    Hence, it holds no state: every method does nothing and attributes that
+    are set on it are discarded.
     
+    See __basik__.VehicleObject.vehicle.Vehicle.vehicle_display
+    '''
     
+    axes = None
+    track = None
+    color = None
     
+    #--------------------------------------------------------------------------
     
+    def __setattr__(self,name,value):
+        return None
     
+    #--------------------------------------------------------------------------
     
+    def do_nothing(self,*args,**kwargs):
+        return None
     
+    show = hide = do_nothing
+    reset_bearings = adjust_bearings = reset_axes = do_nothing
+    reset_coords = adjust_coords = setup_track = cycle_track = do_nothing
+    single_move = multi_move = move_along_track = move = do_nothing
+    shake = swivel = flicker = do_nothing
     
+    #--------------------------------------------------------------------------
     
+    def __repr__(self):
+        return 'NullVehicleDisplay ({0})'.format(hex(id(self)))
     
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
+#------------------------------------------------------------------------------
 
+null_display = NullVehicleDisplay()
+
+#------------------------------------------------------------------------------
@@ -1,49 +1,18 @@
+# Matplotlib is only imported (and its backend selected) once a display 
+# component or plt is first used. See lazy_imports.py
+# For headless use (no display components) see core.py
+# Scripts used to find plt in __main__ after importing __basik__. It is still
+# placed there (unless __main__ has a plt of its own) but is deprecated: its
+# first use warns to use bk.plt or import matplotlib.pyplot instead.
 
-
-import matplotlib
-import warnings
-import sys
-
-# Check if __basik__ is being run from within a Jupyter Notebook or Ipython
-# environment. Display components cannot be rendered in such environments as the
-# kernel dies.
-# If not in such an environment, check if QtA5gg Matplotlib backend is installed.
-# __basik__ display components were designed around this backend.
-
-
-NOTEBOOK = sys.argv[-1].endswith('json') # bool
-
-#if not hasattr(__builtins__,'__IPYTHON__'):
-if not NOTEBOOK:
-    try:
-        matplotlib.use('Qt5Agg')
-    except ValueError:
-        message = '\'Qt5Agg\' is not available as a Matplotlib backend.\n'+\
-                  'As a result, refrain from using Display components in the '+\
-                  'simulation. The Display components were designed to work with'+\
-                  '\'Qt5Agg\' as a backend.'
-        warnings.warn(message)
-else:
-    
-    message = '__basik__ has picked up that it is currently being run from '+\
-              'within a Ipython or Jupyter Notebook. Display components require'+\
-              'QtA5gg to render. Most Ipython-based interactive notebooks have'+\
-              'their kernel shut down when using QtA5gg as a Matplotlib backend. '+\
-              'Hence, __basik__ will not use QtA5gg. As a result, please '+\
-              'refrain from using __basik__ display components while in '+\
-              'the Ipython or Jupyter Notebook environment. If display '+\
-              'components are required, please use Ipython in a console. The '+\
-              'Spyder IDE for Python is highly recommended.'
-    warnings.warn(message)
-    
+from .lazy_imports import plt,NOTEBOOK,DeprecatedPyplot
 
 import __main__
-import matplotlib.pyplot as plt
-print('Importing matplotlib.pyplot as plt\n')
-setattr(__main__,'plt',plt)
+if not hasattr(__main__,'plt'):
+    setattr(__main__,'plt',DeprecatedPyplot())
 
 
-from .global_queue import GlobalQueue
+from .global_queue import GlobalQueue,IndexedQueue,register_event_kind
 from .node import Node
 from .RoadObject import Lane,RoadDisplay
 from .VehicleObject import Vehicle,VehicleDisplay
@@ -55,10 +24,16 @@ from .OnRampObject import OnRamp,OnRampDisplay
 from .IntersectionObject import Intersection,IntersectionDisplay
 from .PedestrianCrossingObject import PedestrianCrossing,PedestrianCrossingDisplay
 from .StopStreetObject import StopStreet,StopStreetDisplay
-from .source import Source,MMPP_rate_schedule,Rate,reset_source_count,csv_to_source,pickle_to_source
+from .source import Source,MMPP_rate_schedule,Rate,reset_source_count,csv_to_source,pickle_to_source,sample_arrival_times
 from .record import Record
+from .record_store import RecordStore
+from .record_statistics import RecordStatistics,merge_statistics
+from .steady_state import SteadyStateMonitor,steady_state_estimate
+from .trajectory_store import TrajectoryStore
 from .obstruction import Obstruction
-from .simulation_session import Session
+from .simulation_session import Session,replicate,replicate_until
+from .sweep import sweep,grid_design,random_design
+from .result_cache import ResultCache,scenario_hash
 #import __basik__.FlowFunctions as FlowFunctions
 from . import FlowFunctions
 from .utils import axes_grid,fill_axes_grid,load_csv,load_pickle
@@ -72,7 +47,7 @@ setattr(GQ,'Queue',Queue)
 reset_source_count(count=0)
 
 __all__ = [plt,
-           GlobalQueue,
+           GlobalQueue,IndexedQueue,register_event_kind,
            Node,
            Lane,RoadDisplay,
            Vehicle,VehicleDisplay,
@@ -84,10 +59,14 @@ __all__ = [plt,
            Intersection,IntersectionDisplay,
            PedestrianCrossing,PedestrianCrossingDisplay,
            StopStreet,StopStreetDisplay,
-           Source,MMPP_rate_schedule,Rate,reset_source_count,csv_to_source,pickle_to_source,
-           Record,
+           Source,MMPP_rate_schedule,Rate,reset_source_count,csv_to_source,pickle_to_source,sample_arrival_times,
+           Record,RecordStore,RecordStatistics,merge_statistics,
+           SteadyStateMonitor,steady_state_estimate,
+           TrajectoryStore,
            Obstruction,
-           Session,
+           Session,replicate,replicate_until,
+           sweep,grid_design,random_design,
+           ResultCache,scenario_hash,
            Queue,
            FlowFunctions,
            axes_grid,fill_axes_grid,load_csv,load_pickle]
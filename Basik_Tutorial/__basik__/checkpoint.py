@@ -0,0 +1,219 @@
+'''
+Compact checkpoints of a __basik__.simulation_session.Session
+
+Session.save pickles the whole session. This includes the display graph: the
+display components, their Matplotlib figure and axes, the (rotated) image of
+every displayed vehicle and the icons of nodes. A checkpoint only keeps the
+simulation state: the nodes and their occupancy, the vehicles in flight, the
+pending events of the queue, the state of the traffic light cycles and other
+controllers and the random number streams. Hence, it is much smaller, faster
+to write and can be loaded without a Matplotlib backend.
+
+Display objects are replaced by None when a checkpoint is restored. The
+restored session therefore runs without a display.
+
+>>> session.checkpoint('run.ckpt')
+>>> session = Session.restore('run.ckpt')
+>>> session.resume()
+'''
+
+try:
+    import cPickle as pickle
+except ImportError or ModuleNotFoundError:
+    import pickle
+
+import io
+import os
+
+import numpy as np
+
+from .lazy_imports import Image
+from . import source as source_module
+
+#------------------------------------------------------------------------------
+
+CHECKPOINT_VERSION = 1
+
+# The placeholders of objects that are left out of a checkpoint.
+_DISPLAY = 'display'
+_RECORDED_VEHICLES = 'recorded vehicles'
+
+#------------------------------------------------------------------------------
+
+def is_display_object(object_)->bool:
+
+    '''
+    Returns:
+    --------
+    bool
+        Whether object_ only serves the display: a __basik__ display
+        component (it has a DISPLAY attribute) or a Matplotlib object such as
+        a figure, axes or image plot.
+    '''
+
+    if isinstance(object_,type):
+        return False
+    if getattr(object_,'DISPLAY',False) is True:
+        return True
+
+    return type(object_).__module__.startswith('matplotlib')
+
+#------------------------------------------------------------------------------
+
+class _CheckpointPickler(pickle.Pickler):
+
+    '''Pickles a session while leaving out its display graph (see
+    is_display_object), the images that were read for the display and
+    optionally the vehicles kept by records.
+    '''
+
+    def __init__(self,file,session,keep_recorded_vehicles=False):
+
+        super().__init__(file,protocol=pickle.HIGHEST_PROTOCOL)
+        self.image_ids = {id(image.image) for image in Image.instances
+                          if image.image is not None}
+        self.recorded_vehicle_ids = set()
+        if not keep_recorded_vehicles:
+            for record_object in session.record_objects.values():
+                vehicles = getattr(record_object,'vehicles',None)
+                if vehicles is not None:
+                    self.recorded_vehicle_ids.add(id(vehicles))
+
+    def persistent_id(self,object_):
+
+        if isinstance(object_,(int,float,str,bool,type(None))):
+            return None
+        if id(object_) in self.recorded_vehicle_ids:
+            return _RECORDED_VEHICLES
+        if isinstance(object_,np.ndarray) and id(object_) in self.image_ids:
+            return _DISPLAY
+        if is_display_object(object_):
+            return _DISPLAY
+
+        return None
+
+#------------------------------------------------------------------------------
+
+class _CheckpointUnpickler(pickle.Unpickler):
+
+    def persistent_load(self,pid):
+        if pid == _RECORDED_VEHICLES:
+            return []
+        return None  # display objects
+
+#------------------------------------------------------------------------------
+
+def dumps_checkpoint(session,keep_recorded_vehicles=False)->bytes:
+
+    '''A checkpoint of a session in memory. See write_checkpoint.
+
+    Returns:
+    --------
+    bytes
+    '''
+
+    buffer = io.BytesIO()
+    pickler = _CheckpointPickler(buffer,session,keep_recorded_vehicles)
+    pickler.dump({'version':CHECKPOINT_VERSION,
+                  'session':session,
+                  'numpy_random_state':np.random.get_state(),
+                  'source_count':source_module.source_count})
+
+    return buffer.getvalue()
+
+#------------------------------------------------------------------------------
+
+def loads_checkpoint(content:bytes,name:str='content'):
+
+    '''A session from a checkpoint made by dumps_checkpoint. See 
+    read_checkpoint.
+
+    Raises:
+    -------
+    ValueError:
+        If content is not a checkpoint of a supported version.
+
+    Returns:
+    --------
+    __basik__.simulation_session.Session
+        It is not activated yet.
+    '''
+
+    content = _CheckpointUnpickler(io.BytesIO(content)).load()
+
+    if (not isinstance(content,dict) or
+        content.get('version') != CHECKPOINT_VERSION):
+        raise ValueError('{0} is not a supported checkpoint.'.format(name))
+
+    np.random.set_state(content['numpy_random_state'])
+    source_module.reset_source_count(content['source_count'])
+
+    return content['session']
+
+#------------------------------------------------------------------------------
+
+def write_checkpoint(session,file_name:str,keep_recorded_vehicles=False):
+
+    '''Writes a compact checkpoint of a session.
+
+    The checkpoint is first written to a temporary file that then replaces
+    file_name. Hence, an existing checkpoint is never left half-written if
+    the process is interrupted.
+
+    Parameters:
+    -----------
+    session: __basik__.simulation_session.Session
+    file_name: str
+    keep_recorded_vehicles: bool
+        Whether the vehicles kept by __basik__.record.Record objects (see
+        Record.keep_vehicles) are part of the checkpoint. Their time-stamps,
+        source IDs and statistics always are.
+
+    Returns:
+    --------
+    int
+        The size of the checkpoint in bytes.
+    '''
+
+    content = dumps_checkpoint(session,keep_recorded_vehicles)
+
+    temporary_file = file_name + '.tmp'
+    with open(temporary_file,'wb') as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_file,file_name)
+
+    return len(content)
+
+#------------------------------------------------------------------------------
+
+def read_checkpoint(file_name:str):
+
+    '''Reads a checkpoint written by write_checkpoint. The global numpy.random
+    state and the source count are restored as well such that the
+    simulation continues exactly as it would have.
+
+    Parameters:
+    -----------
+    file_name: str
+
+    Raises:
+    -------
+    FileNotFoundError:
+        If file_name does not exist.
+    ValueError:
+        If file_name is not a checkpoint of a supported version.
+
+    Returns:
+    --------
+    __basik__.simulation_session.Session
+        It is not activated yet.
+    '''
+
+    with open(file_name,'rb') as file:
+        content = file.read()
+
+    return loads_checkpoint(content,file_name)
+
+#------------------------------------------------------------------------------
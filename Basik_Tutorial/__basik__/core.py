@@ -0,0 +1,65 @@
+'''
+Headless entry point of __basik__ that only exposes the simulation engine.
+
+>>> import __basik__.core as bk
+
+Display components are not exposed. Matplotlib, SciPy and pandas are not
+imported and no images are read unless one of the functions that require
+them (e.g. Record.save or csv_to_source) is used. Neither does it depend on
+the current working directory. This makes it suitable for batch runs and
+worker processes.
+'''
+
+from . import Queue
+from .global_queue import GlobalQueue,IndexedQueue,register_event_kind
+from .node import Node
+from .RoadObject.lane import Lane
+from .VehicleObject.vehicle import Vehicle
+from .CircleObject.circle import Circle
+from .TrafficLightObject.traffic_light import TrafficLight
+from .TrafficLightObject.traffic_light_cycle import TrafficLightCycle
+from .FlaredTrafficLightObject.flared_traffic_light import FlaredTrafficLight
+from .FlaredTrafficLightObject.flared_traffic_light_cycle import FlaredTrafficLightCycle
+from .OffRampObject.off_ramp import OffRamp
+from .OnRampObject.on_ramp import OnRamp
+from .IntersectionObject.intersection import Intersection
+from .PedestrianCrossingObject.pedestrian_crossing import PedestrianCrossing
+from .StopStreetObject.stop_street import StopStreet
+from .source import Source,MMPP_rate_schedule,Rate,reset_source_count,csv_to_source,pickle_to_source,sample_arrival_times
+from .record import Record
+from .record_store import RecordStore
+from .record_statistics import RecordStatistics,merge_statistics
+from .steady_state import SteadyStateMonitor,steady_state_estimate
+from .trajectory_store import TrajectoryStore
+from .obstruction import Obstruction
+from .simulation_session import Session,replicate,replicate_until
+from .sweep import sweep,grid_design,random_design
+from .result_cache import ResultCache,scenario_hash
+from . import FlowFunctions
+from .utils import load_csv,load_pickle
+
+#------------------------------------------------------------------------------
+
+__all__ = [GlobalQueue,IndexedQueue,register_event_kind,
+           Node,
+           Lane,
+           Vehicle,
+           Circle,
+           FlaredTrafficLight,FlaredTrafficLightCycle,
+           TrafficLight,TrafficLightCycle,
+           OffRamp,
+           OnRamp,
+           Intersection,
+           PedestrianCrossing,
+           StopStreet,
+           Source,MMPP_rate_schedule,Rate,reset_source_count,csv_to_source,pickle_to_source,sample_arrival_times,
+           Record,RecordStore,RecordStatistics,merge_statistics,
+           SteadyStateMonitor,steady_state_estimate,
+           TrajectoryStore,
+           Obstruction,
+           Session,replicate,replicate_until,
+           sweep,grid_design,random_design,
+           ResultCache,scenario_hash,
+           Queue,
+           FlowFunctions,
+           load_csv,load_pickle]
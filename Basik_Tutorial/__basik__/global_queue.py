@@ -9,6 +9,7 @@
 
 import heapq
 import importlib
+import math
 import sys
 #import .global_queue  # import itself
 
@@ -39,6 +40,90 @@ AllQueues = []
 
 #------------------------------------------------------------------------------
 
+# The event protocol:
+# Every object placed into a GlobalQueue has an EVENT_KIND tag as a class
+# attribute along with a fire(queue) method. When the object is extracted from
+# the queue, fire is called. It performs the event, sets queue.t and returns
+# whether the simulation should continue. See register_event_kind.
+
+event_handlers = dict()     # EVENT_KIND -> handler(event,queue)
+_handlers_by_type = dict()  # type(event) -> handler(event,queue)
+
+#------------------------------------------------------------------------------
+
+def register_event_kind(kind:str,handler=None):
+    
+    '''Registers a kind of event with the GlobalQueue.
+    
+    A class with a fire(queue) method and an EVENT_KIND class attribute can
+    be placed into a GlobalQueue without being registered. Registering a kind
+    allows its events to be handled by some other function instead.
+    
+    Parameters:
+    -----------
+    kind: str
+        The EVENT_KIND tag of the event class e.g. 'vehicle', 'cycle',
+        'obstruction' or some new kind such as 'detector'.
+    handler: callable or None
+        A function handler(event,queue) that performs the event, sets queue.t
+        and returns a bool that is False if the simulation must stop. If None
+        then the fire method of the event is used.
+        
+    Returns:
+    --------
+    None
+    
+    Example:
+    --------
+    >>> class Detector(object):
+    ...     EVENT_KIND = 'detector'
+    ...     def fire(self,queue):
+    ...         queue.t = self.time
+    ...         # sample something and reschedule
+    ...         self.time += self.interval
+    ...         queue.push(self)
+    ...         return True
+    '''
+    
+    if handler is None:
+        event_handlers.pop(kind,None)
+    else:
+        assert callable(handler)
+        event_handlers[kind] = handler
+    # Types are resolved again the next time they are extracted.
+    _handlers_by_type.clear()
+    
+    return None
+
+#------------------------------------------------------------------------------
+
+def get_event_handler(event_type:type):
+    
+    '''Returns the function handler(event,queue) that performs events of the
+    given class.
+    
+    Raises:
+    -------
+    TypeError:
+        If the class does not follow the event protocol.
+    '''
+    
+    kind = getattr(event_type,'EVENT_KIND',None)
+    if kind in event_handlers:
+        handler = event_handlers[kind]
+    elif hasattr(event_type,'fire'):
+        handler = event_type.fire
+    else:
+        message = '{0} cannot be placed into a GlobalQueue. '.format(event_type)+\
+                  'It requires an EVENT_KIND class attribute and a '+\
+                  'fire(queue) method.'
+        raise TypeError(message)
+    _handlers_by_type[event_type] = handler
+    
+    return handler
+
+#------------------------------------------------------------------------------
+
 class GlobalQueue(object):
     
     '''A Priority Queue/Heap that allows simulation events to occur in the
@@ -148,6 +233,68 @@ class GlobalQueue(object):
         '''Ensures that no duplicate of an event exists.
         '''
         self.Q = (np.unique(self.Q)).tolist()
+        
+    #--------------------------------------------------------------------------
+    
+    def reschedule(self,*objects):
+        '''Restores the heap invariant after the time of one or more objects
+        that are already in the heap has been altered in place.
+        
+        The GlobalQueue has no record of where an object sits in the heap.
+        Hence, the entire heap is re-arranged using heapify in O(n).
+        
+        Parameters:
+        -----------
+        objects: object
+            The objects whose time attribute has been altered. Objects that 
+            are not in the heap are ignored.
+        
+        Returns:
+        --------
+        None
+        
+        See Also:
+        ---------
+        __basik__.global_queue.IndexedQueue.reschedule
+        '''
+        self.heapify()
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def cancel(self,object_:object):
+        '''Removes a scheduled object from the heap such that its event will
+        not occur.
+        
+        Parameters:
+        -----------
+        object_: object
+            Any object that has been placed into the heap with the push method.
+        
+        Returns:
+        --------
+        bool
+            True if the object was found and removed. False otherwise.
+        '''
+        n_before = len(self.Q)
+        # Compare by identity. The __eq__ of events compares times.
+        self.Q = [event for event in self.Q if event is not object_]
+        self.heapify()
+        
+        return len(self.Q) < n_before
+    
+    #--------------------------------------------------------------------------
+    
+    def _restore_heap(self):
+        '''Called before every event is extracted by run_single_event.
+        Duplicates are removed and the heap is re-arranged since objects may
+        have had their time altered while inside the heap.
+        '''
+        self.unique()   # FIXME:
+        self.heapify()  # FIXME:
+        
+        return None
     
     #--------------------------------------------------------------------------
     
@@ -244,6 +391,9 @@ class GlobalQueue(object):
         
         Notes:
         ------
+        The object performs its own event through its fire method (see 
+        __basik__.global_queue.register_event_kind).
+        
         This function serves as the workhorse for the run method. The run method 
         could be written without using run_single_event. The convenience of
         run_single_event lies in the fact that it allows for the simulator to 
@@ -265,58 +415,16 @@ class GlobalQueue(object):
             warnings.warn(message)
             return False  # empty queue
         
-        self.unique()   # FIXME:
-        self.heapify()  # FIXME:
+        self._restore_heap()
         component = self.pop()
         self.current_component = component
-
-        
-        if hasattr(component,'is_obstruction'):
-            # Introduction and removal of obstruction events as well
-            # as pedestrian crossing events.
-            
-            if component.do_activate:
-                component.activate()
-                self.t = component.start_time
-            else:
-                component.deactivate()
-                self.t = component.end_time
-            return True
         
-
-        elif hasattr(component,'is_cycle'):
-            # Traffic light and flared traffic light cycle transitions.
-            component.activate()
-            self.t = component.start_time
-            return True
-            
-        else:
-            vehicle = component
-            
-            
-        if vehicle.arrival:
-            self.last_arrival_time = vehicle.time
-            vehicle.arrival = False
-            
-        self.t = vehicle.time
-        
-#        if self.t > self.end_time:
-#            return False
-        
-        vehicle.move()
-        if not vehicle.dispose:
-            vehicle.schedule_move()
-        
-        # NOTE: we have moved the below snippet of code. There is a good reason.
-        # In original placement we have the scenario where not all the vehicles
-        # placed on the simulation can be found in the global queue. This leads
-        # to "dead" vehicles. The result is that certain nodes remain occupied
-        # indefinitely. This makes running another simulation on the same
-        # setup impossible.
-        if self.t > self.end_time:
-            return False
+        try:
+            fire = _handlers_by_type[type(component)]
+        except KeyError:
+            fire = get_event_handler(type(component))
         
-        return True  # do we continue with the simualtion or not
+        return fire(component,self)  # do we continue with the simualtion or not
     
     #--------------------------------------------------------------------------
     
@@ -573,6 +681,349 @@ class GlobalQueue(object):
 
     
 
+#------------------------------------------------------------------------------
+
+class IndexedQueue(GlobalQueue):
+    
+    '''A GlobalQueue that keeps track of where each scheduled object sits in
+    the heap. This allows an object to be rescheduled (decrease-key or 
+    increase-key) or cancelled in O(log n).
+    
+    Events are ordered according to the key (time,sequence) where the 
+    sequence number is assigned whenever an object is pushed or rescheduled.
+    Hence, events that share a time are extracted in the order in which they
+    were scheduled. 
+    
+    An object can only be present in the heap once. Pushing an object that is
+    already scheduled will reschedule it according to its current time. As a
+    result, duplicates cannot exist and neither unique nor heapify needs to be
+    called before every event.
+    
+    In return, whoever alters the time of a scheduled object must call 
+    reschedule (or push) for it, or heapify after altering many of them. 
+    Unlike GlobalQueue, the heap is not rebuilt before every event. pop 
+    raises a ValueError if it finds that the time of the earliest object was
+    altered without doing so. Times must be finite.
+    
+    Usage:
+    ------
+    Simply create one in place of a GlobalQueue. It becomes the Queue used by
+    __basik__ in the same manner as GlobalQueue.new would.
+    
+    >>> Queue = IndexedQueue()
+    
+    Attributes:
+    -----------
+    Q: list
+        The scheduled objects arranged as a binary heap. Q[0] is the earliest
+        event. As with GlobalQueue, it must not be altered directly.
+    keys: list
+        The (time,sequence) key of each object in Q at the same position.
+    '''
+    
+    #--------------------------------------------------------------------------
+    
+    def __init__(self):
+        self.keys = []
+        self._position = dict()  # id(object) -> index in self.Q
+        self._sequence = 0
+        GlobalQueue.__init__(self)
+        
+    #--------------------------------------------------------------------------
+    
+    def _next_key(self,object_):
+        time = object_.time
+        if not math.isfinite(time):
+            raise ValueError('{0} cannot be scheduled at time {1}.'.format(
+                                                                object_,time))
+        self._sequence += 1
+        return (time,self._sequence)
+    
+    #--------------------------------------------------------------------------
+    
+    def _place(self,idx,object_,key):
+        self.Q[idx] = object_
+        self.keys[idx] = key
+        self._position[id(object_)] = idx
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def _sift_up(self,idx):
+        '''Move the entry at idx towards the root until its parent is smaller.
+        '''
+        object_ = self.Q[idx]
+        key = self.keys[idx]
+        while idx > 0:
+            parent_idx = (idx - 1) >> 1
+            if key < self.keys[parent_idx]:
+                self._place(idx,self.Q[parent_idx],self.keys[parent_idx])
+                idx = parent_idx
+            else:
+                break
+        self._place(idx,object_,key)
+        return idx
+    
+    #--------------------------------------------------------------------------
+    
+    def _sift_down(self,idx):
+        '''Move the entry at idx towards the leaves until its children are 
+        larger.
+        '''
+        n = len(self.Q)
+        object_ = self.Q[idx]
+        key = self.keys[idx]
+        while True:
+            child_idx = 2*idx + 1
+            if child_idx >= n:
+                break
+            right_idx = child_idx + 1
+            if right_idx < n and self.keys[right_idx] < self.keys[child_idx]:
+                child_idx = right_idx
+            if self.keys[child_idx] < key:
+                self._place(idx,self.Q[child_idx],self.keys[child_idx])
+                idx = child_idx
+            else:
+                break
+        self._place(idx,object_,key)
+        return idx
+    
+    #--------------------------------------------------------------------------
+    
+    def _update(self,idx,key):
+        old_key = self.keys[idx]
+        self.keys[idx] = key
+        if key < old_key:
+            self._sift_up(idx)
+        else:
+            self._sift_down(idx)
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def _remove_at(self,idx):
+        object_ = self.Q[idx]
+        del self._position[id(object_)]
+        last_object = self.Q.pop()
+        last_key = self.keys.pop()
+        if idx < len(self.Q):
+            # Fill the hole with the last entry and restore the invariant.
+            self._place(idx,last_object,last_key)
+            if self._sift_up(idx) == idx:
+                self._sift_down(idx)
+        return object_
+    
+    #--------------------------------------------------------------------------
+    
+    def is_scheduled(self,object_:object):
+        '''Whether the object currently has an event in the heap.
+        '''
+        return id(object_) in self._position
+    
+    #--------------------------------------------------------------------------
+    
+    def push(self,object_:object):
+        '''Schedules the object according to its time attribute in O(log n).
+        
+        If the object is already in the heap then it is rescheduled instead
+        of being added a second time.
+        
+        Parameters:
+        -----------
+        object_ : object
+            See __basik__.global_queue.GlobalQueue.push
+            
+        Raises:
+        -------
+        ValueError:
+            If the time of the object is not finite.
+            
+        Returns:
+        --------
+        None
+        '''
+        if id(object_) in self._position:
+            self.reschedule(object_)
+            return None
+        
+        key = self._next_key(object_)
+        self.Q.append(object_)
+        self.keys.append(None)
+        self._place(len(self.Q)-1,object_,key)
+        self._sift_up(len(self.Q)-1)
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def pop(self):
+        '''Removes and returns the earliest event in O(log n).
+        
+        Returns:
+        --------
+        See __basik__.global_queue.GlobalQueue.pop
+        
+        Raises:
+        -------
+        IndexError:
+            self.Q is empty.
+        ValueError:
+            The time of the earliest object was altered without calling
+            reschedule. It may not be the earliest event any more.
+        '''
+        if not self.Q:
+            raise IndexError('pop from an empty IndexedQueue')
+        
+        if self.Q[0].time != self.keys[0][0]:
+            raise ValueError('The time of {0} was altered from {1} to {2} '.format(
+                                                        self.Q[0],
+                                                        self.keys[0][0],
+                                                        self.Q[0].time)+\
+                             'without calling reschedule.')
+        
+        return self._remove_at(0)
+    
+    #--------------------------------------------------------------------------
+    
+    def reschedule(self,*objects):
+        '''Moves each object to the place in the heap that agrees with its 
+        current time. This is done in O(log n) per object.
+        
+        Parameters:
+        -----------
+        objects: object
+            The objects whose time attribute has been altered. Objects that 
+            are not in the heap are ignored.
+        
+        Raises:
+        -------
+        ValueError:
+            If the time of an object is not finite.
+        
+        Returns:
+        --------
+        None
+        '''
+        for object_ in objects:
+            idx = self._position.get(id(object_))
+            if idx is None:
+                continue
+            self._update(idx,self._next_key(object_))
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def cancel(self,object_:object):
+        '''Removes a scheduled object from the heap in O(log n).
+        
+        Parameters:
+        -----------
+        object_: object
+            Any object that has been placed into the heap with the push method.
+        
+        Returns:
+        --------
+        bool
+            True if the object was found and removed. False otherwise.
+        '''
+        idx = self._position.get(id(object_))
+        if idx is None:
+            return False
+        self._remove_at(idx)
+        
+        return True
+    
+    #--------------------------------------------------------------------------
+    
+    def unique(self):
+        '''Duplicates cannot exist in an IndexedQueue. Nothing is done.
+        '''
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def _restore_heap(self):
+        # Every alteration of a scheduled time is made known through push or
+        # reschedule. Hence, the heap is always in order.
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def heapify(self):
+        '''Rebuilds the heap from the current time of every object in O(n).
+        
+        This is only required if the times of many scheduled objects have been
+        altered together (see __basik__.simulation_session.Session.reset_time)
+        or if self.Q has been altered directly.
+        
+        Returns:
+        --------
+        None
+        '''
+        sequences = {id(object_):key[1] for object_,key in zip(self.Q,self.keys)}
+        objects = []
+        seen = set()
+        for object_ in self.Q:
+            if id(object_) not in seen:
+                seen.add(id(object_))
+                objects.append(object_)
+        self.Q = objects
+        self.keys = [None]*len(objects)
+        self._position = dict()
+        for idx,object_ in enumerate(objects):
+            sequence = sequences.get(id(object_))
+            if sequence is None:
+                key = self._next_key(object_)
+            elif not math.isfinite(object_.time):
+                raise ValueError('{0} cannot be scheduled at time {1}.'.format(
+                                                        object_,object_.time))
+            else:
+                key = (object_.time,sequence)
+            self._place(idx,object_,key)
+        for idx in reversed(range(len(objects)//2)):
+            self._sift_down(idx)
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def clear(self):
+        '''Makes self.Q (as a result self.content) into an empty list.
+        
+        Returns:
+        --------
+        None
+        '''
+        GlobalQueue.clear(self)
+        self.keys.clear()
+        self._position.clear()
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def __getstate__(self):
+        # Positions are keyed by id() which does not survive pickling.
+        state = self.__dict__.copy()
+        del state['_position']
+        return state
+    
+    #--------------------------------------------------------------------------
+    
+    def __setstate__(self,state):
+        self.__dict__.update(state)
+        self._position = {id(object_):idx for idx,object_ in enumerate(self.Q)}
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def __repr__(self):
+        return 'IndexedQueue ({0})'.format(hex(id(self)))
+    
+    #--------------------------------------------------------------------------
+
+
 #------------------------------------------------------------------------------
 
 # Create a new Queue if there is not one already.
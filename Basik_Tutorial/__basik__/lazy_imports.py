@@ -0,0 +1,219 @@
+'''
+Deferred access to Matplotlib, SciPy, pandas and the images of __basik__.
+
+The simulation engine itself requires none of these. They are only imported
+once a display component, a plot or a csv file requires them. This keeps
+the import of __basik__ (and __basik__.core in particular) fast and allows
+it to run without a display.
+'''
+
+import os
+import sys
+import warnings
+
+#------------------------------------------------------------------------------
+
+# Images are found relative to the package and not the working directory.
+IMAGE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'Images')
+
+# Check if __basik__ is being run from within a Jupyter Notebook or Ipython
+# environment. Display components cannot be rendered in such environments as the
+# kernel dies.
+# If not in such an environment, check if QtA5gg Matplotlib backend is installed.
+# __basik__ display components were designed around this backend.
+
+NOTEBOOK = sys.argv[-1].endswith('json') # bool
+
+_pyplot = None
+
+#------------------------------------------------------------------------------
+
+def setup_matplotlib():
+
+    '''Selects the Matplotlib backend that the display components were
+    designed for. This is done right before matplotlib.pyplot is imported.
+
+    Returns:
+    --------
+    None
+    '''
+
+    import matplotlib
+
+    #if not hasattr(__builtins__,'__IPYTHON__'):
+    if not NOTEBOOK:
+        try:
+            matplotlib.use('Qt5Agg')
+        except ValueError:
+            message = '\'Qt5Agg\' is not available as a Matplotlib backend.\n'+\
+                      'As a result, refrain from using Display components in the '+\
+                      'simulation. The Display components were designed to work with'+\
+                      '\'Qt5Agg\' as a backend.'
+            warnings.warn(message)
+    else:
+
+        message = '__basik__ has picked up that it is currently being run from '+\
+                  'within a Ipython or Jupyter Notebook. Display components require'+\
+                  'QtA5gg to render. Most Ipython-based interactive notebooks have'+\
+                  'their kernel shut down when using QtA5gg as a Matplotlib backend. '+\
+                  'Hence, __basik__ will not use QtA5gg. As a result, please '+\
+                  'refrain from using __basik__ display components while in '+\
+                  'the Ipython or Jupyter Notebook environment. If display '+\
+                  'components are required, please use Ipython in a console. The '+\
+                  'Spyder IDE for Python is highly recommended.'
+        warnings.warn(message)
+
+    return None
+
+#------------------------------------------------------------------------------
+
+def get_pyplot():
+
+    '''
+    Returns:
+    --------
+    module:
+        matplotlib.pyplot which is imported on the first call.
+    '''
+
+    global _pyplot
+
+    if _pyplot is None:
+        if 'matplotlib.pyplot' not in sys.modules:
+            setup_matplotlib()
+        import matplotlib.pyplot as pyplot
+        _pyplot = pyplot
+
+    return _pyplot
+
+#------------------------------------------------------------------------------
+
+class LazyPyplot(object):
+
+    '''Stands in for matplotlib.pyplot. The module is only imported once one
+    of its attributes is accessed e.g. plt.subplots()
+    '''
+
+    def __getattr__(self,name):
+        return getattr(get_pyplot(),name)
+
+    def __repr__(self):
+        if _pyplot is None:
+            return 'matplotlib.pyplot (not yet imported)'
+        return repr(_pyplot)
+
+#------------------------------------------------------------------------------
+
+plt = LazyPyplot()
+
+#------------------------------------------------------------------------------
+
+class DeprecatedPyplot(LazyPyplot):
+
+    '''The plt that importing __basik__ places into __main__. Scripts that
+    rely on it keep working but are warned (once) to use bk.plt instead.
+    '''
+
+    warned = False
+
+    def __getattr__(self,name):
+        if not DeprecatedPyplot.warned:
+            DeprecatedPyplot.warned = True
+            message = 'The plt that __basik__ places into __main__ is '+\
+                      'deprecated. Use bk.plt or import matplotlib.pyplot '+\
+                      'as plt instead.'
+            warnings.warn(message,DeprecationWarning,stacklevel=2)
+        return getattr(get_pyplot(),name)
+
+#------------------------------------------------------------------------------
+
+def get_pandas():
+
+    import pandas
+
+    return pandas
+
+#------------------------------------------------------------------------------
+
+def read_csv(*args,**kwargs):
+
+    '''See pandas.read_csv'''
+
+    return get_pandas().read_csv(*args,**kwargs)
+
+#------------------------------------------------------------------------------
+
+def rotate(*args,**kwargs):
+
+    '''See scipy.ndimage.rotate'''
+
+    from scipy.ndimage import rotate as ndimage_rotate
+
+    return ndimage_rotate(*args,**kwargs)
+
+#------------------------------------------------------------------------------
+
+def is_figure(obj):
+
+    '''Checks if obj is a matplotlib.figure.Figure without importing
+    Matplotlib. If Matplotlib was never imported then obj cannot be a figure.
+    '''
+
+    figure_module = sys.modules.get('matplotlib.figure')
+    if figure_module is None:
+        return False
+
+    return isinstance(obj,figure_module.Figure)
+
+#------------------------------------------------------------------------------
+
+def imread(relative_path:str):
+
+    '''
+    Parameters:
+    -----------
+    relative_path: str
+        Path of the image relative to IMAGE_DIRECTORY
+        e.g. 'traffic_light/block_N.jpg'
+
+    Returns:
+    --------
+    numpy.ndarray
+    '''
+
+    return get_pyplot().imread(os.path.join(IMAGE_DIRECTORY,relative_path))
+
+#------------------------------------------------------------------------------
+
+class Image(object):
+
+    '''A class attribute that reads its image on first access.
+
+    Example:
+    --------
+    >>> class RoadDisplay(object):
+    ...     road_image = Image('road.jpg')
+
+    RoadDisplay.road_image and RoadDisplay().road_image both return the
+    numpy.ndarray of the image. It is read only once.
+    '''
+
+    # Every Image attribute such that the images that have been read can be
+    # recognised (and left out) when a session is checkpointed.
+    instances = []
+
+    def __init__(self,relative_path:str):
+        self.relative_path = relative_path
+        self.image = None
+        Image.instances.append(self)
+
+    def __get__(self,instance,owner):
+        if self.image is None:
+            self.image = imread(self.relative_path)
+        return self.image
+
+    def __repr__(self):
+        return 'Image ({0})'.format(self.relative_path)
+
+#------------------------------------------------------------------------------
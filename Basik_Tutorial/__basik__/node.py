@@ -1,12 +1,145 @@
 
 import numpy as np
-import matplotlib.pyplot as plt
+from .lazy_imports import plt,Image
 
 from .obstruction import Obstruction
 from .global_queue import Queue
+from .random_streams import GLOBAL_RNG
 
 
 
+#-------------------------------------------------------------------------------
+
+# The roles that a node can play for the various components. Each role is a
+# single bit of Node.roles. This allows a node to be tested for several roles
+# with a single mask (see role_mask). The roles remain accessible under their
+# usual attribute names e.g. node.circle_entrance
+
+ROLE_NAMES = ('source_attached',
+              'record',
+              'velocity_change',
+              'left_lane',
+              'overflow_protection',
+              # Stop street
+              'stop_street_entrance',
+              'stop_street_exit',
+              # Traffic light
+              'traffic_light_entrance',
+              'traffic_light_exit',
+              # Circle
+              'circle_entrance',    # Performs entrance maneouvre
+              'circle_node',        # Is part of internalc circle flow
+              'circle_exit',        # Lies to the left of a circle_node
+              # Off-ramp
+              'off_ramp_entrance',
+              'off_ramp_standard_entrance',
+              'off_ramp_exit',
+              'off_ramp_standard_exit',
+              # On-ramp
+              'on_ramp_node',           # either main or sub flow entrance
+              'on_ramp_standard_node',  # for the other lane which acts as standard
+              'sub_flow',               # sub flow entrance which waits to join with main flow.
+              'on_ramp_exit',
+              # Flared Traffic light
+              'flared_traffic_light_entrance',
+              'flared_traffic_light_exit',
+              'buffer_start',
+              'buffer_end',
+              'buffer_node',
+              # Intersection (Unstructured with main and subordinate flow)
+              'intersection_entrance',
+              'intersection_exit',
+              'main_flow',   # an entrance is either main flow 
+              # Pedestrianc Crossing
+              'pedestrian_crossing_entrance',
+              'pedestrian_crossing_buffer_entrance',
+              'pedestrian_crossing_exit',
+              'pedestrian_crossing_buffer_exit',
+              'pedestrian_crossing_buffer_node')
+
+ROLES = {name:1 << bit for bit,name in enumerate(ROLE_NAMES)}
+
+#-------------------------------------------------------------------------------
+
+def role_mask(*names):
+    
+    '''
+    Parameters:
+    -----------
+    names: str
+        Names of roles found in ROLE_NAMES.
+    
+    Returns:
+    --------
+    int:
+        The bits of all the roles combined. node.roles & mask is non-zero
+        if the node plays any of these roles.
+    '''
+    
+    mask = 0
+    for name in names:
+        mask |= ROLES[name]
+    
+    return mask
+
+#-------------------------------------------------------------------------------
+
+# Data that only the entrances and exits of components as well as displayed
+# nodes require. It is kept in a NodeComponents object that is only created
+# once one of these attributes is assigned something other than None.
+
+COMPONENT_ATTRIBUTES = ('source',
+                        'record_object',
+                        'obstruction',
+                        'pending_obstructions',
+                        'end_time',
+                        'new_velocity',
+                        'idx',   # the idx of entrance or exit that it might be
+                        'key',
+                        'stop_street',
+                        'stop_street_display',
+                        'traffic_light',
+                        'traffic_light_display',
+                        'circle',
+                        'circle_display',
+                        'circle_track_idx',
+                        'off_ramp',
+                        'off_ramp_display',
+                        'on_ramp',
+                        'on_ramp_display',
+                        'flared_traffic_light',
+                        'flared_traffic_light_display',
+                        'intersection',
+                        'intersection_display',
+                        'pedestrian_crossing',
+                        'pedestrian_crossing_display',
+                        # For displaying icons
+                        'road_display_object',
+                        'display_coord',
+                        'display_axes',
+                        'car_width',
+                        'car_length',
+                        'icon_image')
+
+#-------------------------------------------------------------------------------
+
+class NodeComponents(object):
+    
+    '''Component and display data of a __basik__.node.Node. All attributes
+    are None by default. See COMPONENT_ATTRIBUTES.
+    '''
+    
+    __slots__ = COMPONENT_ATTRIBUTES
+    
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self,name,None)
+    
+    #--------------------------------------------------------------------------
+    
+    def __repr__(self):
+        return 'NodeComponents ({0})'.format(hex(id(self)))
+
 #-------------------------------------------------------------------------------
 
 class Node(object):
@@ -23,15 +156,41 @@ class Node(object):
         The vehicle that occupies the node.
     distance:
         The distance in meters between two successive, fully connected nodes.
+    roles: int
+        The roles (see ROLE_NAMES) of the node packed into bits. 
+        Each role is also available as a bool attribute of the same name.
     '''
     
+    __slots__ = ('front',
+                 'behind',
+                 'left',
+                 'right',
+                 '_occupied',
+                 'vehicle',
+                 '_service_node',
+                 'locked',
+                 'unlock_time',
+                 'lane',
+                 'lane_position',
+                 'obstructed',
+                 'contains_obstruction',
+                 'roles',
+                 'components',
+                 # Only set once required. 
+                 'icon_plot',
+                 'count',
+                 'n_vehicles_obstructued',
+                 'last_seen_vehicle',
+                 'duration',
+                 'duration_std')
     
     INTERNAL = True
     
-    camera = plt.imread('__basik__/Images/camera.png')
-    speedometer = plt.imread('__basik__/Images/speedometer.png')
-    cone = plt.imread('__basik__/Images/cone.png')
-    cone_round = plt.imread('__basik__/Images/cone_round.png')
+    
+    camera = Image('camera.png')
+    speedometer = Image('speedometer.png')
+    cone = Image('cone.png')
+    cone_round = Image('cone_round.png')
     
     
     icon_shrink_factor = 0.95
@@ -92,109 +251,76 @@ class Node(object):
         self.left = left
         self.right = right
         # Occupied implies the node has a vehicle. 
-        self.occupied = False
+        # See the occupied property. The lane is notified of every change.
+        self._occupied = False
         self.vehicle = None
         # Out of service implies the node has no vehicle but can also not
         # be accessed to be occupied by a vehicle.
         # This allows for stop streets and various components to function.
-        self.service_node = False
+        self._service_node = False
         self.locked = False  
         self.unlock_time = None
         
-        self.road_display_object = None
-        self.left_lane = False
         self.lane = None
-        self.overflow_protection = False
+        self.lane_position = None  # index of the node in lane.nodes
         
-
-        # Each component must be able to embed the display component into its nodes.
-        self.stop_street = None
-        self.stop_street_entrance = False
-        self.stop_street_exit = False
-        self.stop_street_display = None  # For vizualisation/display purposes
-        
-        self.source_attached = False
-        self.source = None
-        
-        self.traffic_light = None
-        self.traffic_light_entrance = False
-        self.traffic_light_exit = False
-        self.traffic_light_display = None  # For vizualisation/display purposes
-        
-        self.circle = None               # Circle object
-        self.circle_entrance = False     # Performs entrance maneouvre
-        self.circle_node = False         # Is part of internalc circle flow
-        self.circle_exit = False         # Lies to the left of a circle_node
-        self.circle_display = None
-        self.circle_track_idx = None
-        
-        self.off_ramp = None
-        self.off_ramp_entrance = False
-        self.off_ramp_standard_entrance = False
-        self.off_ramp_exit = False
-        self.off_ramp_standard_exit = False
-        self.off_ramp_display = None  # For vizualisation/display purposes
-        
-        self.on_ramp = None    # the on_ramp object itself
-        self.on_ramp_node = False  # either main or sub flow entrance
-        self.on_ramp_standard_node = False  # for the other lane which acts as standard
-        self.sub_flow = False  # sub flow entrance which waits to join with main flow.
-        self.on_ramp_exit = False
-        self.on_ramp_display = None  # For vizualisation/display purposes
-        
-        self.obstruction = None
         self.obstructed = False
         self.contains_obstruction = False
-        self.end_time = None
-        
-        self.record_object = None
-        self.record = False
-        
-        self.idx = None   # the idx of entrance or exit that it might be
-        
-        self.velocity_change = False
-        self.new_velocity = None
         
+        # All roles are False. See ROLE_NAMES.
+        self.roles = 0
+        # Each component must be able to embed the display component into 
+        # its nodes. See COMPONENT_ATTRIBUTES.
+        self.components = None
         
-        
-        # For displaying icons
-        self.display_coord = None
-        self.display_axes = None
-        self.car_width = None
-        self.car_length = None
-        self.icon_image = None
-        
-        
-        # Flared Traffic light
-        self.flared_traffic_light = None
-        self.flared_traffic_light_entrance = False
-        self.flared_traffic_light_exit = False
-        self.buffer_start = False
-        self.buffer_end = False
-        self.buffer_node = False
-        self.flared_traffic_light_display = None
-        
-        
-        # Intersection (Unstructured with main and subordinate flow)
-        self.intersection = None
-        self.intersection_entrance = False
-        self.intersection_exit = False
-        self.main_flow = False   # an entrance is either main flow 
 
-        # Pedestrianc Crossing
-        self.pedestrian_crossing = None
-        self.pedestrian_crossing_entrance = False
-        self.pedestrian_crossing_buffer_entrance = False
-        self.pedestrian_crossing_exit = False
-        self.pedestrian_crossing_buffer_exit = False
-        self.pedestrian_crossing_display = None
-        self.pedestrian_crossing_buffer_node = False
-        
+    #--------------------------------------------------------------------------
+    
+    @property
+    def occupied(self):
+        return self._occupied
+    
+    @occupied.setter
+    def occupied(self,value):
+        value = bool(value)
+        if value != self._occupied:
+            self._occupied = value
+            if self.lane is not None:
+                # Keep the occupancy index of the lane up to date.
+                self.lane.occupancy_changed(self)
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    @property
+    def rng(self):
+        '''The stream of the lane the node belongs to (if any). Obstructions
+        on the node draw their durations from it.
+        '''
+        if self.lane is None:
+            return GLOBAL_RNG
+        return self.lane.rng
+    
+    #--------------------------------------------------------------------------
+    
+    @property
+    def service_node(self):
+        return self._service_node
+    
+    @service_node.setter
+    def service_node(self,value):
+        value = bool(value)
+        if value != self._service_node:
+            self._service_node = value
+            if self.lane is not None:
+                self.lane.service_changed(self)
+        return None
 
     #--------------------------------------------------------------------------
     
     def schedule_obstructions(self,start_times:list,durations:list,
-                           duration_std=0.5):
+                           duration_std=0.5,
+                           lazy=False):
         
         '''
         This obstructs a node and prevents any vehicle from entering it for
@@ -212,12 +338,19 @@ class Node(object):
         durartion_std: float
             The standard deviation that will apply to the duration of all
             durations.
+        lazy: bool
+            If True then only the first obstruction is placed into the global
+            queue. Each following obstruction is placed into it once the one
+            before it ends (or once it starts if they overlap). The durations
+            are drawn in the same order. start_times must then be sorted.
             
         Raises:
         AssertionError
             start_times and durations must be of the same length.
         TypeError:
             start_times and end_times are required to be lists.
+        ValueError:
+            If lazy is True and start_times are not sorted.
             
         Returns:
         --------
@@ -237,14 +370,25 @@ class Node(object):
         start_times.reverse()
         durations.reverse()
         
+        if lazy:
+            if any(later > earlier for earlier,later in zip(start_times,
+                                                            start_times[1:])):
+                raise ValueError('start_times must be sorted if lazy is True.')
+            # The next obstruction is found at the end of the list.
+            self.pending_obstructions = [(start_time,duration,duration_std)
+                                         for start_time,duration 
+                                         in zip(start_times,durations)]
+            self.schedule_next_obstruction()
+            return None
+        
         while True:
             
             start_time = start_times.pop()
             duration = durations.pop()
-            end_time = start_time + np.random.normal(duration,duration_std)
+            end_time = start_time + self.rng.normal(duration,duration_std)
             # ensure that the end_time is indeed larger than the start_time
             while end_time <= start_time:
-                end_time = start_time + np.random.normal(duration,duration_std)
+                end_time = start_time + self.rng.normal(duration,duration_std)
             
             
             obstruction = Obstruction(start_time,end_time,
@@ -259,6 +403,44 @@ class Node(object):
     
     #--------------------------------------------------------------------------
     
+    def schedule_next_obstruction(self,before=np.inf):
+        
+        '''Places the next obstruction scheduled lazily by 
+        schedule_obstructions into the current global queue.
+        
+        Parameters:
+        -----------
+        before: float
+            The next obstruction is only placed into the queue if it starts
+            before this time.
+        
+        Returns:
+        --------
+        bool
+            Whether an obstruction was placed into the queue.
+        '''
+        
+        pending_obstructions = self.pending_obstructions
+        if not pending_obstructions:
+            return False
+        
+        start_time,duration,duration_std = pending_obstructions[-1]
+        if start_time >= before:
+            return False
+        
+        pending_obstructions.pop()
+        end_time = start_time + self.rng.normal(duration,duration_std)
+        # ensure that the end_time is indeed larger than the start_time
+        while end_time <= start_time:
+            end_time = start_time + self.rng.normal(duration,duration_std)
+        
+        Queue.push(Obstruction(start_time,end_time,
+                               obstruction_node=self))
+        
+        return True
+    
+    #--------------------------------------------------------------------------
+    
     def schedule_n_obstructions(self,n:int,
                                 duration:float,
                                 duration_std:float=0.1):
@@ -310,8 +492,8 @@ class Node(object):
                 
         self.count += 1
         self.last_seen_vehicle = vehicle
-        self.end_time = vehicle.time + np.random.normal(self.duration,
-                                                        self.duration_std)
+        self.end_time = vehicle.time + self.rng.normal(self.duration,
+                                                       self.duration_std)
         
         if self.count == self.n_vehicles_obstructued:
             self.service_node = False
@@ -420,3 +602,49 @@ class Node(object):
         return 'Node ({0})'.format(hex(id(self)))
         
 #-------------------------------------------------------------------------------
+
+def _role_property(name):
+    
+    flag = ROLES[name]
+    
+    def get_role(self):
+        return bool(self.roles & flag)
+    
+    def set_role(self,value):
+        if value:
+            self.roles |= flag
+        else:
+            self.roles &= ~flag
+        return None
+    
+    return property(get_role,set_role,doc='Role {0} of the node.'.format(name))
+
+#-------------------------------------------------------------------------------
+
+def _component_property(name):
+    
+    def get_attribute(self):
+        if self.components is None:
+            return None
+        return getattr(self.components,name)
+    
+    def set_attribute(self,value):
+        if self.components is None:
+            if value is None:
+                return None
+            self.components = NodeComponents()
+        setattr(self.components,name,value)
+        return None
+    
+    return property(get_attribute,set_attribute,
+                    doc='{0} found in Node.components.'.format(name))
+
+#-------------------------------------------------------------------------------
+
+for _name in ROLE_NAMES:
+    setattr(Node,_name,_role_property(_name))
+for _name in COMPONENT_ATTRIBUTES:
+    setattr(Node,_name,_component_property(_name))
+del _name
+
+#-------------------------------------------------------------------------------
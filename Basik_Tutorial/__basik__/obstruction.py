@@ -9,6 +9,7 @@ __all__ = ['Obstruction']#,'ObstructionNode','convert_to_obstruction_node']
 class Obstruction(object):
     
     is_obstruction = True
+    EVENT_KIND = 'obstruction'
     
     
     '''An event that allows a __basik__.node.Node to not be occupied by a 
@@ -43,6 +44,7 @@ class Obstruction(object):
         self.time = start_time
         self.obstruction_node = obstruction_node
         self.obstruction_node.obstruction = self
+        self.successor_scheduled = False
         
     #--------------------------------------------------------------------------
     
@@ -72,6 +74,25 @@ class Obstruction(object):
     
     #--------------------------------------------------------------------------
     
+    def fire(self,queue):
+        '''Introduces or removes the obstruction. See GlobalQueue.run_single_event
+        '''
+        if self.do_activate:
+            self.activate()
+            queue.t = self.start_time
+            # Obstructions scheduled lazily: the next one is placed into the
+            # queue now only if it starts before this one ends.
+            self.successor_scheduled = \
+                self.obstruction_node.schedule_next_obstruction(before=self.end_time)
+        else:
+            self.deactivate()
+            queue.t = self.end_time
+            if not self.successor_scheduled:
+                self.obstruction_node.schedule_next_obstruction()
+        return True
+    
+    #--------------------------------------------------------------------------
+    
     def __lt__(self,other):
         return self.time < other.time
     
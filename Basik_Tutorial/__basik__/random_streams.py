@@ -0,0 +1,286 @@
+'''
+The random number streams of __basik__.
+
+Every component that samples (sources, vehicles, lanes, circles, traffic
+lights, stop streets, intersections, ramps and pedestrian crossings) draws
+from its own rng attribute rather than from numpy.random directly. By default
+rng is GLOBAL_RNG which draws from numpy.random itself such that
+numpy.random.seed controls a simulation as it always has.
+
+Once a session is given a seed (see Session.set_seed in simulation_session)
+every named component is handed its own numpy.random.Generator (buffered by
+a BufferedStream). A stream only depends on the session seed and the name of
+the component. Hence, two designs that share component names (e.g. the same
+sources with a different junction) make use of common random numbers. Streams
+are also independent of the process they are used in which makes them safe to
+use from parallel workers.
+'''
+
+import hashlib
+
+import numpy as np
+
+#------------------------------------------------------------------------------
+
+class GlobalStream(object):
+
+    '''Stands in for the numpy.random module as a stream. It provides the
+    same normal, uniform, choice, exponential and poisson methods as a
+    numpy.random.Generator. Unlike the module, it can be pickled along with
+    the components that use it.
+    '''
+
+    def __getattr__(self,name):
+        attribute = getattr(np.random,name)
+        setattr(self,name,attribute)  # look it up only once
+        return attribute
+
+    def __reduce__(self):
+        return 'GLOBAL_RNG'
+
+    def __repr__(self):
+        return 'GlobalStream (numpy.random)'
+
+#------------------------------------------------------------------------------
+
+# The legacy global stream.
+GLOBAL_RNG = GlobalStream()
+
+#------------------------------------------------------------------------------
+
+class BufferedStream(object):
+
+    '''Hands out scalar normal and uniform (and random) draws from pools that
+    are refilled in bulk from an underlying stream.
+
+    Vehicles draw a scalar normal or uniform for nearly every move. A single
+    vectorised call that produces pool_size standard normals (or uniforms)
+    costs about as much as a handful of scalar calls. Hence, scaling a value
+    taken from a pool is much cheaper than calling the stream every time.
+    The draws have exactly the same distribution and only depend on the
+    underlying stream. Any other method (choice, exponential, ...) and any
+    call with a size is passed on to the underlying stream.
+
+    The global numpy.random stream is never buffered: values left in a pool
+    would survive a call to numpy.random.seed.
+
+    Attributes:
+    -----------
+    rng: numpy.random.Generator
+        The underlying stream.
+    pool_size: int
+        The amount of values drawn whenever a pool is empty.
+    '''
+
+    pool_size = 4096
+
+    #--------------------------------------------------------------------------
+
+    def __init__(self,rng:np.random.Generator,pool_size:int=None):
+
+        self.rng = rng
+        if pool_size is not None:
+            assert pool_size > 0
+            self.pool_size = pool_size
+        self._normals = []
+        self._uniforms = []
+
+    #--------------------------------------------------------------------------
+
+    def normal(self,loc=0.0,scale=1.0,size=None):
+
+        '''See numpy.random.Generator.normal'''
+
+        if size is not None:
+            return self.rng.normal(loc,scale,size)
+        if scale < 0:
+            raise ValueError('scale < 0')
+        try:
+            z = self._normals.pop()
+        except IndexError:
+            self._normals = self.rng.standard_normal(self.pool_size).tolist()
+            z = self._normals.pop()
+
+        return loc + scale*z
+
+    #--------------------------------------------------------------------------
+
+    def uniform(self,low=0.0,high=1.0,size=None):
+
+        '''See numpy.random.Generator.uniform'''
+
+        if size is not None:
+            return self.rng.uniform(low,high,size)
+        try:
+            u = self._uniforms.pop()
+        except IndexError:
+            self._uniforms = self.rng.random(self.pool_size).tolist()
+            u = self._uniforms.pop()
+
+        return low + (high-low)*u
+
+    #--------------------------------------------------------------------------
+
+    def random(self,size=None):
+
+        '''See numpy.random.Generator.random'''
+
+        if size is not None:
+            return self.rng.random(size)
+        try:
+            return self._uniforms.pop()
+        except IndexError:
+            self._uniforms = self.rng.random(self.pool_size).tolist()
+            return self._uniforms.pop()
+
+    #--------------------------------------------------------------------------
+
+    def __getattr__(self,name):
+        # Only called for attributes that are not found above.
+        if name == 'rng':
+            raise AttributeError(name)  # e.g. while being unpickled
+        return getattr(self.rng,name)
+
+    def __repr__(self):
+        return 'BufferedStream ({0})'.format(self.rng)
+
+#------------------------------------------------------------------------------
+
+def as_seed_sequence(seed)->np.random.SeedSequence:
+
+    '''
+    Parameters:
+    -----------
+    seed: int, sequence of int, numpy.random.SeedSequence or None
+        None draws fresh entropy from the operating system.
+
+    Returns:
+    --------
+    numpy.random.SeedSequence
+        A new one if seed is a SeedSequence as well: spawning children from
+        it does not change (the spawn counter of) the one of the caller.
+    '''
+
+    if isinstance(seed,np.random.SeedSequence):
+        return np.random.SeedSequence(entropy=seed.entropy,
+                                      spawn_key=seed.spawn_key,
+                                      pool_size=seed.pool_size)
+
+    return np.random.SeedSequence(seed)
+
+#------------------------------------------------------------------------------
+
+# The amount of 32-bit words of the digest of a name that make up its key.
+NAME_KEY_WORDS = 4
+
+#------------------------------------------------------------------------------
+
+def stream_seed(seed,name:str)->np.random.SeedSequence:
+
+    '''The seed of the stream called name. The same seed and name always give
+    rise to the same stream regardless of the order in which streams are made.
+
+    Parameters:
+    -----------
+    seed: int, sequence of int, numpy.random.SeedSequence or None
+        The session seed.
+    name: str
+        The name of the component e.g. 'Beach Rd source'
+
+    Returns:
+    --------
+    numpy.random.SeedSequence
+        The session seed with the name appended to its spawn_key as
+        NAME_KEY_WORDS 32-bit words of the SHA-256 digest of the name. Two
+        names hence only share a stream if 128 bits of their digests agree
+        which does not happen even among the names of a large sweep.
+    '''
+
+    seed = as_seed_sequence(seed)
+    digest = hashlib.sha256(str(name).encode('utf-8')).digest()
+    key = tuple(int.from_bytes(digest[4*idx:4*idx + 4],'little')
+                for idx in range(NAME_KEY_WORDS))
+
+    return np.random.SeedSequence(entropy=seed.entropy,
+                                  spawn_key=tuple(seed.spawn_key) + key,
+                                  pool_size=seed.pool_size)
+
+#------------------------------------------------------------------------------
+
+def make_rng(seed,name:str,buffered:bool=True):
+
+    '''
+    Parameters:
+    -----------
+    seed: int, sequence of int, numpy.random.SeedSequence or None
+        The session seed.
+    name: str
+        The name of the component.
+    buffered: bool
+        Whether scalar normal and uniform draws are taken from pools. See
+        BufferedStream.
+
+    Returns:
+    --------
+    BufferedStream or numpy.random.Generator
+        A PCG64 generator seeded by stream_seed(seed,name)
+    '''
+
+    rng = np.random.Generator(np.random.PCG64(stream_seed(seed,name)))
+    if buffered:
+        return BufferedStream(rng)
+
+    return rng
+
+#------------------------------------------------------------------------------
+
+def seed_component(component,seed,name:str,in_place:bool=False)->bool:
+
+    '''Hands a component its own stream(s). Sources are also given a second
+    stream (vehicle_rng) for the vehicles they produce. This keeps the arrival
+    times of a source the same between designs even though its vehicles may
+    draw a different amount of random numbers.
+
+    Parameters:
+    -----------
+    component:
+        Any __basik__ simulation object. Objects without an rng attribute
+        are left alone.
+    seed: int, sequence of int, numpy.random.SeedSequence or None
+        The session seed.
+    name: str
+        The name of the component.
+    in_place: bool
+        If True, then a BufferedStream that the component already has is
+        reseeded rather than replaced. Vehicles that a source has produced
+        share its vehicle_rng. Reseeding it in place hands the new stream to
+        these vehicles as well e.g. once a populated session is forked.
+
+    Returns:
+    --------
+    bool:
+        Whether the component was seeded.
+    '''
+
+    if not hasattr(component,'rng'):
+        return False
+
+    for attribute,stream_name in [('rng',name),
+                                  ('vehicle_rng',name + ' vehicles')]:
+        if attribute == 'vehicle_rng' and not hasattr(component,attribute):
+            break
+        stream = getattr(component,attribute)
+        if in_place and isinstance(stream,BufferedStream):
+            stream.rng = make_rng(seed,stream_name,buffered=False)
+            stream._normals = []
+            stream._uniforms = []
+            continue
+        try:
+            setattr(component,attribute,make_rng(seed,stream_name))
+        except AttributeError:
+            # e.g. a __basik__.node.Node which uses the stream of its lane.
+            return False
+
+    return True
+
+#------------------------------------------------------------------------------
@@ -1,10 +1,14 @@
 
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+from array import array
+from collections.abc import Sequence
+from .lazy_imports import plt,read_csv,get_pandas
 from .node import Node
 from .source import Source
-from .VehicleObject.vehicle import Vehicle
+from .random_streams import make_rng
+from .record_store import RecordStore
+from .record_statistics import RecordStatistics
+from .steady_state import steady_state_estimate
 import warnings
 from .utils import unique_legend
 
@@ -16,20 +20,74 @@ except ImportError or ModuleNotFoundError:
 
 #------------------------------------------------------------------------------
 
+class RecordedValues(Sequence):
+    
+    '''A read-only view of the time-stamps or source IDs of a Record.
+    
+    It reads the compact array of the record on every access and hence 
+    follows the recordings as they are made. Indexing, len, iteration, 
+    comparisons with lists and numpy.asarray work as for a list in O(1) 
+    (O(n) for numpy.asarray). Writes such as append or item assignment 
+    raise an error: assign a new sequence to the attribute of the record 
+    instead.
+    '''
+    
+    __slots__ = ('record','name')
+    
+    def __init__(self,record,name):
+        self.record = record
+        self.name = name  # '_time_stamps' or '_source_IDs'
+    
+    def __getitem__(self,idx):
+        values = getattr(self.record,self.name)
+        if isinstance(idx,slice):
+            return values[idx].tolist()
+        return values[idx]
+    
+    def __len__(self):
+        return len(getattr(self.record,self.name))
+    
+    def __iter__(self):
+        return iter(getattr(self.record,self.name))
+    
+    def __eq__(self,other):
+        if isinstance(other,(RecordedValues,list,tuple,array)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __array__(self,dtype=None,copy=None):
+        values = getattr(self.record,self.name)
+        return np.array(values,dtype=dtype or values.typecode)
+    
+    def tolist(self)->list:
+        return getattr(self.record,self.name).tolist()
+    
+    def __repr__(self):
+        return repr(self.tolist())
+
+#------------------------------------------------------------------------------
+
 class Record(object):
     
     '''Records the time-stamps of vehicle arrival times.
     
     Attributes
     -----------
-    time_stamps: list
-        A list of the times that vehicles passed the node with a Record object.
-    source_IDs: list
+    time_stamps: RecordedValues
+        The times that vehicles passed the node with a Record object. They are
+        held in a compact array of floats (typecode 'd'). time_stamps is a
+        read-only view of it that is indexed like a list: appending to it or
+        assigning items raises an error. Assigning a sequence to time_stamps
+        replaces the recordings. Use get_time_stamps for a numpy.ndarray.
+    source_IDs: RecordedValues
         Each source that generates vehicle arrivals has an ID. This way we can
-        determine which source a recorded vehicle may have come from.
+        determine which source a recorded vehicle may have come from. They are
+        held in a compact array of 64-bit ints (typecode 'q') and viewed just
+        like time_stamps.
     colors: list
         Just as each source has an ID associated with it, so does it have a
-        unique color as well. This helps with the stem_plot method.
+        unique color as well. This helps with the stem_plot method. It is 
+        derived from source_IDs.
     data: Pandas DataFrame
         If we are recording either time-stamps or inter-arrival times to a 
         csv file then we produces this DataFrame as to make use of the 
@@ -39,11 +97,44 @@ class Record(object):
     vehicles: list
         A list of the actual vehicles that passed will be
         kept in addition to the time-stamps. This means that the vehicles
-        can be probed for additional information.
+        can be probed for additional information. Which vehicles are kept
+        depends on keep_vehicles.
+    keep_vehicles: 'all', 'none' or int
+        The retention policy of vehicles. A vehicle keeps its display, 
+        movement record and nodes alive. Hence, long simulations should keep
+        only a sample of N vehicles (an int) or none of them.
+    rng: numpy.random.Generator or None
+        The stream from which a sample of vehicles is chosen. It is separate
+        from the streams of the simulation such that keeping a sample does not 
+        change the outcome of a simulation.
+    store: __basik__.record_store.RecordStore or None
+        Only set once stream_to is called. The recordings are then appended
+        to this store in chunks of chunk_size and time_stamps, source_IDs and
+        field_values only hold the recordings that have not been flushed yet.
+        Use get_time_stamps and get_source_IDs to obtain all of them.
+    field_values: dict
+        The values of the vehicle attributes chosen in stream_to that have
+        not been flushed yet.
+    n_records: int
+        The amount of vehicles recorded thus far.
+    keep_time_stamps: bool
+        Whether time_stamps and source_IDs are kept.
+    statistics: __basik__.record_statistics.RecordStatistics or None
+        Online statistics (count, rate, inter-arrival moments, a histogram and
+        quantiles, also per source ID) that are updated with every recorded
+        vehicle. They can be merged across replications.
     '''
     
     is_record  = True
     RECORD = True
+    keep_vehicles = 'all'  # Records pickled before the retention policy
+    rng = None
+    store = None
+    chunk_size = 65536
+    n_flushed = 0
+    n_records = 0
+    keep_time_stamps = True
+    statistics = None
     
     color_list = ['royalblue','orchid','coral','cyan','palegreen','firebrick',
                   'orange','olive','thistle','grey','tomato','teal','maroon',
@@ -51,7 +142,10 @@ class Record(object):
     
     #--------------------------------------------------------------------------
     
-    def __init__(self,node:'__basik__.node.Node',axes=None):
+    def __init__(self,node:'__basik__.node.Node',axes=None,
+                 keep_vehicles:'\'all\', \'none\' or int'='all',
+                 statistics:'bool or RecordStatistics'=False,
+                 keep_time_stamps:bool=True):
         '''
         Parameters
         ----------
@@ -61,61 +155,328 @@ class Record(object):
             The stem_plot method makes use of this. If is left as None, then
             a new axes object will be produced. This object can be accessed as
             a class attribute.
+        keep_vehicles: 'all', 'none' or int
+            Whether all recorded vehicles are kept in vehicles, none of them 
+            or a uniformly chosen sample (reservoir sample) of this size. 
+        statistics: bool or __basik__.record_statistics.RecordStatistics
+            If True, then online statistics with the default set up are kept.
+            A RecordStatistics object can be given to set up the histogram and
+            quantile sketch.
+        keep_time_stamps: bool
+            If False, then no time-stamps and source IDs are kept. This is
+            intended for runs that only require the statistics.
             
         Raises:
         -------
         AssertionError
             If the node parameter is not an instance of __basik__.node.Node
+        ValueError
+            If keep_vehicles is not 'all', 'none' or a positive int.
         '''
 
         assert isinstance(node,Node)
-        self.time_stamps = []
-        self.source_IDs = []
-        self.colors = []
+        if keep_vehicles not in ('all','none'):
+            if (not isinstance(keep_vehicles,(int,np.integer)) or
+                isinstance(keep_vehicles,bool) or keep_vehicles < 1):
+                raise ValueError('keep_vehicles must be \'all\', \'none\' '+\
+                                 'or a positive int')
+        self.keep_vehicles = keep_vehicles
+        self.rng = None
+        if statistics is True:
+            statistics = RecordStatistics()
+        elif statistics is False:
+            statistics = None
+        self.statistics = statistics
+        self.keep_time_stamps = keep_time_stamps
+        self.n_records = 0
+        self._time_stamps = array('d')
+        self._source_IDs = array('q')
         self.data = None
         self.axes = axes
         self.vehicles = []
         self.__setup(node)
         self.current_time = 0
+        
+    #--------------------------------------------------------------------------
+    
+    @property
+    def time_stamps(self)->RecordedValues:
+        return RecordedValues(self,'_time_stamps')
+    
+    @time_stamps.setter
+    def time_stamps(self,time_stamps):
+        self._time_stamps = array('d',np.asarray(time_stamps,
+                                                 dtype=np.float64).tobytes())
+    
+    #--------------------------------------------------------------------------
+    
+    @property
+    def source_IDs(self)->RecordedValues:
+        return RecordedValues(self,'_source_IDs')
+    
+    @source_IDs.setter
+    def source_IDs(self,source_IDs):
+        self._source_IDs = array('q',np.asarray(source_IDs,
+                                                dtype=np.int64).tobytes())
+    
+    #--------------------------------------------------------------------------
+    
+    def __setstate__(self,state):
+        
+        # Records pickled before the recordings were kept in private arrays
+        # hold them (as lists or arrays) under their public names.
+        
+        recordings = {name:state.pop(name) for name in ('time_stamps',
+                                                        'source_IDs')
+                      if name in state}
+        self.__dict__.update(state)
+        if '_time_stamps' not in state:
+            self._time_stamps = array('d')
+            self._source_IDs = array('q')
+        for name,values in recordings.items():
+            setattr(self,name,values)
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    @property
+    def colors(self):
+        color_list = self.color_list
+        return [color_list[source_ID] for source_ID in self.get_source_IDs()]
                 
     #--------------------------------------------------------------------------
         
     def place_record(self,vehicle):
         '''Record the actual vehicle.
         
-        The vehicle object will be appended to the vehicles list, its arrival
-        time will be appended to the time_stamps and its source ID and color
-        will be recorded as well. The current_time of the record object will
-        be updated to match that of the current vehicle being recorded.
+        Its arrival time will be appended to the time_stamps and its source ID
+        will be recorded as well. The vehicle object is kept in the vehicles
+        list according to keep_vehicles. The current_time of the record object
+        will be updated to match that of the current vehicle being recorded.
         
         Parameters:
         -----------
         vehicle:  __basik__.VehicleObject.vehicle.Vehicle
             A vehicle being recorded.
             
+        Returns:
+        -------
+        None
+        '''
+        
+        self.current_time = vehicle.time
+        self.n_records += 1
+        if self.keep_time_stamps:
+            self._time_stamps.append(vehicle.time)
+            self._source_IDs.append(vehicle.source_ID)
+        if self.statistics is not None:
+            self.statistics.update(vehicle.time,vehicle.source_ID)
+        
+        keep_vehicles = self.keep_vehicles
+        if keep_vehicles == 'all':
+            self.vehicles.append(vehicle)
+        elif keep_vehicles != 'none':
+            # Reservoir sampling: every vehicle recorded thus far is in the 
+            # sample with the same probability.
+            if len(self.vehicles) < keep_vehicles:
+                self.vehicles.append(vehicle)
+            else:
+                if self.rng is None:
+                    self.rng = make_rng(0,'Record',buffered=False)
+                idx = int(self.rng.random()*self.n_records)
+                if idx < keep_vehicles:
+                    self.vehicles[idx] = vehicle
+        
+        if self.store is not None:
+            for name,values in self.field_values.items():
+                values.append(getattr(vehicle,name))
+            if len(self._time_stamps) >= self.chunk_size:
+                self.flush()
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def stream_to(self,directory:str,
+                       fields:'list of str'=(),
+                       chunk_size:'int or None'=None):
+        
+        '''Appends the recordings to a __basik__.record_store.RecordStore on 
+        disk in chunks while the simulation runs. Hence, the memory that the
+        record object uses stays flat. Consider setting keep_vehicles to
+        'none' or a sample size as well.
+        
+        Recordings made before stream_to was called are written to the store 
+        first.
+        
+        Parameters:
+        -----------
+        directory: str
+            The directory of the store. Existing recordings in it are removed.
+        fields: list of str
+            Attributes of the recorded vehicles (e.g. 'velocity') that are 
+            stored as floats in addition to the time-stamps and source IDs.
+        chunk_size: int or None
+            The amount of recordings kept in memory before they are written
+            to the store. None keeps Record.chunk_size
+            
         Raises:
         -------
-        AssertionError
-            If the node parameter is not an instance of 
-            __basik__.VehicleObject.vehicle.Vehicle
+        ValueError:
+            If chunk_size is not a positive int or if no time-stamps are 
+            kept (see keep_time_stamps).
             
         Returns:
-        -------
+        --------
+        __basik__.record_store.RecordStore
+        
+        See Also:
+        ---------
+        __basik__.source.csv_to_source (the directory serves as a file name)
+        '''
+        
+        if not self.keep_time_stamps:
+            raise ValueError('A record that does not keep time-stamps has '+\
+                             'nothing to stream.')
+        if chunk_size is not None:
+            if not isinstance(chunk_size,(int,np.integer)) or chunk_size < 1:
+                raise ValueError('chunk_size must be a positive int')
+            self.chunk_size = chunk_size
+        
+        time_stamps = self.get_time_stamps()
+        source_IDs = self.get_source_IDs()
+        
+        self.store = RecordStore(directory,fields=list(fields))
+        self.store.append({'time_stamps':time_stamps,
+                           'source_IDs':source_IDs,
+                           **{name:np.full(len(time_stamps),np.nan) 
+                              for name in fields}})
+        self.n_flushed = len(time_stamps)
+        self._time_stamps = array('d')
+        self._source_IDs = array('q')
+        self.field_values = {name:array('d') for name in fields}
+        
+        return self.store
+    
+    #--------------------------------------------------------------------------
+    
+    def flush(self):
+        
+        '''Writes the recordings held in memory to the store (if any).
+        
+        Returns:
+        --------
         None
         '''
         
-        assert isinstance(vehicle,Vehicle)
-        self.vehicles.append(vehicle)
-        self.current_time = vehicle.time
-        self.time_stamps.append(vehicle.time)
-        self.source_IDs.append(vehicle.source_ID)
-        self.colors.append(self.color_list[vehicle.source_ID])
-                
+        if self.store is None or not self._time_stamps:
+            return None
+        
+        self.store.append({'time_stamps':self._time_stamps,
+                           'source_IDs':self._source_IDs,
+                           **self.field_values})
+        self.n_flushed += len(self._time_stamps)
+        self._time_stamps = array('d')
+        self._source_IDs = array('q')
+        self.field_values = {name:array('d') for name in self.field_values}
         
         return None
     
     #--------------------------------------------------------------------------
     
+    def get_time_stamps(self)->np.ndarray:
+        
+        '''Returns:
+        --------
+        numpy.ndarray
+            All recorded time-stamps. If the record streams to a store then 
+            this is a read-only memory map of the store.
+        '''
+        
+        if self.store is not None:
+            self.flush()
+            return self.store.time_stamps
+        
+        return np.array(self._time_stamps,dtype=np.float64)
+    
+    #--------------------------------------------------------------------------
+    
+    def get_source_IDs(self)->np.ndarray:
+        
+        '''Returns:
+        --------
+        numpy.ndarray
+            All recorded source IDs. See get_time_stamps
+        '''
+        
+        if self.store is not None:
+            self.flush()
+            return self.store.source_IDs
+        
+        return np.array(self._source_IDs,dtype=np.int64)
+    
+    #--------------------------------------------------------------------------
+    
+    def steady_state(self,bin_width:float=60,
+                          start_time:float=0,
+                          end_time:'float or None'=None,
+                          batch_size:int=5,
+                          n_batches:int=20,
+                          confidence:float=0.95)->dict:
+        
+        '''The steady-state throughput of the record. 
+        
+        The time-stamps are counted in bins of bin_width. The throughput of
+        the bins forms a series of which the warm-up is truncated with MSER
+        and the steady-state mean is estimated with batch means.
+        
+        Parameters:
+        -----------
+        bin_width: float
+            In seconds.
+        start_time: float
+            The start of the first bin e.g. the start of the simulation.
+        end_time: float or None
+            Bins past end_time are left out. None uses the last time-stamp.
+        batch_size: int
+            See __basik__.steady_state.mser
+        n_batches: int
+            See __basik__.steady_state.batch_means
+        confidence: float
+            
+        Raises:
+        -------
+        ValueError:
+            If the time-stamps are not kept (see keep_time_stamps).
+        
+        Returns:
+        --------
+        dict
+            The throughput in vehicles per second. See 
+            __basik__.steady_state.steady_state_estimate. truncation_time is
+            the end of the warm-up.
+        '''
+        
+        if not self.keep_time_stamps:
+            raise ValueError('The steady state requires the time-stamps. '+\
+                             'Set keep_time_stamps=True or use a '+\
+                             'SteadyStateMonitor.')
+        
+        time_stamps = self.get_time_stamps()
+        if end_time is None:
+            end_time = time_stamps[-1] if len(time_stamps) else start_time
+        n_bins = max(int((end_time - start_time)//bin_width),0)
+        edges = start_time + bin_width*np.arange(n_bins + 1)
+        counts = np.zeros(n_bins)
+        if n_bins > 0:
+            counts,_ = np.histogram(time_stamps,bins=edges)
+        
+        return steady_state_estimate(counts/bin_width,batch_size,n_batches,
+                                     confidence,times=edges[:-1])
+    
+    #--------------------------------------------------------------------------
+    
     def process_records(self,start_time:'float or None'=None):
         '''Processes time-stamp into intervals.
         
@@ -132,24 +493,29 @@ class Record(object):
         AssertionError:
             If start_time is not None then it must be smnaller than the first
             recorded time-stamp.
+        ValueError:
+            If the time-stamps are not kept (see keep_time_stamps).
             
         Returns:
         -------
         None
         '''
         
-        if not bool(self.vehicles):
+        if not self.keep_time_stamps:
+            raise ValueError('Intervals require the time-stamps. Set '+\
+                             'keep_time_stamps=True or use the statistics.')
+        
+        x = self.get_time_stamps()
+        if not len(x):
             raise Exception('No vehicles were recorded.')
             
 #        for vehicle in self.vehicles:
 #            self.place_record(vehicle)
     
         
-        if start_time is None:
-            x = np.array(self.time_stamps)
-        else:
-            assert start_time < self.time_stamps[0]
-            x = np.array([start_time] + self.time_stamps)
+        if start_time is not None:
+            assert start_time < x[0]
+            x = np.concatenate(([start_time],x))
         
         self.intervals = x[1:] - x[:-1]
         
@@ -170,9 +536,15 @@ class Record(object):
         None
         '''
         
-        self.time_stamps = []
-        self.source_IDs = []
-        self.colors = []
+        self._time_stamps = array('d')
+        self._source_IDs = array('q')
+        self.n_records = 0
+        if self.statistics is not None:
+            self.statistics.clear()
+        if self.store is not None:
+            self.store.truncate()
+            self.n_flushed = 0
+            self.field_values = {name:array('d') for name in self.field_values}
         self.current_time = current_time
         self.vehicles = []
         self.intervals = None
@@ -204,20 +576,23 @@ class Record(object):
     #--------------------------------------------------------------------------
         
     def _read(self,file_name):
-        self.data = pd.read_csv(file_name)
+        self.data = read_csv(file_name)
         return None
     
     #--------------------------------------------------------------------------
         
     def _write(self,file_name,intervals=True):
         
+        pd = get_pandas()
+        
+        time_stamps = self.get_time_stamps()
         if intervals:
-            x = np.array([0] + self.time_stamps)
+            x = np.concatenate(([0],time_stamps))
             x = x[1:] - x[:-1]
             self.data = pd.DataFrame(data=x,
                                      columns=['intervals'])
         else:
-            self.data = pd.DataFrame(data=self.time_stamps,
+            self.data = pd.DataFrame(data=time_stamps,
                                      columns=['time-stamps'])
         
         if file_name[-4:] != '.csv':
@@ -243,6 +618,8 @@ class Record(object):
             file_name += '.pkl'
             warnings.warn('.pkl extentsion was added.')
         
+        self.flush()  # a streaming record only refers to its store
+        
         with open(file_name,'wb') as file:
 
             pickle.dump(self,  # it pickles the actual Source class instance.
@@ -337,7 +714,7 @@ class Record(object):
         vehicle_color: str
             This is the color setting of the vehicle. Note that if the color has
             been set to 'random' then the randomly selected color can be accessed
-            via Vehicle.vehicle_display.color
+            via Vehicle.display_color
         record_movement: bool
             A vehicle can be produced by the source with the setting/instructions
             that it record its movement across the simulation. A recorded vehicle
@@ -400,24 +777,25 @@ class Record(object):
         if self.axes is None:
             self.figure,self.axes = plt.subplots(1,1)
         
-        if start_time is None:
-            X = np.array(self.time_stamps)
-        else:
-            X = np.array([start_time] + self.time_stamps)
+        X = self.get_time_stamps()
+        if start_time is not None:
+            X = np.concatenate(([start_time],X))
             
             
         X = X[1:] - X[:-1]
+        colors = self.colors
+        source_IDs = self.get_source_IDs()
         seen_ids = []
         for idx,x in enumerate(X):
             
-            self.axes.vlines(idx,0,x,colors=self.colors[idx],
+            self.axes.vlines(idx,0,x,colors=colors[idx],
                              alpha=0.5,linestyle='--')
-            source_id = self.source_IDs[idx]
+            source_id = source_IDs[idx]
             if source_id in seen_ids:
-                self.axes.scatter([idx],[x],color=self.colors[idx])
+                self.axes.scatter([idx],[x],color=colors[idx])
             else:
                 seen_ids.append(source_id)
-                self.axes.scatter([idx],[x],color=self.colors[idx],
+                self.axes.scatter([idx],[x],color=colors[idx],
                                    label='Source (ID:{0})'.format(source_id))
                 
         if legend:
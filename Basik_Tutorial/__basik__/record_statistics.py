@@ -0,0 +1,474 @@
+'''
+Online statistics of the vehicles that a __basik__.record.Record records.
+
+Every recorded vehicle updates the accumulators in O(1). Hence, summary
+metrics (count, rate, inter-arrival mean and variance, a histogram and
+quantiles) are available without keeping the time-stamps. Accumulators of
+different replications can be merged into a single one.
+
+>>> record = Record(node,statistics=True,keep_time_stamps=False)
+>>> ...
+>>> record.statistics.summary()
+'''
+
+import math
+
+import numpy as np
+
+#------------------------------------------------------------------------------
+
+class QuantileSketch(object):
+
+    '''A mergeable streaming quantile sketch of positive values.
+
+    Values are counted in logarithmic buckets. Bucket k holds the values in
+    (gamma**(k-1),gamma**k] where gamma = (1+alpha)/(1-alpha). A quantile is
+    estimated by the centre of the bucket it falls in. Hence, its relative
+    error is at most relative_accuracy (alpha). The amount of buckets only
+    grows with the logarithm of the range of the values.
+
+    Attributes:
+    -----------
+    relative_accuracy: float
+    buckets: dict
+        The count of every bucket index.
+    n_zero: int
+        The count of values that are smaller than min_value (e.g. zero).
+    count: int
+    '''
+
+    min_value = 1e-9
+
+    #--------------------------------------------------------------------------
+
+    def __init__(self,relative_accuracy:float=0.01):
+
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('relative_accuracy must be in (0,1)')
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy)/(1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = dict()
+        self.n_zero = 0
+        self.count = 0
+
+    #--------------------------------------------------------------------------
+
+    def add(self,x:float):
+        self.count += 1
+        if x < self.min_value:
+            self.n_zero += 1
+            return None
+        key = math.ceil(math.log(x)/self.log_gamma)
+        buckets = self.buckets
+        buckets[key] = buckets.get(key,0) + 1
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def quantile(self,q:float)->float:
+
+        '''
+        Parameters:
+        -----------
+        q: float
+            A value in [0,1]
+
+        Returns:
+        --------
+        float
+            numpy.nan if no values were added.
+        '''
+
+        if not 0 <= q <= 1:
+            raise ValueError('q must be in [0,1]')
+        if self.count == 0:
+            return np.nan
+
+        rank = q*(self.count - 1)
+        cumulative = self.n_zero
+        if rank < cumulative:
+            return 0.0
+        for key in sorted(self.buckets):
+            cumulative += self.buckets[key]
+            if rank < cumulative:
+                return 2*self.gamma**key/(self.gamma + 1)
+
+        return 2*self.gamma**max(self.buckets)/(self.gamma + 1)
+
+    #--------------------------------------------------------------------------
+
+    def merge(self,other:'QuantileSketch'):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Only sketches with the same relative_accuracy '+\
+                             'can be merged.')
+        for key,count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key,0) + count
+        self.n_zero += other.n_zero
+        self.count += other.count
+        return None
+
+#------------------------------------------------------------------------------
+
+class IntervalStatistics(object):
+
+    '''Accumulates the time-stamps of a stream of recorded vehicles and the
+    inter-arrival times (intervals) between them.
+
+    Attributes:
+    -----------
+    count: int
+        The amount of time-stamps.
+    first_time: float or None
+    last_time: float or None
+    n_intervals: int
+    mean: float
+        The mean interval (Welford).
+    M2: float
+        The sum of squared deviations of the intervals from their mean
+        (Welford).
+    minimum: float
+    maximum: float
+    histogram: list
+        The counts of the intervals in every bin of bin_edges. The first and
+        last entries count the intervals below and above the range.
+    bin_edges: numpy.ndarray
+    sketch: QuantileSketch
+        Of the intervals.
+    '''
+
+    #--------------------------------------------------------------------------
+
+    def __init__(self,histogram_range:tuple=(0,60),
+                      n_bins:int=60,
+                      relative_accuracy:float=0.01):
+
+        low,high = histogram_range
+        if not high > low:
+            raise ValueError('histogram_range must be (low,high) with high > low')
+        if n_bins < 1:
+            raise ValueError('n_bins must be positive')
+
+        self.histogram_range = (low,high)
+        self.n_bins = n_bins
+        self.bin_width = (high - low)/n_bins
+        self.count = 0
+        self.first_time = None
+        self.last_time = None
+        self.n_intervals = 0
+        self.mean = 0.0
+        self.M2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.histogram = [0]*(n_bins + 2)
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    #--------------------------------------------------------------------------
+
+    @property
+    def bin_edges(self):
+        low,high = self.histogram_range
+        return np.linspace(low,high,self.n_bins + 1)
+
+    #--------------------------------------------------------------------------
+
+    def add(self,t:float):
+
+        '''Adds a time-stamp. This is O(1).'''
+
+        self.count += 1
+        last_time = self.last_time
+        self.last_time = t
+        if last_time is None:
+            self.first_time = t
+            return None
+
+        x = t - last_time
+        self.n_intervals += 1
+        delta = x - self.mean
+        self.mean += delta/self.n_intervals
+        self.M2 += delta*(x - self.mean)
+        if x < self.minimum:
+            self.minimum = x
+        if x > self.maximum:
+            self.maximum = x
+
+        idx = (x - self.histogram_range[0])/self.bin_width
+        if idx < 0:
+            self.histogram[0] += 1
+        elif idx >= self.n_bins:
+            self.histogram[-1] += 1
+        else:
+            self.histogram[int(idx) + 1] += 1
+
+        self.sketch.add(x)
+
+        return None
+
+    #--------------------------------------------------------------------------
+
+    @property
+    def variance(self):
+        '''The sample variance of the intervals.'''
+        if self.n_intervals < 2:
+            return np.nan
+        return self.M2/(self.n_intervals - 1)
+
+    #--------------------------------------------------------------------------
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    #--------------------------------------------------------------------------
+
+    def rate(self,duration:'float or None'=None)->float:
+
+        '''
+        Parameters:
+        -----------
+        duration: float or None
+            If given, then the rate is count/duration. Otherwise, it is one
+            over the mean interval. The latter remains valid once accumulators
+            of different replications have been merged.
+
+        Returns:
+        --------
+        float
+            Vehicles per second.
+        '''
+
+        if duration is not None:
+            return self.count/duration if duration > 0 else np.nan
+        if self.n_intervals == 0 or self.mean <= 0:
+            return np.nan
+
+        return 1/self.mean
+
+    #--------------------------------------------------------------------------
+
+    def quantile(self,q:float)->float:
+        '''An estimate of the q-quantile of the intervals. See QuantileSketch'''
+        return self.sketch.quantile(q)
+
+    #--------------------------------------------------------------------------
+
+    def merge(self,other:'IntervalStatistics'):
+
+        '''Adds the accumulated values of other (e.g. another replication).
+        Intervals are not formed between the time-stamps of the two.
+
+        Raises:
+        -------
+        ValueError:
+            If the histograms or sketches differ in their set up.
+
+        Returns:
+        --------
+        None
+        '''
+
+        if (other.histogram_range != self.histogram_range or
+            other.n_bins != self.n_bins):
+            raise ValueError('Only accumulators with the same histogram bins '+\
+                             'can be merged.')
+        self.sketch.merge(other.sketch)
+
+        # Chan et al. for the mean and M2 of the union.
+        n = self.n_intervals + other.n_intervals
+        if n > 0:
+            delta = other.mean - self.mean
+            self.M2 += other.M2 + delta**2*self.n_intervals*other.n_intervals/n
+            self.mean += delta*other.n_intervals/n
+        self.n_intervals = n
+        self.count += other.count
+        self.minimum = min(self.minimum,other.minimum)
+        self.maximum = max(self.maximum,other.maximum)
+        self.histogram = [a + b for a,b in zip(self.histogram,other.histogram)]
+        if other.first_time is not None:
+            if self.first_time is None or other.first_time < self.first_time:
+                self.first_time = other.first_time
+            if self.last_time is None or other.last_time > self.last_time:
+                self.last_time = other.last_time
+
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def summary(self,quantiles=(0.5,0.9,0.95,0.99),
+                     duration:'float or None'=None)->dict:
+
+        '''
+        Returns:
+        --------
+        dict
+            count, rate, mean_interval, std_interval, min_interval,
+            max_interval and the quantiles of the intervals (e.g. 'q0.5').
+        '''
+
+        summary = {'count':self.count,
+                   'rate':self.rate(duration),
+                   'mean_interval':self.mean if self.n_intervals else np.nan,
+                   'std_interval':self.std,
+                   'min_interval':self.minimum if self.n_intervals else np.nan,
+                   'max_interval':self.maximum if self.n_intervals else np.nan}
+        for q in quantiles:
+            summary['q{0}'.format(q)] = self.quantile(q)
+
+        return summary
+
+    #--------------------------------------------------------------------------
+
+    def __repr__(self):
+        return 'IntervalStatistics (count={0})'.format(self.count)
+
+#------------------------------------------------------------------------------
+
+class RecordStatistics(object):
+
+    '''The online statistics of a __basik__.record.Record. It accumulates all
+    recorded vehicles together (total) as well as per source ID (sources).
+
+    Attributes:
+    -----------
+    total: IntervalStatistics
+    sources: dict
+        An IntervalStatistics for every source ID. The intervals are those
+        between vehicles of the same source.
+    by_source: bool
+    '''
+
+    #--------------------------------------------------------------------------
+
+    def __init__(self,histogram_range:tuple=(0,60),
+                      n_bins:int=60,
+                      relative_accuracy:float=0.01,
+                      by_source:bool=True):
+
+        '''
+        Parameters:
+        -----------
+        histogram_range: tuple
+            The (low,high) range of the inter-arrival time histogram in
+            seconds.
+        n_bins: int
+            The amount of equally wide bins in histogram_range.
+        relative_accuracy: float
+            Of the quantile estimates. See QuantileSketch
+        by_source: bool
+            Whether a breakdown per source ID is kept as well.
+
+        Raises:
+        -------
+        ValueError:
+            If the histogram or sketch arguments are not valid.
+        '''
+
+        self.histogram_range = tuple(histogram_range)
+        self.n_bins = n_bins
+        self.relative_accuracy = relative_accuracy
+        self.by_source = by_source
+        self.total = self._new()
+        self.sources = dict()
+
+    #--------------------------------------------------------------------------
+
+    def _new(self):
+        return IntervalStatistics(self.histogram_range,self.n_bins,
+                                  self.relative_accuracy)
+
+    #--------------------------------------------------------------------------
+
+    def update(self,t:float,source_ID:int):
+
+        '''Adds a recorded vehicle. This is O(1).'''
+
+        self.total.add(t)
+        if self.by_source:
+            try:
+                self.sources[source_ID].add(t)
+            except KeyError:
+                self.sources[source_ID] = self._new()
+                self.sources[source_ID].add(t)
+
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def clear(self):
+        self.total = self._new()
+        self.sources = dict()
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def merge(self,other:'RecordStatistics'):
+
+        '''Adds the accumulated values of other e.g. the statistics of the same
+        record in another replication.
+
+        Returns:
+        --------
+        None
+        '''
+
+        self.total.merge(other.total)
+        for source_ID,statistics in other.sources.items():
+            if source_ID not in self.sources:
+                self.sources[source_ID] = self._new()
+            self.sources[source_ID].merge(statistics)
+
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def summary(self,quantiles=(0.5,0.9,0.95,0.99),
+                     duration:'float or None'=None)->dict:
+
+        '''
+        Returns:
+        --------
+        dict
+            The summary of the total (see IntervalStatistics.summary) along
+            with 'sources': a summary for every source ID.
+        '''
+
+        summary = self.total.summary(quantiles,duration)
+        summary['sources'] = {source_ID:statistics.summary(quantiles,duration)
+                              for source_ID,statistics in self.sources.items()}
+
+        return summary
+
+    #--------------------------------------------------------------------------
+
+    def __repr__(self):
+        return 'RecordStatistics (count={0})'.format(self.total.count)
+
+#------------------------------------------------------------------------------
+
+def merge_statistics(statistics:'list of RecordStatistics')->RecordStatistics:
+
+    '''Merges the statistics of e.g. several replications into a new one.
+
+    Parameters:
+    -----------
+    statistics: list of RecordStatistics
+        These are left unchanged.
+
+    Returns:
+    --------
+    RecordStatistics
+    '''
+
+    statistics = list(statistics)
+    if not statistics:
+        raise ValueError('No statistics to merge.')
+    first = statistics[0]
+    merged = RecordStatistics(first.histogram_range,first.n_bins,
+                              first.relative_accuracy,first.by_source)
+    for other in statistics:
+        merged.merge(other)
+
+    return merged
+
+#------------------------------------------------------------------------------
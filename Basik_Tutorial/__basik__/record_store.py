@@ -0,0 +1,239 @@
+'''
+On-disk storage of the recordings of a __basik__.record.Record.
+
+A Record that streams (see Record.stream_to) appends its time-stamps, source
+IDs and a selection of vehicle fields to a directory in chunks while the
+simulation runs. Hence, its memory use stays flat however long the simulation.
+
+Every field is a raw binary file (float64 or int64 in the byte order of the
+machine) to which the chunks are appended. The fields are described by
+record.json in the same directory. They are read back as memory maps or lazily
+in chunks (see RecordStore.iter_time_stamps) such that a store can serve as a
+streamed arrival trace of a __basik__.source.Source.
+'''
+
+import os
+import json
+
+import numpy as np
+
+#------------------------------------------------------------------------------
+
+DESCRIPTION_FILE = 'record.json'
+
+#------------------------------------------------------------------------------
+
+class RecordStore(object):
+
+    '''A directory of recorded fields.
+
+    Attributes:
+    -----------
+    directory: str
+        The directory that contains the fields.
+    fields: dict
+        The name of every field and its numpy dtype string. There is always a
+        'time_stamps' (float64) and 'source_IDs' (int64) field.
+    '''
+
+    RECORD_STORE = True
+
+    #--------------------------------------------------------------------------
+
+    def __init__(self,directory:str,fields:'list or None'=None):
+
+        '''
+        Parameters:
+        -----------
+        directory: str
+            The directory of the store.
+        fields: list or None
+            If None, then an existing store is opened. Otherwise a new (empty)
+            store is created with a float64 field for every name in fields in
+            addition to the time-stamps and source IDs. Existing files of the
+            fields are then overwritten.
+
+        Raises:
+        -------
+        FileNotFoundError:
+            If fields is None and the directory does not contain a store.
+        '''
+
+        self.directory = os.path.abspath(directory)
+        description_file = os.path.join(self.directory,DESCRIPTION_FILE)
+
+        if fields is None:
+            with open(description_file,'r') as file:
+                self.fields = json.load(file)['fields']
+        else:
+            self.fields = {'time_stamps':'float64','source_IDs':'int64'}
+            for name in fields:
+                self.fields[name] = 'float64'
+            os.makedirs(self.directory,exist_ok=True)
+            with open(description_file,'w') as file:
+                json.dump({'fields':self.fields},file)
+            self.truncate()
+
+    #--------------------------------------------------------------------------
+
+    def path(self,name:str)->str:
+        return os.path.join(self.directory,name + '.bin')
+
+    #--------------------------------------------------------------------------
+
+    def truncate(self):
+        '''Removes all recordings while keeping the fields.'''
+        for name in self.fields:
+            open(self.path(name),'wb').close()
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def append(self,columns:dict):
+
+        '''Appends a chunk to the end of every field.
+
+        Parameters:
+        -----------
+        columns: dict
+            An array-like (e.g. array.array) of values for every field. They
+            must all have the same length.
+
+        Returns:
+        --------
+        None
+        '''
+
+        for name,dtype in self.fields.items():
+            with open(self.path(name),'ab') as file:
+                np.asarray(columns[name],dtype=dtype).tofile(file)
+
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def column(self,name:str)->np.ndarray:
+
+        '''
+        Parameters:
+        -----------
+        name: str
+            The name of a field.
+
+        Returns:
+        --------
+        numpy.memmap or numpy.ndarray
+            A read-only memory map of the field. An empty field gives an empty
+            array since an empty file cannot be mapped.
+        '''
+
+        dtype = np.dtype(self.fields[name])
+        if os.path.getsize(self.path(name)) < dtype.itemsize:
+            return np.empty(0,dtype=dtype)
+
+        return np.memmap(self.path(name),dtype=dtype,mode='r')
+
+    #--------------------------------------------------------------------------
+
+    @property
+    def time_stamps(self):
+        return self.column('time_stamps')
+
+    #--------------------------------------------------------------------------
+
+    @property
+    def source_IDs(self):
+        return self.column('source_IDs')
+
+    #--------------------------------------------------------------------------
+
+    def iter_time_stamps(self,start_time:'float or None'=None,
+                              end_time:float=np.inf,
+                              chunk_size:int=65536):
+
+        '''Iterates over the recorded time-stamps without loading them at once.
+
+        Parameters:
+        -----------
+        start_time: float or None
+            If provided, the time-stamps are shifted such that the first one
+            is at start_time.
+        end_time: float
+            Time-stamps (after the shift) larger than this are not produced.
+            The time-stamps of a store are in the order they were recorded
+            which is chronological.
+        chunk_size: int
+            The amount of time-stamps read from disk at once.
+
+        Returns:
+        --------
+        iterator of float
+            It can be pickled.
+        '''
+
+        return _StoredTimeStamps(self,start_time,end_time,chunk_size)
+
+    #--------------------------------------------------------------------------
+
+    def __len__(self):
+        itemsize = np.dtype(self.fields['time_stamps']).itemsize
+        return os.path.getsize(self.path('time_stamps'))//itemsize
+
+    #--------------------------------------------------------------------------
+
+    def __repr__(self):
+        return 'RecordStore ({0})'.format(self.directory)
+
+#------------------------------------------------------------------------------
+
+class _StoredTimeStamps(object):
+
+    '''Reads the time-stamps of a RecordStore from disk one chunk at a time.
+    Only the position in the file is kept such that it can be pickled along
+    with a __basik__.simulation_session.Session
+    '''
+
+    def __init__(self,store,start_time,end_time,chunk_size):
+
+        assert chunk_size > 0
+        self.path = store.path('time_stamps')
+        self.dtype = store.fields['time_stamps']
+        self.start_time = start_time
+        self.end_time = end_time
+        self.chunk_size = chunk_size
+        self.position = 0  # in time-stamps
+        self.delta = 0.0
+        self.chunk = []
+        self.finished = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+
+        if not self.chunk:
+            if self.finished:
+                raise StopIteration
+            itemsize = np.dtype(self.dtype).itemsize
+            chunk = np.fromfile(self.path,dtype=self.dtype,
+                                count=self.chunk_size,
+                                offset=self.position*itemsize)
+            if chunk.size == 0:
+                self.finished = True
+                raise StopIteration
+            if self.start_time is not None and self.position == 0:
+                # first time-stamp + delta = start_time
+                self.delta = self.start_time - chunk[0]
+            self.position += chunk.size
+            # Reversed since time-stamps are popped from the end.
+            self.chunk = (chunk[::-1] + self.delta).tolist()
+
+        t = self.chunk.pop()
+        if t > self.end_time:
+            self.chunk = []
+            self.finished = True
+            raise StopIteration
+
+        return t
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,481 @@
+'''
+A content-addressed cache of simulation results.
+
+A run of a session is fully determined by the state of the session (its
+components, their settings and random number streams and the pending events
+of its queue), the global state that it draws from and the settings of the
+run. scenario_hash reduces all of these to a stable hash. Objects are
+visited in a fixed order and references between them are replaced by the
+order in which they were first seen. Hence, the same scenario built twice
+(in any process) gives the same hash while any difference in the lanes,
+Node.distance, tpm matrices, rate schedules, component settings or seed gives
+another one. Display objects are left out.
+
+A ResultCache keeps compact outputs (the arrays of every record) in files
+named after this hash. The files that were used least recently are removed
+once the cache grows beyond max_bytes.
+
+Outputs are only read back by runs that are not continued afterwards
+(terminal=True, as used by replicate and sweep) since such a run leaves the
+vehicles, queue and streams of the session as they were.
+
+>>> cache = ResultCache('results',max_bytes=2**30)
+>>> session.run(3600,cache=cache)                  # simulates and stores
+>>> session2.run(3600,cache=cache,terminal=True)   # the same scenario: read back
+'''
+
+try:
+    import cPickle as pickle
+except ImportError or ModuleNotFoundError:
+    import pickle
+
+import os
+import types
+import hashlib
+import functools
+from array import array
+from collections import deque
+
+import numpy as np
+
+from .random_streams import GlobalStream
+from .lazy_imports import Image
+from .checkpoint import is_display_object
+from . import source as source_module
+from . import utils
+
+#------------------------------------------------------------------------------
+
+# Part of every hash. Increase it whenever a change of the simulation changes
+# the outcome of existing scenarios such that old results are not used.
+CACHE_VERSION = 1
+
+# Attributes that are derived from others and only depend on the memory
+# addresses of objects e.g. the positions of IndexedQueue.
+EXCLUDED_ATTRIBUTES = frozenset(['_position'])
+
+_PLAIN_TYPES = (type(None),bool,int,float,str,bytes)
+
+#------------------------------------------------------------------------------
+
+class _ScenarioHasher(object):
+
+    '''Feeds an object graph into a sha256 hash. The graph is walked with an
+    explicit stack since chains of nodes can be far deeper than the
+    recursion limit.
+    '''
+
+    def __init__(self):
+
+        self.hash = hashlib.sha256()
+        self.memo = dict()  # id(object) -> the order in which it was seen
+        self.alive = []     # keeps objects made during the walk alive
+        self.image_ids = {id(image.image) for image in Image.instances
+                          if image.image is not None}
+
+    #--------------------------------------------------------------------------
+
+    def write(self,tag:bytes,content:bytes=b''):
+        self.hash.update(tag + len(content).to_bytes(8,'little') + content)
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def digest(self,object_)->bytes:
+        # The hash of an object on its own.
+        hasher = _ScenarioHasher()
+        hasher.walk(object_)
+        return hasher.hash.digest()
+
+    #--------------------------------------------------------------------------
+
+    def walk(self,root):
+
+        '''Adds root and everything it refers to.
+
+        Raises:
+        -------
+        TypeError:
+            If an object is found whose state can not be read.
+        '''
+
+        stack = [root]
+        while stack:
+            object_ = stack.pop()
+            kind = type(object_)
+
+            if object_ is None or kind is bool:
+                self.write(b'c',repr(object_).encode())
+                continue
+            if kind is int:
+                self.write(b'i',str(object_).encode())
+                continue
+            if kind is float:
+                self.write(b'f',object_.hex().encode())
+                continue
+            if kind is str:
+                self.write(b's',object_.encode('utf-8','surrogatepass'))
+                continue
+            if kind is bytes:
+                self.write(b'b',object_)
+                continue
+            if isinstance(object_,np.generic):
+                self.write(b'n',object_.dtype.str.encode() + object_.tobytes())
+                continue
+
+            if id(object_) in self.memo:
+                self.write(b'r',str(self.memo[id(object_)]).encode())
+                continue
+            self.memo[id(object_)] = len(self.memo)
+            self.alive.append(object_)
+
+            stack.extend(reversed(self.parts(object_)))
+
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def parts(self,object_)->list:
+
+        # Writes the tag of a (non-plain) object and returns the objects that
+        # it consists of.
+
+        kind = type(object_)
+
+        if id(object_) in self.image_ids or is_display_object(object_):
+            self.write(b'd')
+            return []
+
+        if isinstance(object_,np.ndarray):
+            header = '{0}{1}'.format(object_.dtype.str,object_.shape).encode()
+            if object_.dtype.hasobject:
+                self.write(b'O',header)
+                return object_.ravel().tolist()
+            self.write(b'a',header + np.ascontiguousarray(object_).tobytes())
+            return []
+
+        if isinstance(object_,array):
+            self.write(b'A',object_.typecode.encode() + object_.tobytes())
+            return []
+
+        if kind in (list,tuple,deque):
+            if object_ and all(type(item) is float for item in object_):
+                # e.g. the pools of a BufferedStream
+                self.write(b'F' + kind.__name__.encode(),
+                           array('d',object_).tobytes())
+                return []
+            self.write(b'l' + kind.__name__.encode(),
+                       str(len(object_)).encode())
+            return list(object_)
+
+        if isinstance(object_,dict):
+            self.write(b'm' + kind.__name__.encode(),
+                       str(len(object_)).encode())
+            return [item for pair in object_.items() for item in pair]
+
+        if isinstance(object_,(set,frozenset)):
+            # Sets have no fixed order. Their items are ordered by hash.
+            self.write(b'S',b''.join(sorted(self.digest(item)
+                                            for item in object_)))
+            return []
+
+        if isinstance(object_,GlobalStream):
+            # Components without a stream of their own draw from numpy.random
+            self.write(b'g')
+            return [np.random.get_state()]
+
+        if isinstance(object_,np.random.Generator):
+            self.write(b'G')
+            return [object_.bit_generator.state]
+
+        if isinstance(object_,np.random.SeedSequence):
+            self.write(b'q')
+            return [object_.entropy,tuple(object_.spawn_key),
+                    object_.pool_size,object_.n_children_spawned]
+
+        if isinstance(object_,functools.partial):
+            self.write(b'p')
+            return [object_.func,object_.args,object_.keywords]
+
+        if isinstance(object_,types.MethodType):
+            self.write(b'M',object_.__name__.encode())
+            return [object_.__self__]
+
+        if isinstance(object_,type):
+            # Settings are often class attributes (e.g. OnRamp.delay_time)
+            self.write(b't','{0}.{1}'.format(object_.__module__,
+                                             object_.__qualname__).encode())
+            settings = dict()
+            for klass in reversed(object_.__mro__):
+                for name,value in vars(klass).items():
+                    if (not name.startswith('__') and
+                        isinstance(value,_PLAIN_TYPES)):
+                        settings[name] = value
+            return [sorted(settings.items())]
+
+        if isinstance(object_,(types.FunctionType,types.BuiltinFunctionType,
+                               types.ModuleType)):
+            name = getattr(object_,'__qualname__',object_.__name__)
+            self.write(b'x','{0}.{1}'.format(getattr(object_,'__module__',''),
+                                             name).encode())
+            return []
+
+        state = dict(getattr(object_,'__dict__',{}))
+        slots = [name for klass in kind.__mro__
+                 for name in getattr(klass,'__slots__',())]
+        if not hasattr(object_,'__dict__') and not slots:
+            raise TypeError('The state of {0} can not be hashed.'.format(
+                                                               kind.__name__))
+        for name in slots:
+            if name != '__dict__' and hasattr(object_,name):
+                state[name] = getattr(object_,name)
+
+        attributes = sorted((name,value) for name,value in state.items()
+                            if name not in EXCLUDED_ATTRIBUTES)
+        self.write(b'o',str(len(attributes)).encode())
+
+        return [kind] + [item for pair in attributes for item in pair]
+
+#------------------------------------------------------------------------------
+
+def scenario_hash(session,**settings)->str:
+
+    '''A stable hash of everything that determines the outcome of a run of a
+    session.
+
+    Parameters:
+    -----------
+    session: __basik__.simulation_session.Session
+    settings:
+        The settings of the run e.g. end_time. They must be plain values,
+        lists, tuples, dicts or numpy arrays.
+
+    Raises:
+    -------
+    TypeError:
+        If the session holds an object whose state can not be hashed.
+
+    Returns:
+    --------
+    str
+        A sha256 hex digest.
+    '''
+
+    hasher = _ScenarioHasher()
+    hasher.walk([CACHE_VERSION,
+                 sorted(settings.items()),
+                 source_module.source_count,
+                 utils._last_idx,
+                 session.seed_sequence,
+                 session.simulation_objects,
+                 session.sim_queue])
+
+    return hasher.hash.hexdigest()
+
+#------------------------------------------------------------------------------
+
+class ResultCache(object):
+
+    '''Outputs of runs on disk, one file per hash. The files are used as a
+    least recently used cache: reading a file marks it as used and the files
+    used longest ago are removed once the files in directory take up more
+    than max_bytes.
+
+    Attributes:
+    -----------
+    directory: str
+    max_bytes: int
+    hits: int
+        The amount of outputs read back by this object.
+    misses: int
+    '''
+
+    extension = '.result'
+
+    #--------------------------------------------------------------------------
+
+    def __init__(self,directory:str,max_bytes:int=2**30):
+
+        '''
+        Parameters:
+        -----------
+        directory: str
+            It is made if it does not exist.
+        max_bytes: int
+            The size that the cache is kept under.
+
+        Raises:
+        -------
+        ValueError:
+            If max_bytes is not positive.
+        '''
+
+        if not max_bytes > 0:
+            raise ValueError('max_bytes must be positive.')
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory,exist_ok=True)
+
+    #--------------------------------------------------------------------------
+
+    def file_name(self,key:str)->str:
+        return os.path.join(self.directory,key + self.extension)
+
+    #--------------------------------------------------------------------------
+
+    def get(self,key:str):
+
+        '''
+        Returns:
+        --------
+        The outputs stored under key or None if there are none.
+        '''
+
+        file_name = self.file_name(key)
+        try:
+            with open(file_name,'rb') as file:
+                content = pickle.load(file)
+            os.utime(file_name)  # used most recently
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (pickle.UnpicklingError,EOFError,AttributeError,ImportError):
+            # A file left by an older version of __basik__
+            self.remove(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return content
+
+    #--------------------------------------------------------------------------
+
+    def put(self,key:str,content)->bool:
+
+        '''Stores content under key and removes the least recently used
+        files if the cache has grown beyond max_bytes.
+
+        Returns:
+        --------
+        bool
+            False if content alone is larger than max_bytes and was not
+            stored.
+        '''
+
+        content = pickle.dumps(content,protocol=pickle.HIGHEST_PROTOCOL)
+        if len(content) > self.max_bytes:
+            return False
+
+        # Workers may write the same key at the same time.
+        file_name = self.file_name(key)
+        temporary_file = '{0}.{1}.tmp'.format(file_name,os.getpid())
+        with open(temporary_file,'wb') as file:
+            file.write(content)
+        os.replace(temporary_file,file_name)
+        self.evict()
+
+        return True
+
+    #--------------------------------------------------------------------------
+
+    def _entries(self)->list:
+        # (last use,size,file name) of every file in the cache
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(self.extension):
+                continue
+            try:
+                status = entry.stat()
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((status.st_mtime,status.st_size,entry.path))
+        return entries
+
+    #--------------------------------------------------------------------------
+
+    def evict(self):
+
+        '''Removes the least recently used files until the cache takes up at
+        most max_bytes.
+
+        Returns:
+        --------
+        int
+            The amount of files removed.
+        '''
+
+        entries = sorted(self._entries())
+        size = sum(entry[1] for entry in entries)
+        removed = 0
+        for _,file_size,file_name in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(file_name)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            size -= file_size
+
+        return removed
+
+    #--------------------------------------------------------------------------
+
+    def remove(self,key:str):
+        try:
+            os.remove(self.file_name(key))
+        except FileNotFoundError:
+            pass
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def clear(self):
+        '''Removes every file of the cache.'''
+        for _,_,file_name in self._entries():
+            try:
+                os.remove(file_name)
+            except FileNotFoundError:
+                pass
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def size(self)->int:
+        '''The amount of bytes taken up by the cache.'''
+        return sum(entry[1] for entry in self._entries())
+
+    #--------------------------------------------------------------------------
+
+    def __contains__(self,key):
+        return os.path.exists(self.file_name(key))
+
+    def __len__(self):
+        return len(self._entries())
+
+    def __repr__(self):
+        # Also used by the hash of sweep settings. Hence, it is stable.
+        return 'ResultCache({0!r},max_bytes={1})'.format(self.directory,
+                                                         self.max_bytes)
+
+#------------------------------------------------------------------------------
+
+def as_result_cache(cache)->'ResultCache or None':
+
+    '''
+    Parameters:
+    -----------
+    cache: ResultCache, str or None
+        A str is the directory of a ResultCache with the default max_bytes.
+    '''
+
+    if cache is None or isinstance(cache,ResultCache):
+        return cache
+    if isinstance(cache,(str,os.PathLike)):
+        return ResultCache(os.fspath(cache))
+
+    raise TypeError('cache must be a ResultCache or a directory.')
+
+#------------------------------------------------------------------------------
@@ -6,17 +6,28 @@ except ImportError or ModuleNotFoundError:
     
     
 from .global_queue import GlobalQueue
+from . import global_queue
 from numpy import inf
-import matplotlib.pyplot as plt
 
 from. VehicleObject import Vehicle,VehicleDisplay
 
-import heapq
 
 import warnings
 import os
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
+from .lazy_imports import is_figure
+from .source import reset_source_count
+from . import source as source_module
+from . import utils
+from .random_streams import as_seed_sequence,seed_component
+from .trajectory_store import TrajectoryStore
+from .steady_state import SteadyStateMonitor,t_quantile
+from .checkpoint import (write_checkpoint,read_checkpoint,dumps_checkpoint,
+                         loads_checkpoint)
+from .result_cache import scenario_hash,as_result_cache
 
 #------------------------------------------------------------------------------
     
@@ -74,11 +85,30 @@ class Session(object):
         the simulation.
     Queue: __basik__.global_queue.GlobalQueue
         A pointer to the sim_queue attribute.
+    seed_sequence: numpy.random.SeedSequence or None
+        The session seed. If None then all components draw from the global
+        numpy.random stream. See set_seed.
+    trajectories: __basik__.trajectory_store.TrajectoryStore or None
+        The movements of the vehicles of all sources once 
+        record_trajectories is called.
+    checkpoint_every: float or None
+        The simulated time between the automatic checkpoints of run.
+    checkpoint_file: str or None
+        The file of the automatic checkpoints of run. See checkpoint.
+    steady_state: __basik__.steady_state.SteadyStateMonitor or None
+        Observes records and lanes while the session runs once 
+        monitor_steady_state is called.
         
         
     
     '''
     
+    trajectories = None  # Sessions saved before record_trajectories existed
+    checkpoint_every = None
+    checkpoint_file = None
+    steady_state = None
+    from_cache = False
+    
     #--------------------------------------------------------------------------
     
     def load(file_name,activate=True):
@@ -121,7 +151,8 @@ class Session(object):
     #--------------------------------------------------------------------------
     
     def __init__(self,name,
-                      Queue=None):
+                      Queue=None,
+                      seed=None):
         
         
         '''
@@ -141,7 +172,12 @@ class Session(object):
             order. Setting it to None means that a new GlobalQueue object will
             be made for this session. This is the default and preferred setting
             as it avoids complications of multipl simulation sessions filling
-            up the same GlobalQueue.
+            up the same GlobalQueue. An empty 
+            __basik__.global_queue.IndexedQueue may be given for large 
+            simulations.
+        seed: int, numpy.random.SeedSequence or None
+            If given then every component added to the session draws from its
+            own numpy.random.Generator. See set_seed.
             
         '''
         
@@ -158,12 +194,17 @@ class Session(object):
         self.record_objects = dict()
         self.cycle_objects = dict()
         self.figure = None
+        self.seed_sequence = None
+        self.trajectories = None
+        if seed is not None:
+            self.seed_sequence = as_seed_sequence(seed)
         
         if Queue is None:
             self.sim_queue = GlobalQueue.new()
-#        else:
-#            assert isinstance(Queue,GlobalQueue)
-#            self.sim_queue = Queue
+        else:
+            # e.g. an __basik__.global_queue.IndexedQueue
+            assert isinstance(Queue,GlobalQueue)
+            self.sim_queue = GlobalQueue.new(Queue)
             
             
         self.display_on = False
@@ -257,7 +298,7 @@ class Session(object):
         
         self.simulation_objects[sim_object_name] = sim_object
         
-        if isinstance(sim_object,plt.Figure):
+        if is_figure(sim_object):
             self.figure = sim_object
         
         if hasattr(sim_object,'INTERNAL'):
@@ -277,6 +318,9 @@ class Session(object):
             
         if hasattr(sim_object,'SOURCE'):
             self.source_objects[sim_object_name] = sim_object
+            
+        if getattr(self,'seed_sequence',None) is not None:
+            seed_component(sim_object,self.seed_sequence,sim_object_name)
         
         return None
         
@@ -412,6 +456,40 @@ class Session(object):
     
     #--------------------------------------------------------------------------
     
+    def set_seed(self,seed):
+        
+        '''Hands every component in the session its own random number stream.
+        
+        A stream is a numpy.random.Generator that only depends on the seed and
+        the name under which the component was added. Hence, two sessions 
+        with the same seed and names (e.g. the same sources and a different
+        junction) share common random numbers. Components added afterwards 
+        are seeded as well. Sources also seed the vehicles they produce.
+        
+        Parameters:
+        -----------
+        seed: int, sequence of int, numpy.random.SeedSequence or None
+            None draws fresh entropy which can be found in 
+            seed_sequence.entropy
+        
+        Returns:
+        --------
+        None
+        
+        See Also:
+        ---------
+        __basik__.random_streams
+        '''
+        
+        self.seed_sequence = as_seed_sequence(seed)
+        
+        for sim_object_name,sim_object in self.simulation_objects.items():
+            seed_component(sim_object,self.seed_sequence,sim_object_name)
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
     def run(self,end_time=None,
                  start_time=0,
                  clear_queue=False,
@@ -419,7 +497,12 @@ class Session(object):
                  schedule_sources=True,
                  schedule_cycles=True,
                  reset_records=True,
-                 ensure_unique=True):
+                 ensure_unique=True,
+                 checkpoint_every=None,
+                 checkpoint_file=None,
+                 precision=None,
+                 cache=None,
+                 terminal=False):
         
         '''Runs the session as a simulation.
         
@@ -455,12 +538,46 @@ class Session(object):
             Care should also be taken not to schedule/set up cycles twice.
         reset_records: bool
             Clears any existing content in a __basik__.record.Record object.
+        checkpoint_every: float or None
+            If given, then a checkpoint (see the checkpoint method) is written 
+            every time this much simulated time has passed. An interrupted 
+            run can then be continued with restore and resume. The events
+            are performed exactly as they would have been without 
+            checkpoints.
+        checkpoint_file: str or None
+            The file that every checkpoint overwrites. None uses the name of
+            the session with a .ckpt extension in the working directory.
+        precision: float or None
+            If given, then the run stops as soon as the steady-state
+            estimate of every series of steady_state has a relative half 
+            width of at most precision (or at end_time otherwise). If 
+            monitor_steady_state has not been called, then all records are
+            monitored with its defaults. See steady_state.report() for the 
+            estimates and truncation points.
+        cache: __basik__.result_cache.ResultCache, str or None
+            If given (a str is a directory), then the outputs of the run are
+            stored in it under its scenario (see 
+            __basik__.result_cache.scenario_hash) and settings. Runs that
+            show a display, write checkpoints, monitor the steady state, 
+            record trajectories or stream records are never cached.
+        terminal: bool
+            States that the session is not continued after this run, as is
+            the case for the replications of replicate and sweep. Only then 
+            are the outputs of an earlier run read from cache instead of 
+            simulated. Such a run only fills the records and sets 
+            sim_queue.t (see run_outputs) while the vehicles, queue and 
+            streams are left as they were. The session is therefore marked 
+            from_cache and can not be run, resumed, populated, checkpointed
+            or forked afterwards.
             
             
         Raises:
         -------
         AssertionError
             If end_time is not None then it must be greater than start_time.
+        ValueError:
+            If checkpoint_every or precision is not positive or the session
+            was filled from a cache (see terminal).
             
         Returns:
         --------
@@ -471,9 +588,36 @@ class Session(object):
         __basik__.global_queue.GlobalQueue.run
         '''
         
+        self._assert_not_from_cache()
+        if checkpoint_every is not None and not checkpoint_every > 0:
+            raise ValueError('checkpoint_every must be positive.')
+        if precision is not None and not precision > 0:
+            raise ValueError('precision must be positive.')
+        
+        cache = as_result_cache(cache)
+        key = self._cache_key(cache,
+                              display=(bool(self.display_objects) and 
+                                       display_vehicles),
+                              uncached=(checkpoint_every is not None or
+                                        precision is not None),
+                              end_time=end_time,
+                              start_time=start_time,
+                              clear_queue=clear_queue,
+                              schedule_sources=schedule_sources,
+                              schedule_cycles=schedule_cycles,
+                              reset_records=reset_records)
+        
         self.start_time = start_time
         self.end_time = end_time
         
+        if key is not None and terminal:
+            outputs = cache.get(key)
+            if outputs is not None:
+                self.checkpoint_every = None
+                self.checkpoint_file = None
+                self._load_run_outputs(outputs)
+                return None
+        
         if clear_queue:
             self.sim_queue.clear()
         
@@ -495,6 +639,13 @@ class Session(object):
         if reset_records:
             self.reset_records()
         
+        if precision is not None and self.steady_state is None:
+            self.monitor_steady_state()
+        if self.steady_state is not None:
+            if precision is not None:
+                self.steady_state.precision = precision
+            self.steady_state.start(self.sim_queue,start_time)
+        
         if bool(self.display_objects):
             # Only do this is display objects exist
             
@@ -508,14 +659,206 @@ class Session(object):
 #        if ensure_unique:
 #            self.sim_queue.Q = (np.unique(self.sim_queue.Q)).tolist()
             
-
-        if end_time is None:
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_file = checkpoint_file
+        if checkpoint_every is not None:
+            self.sim_queue.t = start_time
+            self.sim_queue.start_time = start_time
+            self._run_with_checkpoints(end_time)
+        elif end_time is None:
             # Run until the queue is empty
             self.sim_queue.run()
         else:
             self.sim_queue.run(end_time)
+        
+        if key is not None:
+            cache.put(key,self.run_outputs())
             
         return None
+    
+    #--------------------------------------------------------------------------
+    
+    def _assert_not_from_cache(self):
+        
+        # A session that was filled from a cache only has the records of its
+        # run. Its vehicles, queue and streams do not match them.
+        
+        if self.from_cache:
+            raise ValueError('The session {0} was filled from a cache and can '
+                             'not be continued.'.format(self.name))
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def _cache_key(self,cache,display=False,uncached=False,**settings):
+        
+        # The key of a run in cache (see scenario_hash). None if there is no
+        # cache or the outputs of the run are more than its records.
+        
+        if cache is None or display or uncached:
+            return None
+        if self.steady_state is not None or self.trajectories is not None:
+            return None
+        for record_object in self.record_objects.values():
+            if record_object.store is not None:
+                return None
+        try:
+            return scenario_hash(self,**settings)
+        except TypeError:
+            # e.g. a component that holds a generator
+            return None
+    
+    #--------------------------------------------------------------------------
+    
+    def run_outputs(self)->dict:
+        
+        '''The compact outputs of the last run that a 
+        __basik__.result_cache.ResultCache keeps.
+        
+        Returns:
+        --------
+        dict:
+            t: float
+                The time of sim_queue.
+            records: dict
+                The name of each record object along with its time_stamps,
+                source_IDs, n_records, current_time and (a copy of its)
+                statistics.
+        '''
+        
+        records = dict()
+        for name,record_object in self.record_objects.items():
+            records[name] = {'time_stamps':record_object.get_time_stamps(),
+                             'source_IDs':record_object.get_source_IDs(),
+                             'n_records':record_object.n_records,
+                             'current_time':record_object.current_time,
+                             'statistics':deepcopy(record_object.statistics)}
+        
+        return {'t':self.sim_queue.t,'records':records}
+    
+    #--------------------------------------------------------------------------
+    
+    def _load_run_outputs(self,outputs):
+        
+        # Puts outputs of run_outputs back into the records.
+        
+        for name,content in outputs['records'].items():
+            record_object = self.record_objects[name]
+            record_object.clear(content['current_time'])
+            record_object.time_stamps = content['time_stamps']
+            record_object.source_IDs = content['source_IDs']
+            record_object.n_records = content['n_records']
+            record_object.statistics = content['statistics']
+        self.sim_queue.t = outputs['t']
+        self.from_cache = True
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def _run_with_checkpoints(self,end_time):
+        
+        # Runs the sim_queue up to every checkpoint time in turn. A vehicle 
+        # only ends a run once it has performed and rescheduled its move 
+        # (see Vehicle.fire). Hence, continuing with the next event gives 
+        # exactly the same simulation as a single run.
+        
+        queue = self.sim_queue
+        if end_time is None:
+            end_time = inf
+        checkpoint_time = queue.t + self.checkpoint_every
+        
+        while True:
+            queue.end_time = min(checkpoint_time,end_time)
+            while queue.run_single_event():
+                pass
+            if not queue.Q or queue.end_time >= end_time:
+                break
+            if self.steady_state is not None and self.steady_state.stopped:
+                break
+            while checkpoint_time <= queue.t:
+                checkpoint_time += self.checkpoint_every
+            self.checkpoint(self.checkpoint_file)
+            
+        queue.end_time = end_time
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def resume(self,end_time=None,
+                    checkpoint_every=None,
+                    checkpoint_file=None,
+                    reset_records=False,
+                    cache=None,
+                    terminal=False):
+        
+        '''Continues a run of a restored (or forked) session from the last 
+        event it performed. Sources and cycles are not scheduled again. The 
+        session is activated first.
+        
+        Parameters:
+        -----------
+        end_time: float or None
+            None continues until the end_time of the interrupted run.
+        checkpoint_every: float or None
+            None uses the checkpoint_every of the interrupted run.
+        checkpoint_file: str or None
+            None uses the checkpoint_file of the interrupted run.
+        reset_records: bool
+            Clears the records first e.g. to discard the warm-up of a 
+            populated session.
+        cache: __basik__.result_cache.ResultCache, str or None
+            See run.
+        terminal: bool
+            See run.
+            
+        Raises:
+        -------
+        ValueError:
+            If the session was filled from a cache (see run).
+            
+        Returns:
+        --------
+        None
+        
+        See Also:
+        ---------
+        __basik__.simulation_session.Session.restore
+        '''
+        
+        self._assert_not_from_cache()
+        if end_time is None:
+            end_time = getattr(self,'end_time',None)
+        if checkpoint_every is not None:
+            self.checkpoint_every = checkpoint_every
+        if checkpoint_file is not None:
+            self.checkpoint_file = checkpoint_file
+        if self.checkpoint_every is None:
+            self.checkpoint_every = inf
+        cache = as_result_cache(cache)
+        key = self._cache_key(cache,
+                              uncached=self.checkpoint_every != inf,
+                              resume=True,
+                              end_time=end_time,
+                              reset_records=reset_records)
+        self.end_time = end_time
+        
+        self.activate()
+        if key is not None and terminal:
+            outputs = cache.get(key)
+            if outputs is not None:
+                self._load_run_outputs(outputs)
+                return None
+        
+        if reset_records:
+            self.reset_records()
+        self._run_with_checkpoints(end_time)
+        
+        if key is not None:
+            cache.put(key,self.run_outputs())
+        
+        return None
             
     #--------------------------------------------------------------------------
     
@@ -583,6 +926,7 @@ class Session(object):
         None
         '''
 
+        self._assert_not_from_cache()
         assert end_time >= 0 and end_time != inf
         # Populate is basically running the simulation without a display for 
         # some amount of time. The idea is to get existing vehicles placed
@@ -642,7 +986,7 @@ class Session(object):
         for sim_object in self.sim_queue.Q:
             sim_object.time += delta
             
-        heapq.heapify(self.sim_queue.Q)
+        self.sim_queue.heapify()
         # NOTE: we refer to objects in the Queue as sim_objects. They are
         # mostly vehicles. However, their are traffic light cycles and 
         # scheduled obstructions in it as well.
@@ -692,6 +1036,211 @@ class Session(object):
     
     #--------------------------------------------------------------------------
     
+    def checkpoint(self,file_name=None,keep_recorded_vehicles=False):
+        
+        '''Saves the simulation state of the session in a compact form.
+        
+        In contrast to save, the display graph (display components, their
+        figure and the images of vehicles and icons) is left out. So are the
+        vehicles kept by records unless keep_recorded_vehicles is True. 
+        The random number streams, the global numpy.random state and the
+        pending events are kept such that a restored session continues 
+        exactly where it left off (see restore and resume).
+        
+        Parameters:
+        -----------
+        file_name: str or None
+            None uses the name of the session with a .ckpt extension in the
+            working directory. An existing file is replaced.
+        keep_recorded_vehicles: bool
+            Whether the vehicles kept by __basik__.record.Record objects are
+            saved as well.
+            
+        Returns:
+        --------
+        int
+            The size of the checkpoint in bytes.
+            
+        Raises:
+        -------
+        ValueError:
+            If the session was filled from a cache (see run).
+            
+        See Also:
+        ---------
+        __basik__.checkpoint
+        '''
+        
+        self._assert_not_from_cache()
+        if file_name is None:
+            file_name = os.path.join(os.getcwd(),self.name[:-4] + '.ckpt')
+        
+        return write_checkpoint(self,file_name,keep_recorded_vehicles)
+    
+    #--------------------------------------------------------------------------
+    
+    def restore(file_name,activate=True):
+        
+        '''Loads a session that was saved with checkpoint. It has no display
+        components. Call resume to continue an interrupted run.
+        
+        Parameters:
+        -----------
+        file_name: str
+            The file of the checkpoint.
+        activate: bool
+            See load.
+            
+        Returns:
+        --------
+        __basik__.simulation_session.Session
+        
+        Raises:
+        -------
+        FileNotFoundError:
+            The file_name is not valid.
+        ValueError:
+            The file is not a supported checkpoint.
+        '''
+        
+        session = read_checkpoint(file_name)
+        session._remove_display()
+        
+        if activate:
+            session.activate()
+            
+        return session
+    
+    #--------------------------------------------------------------------------
+    
+    def _remove_display(self):
+        
+        # Display objects have been replaced by None in a checkpoint.
+        for objects in [self.simulation_objects,
+                        self.internal_objects]:
+            for name in [name for name,sim_object in objects.items() 
+                         if sim_object is None]:
+                del objects[name]
+        self.display_objects = dict()
+        self.figure = None
+        self.display_on = False
+        
+        return None
+    
+    #--------------------------------------------------------------------------
+    
+    def snapshot(self,keep_recorded_vehicles=False)->bytes:
+        
+        '''A frozen, in-memory checkpoint of the session (see checkpoint). 
+        Any number of independent copies can be made from it with 
+        from_snapshot.
+        
+        Returns:
+        --------
+        bytes
+        '''
+        
+        self._assert_not_from_cache()
+        
+        return dumps_checkpoint(self,keep_recorded_vehicles)
+    
+    #--------------------------------------------------------------------------
+    
+    def from_snapshot(snapshot:bytes,seed=None,activate=False):
+        
+        '''A copy of a session from its snapshot.
+        
+        Parameters:
+        -----------
+        snapshot: bytes
+            See snapshot.
+        seed: int, numpy.random.SeedSequence or None
+            If given, then the copy is handed fresh random number streams
+            seeded from it. Streams that exist already are reseeded in 
+            place such that the vehicles in flight (which share the stream
+            of their source) follow the new seed as well. Vehicles in flight 
+            that draw from the global numpy.random stream keep doing so.
+        activate: bool
+            See load.
+            
+        Returns:
+        --------
+        __basik__.simulation_session.Session
+            It has its own sim_queue and no display components. It is not
+            set up to write checkpoints.
+        '''
+        
+        # Loading restores the global state of the snapshot. The caller's
+        # numpy.random state is left as it was.
+        state = np.random.get_state()
+        session = loads_checkpoint(snapshot,'snapshot')
+        np.random.set_state(state)
+        
+        session._remove_display()
+        session.checkpoint_every = None
+        session.checkpoint_file = None
+        if seed is not None:
+            session.seed_sequence = as_seed_sequence(seed)
+            for sim_object_name,sim_object in session.simulation_objects.items():
+                seed_component(sim_object,session.seed_sequence,
+                               sim_object_name,in_place=True)
+        
+        if activate:
+            session.activate()
+        
+        return session
+    
+    #--------------------------------------------------------------------------
+    
+    def fork(self,n:int=1,seed=None)->list:
+        
+        '''Independent copies of a (populated) session.
+        
+        The session is frozen into a snapshot once (see snapshot) after which
+        every copy is made from it. Each copy has its own nodes, vehicles, 
+        pending events, controller phases and sim_queue and is handed fresh 
+        random number streams. Continue a copy with resume. Warm-up can then
+        be performed once with populate rather than for every replication.
+        See replicate (warm_start=True) to run copies in worker processes.
+        
+        >>> session.schedule_sources(4200)
+        >>> session.schedule_cycles(4200)
+        >>> session.run(600,schedule_sources=False,schedule_cycles=False)
+        >>> for copy in session.fork(10,seed=1):
+        ...     copy.resume(4200,reset_records=True)
+        
+        Parameters:
+        -----------
+        n: int
+            The number of copies.
+        seed: int, numpy.random.SeedSequence or None
+            The master seed. Copy i is seeded from the i-th spawn of it (see
+            spawn_seeds).
+        
+        Raises:
+        -------
+        AssertionError:
+            If n is not a positive int.
+        ValueError:
+            If the session was filled from a cache (see run).
+            
+        Returns:
+        --------
+        list
+            n __basik__.simulation_session.Session objects. They are not 
+            activated. The session itself is left as it was.
+        '''
+        
+        assert isinstance(n,(int,np.integer)) and n > 0
+        self._assert_not_from_cache()
+        
+        snapshot = self.snapshot()
+        
+        return [Session.from_snapshot(snapshot,seed_sequence) 
+                for seed_sequence in spawn_seeds(seed,n)]
+    
+    #--------------------------------------------------------------------------
+    
     
     def vehicles_only(self):
         
@@ -759,14 +1308,122 @@ class Session(object):
         
         for record_object in self.record_objects.values():
             record_object.clear()
+        if self.trajectories is not None:
+            self.trajectories.clear()
             
         return None
     
     #--------------------------------------------------------------------------
     
+    def record_trajectories(self,sample_every:int=1,
+                                 chunk_size:int=65536):
+        
+        '''Records the movement of the vehicles of all sources in 
+        source_objects to a single columnar table (self.trajectories) rather
+        than to the movement_record of every vehicle. Call it before the 
+        sources are scheduled.
+        
+        Parameters:
+        -----------
+        sample_every: int
+            Only every k-th vehicle is recorded.
+        chunk_size: int
+            The amount of rows in a chunk.
+            
+        Raises:
+        -------
+        ValueError:
+            If sample_every or chunk_size is not a positive int.
+            
+        Returns:
+        --------
+        __basik__.trajectory_store.TrajectoryStore
+        '''
+        
+        self.trajectories = TrajectoryStore(sample_every,chunk_size)
+        for source_object in self.source_objects.values():
+            source_object.trajectory_store = self.trajectories
+        
+        return self.trajectories
+    
+    #--------------------------------------------------------------------------
+    
+    def monitor_steady_state(self,interval:float=60,
+                                  records:'list or None'=None,
+                                  lanes:'list or None'=None,
+                                  batch_size:int=5,
+                                  n_batches:int=20,
+                                  confidence:float=0.95,
+                                  precision:'float or None'=None,
+                                  check_every:int=10):
+        
+        '''Observes the throughput of records and the occupancy of lanes at a
+        fixed interval during every following run. The end of the warm-up 
+        of each series is detected with MSER-5 and a batch means confidence
+        interval is found for its steady-state mean.
+        
+        >>> session.monitor_steady_state(interval=30,lanes=['Main Rd'])
+        >>> session.run(7200,precision=0.05)
+        >>> session.steady_state.report()['Main Rd']['truncation_time']
+        
+        Parameters:
+        -----------
+        interval: float
+            The simulated time between observations.
+        records: list or None
+            The names of records in record_objects. None uses all of them.
+        lanes: list or None
+            The names of __basik__.RoadObject.lane.Lane objects that have 
+            been added to the session.
+        batch_size: int
+            See __basik__.steady_state.mser
+        n_batches: int
+            See __basik__.steady_state.batch_means
+        confidence: float
+        precision: float or None
+            See run.
+        check_every: int
+            The amount of observations between checks of the precision.
+            
+        Raises:
+        -------
+        KeyError:
+            If a name cannot be found.
+        ValueError:
+            If nothing would be observed.
+        
+        Returns:
+        --------
+        __basik__.steady_state.SteadyStateMonitor
+        
+        See Also:
+        ---------
+        __basik__.steady_state
+        '''
+        
+        if records is None:
+            records = list(self.record_objects)
+        if self.steady_state is not None:
+            self.sim_queue.cancel(self.steady_state)
+        self.steady_state = SteadyStateMonitor(
+                    interval,
+                    records={name:self.record_objects[name] for name in records},
+                    lanes={name:self.simulation_objects[name] 
+                           for name in (lanes or [])},
+                    batch_size=batch_size,
+                    n_batches=n_batches,
+                    confidence=confidence,
+                    precision=precision,
+                    check_every=check_every)
+        
+        return self.steady_state
+    
+    #--------------------------------------------------------------------------
+    
     def schedule_cycles(self,end_time,
                              start_time=0,
-                             fixed_cycle=True):
+                             fixed_cycle=True,
+                             lazy=False):
         
         '''Schedules all objects in self.cycle_objects.
         
@@ -780,11 +1437,15 @@ class Session(object):
             Traffic lights can follow a fixed cycle from the given cycle
             schedule or it can randomise its cycle by shuffling this
             given cycle schedule.
+        lazy: bool
+            Whether traffic lights and pedestrian crossings place their cycles
+            into the queue one at a time.
             
         See Also:
         ---------
         __basik__.TrafficLightObject.traffic_light.TrafficLight.setup_cycles
         __basik__.FlaredTrafficLightObject.flared_traffic_light.FlaredTrafficLight.setup_cycles
+        __basik__.PedestrianCrossingObject.pedestrian_crossing.PedestrianCrossing.setup_cycles
         
         Raises:
         --------
@@ -801,14 +1462,16 @@ class Session(object):
         assert end_time < np.inf
         
         for cycle_object in self.cycle_objects.values():
-            cycle_object.setup_cycles(end_time,start_time,fixed_cycle)
+            cycle_object.setup_cycles(end_time,start_time,fixed_cycle,lazy)
             
         return None
     
     #--------------------------------------------------------------------------
     
     def schedule_sources(self,end_time,
-                              start_time=0):
+                              start_time=0,
+                              lazy=False,
+                              spillback=False):
         
         '''Schedules all objects in self.source_objects.
         
@@ -818,6 +1481,11 @@ class Session(object):
             The time at which cycles will end
         start_time: float
             The time at which cycles will start.
+        lazy: bool
+            Whether sources produce their arrivals one at a time.
+        spillback: bool
+            Whether arrivals that cannot enter are held outside of the global
+            queue until the vehicle in front of them has entered.
                
         See Also:
         ---------
@@ -838,12 +1506,148 @@ class Session(object):
         assert end_time < np.inf
         
         for source_object in self.source_objects.values():
-            source_object.setup_arrivals(end_time,start_time)
+            source_object.setup_arrivals(end_time,start_time,lazy,spillback)
         
         return None
     
     #--------------------------------------------------------------------------
     
+    def record_summary(self):
+        
+        '''A compact summary of every __basik__.record.Record object in 
+        record_objects. Only arrays and numbers are kept (no vehicles) such 
+        that it is cheap to send between processes.
+        
+        Returns:
+        --------
+        dict:
+            The name of each record object along with a dict containing:
+                time_stamps: numpy.ndarray
+                source_IDs: numpy.ndarray
+                count: int
+                rate: float
+                    Vehicles per second over the last run of the session.
+                mean_interval: float
+                std_interval: float
+                    These are numpy.nan if less than two vehicles were recorded.
+                statistics: RecordStatistics or None
+                    A copy of the online statistics of the record (if any).
+                    Those of several replications can be merged (see
+                    __basik__.record_statistics.merge_statistics).
+        '''
+        
+        start_time = getattr(self,'start_time',0)
+        if start_time is None:
+            start_time = 0
+        end_time = getattr(self,'end_time',None)
+        if end_time is None or end_time == inf:
+            end_time = self.sim_queue.t
+        duration = end_time - start_time
+        
+        summary = dict()
+        for name,record_object in self.record_objects.items():
+            time_stamps = np.array(record_object.get_time_stamps(),
+                                   dtype=np.float64)
+            statistics = record_object.statistics
+            if statistics is not None:
+                # Also available if no time-stamps were kept.
+                total = statistics.total
+                count = total.count
+                mean_interval = total.mean if total.n_intervals else np.nan
+                std_interval = total.std
+            else:
+                count = len(time_stamps)
+                if count > 1:
+                    intervals = np.diff(time_stamps)
+                    mean_interval = intervals.mean()
+                    std_interval = intervals.std(ddof=1) if count > 2 else 0.0
+                else:
+                    mean_interval = np.nan
+                    std_interval = np.nan
+            summary[name] = {'time_stamps':time_stamps,
+                             'source_IDs':np.array(record_object.get_source_IDs(),
+                                                   dtype=np.int64),
+                             'count':count,
+                             'rate':count/duration if duration > 0 else np.nan,
+                             'mean_interval':mean_interval,
+                             'std_interval':std_interval,
+                             'statistics':deepcopy(statistics)}
+            
+        return summary
+    
+    #--------------------------------------------------------------------------
+    
+    def replicate(self,n:int,
+                       end_time:float,
+                       workers:'int or None'=1,
+                       seed:'int, numpy.random.SeedSequence or None'=None,
+                       warm_start:bool=False,
+                       **run_kwargs):
+        
+        '''Runs independent replications of the session and returns a 
+        compact summary of the records of each one.
+        
+        The session itself is not altered. It is pickled once and each 
+        replication unpickles its own copy. See 
+        __basik__.simulation_session.replicate
+        
+        Parameters:
+        -----------
+        n: int
+            The number of replications.
+        end_time: float
+            The time at which every replication ends.
+        workers: int or None
+            The number of processes. If set to 1 then the replications are 
+            run one after the other in this process. None uses os.cpu_count()
+        seed: int, numpy.random.SeedSequence or None
+            The master seed. Replication i is seeded from the i-th spawn of it.
+            Hence, results are identical for a given seed regardless of workers.
+        warm_start: bool
+            If True, then every replication continues from the current 
+            (e.g. populated) state of the session rather than running it 
+            from the start. See fork.
+        run_kwargs:
+            Passed on to the run method e.g. start_time or schedule_cycles.
+            
+        Returns:
+        --------
+        list:
+            One dict per replication in order. See 
+            __basik__.simulation_session.replicate
+        '''
+        
+        return replicate(self,n,end_time,workers,seed,warm_start,**run_kwargs)
+    
+    #--------------------------------------------------------------------------
+    
+    def replicate_until(self,end_time:float,
+                             record:str,
+                             precision:float,
+                             metric:'str or callable'='mean_interval',
+                             **kwargs)->dict:
+        
+        '''Runs replications of the session in batches until the confidence
+        interval of metric at record reaches precision (relative by
+        default) e.g. the mean inter-arrival time within 2% at 95%:
+        
+        >>> session.replicate_until(3600,'Main Rd record',0.02,workers=8)
+        
+        The session itself is not altered. See 
+        __basik__.simulation_session.replicate_until for the keyword 
+        arguments (confidence, workers, batch_size, seed, ...) and the 
+        result.
+        
+        Returns:
+        --------
+        dict
+            The estimate, its confidence interval and the replications used.
+        '''
+        
+        return replicate_until(self,end_time,record,precision,metric,**kwargs)
+    
+    #--------------------------------------------------------------------------
+    
     
     def __repr__(self):
         return '\tSession\n>>> name: {0}\n>>> id: {1}'.format(self.name,
@@ -887,6 +1691,419 @@ def load_session(file_name,activate=True)->Session:
 
 #------------------------------------------------------------------------------
 
+# Set up in each worker process by _setup_replication_worker.
+_replication_payload = None
+
+#------------------------------------------------------------------------------
+
+def spawn_seeds(seed,n:int)->list:
+    
+    '''
+    Parameters:
+    -----------
+    seed: int, numpy.random.SeedSequence or None
+        The master seed. None draws fresh entropy from the operating system.
+    n: int
+        The number of independent child seeds required.
+        
+    Returns:
+    --------
+    list:
+        n numpy.random.SeedSequence objects. A given SeedSequence is copied 
+        first (see __basik__.random_streams.as_seed_sequence) such that the
+        same seed always gives the same children.
+    '''
+    
+    return as_seed_sequence(seed).spawn(n)
+
+#------------------------------------------------------------------------------
+
+def _setup_replication_worker(payload):
+    
+    global _replication_payload
+    
+    _replication_payload = payload
+    
+    return None
+
+#------------------------------------------------------------------------------
+
+def _run_replication(task):
+    
+    '''Runs a single replication in the current process from 
+    _replication_payload. It is module level such that it can be sent to a 
+    worker process.
+    '''
+    
+    index,seed_sequence,end_time,run_kwargs = task
+    kind,content = _replication_payload
+    
+    if kind == 'snapshot':
+        return _resume_replication(index,seed_sequence,end_time,run_kwargs)
+    
+    # Everything that draws random numbers or assigns IDs starts from the same
+    # state in every replication, whichever process it happens to run in.
+    # Components that are not part of the session itself (and hence have no
+    # stream of their own) draw from the global stream.
+    np.random.seed(seed_sequence.generate_state(8))
+    utils._last_idx = 0
+    reset_source_count()
+    
+    if kind == 'pickle':
+        session = pickle.loads(content)
+        session.activate()
+    else:
+        session = content()
+        if not isinstance(session,Session):
+            raise TypeError('The session factory must return a Session.')
+    session.set_seed(seed_sequence)
+    
+    run_kwargs = dict(run_kwargs)
+    run_kwargs['display_vehicles'] = False
+    run_kwargs['terminal'] = True
+    session.run(end_time,**run_kwargs)
+    
+    try:
+        global_queue.AllQueues.remove(session.sim_queue)
+    except ValueError:
+        pass
+    
+    return {'replication':index,
+            'entropy':seed_sequence.entropy,
+            'spawn_key':seed_sequence.spawn_key,
+            'end_time':end_time,
+            'records':session.record_summary()}
+
+#------------------------------------------------------------------------------
+
+def _resume_replication(index,seed_sequence,end_time,run_kwargs):
+    
+    # A warm started replication: a copy of the snapshot in 
+    # _replication_payload is continued until end_time.
+    
+    session = Session.from_snapshot(_replication_payload[1],seed_sequence,
+                                    activate=True)
+    np.random.seed(seed_sequence.generate_state(8))
+    session.resume(end_time,
+                   reset_records=run_kwargs.get('reset_records',True),
+                   cache=run_kwargs.get('cache'),
+                   terminal=True)
+    
+    try:
+        global_queue.AllQueues.remove(session.sim_queue)
+    except ValueError:
+        pass
+    
+    return {'replication':index,
+            'entropy':seed_sequence.entropy,
+            'spawn_key':seed_sequence.spawn_key,
+            'end_time':end_time,
+            'records':session.record_summary()}
+
+#------------------------------------------------------------------------------
+
+def replicate(session:'Session or callable',
+              n:int,
+              end_time:float,
+              workers:'int or None'=1,
+              seed:'int, numpy.random.SeedSequence or None'=None,
+              warm_start:bool=False,
+              **run_kwargs)->list:
+    
+    '''Runs n independent replications of a session.
+    
+    Each replication starts from a fresh copy of the session. Replication i 
+    seeds the streams of the session (see Session.set_seed) as well as
+    numpy.random from the i-th spawn of numpy.random.SeedSequence(seed). Results are therefore bit-reproducible for a given
+    seed regardless of the number of workers or the order in which they finish.
+    
+    Since Session.run schedules the sources and cycles of each replication,
+    the session should be built without calling setup_arrivals or setup_cycles
+    (unless schedule_sources=False or schedule_cycles=False is given).
+    
+    Parameters:
+    -----------
+    session: __basik__.simulation_session.Session or callable
+        A session that will be pickled once and unpickled for each replication
+        or a picklable function without arguments (e.g. a module level 
+        function) that builds a new session. The latter is built in the worker
+        itself which avoids pickling large sessions.
+    n: int
+        The number of replications.
+    end_time: float
+        The time at which every replication ends.
+    workers: int or None
+        The number of processes. If set to 1 then the replications are run one
+        after the other in this process. None uses os.cpu_count()
+    seed: int, numpy.random.SeedSequence or None
+        The master seed. If None then fresh entropy is used. It can be found
+        under 'entropy' in the results to reproduce the replications.
+    warm_start: bool
+        If True, then session must be a Session (e.g. one that has been 
+        populated). It is frozen into a snapshot (see Session.snapshot) and
+        every replication continues a copy of it (see Session.fork) until
+        end_time instead of running it from the start. Only reset_records 
+        (True by default: the warm-up is discarded) and cache are used from
+        run_kwargs. Worker processes that are forked share the snapshot 
+        copy-on-write.
+    run_kwargs:
+        Passed on to __basik__.simulation_session.Session.run
+        display_vehicles is always False. A cache (see 
+        __basik__.result_cache.ResultCache) serves replications that were
+        run before with the same seed e.g. by an earlier study or sweep.
+        
+    Raises:
+    -------
+    AssertionError:
+        If n or workers is not a positive int.
+    TypeError:
+        If session is neither a Session nor callable or warm_start is True
+        and session is not a Session.
+        
+    Returns:
+    --------
+    list:
+        One dict per replication, ordered by replication, containing:
+            replication: int
+            entropy: int
+            spawn_key: tuple
+            end_time: float
+            records: dict
+                See __basik__.simulation_session.Session.record_summary
+    '''
+    
+    assert isinstance(n,(int,np.integer)) and n > 0
+    if workers is None:
+        workers = os.cpu_count() or 1
+    assert isinstance(workers,(int,np.integer)) and workers > 0
+    
+    payload = _replication_payload_of(session,warm_start)
+    
+    tasks = [(index,seed_sequence,end_time,run_kwargs) 
+             for index,seed_sequence in enumerate(spawn_seeds(seed,n))]
+    
+    if workers == 1:
+        return _run_in_this_process(payload,tasks)
+    
+    with ProcessPoolExecutor(max_workers=min(workers,n),
+                             initializer=_setup_replication_worker,
+                             initargs=(payload,)) as executor:
+        results = list(executor.map(_run_replication,tasks))
+    
+    return results
+
+#------------------------------------------------------------------------------
+
+def _replication_payload_of(session,warm_start):
+    
+    # What every replication is made from. See _run_replication.
+    
+    if warm_start:
+        if not isinstance(session,Session):
+            raise TypeError('A warm start requires a Session.')
+        return ('snapshot',session.snapshot())
+    if isinstance(session,Session):
+        return ('pickle',pickle.dumps(session,protocol=-1))
+    if callable(session):
+        return ('factory',session)
+    
+    raise TypeError('session must be a Session or a function that builds one.')
+
+#------------------------------------------------------------------------------
+
+def _run_in_this_process(payload,tasks):
+    
+    # Runs replications in this process but leaves its state as it was found.
+    
+    global _replication_payload
+    previous_payload = _replication_payload
+    previous_Queue = global_queue.Queue
+    previous_state = np.random.get_state()
+    previous_show = VehicleDisplay.SHOW
+    previous_source_count = source_module.source_count
+    _replication_payload = payload
+    try:
+        results = [_run_replication(task) for task in tasks]
+    finally:
+        _replication_payload = previous_payload
+        if previous_Queue is not None:
+            GlobalQueue.reload(previous_Queue)
+        np.random.set_state(previous_state)
+        VehicleDisplay.SHOW = previous_show
+        source_module.source_count = previous_source_count
+    
+    return results
+
+#------------------------------------------------------------------------------
+
+def _replication_value(result,record,metric):
+    # The output of interest of a single replication.
+    if callable(metric):
+        return float(metric(result['records'][record]))
+    return float(result['records'][record][metric])
+
+#------------------------------------------------------------------------------
+
+def replicate_until(session:'Session or callable',
+                    end_time:float,
+                    record:str,
+                    precision:float,
+                    metric:'str or callable'='mean_interval',
+                    relative:bool=True,
+                    confidence:float=0.95,
+                    workers:'int or None'=1,
+                    batch_size:'int or None'=None,
+                    min_replications:int=5,
+                    max_replications:int=1000,
+                    seed:'int, numpy.random.SeedSequence or None'=None,
+                    warm_start:bool=False,
+                    **run_kwargs)->dict:
+    
+    '''Runs replications of a session in batches until the confidence 
+    interval of an output reaches a precision.
+    
+    >>> replicate_until(session,3600,record='Main Rd record',precision=0.02)
+    
+    gives the mean inter-arrival time at 'Main Rd record' within 2% at 95%
+    confidence. After every batch the interval is found from the values of 
+    all replications so far (Student t). The study stops at the first batch
+    after which it is narrow enough. The replications of a batch run in 
+    parallel. Since the check is only made between batches, the amount of
+    replications used does not depend on the order in which workers finish.
+    Replication i is seeded as in replicate. Hence, the replications are the
+    first n of replicate(session,max_replications,...) with the same seed.
+    
+    Parameters:
+    -----------
+    session: __basik__.simulation_session.Session or callable
+        See replicate.
+    end_time: float
+        The time at which every replication ends.
+    record: str
+        The name of the record in record_objects.
+    precision: float
+        The required half width of the confidence interval. It is relative
+        to the absolute estimate if relative is True (e.g. 0.02 is 2%).
+    metric: str or callable
+        An entry of the record summary (see Session.record_summary) such as
+        'mean_interval', 'std_interval', 'rate' or 'count'. A function of the 
+        record summary that returns a float may be given as well.
+    relative: bool
+    confidence: float
+        In (0,1).
+    workers: int or None
+        See replicate.
+    batch_size: int or None
+        The amount of replications per batch. None uses workers.
+    min_replications: int
+        The first batch contains at least this many replications (at least
+        2).
+    max_replications: int
+        The study stops here even if the precision is not reached.
+    seed: int, numpy.random.SeedSequence or None
+        The master seed. See replicate.
+    warm_start: bool
+        See replicate.
+    run_kwargs:
+        See replicate.
+        
+    Raises:
+    -------
+    ValueError:
+        If precision, confidence or the amounts of replications are not 
+        valid or the value of a replication is not finite (e.g. the 
+        mean_interval of a record with fewer than two arrivals).
+    TypeError:
+        See replicate.
+        
+    Returns:
+    --------
+    dict
+        estimate: float
+            The mean of the values of the replications.
+        half_width: float
+        lower: float
+        upper: float
+        converged: bool
+            Whether the precision was reached within max_replications.
+        n: int
+            The amount of replications used.
+        values: numpy.ndarray
+            The value of every replication.
+        replications: list
+            The result of every replication (see replicate).
+    '''
+    
+    if not precision > 0:
+        raise ValueError('precision must be positive.')
+    if not 0 < confidence < 1:
+        raise ValueError('confidence must be in (0,1).')
+    min_replications = max(min_replications,2)
+    if max_replications < min_replications:
+        raise ValueError('max_replications must be at least min_replications.')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    assert isinstance(workers,(int,np.integer)) and workers > 0
+    if batch_size is None:
+        batch_size = workers
+    assert isinstance(batch_size,(int,np.integer)) and batch_size > 0
+    
+    payload = _replication_payload_of(session,warm_start)
+    seed_sequence = as_seed_sequence(seed)
+    
+    results = []
+    values = []
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers,
+                                       initializer=_setup_replication_worker,
+                                       initargs=(payload,))
+    try:
+        while True:
+            n_new = batch_size if results else max(batch_size,min_replications)
+            n_new = min(n_new,max_replications - len(results))
+            # Spawning in turn gives the same children as spawning all at once.
+            tasks = [(len(results) + index,child,end_time,run_kwargs) 
+                     for index,child in enumerate(seed_sequence.spawn(n_new))]
+            if executor is None:
+                batch = _run_in_this_process(payload,tasks)
+            else:
+                batch = list(executor.map(_run_replication,tasks))
+            for result in batch:
+                value = _replication_value(result,record,metric)
+                if not np.isfinite(value):
+                    raise ValueError('Replication {0} (entropy {1}, spawn_key '
+                                     '{2}) gives {3} for {4} of {5}.'.format(
+                                            result['replication'],
+                                            result['entropy'],
+                                            result['spawn_key'],
+                                            value,metric,record))
+                values.append(value)
+            results.extend(batch)
+            
+            estimate = float(np.mean(values))
+            standard_error = float(np.std(values,ddof=1))/np.sqrt(len(values))
+            half_width = float(t_quantile(0.5 + confidence/2,len(values) - 1)*
+                               standard_error)
+            target = precision*abs(estimate) if relative else precision
+            converged = bool(half_width <= target)
+            if converged or len(results) >= max_replications:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    
+    return {'estimate':estimate,
+            'half_width':half_width,
+            'lower':estimate - half_width,
+            'upper':estimate + half_width,
+            'converged':converged,
+            'n':len(results),
+            'values':np.array(values),
+            'replications':results}
+
+#------------------------------------------------------------------------------
+
 
 
 
@@ -1,11 +1,13 @@
 
+import os
 import numpy as np
-import matplotlib.pyplot as plt
+from .lazy_imports import plt,read_csv
 from .VehicleObject import Vehicle,color_list
 from .node import Node
 from .utils import cycle_list,merge_dicts,get_pi,get_ordered_dict
-from collections import OrderedDict
-from pandas import read_csv
+from .random_streams import GLOBAL_RNG
+from .record_store import RecordStore
+from collections import OrderedDict,deque
 import warnings
 try:
     import cPickle as pickle
@@ -14,7 +16,8 @@ except ImportError or ModuleNotFoundError:
 
 #-------------------------------------------------------------------------------
 
-__all__ = ['Rate','Source','source_count','MMPP_rate_schedule']
+__all__ = ['Rate','Source','source_count','MMPP_rate_schedule',
+           'sample_arrival_times']
 
 
 #-------------------------------------------------------------------------------
@@ -35,7 +38,9 @@ def csv_to_source(file_name:str,
     file_name: str
         A working path name. If a .csv extension is not present then one will
         be added. The user will be notified of this via a warning produced from
-        the warnings module.
+        the warnings module. The directory of a streaming Record (see 
+        Record.stream_to) can be given as well. Its time-stamps are then read
+        from disk in chunks as the simulation runs.
     vehicle_velocity: float
         A value in meters per second. All vehicle will move at this
         velocity on average.
@@ -45,7 +50,7 @@ def csv_to_source(file_name:str,
     vehicle_color: str
         This is the color setting of the vehicle. Note that if the color has
         been set to 'random' then the randomly selected color can be accessed
-        via Vehicle.vehicle_display.color
+        via Vehicle.display_color
     record_movement: bool
         A vehicle can be produced by the source with the setting/instructions
         that it record its movement across the simulation. A recorded vehicle
@@ -64,7 +69,9 @@ def csv_to_source(file_name:str,
     '''
     
     
-    if file_name[-4:] != '.csv':
+    if os.path.isdir(file_name):
+        pass  # the directory of a __basik__.record_store.RecordStore
+    elif file_name[-4:] != '.csv':
             file_name += '.csv'
             warnings.warn('.csv extension was added.')
     
@@ -99,7 +106,9 @@ def pickle_to_source(file_name:str,
     file_name: str
         A working path name. If a .pkl extension is not present then one will
         be added. The user will be notified of this via a warning produced from
-        the warnings module.
+        the warnings module. The directory of a streaming Record (see 
+        Record.stream_to) can be given as well. A pickled streaming Record is
+        read back from its store too.
     vehicle_velocity: float
         A value in meters per second. All vehicle will move at this
         velocity on average.
@@ -109,7 +118,7 @@ def pickle_to_source(file_name:str,
     vehicle_color: str
         This is the color setting of the vehicle. Note that if the color has
         been set to 'random' then the randomly selected color can be accessed
-        via Vehicle.vehicle_display.color
+        via Vehicle.display_color
     record_movement: bool
         A vehicle can be produced by the source with the setting/instructions
         that it record its movement across the simulation. A recorded vehicle
@@ -126,7 +135,9 @@ def pickle_to_source(file_name:str,
     '''
     
     
-    if file_name[-4:] != '.pkl':
+    if os.path.isdir(file_name):
+        pass  # the directory of a __basik__.record_store.RecordStore
+    elif file_name[-4:] != '.pkl':
             file_name += '.pkl'
             warnings.warn('.pkl extension was added.')
     
@@ -160,13 +171,125 @@ def general_function(t,
 
 #-------------------------------------------------------------------------------
 
+def sample_arrival_times(rate_schedule:'dict -> {end_time:Rate}',
+                         end_time:float,
+                         start_time:float=0,
+                         min_rate:float=5e-2,
+                         rng=None)->np.ndarray:
+    
+    '''Simulates the arrival times of a non-homogeneous Poisson process whose
+    rate intensity is given by a piece-wise rate schedule.
+    
+    All arrival times are produced at once using NumPy array operations. This
+    is done by thinning: candidate arrivals are drawn from a homogeneous 
+    Poisson process whose rate is an upper bound of the rate intensity on each
+    piece of the schedule. A candidate at time t is then kept with probability
+    rate(t)/bound.
+    
+    Parameters:
+    -----------
+    rate_schedule: dict or collections.OrderedDict
+        The form of a rate scedule is:
+        >>> schedule = {end time of schedule:__basik__.source.Rate}
+        A Rate applies from the end time of the Rate before it up to its own
+        end time. The last Rate continues to apply after its end time.
+    end_time: float
+        No arrivals will be produced after this time.
+    start_time: float
+        No arrivals will be produced before this time.
+    min_rate: float or None
+        The rate intensity that is used wherever a Rate is zero or negative.
+        If set to None (or zero) then no arrivals are produced while the
+        rate intensity is not positive.
+    rng: numpy.random.Generator or None
+        The stream to sample from. None uses the global numpy.random stream.
+        
+    Returns:
+    --------
+    numpy.ndarray (float64)
+        The sorted arrival times.
+    
+    Raises:
+    -------
+    AssertionError:
+        If end_time is not greater than start_time or is not finite.
+    TypeError:
+        If the rate_schedule contains anything other than Rate objects.
+        
+    See Also:
+    ---------
+    __basik__.source.general_function
+    '''
+    
+    assert end_time > start_time
+    assert end_time < np.inf
+    if min_rate is None:
+        min_rate = 0
+    assert min_rate >= 0
+    if rng is None:
+        rng = GLOBAL_RNG
+    
+    schedule_end_times = sorted(rate_schedule.keys())
+    rates = [rate_schedule[key] for key in schedule_end_times]
+    for rate in rates:
+        if not isinstance(rate,Rate):
+            raise TypeError('A rate_schedule to sample from may only contain '+\
+                            'Rate objects.')
+    
+    # The (lower,upper] bounds of every piece within [start_time,end_time]
+    upper = np.array(schedule_end_times,dtype=np.float64)
+    upper[-1] = np.inf
+    lower = np.empty_like(upper)
+    lower[0] = -np.inf
+    lower[1:] = upper[:-1]
+    lower = np.maximum(lower,start_time)
+    upper = np.minimum(upper,end_time)
+    durations = np.maximum(upper - lower,0)
+    
+    constant = np.array([rate.constant for rate in rates],dtype=np.float64)
+    drift = np.array([rate.drift for rate in rates],dtype=np.float64)
+    drift_reference = np.array([rate.drift_reference for rate in rates],
+                               dtype=np.float64)
+    amplitude = np.array([rate.amplitude for rate in rates],dtype=np.float64)
+    prob = np.array([rate.prob for rate in rates],dtype=np.float64)
+    T1 = np.array([rate.T1 for rate in rates],dtype=np.float64)
+    T2 = np.array([rate.T2 for rate in rates],dtype=np.float64)
+    
+    # The linear part is largest at one of the end points and the periodic 
+    # part can never exceed the amplitude since 0 <= prob <= 1.
+    bounds = constant + np.maximum(drift*(lower-drift_reference),
+                                   drift*(upper-drift_reference)) +\
+             np.abs(amplitude)
+    bounds = np.maximum(bounds,min_rate)
+    bounds[durations == 0] = 0
+    
+    counts = rng.poisson(bounds*durations)
+    idx = np.repeat(np.arange(len(rates)),counts)
+    
+    times = lower[idx] + rng.uniform(size=idx.size)*durations[idx]
+    intensity = general_function(times,
+                                 constant[idx],
+                                 drift[idx],
+                                 drift_reference[idx],
+                                 amplitude[idx],
+                                 prob[idx],
+                                 T1[idx],
+                                 T2[idx])
+    intensity = np.where(intensity > 0,intensity,min_rate)
+    keep = rng.uniform(size=idx.size)*bounds[idx] < intensity
+    
+    return np.sort(times[keep])
+
+#-------------------------------------------------------------------------------
+
 
 
 def MMPP_rate_schedule(Q:'array(N,N)',
                        Rates:'array(N)',
                        end_time:float,
                        start_time:float=0,
-                       pi:'array(N)'=None):
+                       pi:'array(N)'=None,
+                       rng=None):
     
     '''Creates an ordered dictionary of rate schedules. This rate schedule
     will allow the source object to simulate a Markov Modulated Poisson 
@@ -186,6 +309,8 @@ def MMPP_rate_schedule(Q:'array(N,N)',
         The probability distribution vector for the starting states. If None is
         given then the stationary distribution of the embedded chain of the
         Generator Matrix will be used.
+    rng: numpy.random.Generator or None
+        The stream to sample from. None uses the global numpy.random stream.
         
     Returns:
     --------
@@ -206,6 +331,8 @@ def MMPP_rate_schedule(Q:'array(N,N)',
     '''
     
     assert end_time > start_time
+    if rng is None:
+        rng = GLOBAL_RNG
     
     # SOURCE:
     # https://en.wikipedia.org/wiki/Markov_chain#Embedded_Markov_chain
@@ -268,15 +395,15 @@ def MMPP_rate_schedule(Q:'array(N,N)',
     T = end_time
     
     states = np.arange(N,dtype=int)
-    current_state = np.random.choice(states,p=pi)
+    current_state = rng.choice(states,p=pi)
     
     
     while True:
         
         rate = Rates[current_state]
-        next_state = np.random.choice(states,p=P[current_state])
+        next_state = rng.choice(states,p=P[current_state])
         transition_rate = Q[current_state,next_state]
-        duration = np.random.exponential(scale=1./transition_rate)
+        duration = rng.exponential(scale=1./transition_rate)
         
         t += duration
         
@@ -434,7 +561,7 @@ def reset_source_count(count=0):
     '''
     assert isinstance(count,int)
     assert count >= 0
-    globals()['source_count'] = 0
+    globals()['source_count'] = count
 #    global source_count
 #    source_count = 0
     return None
@@ -442,6 +569,44 @@ def reset_source_count(count=0):
 
 #-------------------------------------------------------------------------------
 
+class _SimulatedArrivalTimes(object):
+    
+    '''Iterates over arrival times simulated from the rate_schedule of a
+    __basik__.source.Source. The arrival times are simulated in chunks of
+    chunk_duration such that only a limited amount of them exist at once.
+    '''
+    
+    def __init__(self,source,end_time,start_time=0,chunk_duration=np.inf):
+        
+        assert chunk_duration > 0
+        self.source = source
+        self.end_time = end_time
+        self.t = start_time
+        self.chunk_duration = chunk_duration
+        self.chunk = iter([])
+        
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        
+        while True:
+            try:
+                return next(self.chunk)
+            except StopIteration:
+                if self.t >= self.end_time:
+                    raise
+            chunk_end = min(self.t + self.chunk_duration,self.end_time)
+            times = sample_arrival_times(self.source.rate_schedule,
+                                         end_time=chunk_end,
+                                         start_time=self.t,
+                                         min_rate=self.source.min_rate,
+                                         rng=self.source.rng)
+            self.chunk = iter(times.tolist())
+            self.t = chunk_end
+
+#-------------------------------------------------------------------------------
+
 
 class Source(object):
     '''Introduces new vehicles into the simulation.
@@ -449,6 +614,10 @@ class Source(object):
     
     Attributes:
     -----------
+    rng: numpy.random.Generator or __basik__.random_streams.GlobalStream
+        The stream from which arrival times are simulated.
+    vehicle_rng: numpy.random.Generator or __basik__.random_streams.GlobalStream
+        The stream handed to every vehicle the source produces.
     ID: int
         Every source is assigned an integer starting at 0 (Natural Number).
         Vehicles produced by thus source will contain the ID as well. This way
@@ -464,6 +633,33 @@ class Source(object):
     current_time: float
         This attribute only exists if the setup_arrivals is called. It is the
         last time that a source produced an arrival.
+    n_arrivals: int
+        This attribute only exists if the setup_arrivals is called. The amount
+        of arrivals produced thus far.
+    lazy: bool
+        This attribute only exists if the setup_arrivals is called. Whether
+        arrivals are produced one at a time (see setup_arrivals).
+    spillback: bool
+        This attribute only exists if the setup_arrivals is called. Whether
+        arrivals that cannot enter the target_node are held as time-stamps
+        (see setup_arrivals).
+    held_arrivals: collections.deque
+        Only used if spillback is True. The time-stamps of the arrivals that
+        have occurred but wait for the vehicle in front of them to enter. Its
+        length is the current spillback length.
+    max_spillback: int
+        The largest spillback length seen thus far.
+    held_time: float
+        The total time that arrivals spent in held_arrivals.
+    n_entered: int
+        The amount of vehicles of a spillback source that entered thus far.
+    total_entry_delay: float
+        The total time between the arrival of these vehicles and their entry.
+    max_entry_delay: float
+        The largest such delay.
+    trajectory_store: __basik__.trajectory_store.TrajectoryStore or None
+        If set, then the vehicles of the source record their movement to it.
+        See __basik__.simulation_session.Session.record_trajectories
     figure: matplotlib.figure.Figure or bool 
         Only exists if the view_rate method is called. If an existing axes
         is provided in the arguments of view_rate then no new figure will
@@ -480,13 +676,19 @@ class Source(object):
     
     size = 1
     
+    # A lazy source simulates the arrival times of this many seconds at once.
+    chunk_duration = 600
+    
+    trajectory_store = None
+    
     #---------------------------------------------------------------------------
     
     def __init__(self,vehicle_velocity:float,
                       target_node:'Node',
                       rate_schedule:'dict -> {end_time:rate(args)}',
                       vehicle_color='random',
-                      record_movement=False):
+                      record_movement=False,
+                      min_rate=5e-2):
         
         '''
         Parameters:
@@ -510,11 +712,15 @@ class Source(object):
         vehicle_color: str
             This is the color setting of the vehicle. Note that if the color has
             been set to 'random' then the randomly selected color can be accessed
-            via Vehicle.vehicle_display.color
+            via Vehicle.display_color
         record_movement: bool
             A vehicle can be produced by the source with the setting/instructions
             that it record its movement across the simulation. A recorded vehicle
             can then be probed for this information from the vehicles list.
+        min_rate: float or None
+            The rate intensity used wherever a Rate in the rate_schedule is 
+            zero or negative. If set to None (or zero) then no arrivals are
+            produced while the rate intensity is not positive.
                 
         Raises:
         -------
@@ -579,15 +785,19 @@ class Source(object):
         self.vehicle_color = vehicle_color
         
         self.record_movement = record_movement
+        self.min_rate = min_rate
+        
+        # See __basik__.random_streams
+        self.rng = GLOBAL_RNG
+        self.vehicle_rng = GLOBAL_RNG
         
     
     #---------------------------------------------------------------------------
         
     def _choose_rate_from_schedule(self,t):
-        times = t - self.schedule_end_times
-        times = np.array(times,dtype=object)
-        times[times<0] = np.inf
-        idx = np.argmin(times)
+        # A Rate applies up to its end time. The last one applies thereafter.
+        idx = np.searchsorted(self.schedule_end_times,t,side='left')
+        idx = min(idx,len(self.schedule_end_times)-1)
         schedule_time = self.schedule_end_times[idx]
         return self.rate_schedule[schedule_time]
         
@@ -601,63 +811,22 @@ class Source(object):
     
     
     # OPTION 1: we simulate unique arrivals
-    def _simulate_arrivals(self,end_time,start_time=0):
+    def _simulate_arrival_times(self,end_time,start_time=0,
+                                     chunk_duration=np.inf):
         
         '''
         This is done for a schedule of rates.
         '''
         
-        T = end_time
-        t = start_time
-        
-        self.arrival_times = []
-        t = 0
-        
-        while True:
-            
-            
-            rate = self._get_rate(t)
-            if rate <= 0:
-                rate = 5e-2  # some hard-coded minimum
-            t += np.random.exponential(scale=1/rate)
-            if t > T:
-                break
-            self.arrival_times.append(t)
-            
-            # Create a temp node that leads to the target node
-            temp_node = Node(front=self.target_node)
-            # We can store the arrival here
-            # MAIN REASON for temp node:
-            # If the target node is not available at the time of arrival 
-            # (a very unlikely event) then the arrival can be delayed by 
-            # remaining in its temp node for some time.            
-        
-            vehicle = Vehicle(velocity=self.vehicle_velocity,
-                              global_time=t,
-                              current_node=temp_node,
-                              source_ID=self.ID,
-                              color=self.vehicle_color,
-                              record_movement=self.record_movement)
-                              
-            temp_node.occupied = True
-            temp_node.vehicle = vehicle
-
-            # Schedule an arrival  
-            
-            vehicle.schedule_move()
-            # schedule_move() puts the vehicles into the Queue
-#            Queue.push(vehicle)
-            
-
-        return None
+        return _SimulatedArrivalTimes(self,end_time,start_time,chunk_duration)
     
     
     #---------------------------------------------------------------------------
     
     # OPTION 2: We read arrivals from a csv file.
-    def _read_arrivals(self,file_name,
-                            end_time=np.inf,# convert/read all
-                            start_time=0):
+    def _read_arrival_times(self,file_name,
+                                 end_time=np.inf,# convert/read all
+                                 start_time=0):
         
         DataFrame = read_csv(file_name)
         column_name = list(DataFrame.columns)
@@ -667,47 +836,19 @@ class Source(object):
                       'intervals.'
             raise ValueError(message)
         
-        time_stamps = DataFrame['time-stamps'].values.ravel()
+        time_stamps = np.array(DataFrame['time-stamps'].values.ravel(),
+                               dtype=np.float64)
         time_stamps.sort()  # just in case.
         
-        original_start_time = time_stamps[0]
-        # original_start_time + delta = start_time
-        delta = start_time - original_start_time
-        
-        time_stamps += delta # Corrected
-        
-        self.arrival_times = []
-        
-        for t in time_stamps:
-            
-            if t > end_time:
-                break
-            
-            self.arrival_times.append(t)
-            
-            temp_node = Node(front=self.target_node) 
-    
-            vehicle = Vehicle(velocity=self.vehicle_velocity,
-                              global_time=t,
-                              current_node=temp_node,
-                              source_ID=self.ID,
-                              color=self.vehicle_color,
-                              record_movement=self.record_movement)
-                              
-            temp_node.occupied = True
-            temp_node.vehicle = vehicle
-            # Schedule an arrival  
-            vehicle.schedule_move()
-            
-        return None
+        return self._shift_time_stamps(time_stamps,end_time,start_time)
             
 
     #---------------------------------------------------------------------------
     
     # OPTION 3: We unpickle a Record object.
-    def _unpickle_arrivals(self,file_name,
-                                end_time=np.inf,
-                                start_time=0):
+    def _unpickle_arrival_times(self,file_name,
+                                     end_time=np.inf,
+                                     start_time=0):
         
         with open(file_name,'rb') as file:
             record = pickle.load(file)
@@ -716,72 +857,315 @@ class Source(object):
             message = 'The pickled object is not a single Record object.'
             raise Exception(message)
             
-        self._convert_record_object_to_arrivals(record,start_time=start_time)
-        
-        return None
+        return self._convert_record_object_to_arrival_times(record,
+                                                            end_time=end_time,
+                                                            start_time=start_time)
     
     #---------------------------------------------------------------------------
     
-    def _convert_record_object_to_arrivals(self,record,
-                                                end_time=np.inf, # convert/read all
-                                                start_time=0):
+    def _convert_record_object_to_arrival_times(self,record,
+                                                     end_time=np.inf, # convert/read all
+                                                     start_time=0):
         
+        if getattr(record,'store',None) is not None:
+            # A streaming record is read back from its store in chunks.
+            record.flush()
+            return record.store.iter_time_stamps(start_time,end_time)
 
-        if not bool(record.time_stamps):
-            # If the record has no time-stamps first see if the record has not
-            # been processed yet.
+        if not getattr(record,'keep_time_stamps',True):
+            raise ValueError('{0} was made with keep_time_stamps=False. '.format(
+                                                                      record)+\
+                             'It has no time-stamps and cannot be used as '+\
+                             'an arrival trace.')
+        
+        time_stamps = record.get_time_stamps()  # a copy that can be sorted
+        
+        if not len(time_stamps):
             # If the record object has recorded nothing then it will raise
-            # an error itself/
+            # an error itself.
             record.process_records()
-            
-        if not bool(record.time_stamps):
             # still empty
             message = 'No records were placed. Hence, there are no arrivals '+\
                       'to be generated.'
             warnings.warn(message)
-            return None
+            return iter([])
             
-
-        time_stamps = np.array(record.time_stamps)
         time_stamps.sort()  # just in case.
         
+        return self._shift_time_stamps(time_stamps,end_time,start_time)
+    
+    #---------------------------------------------------------------------------
+    
+    def _shift_time_stamps(self,time_stamps,end_time,start_time):
+        
+        time_stamps = np.asarray(time_stamps,dtype=np.float64)
         original_start_time = time_stamps[0]
         # original_start_time + delta = start_time
         delta = start_time - original_start_time
         
         time_stamps += delta # Corrected
+        time_stamps = time_stamps[time_stamps <= end_time]
         
-        self.arrival_times = []
-
+        # A list iterator (unlike a generator) can be pickled along with a
+        # __basik__.simulation_session.Session
+        return iter(time_stamps.tolist())
+    
+    #---------------------------------------------------------------------------
+    
+    def _arrival_times(self,end_time,start_time=0,lazy=False):
+        
+        '''Returns an iterator over the arrival times of the rate_schedule.
+        '''
+        
+        chunk_duration = self.chunk_duration if lazy else np.inf
         
-        for t in time_stamps:
+        # A) a single item
+        if len(self.rate_schedule) == 1:
+            # It can be a single Rate object, a .csv file name or a
+            # .pkl (pickle) file name. 
+            item = list(self.rate_schedule.values())[0]
             
-            if t > end_time:
-                break
+            # 1) Rate Objects
+            if isinstance(item,Rate):
+                return self._simulate_arrival_times(end_time,start_time,
+                                                    chunk_duration)
             
-            self.arrival_times.append(t)
+            # 2) A file
+            elif isinstance(item,str):
+                
+                extension = item[-4:]
+                
+                # 2a) The directory of a __basik__.record_store.RecordStore
+                if os.path.isdir(item):
+                    return RecordStore(item).iter_time_stamps(start_time,
+                                                              end_time)
+                # 2b) A comma separated value file
+                elif extension == '.csv':
+                    return self._read_arrival_times(file_name=item,
+                                                    end_time=end_time,
+                                                    start_time=start_time)
+                # 2c) a single pickled object
+                elif extension == '.pkl':
+                    return self._unpickle_arrival_times(item,
+                                                        end_time=end_time,
+                                                        start_time=start_time)
+                else:
+                    message = 'rate_schedule should either contain '+\
+                              'a Rate object, or a string file name that has '+\
+                              'a .csv or .pkl extension.'
+                    raise ValueError(message)
+              
+            # 3) A RecordStore object
+            elif hasattr(item,'RECORD_STORE'):
+                return item.iter_time_stamps(start_time,end_time)
             
-            temp_node = Node(front=self.target_node) 
-    
-            vehicle = Vehicle(velocity=self.vehicle_velocity,
-                              global_time=t,
-                              current_node=temp_node,
-                              source_ID=self.ID,
-                              color=self.vehicle_color,
-                              record_movement=self.record_movement)
-                              
-            temp_node.occupied = True
-            temp_node.vehicle = vehicle
-            # Schedule an arrival  
-            vehicle.schedule_move()
+            # 4) A Record object
+            elif hasattr(item,'RECORD'): 
+                return self._convert_record_object_to_arrival_times(item,
+                                                                    end_time=end_time,
+                                                                    start_time=start_time)
             
-        return None
+            else:
+                message = 'rate_schedule object not understood. Please, '+\
+                          'provide either a rate object, record object, '+\
+                          'a .csv or .pkl file name.'
+                raise ValueError(message)
+        
+        # B) Several items and these should be Rate objects.           
+        else:
+            # it can only be a dictionary of rate objects.
+            return self._simulate_arrival_times(end_time,start_time,
+                                                chunk_duration)
+    
+    #---------------------------------------------------------------------------
+    
+    def _produce_arrival(self,t):
+        
+        # Create a temp node that leads to the target node
+        temp_node = Node(front=self.target_node)
+        # We can store the arrival here
+        # MAIN REASON for temp node:
+        # If the target node is not available at the time of arrival 
+        # (a very unlikely event) then the arrival can be delayed by 
+        # remaining in its temp node for some time.            
+    
+        vehicle = Vehicle(velocity=self.vehicle_velocity,
+                          global_time=t,
+                          current_node=temp_node,
+                          source_ID=self.ID,
+                          color=self.vehicle_color,
+                          record_movement=self.record_movement,
+                          rng=self.vehicle_rng,
+                          trajectory_store=self.trajectory_store)
+                          
+        temp_node.occupied = True
+        temp_node.vehicle = vehicle
+        
+        if self.spillback:
+            # The vehicle asks for the next arrival once it has entered.
+            vehicle.entry_source = self
+        elif self.lazy:
+            # The GlobalQueue will ask for the next arrival once this one
+            # occurs.
+            vehicle.source = self
+
+        # Schedule an arrival  
+        vehicle.schedule_move()
+        # schedule_move() puts the vehicles into the Queue
+        
+        self.n_arrivals += 1
+        self.current_time = t
+        
+        return vehicle
+    
+    #---------------------------------------------------------------------------
+    
+    def schedule_next_arrival(self):
+        
+        '''Produces the next arrival of a lazy source and places it into the
+        current global queue. 
+        
+        This is called by the __basik__.global_queue.GlobalQueue when the 
+        pending arrival of the source occurs. Hence, a lazy source only ever has
+        a single arrival waiting in the queue.
+        
+        Returns:
+        --------
+        bool
+            False if the source has no further arrivals to produce.
+        '''
+        
+        if self.pending_arrivals is None:
+            return False
+        
+        try:
+            t = next(self.pending_arrivals)
+        except StopIteration:
+            self.pending_arrivals = None
+            return False
+        
+        self._produce_arrival(t)
+        
+        return True
+    
+    #---------------------------------------------------------------------------
+    
+    def _peek_arrival_time(self):
+        # The next arrival time of a spillback source without consuming it.
+        if self.next_arrival_time is None and self.pending_arrivals is not None:
+            try:
+                self.next_arrival_time = next(self.pending_arrivals)
+            except StopIteration:
+                self.pending_arrivals = None
+        return self.next_arrival_time
+    
+    #---------------------------------------------------------------------------
+    
+    def admit_next_arrival(self,t):
+        
+        '''Produces the next vehicle of a spillback source. This is called by
+        the vehicle in front once it has entered the target_node at time t.
+        
+        Arrivals that occurred while it waited to enter are held in 
+        held_arrivals as time-stamps. Hence, no matter how long the target_node 
+        remains occupied, a spillback source only ever has a single vehicle
+        waiting to enter.
+        
+        Parameters:
+        -----------
+        t: float
+            The time at which the vehicle in front entered.
+        
+        Returns:
+        --------
+        bool
+            False if the source has no further arrivals to produce.
+        '''
+        
+        if self.entrance_time is not None:
+            delay = t - self.entrance_time
+            self.n_entered += 1
+            self.total_entry_delay += delay
+            self.max_entry_delay = max(self.max_entry_delay,delay)
+        
+        next_time = self._peek_arrival_time()
+        while next_time is not None and next_time <= t:
+            self.held_arrivals.append(next_time)
+            self.next_arrival_time = None
+            next_time = self._peek_arrival_time()
+        self.max_spillback = max(self.max_spillback,len(self.held_arrivals))
+        
+        if self.held_arrivals:
+            # It has been waiting and can move up to the target_node now.
+            self.entrance_time = self.held_arrivals.popleft()
+            self.held_time += t - self.entrance_time
+            self._produce_arrival(t)
+            return True
+        
+        if next_time is None:
+            self.entrance_time = None
+            return False
+        
+        self.entrance_time = next_time
+        self.next_arrival_time = None
+        self._produce_arrival(next_time)
+        
+        return True
+    
+    #---------------------------------------------------------------------------
+    
+    def spillback_statistics(self,end_time=None)->dict:
+        
+        '''Summarises the arrivals of a spillback source that had to wait before
+        they could enter the target_node.
+        
+        Parameters:
+        -----------
+        end_time: float or None
+            The time up to which the spillback length is averaged. None uses
+            the time at which the last arrival was produced.
+        
+        Raises:
+        -------
+        ValueError:
+            If setup_arrivals was not called with spillback set to True.
+        
+        Returns:
+        --------
+        dict
+            'entered': the amount of vehicles that entered.
+            'mean entry delay': the average time from arrival to entry.
+            'max entry delay': the largest time from arrival to entry.
+            'spillback': the current spillback length.
+            'max spillback': the largest spillback length.
+            'mean spillback': the time average of the spillback length.
+        '''
+        
+        if not getattr(self,'spillback',False):
+            raise ValueError('setup_arrivals was not called with spillback=True')
+        
+        if end_time is None:
+            end_time = self.current_time if self.current_time is not None else 0
+        held_time = self.held_time + sum(max(end_time-arrival,0) 
+                                         for arrival in self.held_arrivals)
+        duration = end_time - self.start_time
+        
+        mean_spillback = held_time/duration if duration > 0 else 0.0
+        
+        return {'entered':self.n_entered,
+                'mean entry delay':float(self.total_entry_delay/max(self.n_entered,1)),
+                'max entry delay':float(self.max_entry_delay),
+                'spillback':len(self.held_arrivals),
+                'max spillback':self.max_spillback,
+                'mean spillback':float(mean_spillback)}
     
     #---------------------------------------------------------------------------
     
     
     def setup_arrivals(self,end_time,
-                            start_time=0):
+                            start_time=0,
+                            lazy=False,
+                            spillback=False):
         
         '''Produces vehicle arrivals.
         
@@ -792,7 +1176,8 @@ class Source(object):
                __basik__.record.Record object.
         
         In all three cases, vehicles will be produced and placed into the 
-        current global queue.
+        current global queue. This is either done all at once or, if lazy is
+        True, one arrival at a time.
         
         Parameters:
         -----------
@@ -806,6 +1191,20 @@ class Source(object):
             to allow the source to produce arrivals throughout the simulation.
         start_time: float
             The time at which the source will start to produce arrivals.
+        lazy: bool
+            If True then only the first arrival is placed into the global queue.
+            Each following arrival is produced once the one before it occurs.
+            The memory used then depends on the amount of vehicles in the
+            simulation rather than on the length of the simulation. In this
+            case arrival_times is set to None.
+        spillback: bool
+            If True then only a single vehicle of the source waits to enter the
+            target_node at a time. Arrivals that occur while it waits are held
+            as time-stamps in held_arrivals (a first-in-first-out queue outside 
+            of the global queue) and enter one at a time. This keeps a full 
+            lane from producing a storm of rescheduled arrivals and allows a 
+            lane to be full without overflow_protection stopping the 
+            simulation. See spillback_statistics.
             
         Raises:
         -------
@@ -814,6 +1213,8 @@ class Source(object):
         ValueError
             If the rate_schedule does not contain either a csv or pkl filepath
             or valid __basik__.rate.Rate objects.
+            A __basik__.record.Record made with keep_time_stamps=False can
+            not be used either.
             
         Returns:
         --------
@@ -824,59 +1225,40 @@ class Source(object):
         
         assert end_time > start_time
         
-        # A) a single item
-        if len(self.rate_schedule) == 1:
-            # It can be a single Rate object, a .csv file name or a
-            # .pkl (pickle) file name. 
-            item = list(self.rate_schedule.values())[0]
-            
-            # 1) Rate Objects
-            if isinstance(item,Rate):
-                self._simulate_arrivals(end_time,start_time)
-            
-            # 2) A file
-            elif isinstance(item,str):
-                
-                extension = item[-4:]
-                
-                # 2a) A comma separated value file
-                if extension == '.csv':
-                    self._read_arrivals(file_name=item,
-                                        end_time=end_time,
-                                        start_time=start_time)
-                # 2b) a single pickled object
-                elif extension == '.pkl':
-                    self._unpickle_arrivals(item,
-                                            end_time=end_time,
-                                            start_time=start_time)
-                else:
-                    message = 'rate_schedule should either contain '+\
-                              'a Rate object, or a string file name that has '+\
-                              'a .csv or .pkl extension.'
-                    raise ValueError(message)
-              
-            # 3) A Record object
-            elif hasattr(item,'RECORD'): 
-                self._convert_record_object_to_arrivals(item,
-                                                        end_time=end_time,
-                                                        start_time=start_time)
-            
+        arrival_times = self._arrival_times(end_time,start_time,lazy)
+        
+        self.lazy = lazy
+        self.spillback = spillback
+        self.start_time = start_time
+        self.n_arrivals = 0
+        self.current_time = None
+        
+        if spillback:
+            self.held_arrivals = deque()
+            self.max_spillback = 0
+            self.held_time = 0.0
+            self.n_entered = 0
+            self.total_entry_delay = 0.0
+            self.max_entry_delay = 0.0
+            self.next_arrival_time = None
+            self.entrance_time = None
+            if lazy:
+                self.arrival_times = None
+                self.pending_arrivals = arrival_times
             else:
-                message = 'rate_schedule object not understood. Please, '+\
-                          'provide either a rate object, record object, '+\
-                          'a .csv or .pkl file name.'
-                raise ValueError(message)
-        
-        # B) Several items and these should be Rate objects.           
-        else:
-            # it can only be a dictionary of rate objects.
-            self._simulate_arrivals(end_time,start_time)
-            
-        
-        if bool(self.arrival_times):
-            self.current_time = self.arrival_times[-1]
+                self.arrival_times = list(arrival_times)
+                self.pending_arrivals = iter(self.arrival_times)
+            self.admit_next_arrival(start_time)
+        elif lazy:
+            self.arrival_times = None
+            self.pending_arrivals = arrival_times
+            self.schedule_next_arrival()
         else:
-            self.current_time = None
+            self.arrival_times = []
+            self.pending_arrivals = None
+            for t in arrival_times:
+                self.arrival_times.append(t)
+                self._produce_arrival(t)
         
         return None
         
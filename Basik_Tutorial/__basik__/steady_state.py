@@ -0,0 +1,439 @@
+'''
+Warm-up truncation and steady-state confidence intervals.
+
+A simulation that starts from an empty network first passes through a
+transient. Observations made during it bias estimates of the steady state.
+The end of the transient is detected with MSER-5 (the Marginal Standard
+Error Rule applied to means of batches of 5 observations): the truncation
+point d minimises the variance of the mean of the remaining observations,
+
+    MSER(d) = sum_{i>=d} (x_i - mean_d)**2 / (n - d)**2
+
+over the first half of the series. A confidence interval for the
+steady-state mean is then found from the means of a fixed number of
+batches of the truncated series (batch means).
+
+The analysis can be run on a finished series (see steady_state_estimate and
+Record.steady_state) or online while a simulation runs (see
+SteadyStateMonitor and Session.monitor_steady_state).
+'''
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+#------------------------------------------------------------------------------
+
+def t_quantile(p:float,df:int)->float:
+
+    '''The p-quantile of the Student t distribution with df degrees of
+    freedom. It is exact for df 1 and 2 and uses the Cornish-Fisher expansion
+    otherwise (within 0.05 of the exact value for p <= 0.995 and within
+    0.001 for df >= 5). This avoids a dependency on scipy.
+
+    Raises:
+    -------
+    ValueError:
+        If p is not in (0,1) or df < 1
+    '''
+
+    if not 0 < p < 1:
+        raise ValueError('p must be in (0,1)')
+    if df < 1:
+        raise ValueError('df must be at least 1')
+
+    if df == 1:
+        return math.tan(math.pi*(p - 0.5))
+    if df == 2:
+        return (2*p - 1)*math.sqrt(2/(4*p*(1 - p)))
+
+    z = NormalDist().inv_cdf(p)
+    g1 = (z**3 + z)/4
+    g2 = (5*z**5 + 16*z**3 + 3*z)/96
+    g3 = (3*z**7 + 19*z**5 + 17*z**3 - 15*z)/384
+    g4 = (79*z**9 + 776*z**7 + 1482*z**5 - 1920*z**3 - 945*z)/92160
+
+    return z + g1/df + g2/df**2 + g3/df**3 + g4/df**4
+
+#------------------------------------------------------------------------------
+
+def mser(series,batch_size:int=5)->dict:
+
+    '''Detects the end of the initial transient of a series with MSER.
+
+    Parameters:
+    -----------
+    series: array-like of float
+        Observations in the order they were made e.g. the throughput of a
+        record in consecutive intervals.
+    batch_size: int
+        The observations are replaced by the means of batches of this size
+        first (5 gives MSER-5). Incomplete trailing batches are ignored.
+
+    Returns:
+    --------
+    dict
+        truncation: int
+            The amount of observations to discard from the start.
+        statistic: float
+            The MSER statistic at the truncation point.
+        reliable: bool
+            False if the minimum lies at the end of the searched half of the
+            series. The transient is then likely to not have ended yet and
+            the series should be longer.
+        n_batches: int
+    '''
+
+    if batch_size < 1:
+        raise ValueError('batch_size must be positive')
+
+    series = np.asarray(series,dtype=np.float64)
+    n_batches = len(series)//batch_size
+    if n_batches < 2:
+        return {'truncation':0,'statistic':np.nan,'reliable':False,
+                'n_batches':n_batches}
+
+    batches = series[:n_batches*batch_size].reshape(n_batches,batch_size)
+    batches = batches.mean(axis=1)
+
+    # Sums over every tail batches[d:] from reversed cumulative sums.
+    tail_sum = np.cumsum(batches[::-1])[::-1]
+    tail_sum_squares = np.cumsum((batches**2)[::-1])[::-1]
+    tail_length = np.arange(n_batches,0,-1)
+    squared_deviations = tail_sum_squares - tail_sum**2/tail_length
+    statistics = np.maximum(squared_deviations,0)/tail_length**2
+
+    searched = statistics[:n_batches//2 + 1]
+    d = int(np.argmin(searched))
+
+    return {'truncation':d*batch_size,
+            'statistic':float(searched[d]),
+            'reliable':d < len(searched) - 1,
+            'n_batches':n_batches}
+
+#------------------------------------------------------------------------------
+
+def batch_means(series,n_batches:int=20,confidence:float=0.95)->dict:
+
+    '''A confidence interval for the mean of a (steady-state) series.
+
+    The series is split into n_batches batches of equal size. Their means
+    are close to independent and normal once batches are long compared to
+    the correlation of the series.
+
+    Parameters:
+    -----------
+    series: array-like of float
+    n_batches: int
+        At least 2. Trailing observations that do not fill a batch are
+        ignored.
+    confidence: float
+        In (0,1).
+
+    Returns:
+    --------
+    dict
+        mean, half_width, lower, upper, relative_half_width (half_width over
+        the absolute mean), n_batches and batch_size. The half width is
+        numpy.nan if there are fewer observations than batches.
+    '''
+
+    if n_batches < 2:
+        raise ValueError('n_batches must be at least 2')
+    if not 0 < confidence < 1:
+        raise ValueError('confidence must be in (0,1)')
+
+    series = np.asarray(series,dtype=np.float64)
+    batch_size = len(series)//n_batches
+    mean = float(series.mean()) if len(series) else np.nan
+    if batch_size == 0:
+        return {'mean':mean,'half_width':np.nan,'lower':np.nan,
+                'upper':np.nan,'relative_half_width':np.nan,
+                'n_batches':n_batches,'batch_size':0}
+
+    batches = series[:n_batches*batch_size].reshape(n_batches,batch_size)
+    batches = batches.mean(axis=1)
+    mean = float(batches.mean())
+    standard_error = float(batches.std(ddof=1))/math.sqrt(n_batches)
+    half_width = t_quantile(0.5 + confidence/2,n_batches - 1)*standard_error
+    if mean != 0:
+        relative_half_width = half_width/abs(mean)
+    else:
+        relative_half_width = np.inf if half_width > 0 else 0.0
+
+    return {'mean':mean,
+            'half_width':half_width,
+            'lower':mean - half_width,
+            'upper':mean + half_width,
+            'relative_half_width':relative_half_width,
+            'n_batches':n_batches,
+            'batch_size':batch_size}
+
+#------------------------------------------------------------------------------
+
+def steady_state_estimate(series,batch_size:int=5,
+                                 n_batches:int=20,
+                                 confidence:float=0.95,
+                                 times=None)->dict:
+
+    '''Truncates the warm-up of a series (see mser) and finds a batch means
+    confidence interval (see batch_means) of the remaining observations.
+
+    Parameters:
+    -----------
+    series: array-like of float
+    batch_size: int
+        Of MSER.
+    n_batches: int
+        Of batch means.
+    confidence: float
+    times: array-like of float or None
+        The time of every observation. If given, then truncation_time is
+        the time of the first observation that is kept.
+
+    Returns:
+    --------
+    dict
+        The result of batch_means along with truncation (the amount of
+        observations discarded), truncation_time, reliable (see mser) and
+        n_observations (the amount kept).
+    '''
+
+    series = np.asarray(series,dtype=np.float64)
+    truncation = mser(series,batch_size)
+    d = truncation['truncation']
+    estimate = batch_means(series[d:],n_batches,confidence)
+    estimate['truncation'] = d
+    estimate['truncation_time'] = np.nan
+    if times is not None and d < len(times):
+        estimate['truncation_time'] = float(times[d])
+    estimate['reliable'] = truncation['reliable']
+    estimate['n_observations'] = len(series) - d
+
+    return estimate
+
+#------------------------------------------------------------------------------
+
+class SteadyStateMonitor(object):
+
+    '''An event that observes records and lanes at a fixed interval while a
+    simulation runs. Every observation of a record is its throughput
+    (vehicles per second) over the last interval. Every observation of a lane
+    is the amount of vehicles on it.
+
+    Once a precision is set, the steady-state estimate of every series is
+    updated every check_every observations. The simulation is stopped once
+    all of them are reliable and their relative half width is at most the
+    precision.
+
+    Attributes:
+    -----------
+    interval: float
+    records: dict
+        Name -> __basik__.record.Record
+    lanes: dict
+        Name -> __basik__.RoadObject.lane.Lane
+    times: list
+        The time of every observation.
+    series: dict
+        Name -> list of observations.
+    precision: float or None
+        The relative half width that stops the simulation.
+    stopped: bool
+        Whether the monitor stopped the simulation.
+    '''
+
+    EVENT_KIND = 'monitor'
+
+    #--------------------------------------------------------------------------
+
+    def __init__(self,interval:float=60,
+                      records:'dict or None'=None,
+                      lanes:'dict or None'=None,
+                      batch_size:int=5,
+                      n_batches:int=20,
+                      confidence:float=0.95,
+                      precision:'float or None'=None,
+                      check_every:int=10):
+
+        '''
+        Parameters:
+        -----------
+        interval: float
+            The simulated time between observations.
+        records: dict or None
+            The __basik__.record.Record objects to observe by name.
+        lanes: dict or None
+            The __basik__.RoadObject.lane.Lane objects to observe by name.
+        batch_size: int
+            See mser.
+        n_batches: int
+            See batch_means.
+        confidence: float
+            See batch_means.
+        precision: float or None
+            See the attribute.
+        check_every: int
+            The amount of observations between checks of the precision.
+
+        Raises:
+        -------
+        ValueError:
+            If interval is not positive or nothing is observed.
+        '''
+
+        if not interval > 0:
+            raise ValueError('interval must be positive')
+        self.interval = interval
+        self.records = dict(records or {})
+        self.lanes = dict(lanes or {})
+        if not self.records and not self.lanes:
+            raise ValueError('A monitor requires records or lanes to observe.')
+        self.batch_size = batch_size
+        self.n_batches = n_batches
+        self.confidence = confidence
+        self.precision = precision
+        self.check_every = check_every
+        self.time = np.inf
+        self.clear()
+
+    #--------------------------------------------------------------------------
+
+    def clear(self):
+        '''Removes all observations.'''
+        self.times = []
+        self.series = {name:[] for name in list(self.records) + list(self.lanes)}
+        self._counts = {name:record.n_records
+                        for name,record in self.records.items()}
+        self.stopped = False
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def start(self,queue,start_time:float=0):
+
+        '''Clears the observations and schedules the first one an interval
+        after start_time.
+
+        Parameters:
+        -----------
+        queue: __basik__.global_queue.GlobalQueue
+
+        Returns:
+        --------
+        None
+        '''
+
+        queue.cancel(self)
+        self.clear()
+        self.time = start_time + self.interval
+        queue.push(self)
+
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def observe(self):
+
+        '''Takes an observation of every series at self.time'''
+
+        self.times.append(self.time)
+        for name,record in self.records.items():
+            n_records = record.n_records
+            self.series[name].append((n_records - self._counts[name])/
+                                      self.interval)
+            self._counts[name] = n_records
+        for name,lane in self.lanes.items():
+            self.series[name].append(lane.n_occupied)
+
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def estimate(self,name:str)->dict:
+
+        '''The steady-state estimate of a series. See steady_state_estimate.
+        Its truncation_time is the end of the warm-up.
+        '''
+
+        times = self.times
+        if name in self.records:
+            # The throughput observed at t is that of (t - interval,t]
+            times = [t - self.interval for t in times]
+
+        return steady_state_estimate(self.series[name],self.batch_size,
+                                     self.n_batches,self.confidence,times)
+
+    #--------------------------------------------------------------------------
+
+    def report(self)->dict:
+
+        '''
+        Returns:
+        --------
+        dict
+            The estimate of every series by name (see estimate) with an
+            additional converged entry.
+        '''
+
+        report = dict()
+        for name in self.series:
+            estimate = self.estimate(name)
+            estimate['converged'] = self._converged(estimate)
+            report[name] = estimate
+
+        return report
+
+    #--------------------------------------------------------------------------
+
+    def _converged(self,estimate):
+        if self.precision is None:
+            return False
+        return (estimate['reliable'] and
+                estimate['relative_half_width'] <= self.precision)
+
+    #--------------------------------------------------------------------------
+
+    def converged(self)->bool:
+        '''Whether every series has reached the precision.'''
+        return all(self._converged(self.estimate(name))
+                   for name in self.series)
+
+    #--------------------------------------------------------------------------
+
+    def fire(self,queue):
+
+        '''Takes an observation and schedules the next one. See
+        GlobalQueue.run_single_event
+        '''
+
+        queue.t = self.time
+        self.observe()
+
+        if (self.precision is not None and
+            len(self.times) % self.check_every == 0 and
+            self.converged()):
+            self.stopped = True
+            return False
+
+        # Only keep observing while there is something to observe. Otherwise
+        # a run until the queue is empty would never end.
+        if queue.Q:
+            self.time += self.interval
+            queue.push(self)
+
+        # Like a vehicle, the monitor ends a run once it passes its end time.
+        return queue.t <= queue.end_time
+
+    #--------------------------------------------------------------------------
+
+    def __lt__(self,other):
+        return self.time < other.time
+
+    #--------------------------------------------------------------------------
+
+    def __repr__(self):
+        return 'SteadyStateMonitor ({0} observations)'.format(len(self.times))
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,386 @@
+'''
+Parameter sweeps over the settings of a scenario.
+
+A sweep runs a scenario factory at every point of a design, e.g. every
+combination of Intersection p_risk and Rate constants, and gathers the
+record summaries of all replications into a single tidy table: one row per
+point, replication and record.
+
+>>> def scenario(p_risk,rate):
+...     # build and return an (unscheduled) __basik__ Session
+...     ...
+>>> design = grid_design({'p_risk':[0.1,0.3,0.5],'rate':[0.1,0.2]})
+>>> rows = sweep(scenario,design,end_time=3600,replications=5,seed=1,
+...              workers=8,cache_directory='sweep_cache',
+...              table_file='sweep.csv')
+
+The factory must be picklable (e.g. a module level function) when workers
+are used. Points run in a process pool. The seeds of a point only depend on
+the sweep seed and the parameter values of the point. Every finished point
+is written to the cache directory, so an interrupted sweep resumes where it
+stopped when it is called again with the same arguments.
+'''
+
+import os
+import csv
+import json
+import hashlib
+import itertools
+import functools
+from concurrent.futures import ProcessPoolExecutor,as_completed
+
+import numpy as np
+
+from .random_streams import as_seed_sequence,stream_seed
+from . import simulation_session
+
+#------------------------------------------------------------------------------
+
+# The entries of a record summary that form the columns of a sweep table.
+SUMMARY_COLUMNS = ('count','rate','mean_interval','std_interval')
+
+#------------------------------------------------------------------------------
+
+def grid_design(parameters:dict)->list:
+
+    '''Every combination of parameter values (a full factorial design).
+
+    Parameters:
+    -----------
+    parameters: dict
+        The values (list) of every parameter by name. A value that is not a
+        list or tuple is used as a single value.
+
+    Returns:
+    --------
+    list
+        A dict of parameter values for every point. The last parameter
+        varies fastest.
+    '''
+
+    names = list(parameters)
+    values = [value if isinstance(value,(list,tuple)) else [value]
+              for value in parameters.values()]
+
+    return [dict(zip(names,point)) for point in itertools.product(*values)]
+
+#------------------------------------------------------------------------------
+
+def random_design(parameters:dict,n:int,seed=None)->list:
+
+    '''Points drawn at random.
+
+    Parameters:
+    -----------
+    parameters: dict
+        For every parameter by name either:
+            1) a (low,high) tuple: a uniform draw from [low,high]. Integers
+               are drawn if both are int.
+            2) a list: a uniform choice from its values.
+            3) any other value: used at every point.
+    n: int
+        The number of points.
+    seed: int, numpy.random.SeedSequence or None
+
+    Raises:
+    -------
+    AssertionError:
+        If n is not a positive int.
+
+    Returns:
+    --------
+    list
+        A dict of parameter values for every point.
+    '''
+
+    assert isinstance(n,(int,np.integer)) and n > 0
+    rng = np.random.default_rng(as_seed_sequence(seed))
+
+    design = [dict() for _ in range(n)]
+    for name,value in parameters.items():
+        if isinstance(value,tuple):
+            low,high = value
+            if isinstance(low,(int,np.integer)) and isinstance(high,(int,np.integer)):
+                draws = rng.integers(low,high,size=n,endpoint=True).tolist()
+            else:
+                draws = rng.uniform(low,high,size=n).tolist()
+        elif isinstance(value,list):
+            draws = [value[idx] for idx in rng.integers(0,len(value),size=n)]
+        else:
+            draws = [value]*n
+        for point,draw in zip(design,draws):
+            point[name] = draw
+
+    return design
+
+#------------------------------------------------------------------------------
+
+def point_key(point:dict)->str:
+    '''A stable text form of the parameter values of a point.'''
+    return json.dumps(point,sort_keys=True,default=repr)
+
+#------------------------------------------------------------------------------
+
+def _code_digest(code,digest):
+
+    # Adds the byte code and constants of code (and of the functions defined
+    # in it) to digest. The repr of a nested code object holds its address,
+    # so those are visited instead.
+
+    digest.update(code.co_code)
+    for constant in code.co_consts:
+        if hasattr(constant,'co_code'):
+            _code_digest(constant,digest)
+        else:
+            digest.update(repr(constant).encode('utf-8'))
+
+    return None
+
+#------------------------------------------------------------------------------
+
+def factory_fingerprint(factory)->str:
+
+    '''A stable text form of a scenario factory. It changes whenever the code
+    of the factory is edited, not only when it is renamed.
+
+    Parameters:
+    -----------
+    factory: callable
+        A function, a functools.partial of one (its arguments are included)
+        or any other callable.
+
+    Returns:
+    --------
+    str
+        The module and qualified name of the factory along with a hash of
+        its byte code and constants. Callables without code (e.g. builtins)
+        only give their name.
+    '''
+
+    arguments = ''
+    while isinstance(factory,functools.partial):
+        arguments += json.dumps([factory.args,factory.keywords],
+                                sort_keys=True,default=repr)
+        factory = factory.func
+    name = '{0}.{1}'.format(getattr(factory,'__module__',None),
+                            getattr(factory,'__qualname__',
+                                    type(factory).__qualname__))
+    code = getattr(factory,'__code__',None)
+    if code is None:
+        code = getattr(getattr(factory,'__call__',None),'__code__',None)
+    if code is None:
+        return name + arguments
+    digest = hashlib.sha256()
+    _code_digest(code,digest)
+
+    return '{0}:{1}{2}'.format(name,digest.hexdigest(),arguments)
+
+#------------------------------------------------------------------------------
+
+def _rows(point,results):
+
+    # The tidy rows of the replications of a point.
+
+    rows = []
+    for result in results:
+        for record,summary in result['records'].items():
+            row = dict(point)
+            row['replication'] = result['replication']
+            row['record'] = record
+            for column in SUMMARY_COLUMNS:
+                row[column] = float(summary[column])
+            rows.append(row)
+
+    return rows
+
+#------------------------------------------------------------------------------
+
+def _run_point(task):
+
+    '''Runs the replications of a single point of a sweep. It is module
+    level such that it can be sent to a worker process.
+    '''
+
+    index,point,factory,end_time,seed_sequences,run_kwargs = task
+    payload = ('factory',functools.partial(factory,**point))
+    tasks = [(replication,seed_sequence,end_time,run_kwargs)
+             for replication,seed_sequence in enumerate(seed_sequences)]
+    results = simulation_session._run_in_this_process(payload,tasks)
+
+    return index,_rows(point,results)
+
+#------------------------------------------------------------------------------
+
+def _write_json(file_name,content):
+    # Written in full before it replaces file_name.
+    temporary_file = file_name + '.tmp'
+    with open(temporary_file,'w') as file:
+        json.dump(content,file)
+    os.replace(temporary_file,file_name)
+    return None
+
+#------------------------------------------------------------------------------
+
+def sweep(factory,
+          design:list,
+          end_time:float,
+          replications:int=1,
+          seed:'int, numpy.random.SeedSequence or None'=None,
+          workers:'int or None'=1,
+          cache_directory:'str or None'=None,
+          table_file:'str or None'=None,
+          common_random_numbers:bool=False,
+          version:'str or None'=None,
+          verbal:bool=False,
+          **run_kwargs)->list:
+
+    '''Runs a scenario at every point of a design.
+
+    Parameters:
+    -----------
+    factory: callable
+        factory(**point) builds a new __basik__.simulation_session.Session
+        for the parameter values of a point. Sources and cycles are scheduled
+        by Session.run (see replicate). It must be picklable if workers > 1.
+    design: list
+        A dict of parameter values for every point. See grid_design and
+        random_design.
+    end_time: float
+        The time at which every replication ends.
+    replications: int
+        The number of replications of every point.
+    seed: int, numpy.random.SeedSequence or None
+        The sweep seed. The seeds of a point are derived from it and the
+        parameter values of the point (see point_key) such that they do not
+        depend on the order of the design.
+    workers: int or None
+        The number of processes. Points are distributed between them. 1 runs
+        every point in this process. None uses os.cpu_count()
+    cache_directory: str or None
+        If given, then every finished point is written to a file in this
+        directory. Points that are found there already are not run again.
+        A cached point is only used by a sweep with the same factory (see
+        factory_fingerprint), end_time, replications, seed, version and
+        run_kwargs.
+    table_file: str or None
+        If given, then the table is written to this csv file as well.
+    common_random_numbers: bool
+        If True, then replication i of every point uses the same seed.
+        Points then differ only by their parameters (as far as the streams
+        of their components agree), which sharpens comparisons between them.
+    version: str or None
+        Part of the key of cached points. Change it to discard the cache
+        whenever something the factory depends on changes that is not part
+        of its own code, e.g. a helper function or module it calls.
+    verbal: bool
+        Prints the progress of the sweep.
+    run_kwargs:
+        Passed on to __basik__.simulation_session.Session.run e.g. a cache
+        (see __basik__.result_cache.ResultCache) that serves replications
+        run by other sweeps such as one with fewer replications.
+
+    Raises:
+    -------
+    ValueError:
+        If cache_directory is given without a seed (fresh entropy would
+        never match the cache) or a parameter is named like a column of the
+        table ('replication', 'record' or one of SUMMARY_COLUMNS).
+    AssertionError:
+        If replications or workers is not a positive int.
+
+    Returns:
+    --------
+    list
+        The tidy table. A dict for every point, replication and record that
+        contains the parameter values, 'replication', 'record' and the
+        SUMMARY_COLUMNS of the record (see Session.record_summary). The rows
+        are in the order of the design. pandas.DataFrame(rows) gives a data
+        frame.
+    '''
+
+    assert isinstance(replications,(int,np.integer)) and replications > 0
+    if workers is None:
+        workers = os.cpu_count() or 1
+    assert isinstance(workers,(int,np.integer)) and workers > 0
+    if cache_directory is not None and seed is None:
+        raise ValueError('A cached sweep requires a seed.')
+    reserved = {'replication','record'}.union(SUMMARY_COLUMNS)
+    for point in design:
+        clashes = reserved.intersection(point)
+        if clashes:
+            raise ValueError('Parameters may not be named {0}'.format(
+                                                             sorted(clashes)))
+
+    seed = as_seed_sequence(seed)
+    settings = json.dumps({'factory':factory_fingerprint(factory),
+                           'version':version,
+                           'end_time':end_time,
+                           'replications':int(replications),
+                           'entropy':seed.entropy,
+                           'spawn_key':list(seed.spawn_key),
+                           'common_random_numbers':common_random_numbers,
+                           'run_kwargs':run_kwargs},
+                          sort_keys=True,default=repr)
+
+    def cache_file(point):
+        key = hashlib.sha256((settings + point_key(point)).encode('utf-8'))
+        return os.path.join(cache_directory,key.hexdigest() + '.json')
+
+    rows = [None]*len(design)
+    tasks = []
+    if cache_directory is not None:
+        os.makedirs(cache_directory,exist_ok=True)
+    for index,point in enumerate(design):
+        if cache_directory is not None and os.path.exists(cache_file(point)):
+            with open(cache_file(point),'r') as file:
+                rows[index] = json.load(file)['rows']
+            continue
+        if common_random_numbers:
+            point_seed = seed
+        else:
+            point_seed = stream_seed(seed,point_key(point))
+        seed_sequences = simulation_session.spawn_seeds(
+                                    np.random.SeedSequence(
+                                            entropy=point_seed.entropy,
+                                            spawn_key=point_seed.spawn_key),
+                                    replications)
+        tasks.append((index,point,factory,end_time,seed_sequences,run_kwargs))
+
+    if verbal:
+        print('Sweep: {0} points of which {1} were cached.'.format(
+                                                len(design),
+                                                len(design) - len(tasks)))
+
+    def finish(index,point_rows):
+        rows[index] = point_rows
+        if cache_directory is not None:
+            _write_json(cache_file(design[index]),
+                        {'point':design[index],'rows':point_rows})
+        if verbal:
+            print('Finished point {0}: {1}'.format(index,
+                                                   point_key(design[index])))
+        return None
+
+    if workers == 1 or len(tasks) < 2:
+        for task in tasks:
+            finish(*_run_point(task))
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=min(workers,len(tasks))) as executor:
+            futures = [executor.submit(_run_point,task) for task in tasks]
+            for future in as_completed(futures):
+                finish(*future.result())
+
+    table = [row for point_rows in rows for row in point_rows]
+
+    if table_file is not None and table:
+        columns = list(table[0])
+        for row in table:
+            columns.extend(name for name in row if name not in columns)
+        with open(table_file,'w',newline='') as file:
+            writer = csv.DictWriter(file,fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(table)
+
+    return table
+
+#------------------------------------------------------------------------------
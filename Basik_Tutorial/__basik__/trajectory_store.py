@@ -0,0 +1,267 @@
+'''
+A columnar table of vehicle movements.
+
+A vehicle produced with record_movement=True keeps its movement in a dict
+of five lists (see Vehicle.place_movement_record). A TrajectoryStore keeps the
+movements of all vehicles of a session in a single table instead. Rows are
+appended to typed column buffers which are packed into chunks of a structured
+numpy array once they reach chunk_size. The move type is stored as a small
+integer code. Only every k-th vehicle can be recorded (sample_every) as well.
+
+>>> session.record_trajectories(sample_every=10)
+>>> session.run(...)
+>>> table = session.trajectories.to_array()
+>>> session.trajectories.vehicle_view(vehicle_id)  # like movement_record
+'''
+
+from array import array
+
+import numpy as np
+
+from .lazy_imports import get_pandas
+
+#------------------------------------------------------------------------------
+
+# The move types that vehicles perform. Codes of other move types are added
+# in the order they are first seen.
+MOVE_TYPES = ['standard','wait','source arrival','dispose',
+              'enter buffer','move within buffer','exit buffer',
+              'full enter circle','partial enter circle','move within circle',
+              'exit circle','wait at circle entrance',
+              'full cross intersection','partial cross intersection',
+              'wait at intersection',
+              'full cross stop street','partial cross stop street',
+              'wait at stop street entrance',
+              'full cross traffic light','partial cross traffic light',
+              'wait at traffic light entrance',
+              'full enter on-ramp','partial enter on-ramp','pass on-ramp',
+              'on-ramp standard','wait at on-ramp entrance',
+              'off-ramp exit','off-ramp proceed forward','off-ramp standard',
+              'enter pedestrian crossing','move withing pedestrian crossing',
+              'exit pedestrian crossing']
+
+ROW_TYPE = np.dtype([('vehicle',np.int64),
+                     ('time',np.float64),
+                     ('nodes',np.int32),
+                     ('distance',np.float64),
+                     ('velocity',np.float64),
+                     ('move_type',np.int16)])
+
+# The array.array type code of every field of ROW_TYPE.
+TYPE_CODES = {'vehicle':'q','time':'d','nodes':'i','distance':'d',
+              'velocity':'d','move_type':'h'}
+
+#------------------------------------------------------------------------------
+
+class TrajectoryStore(object):
+
+    '''The movements of the (sampled) vehicles of a session.
+
+    Attributes:
+    -----------
+    sample_every: int
+        Only every k-th vehicle that is registered is recorded.
+    chunk_size: int
+        The amount of rows in a chunk.
+    chunks: list
+        Full chunks (numpy structured arrays of ROW_TYPE).
+    columns: dict
+        A typed array.array for every field of ROW_TYPE that holds the rows 
+        that are not part of a chunk yet.
+    move_types: list
+        The move type of every code.
+    n_registered: int
+        The amount of vehicles registered (recorded or not).
+    '''
+
+    #--------------------------------------------------------------------------
+
+    def __init__(self,sample_every:int=1,chunk_size:int=65536):
+
+        '''
+        Parameters:
+        -----------
+        sample_every: int
+            Record every k-th vehicle only.
+        chunk_size: int
+            The amount of rows in a chunk.
+
+        Raises:
+        -------
+        ValueError:
+            If sample_every or chunk_size is not a positive int.
+        '''
+
+        for name,value in [('sample_every',sample_every),
+                           ('chunk_size',chunk_size)]:
+            if not isinstance(value,(int,np.integer)) or value < 1:
+                raise ValueError('{0} must be a positive int'.format(name))
+
+        self.sample_every = sample_every
+        self.chunk_size = chunk_size
+        self.move_types = list(MOVE_TYPES)
+        self._codes = {move_type:code for code,move_type in
+                       enumerate(self.move_types)}
+        self.n_registered = 0
+        self.clear()
+
+    #--------------------------------------------------------------------------
+
+    def register(self)->'int or None':
+
+        '''Called once for every new vehicle.
+
+        Returns:
+        --------
+        int or None
+            The ID of the vehicle in the table. None if it is not sampled.
+        '''
+
+        vehicle_id = self.n_registered
+        self.n_registered += 1
+        if vehicle_id % self.sample_every:
+            return None
+
+        return vehicle_id
+
+    #--------------------------------------------------------------------------
+
+    def code(self,move_type:str)->int:
+        try:
+            return self._codes[move_type]
+        except KeyError:
+            self._codes[move_type] = len(self.move_types)
+            self.move_types.append(move_type)
+            return self._codes[move_type]
+
+    #--------------------------------------------------------------------------
+
+    def append(self,vehicle_id:int,time:float,nodes:int,distance:float,
+                    velocity:float,move_type:str):
+
+        '''Adds a row for a move of a vehicle.
+
+        Returns:
+        --------
+        None
+        '''
+
+        columns = self.columns
+        columns['vehicle'].append(vehicle_id)
+        columns['time'].append(time)
+        columns['nodes'].append(nodes)
+        columns['distance'].append(distance)
+        columns['velocity'].append(velocity)
+        columns['move_type'].append(self.code(move_type))
+        if len(columns['vehicle']) == self.chunk_size:
+            self.chunks.append(self._pack())
+
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def _pack(self)->np.ndarray:
+        # The rows of the column buffers as a structured array. The buffers 
+        # are emptied.
+        chunk = np.empty(len(self.columns['vehicle']),dtype=ROW_TYPE)
+        for name,values in self.columns.items():
+            chunk[name] = values
+        self.columns = {name:array(typecode) for name,typecode in 
+                        TYPE_CODES.items()}
+        return chunk
+
+    #--------------------------------------------------------------------------
+
+    def clear(self):
+        '''Removes all rows. Vehicle IDs continue from where they were.'''
+        self.chunks = []
+        self.columns = {name:array(typecode) for name,typecode in 
+                        TYPE_CODES.items()}
+        return None
+
+    #--------------------------------------------------------------------------
+
+    def to_array(self)->np.ndarray:
+
+        '''Returns:
+        --------
+        numpy.ndarray
+            All rows as a single structured array of ROW_TYPE in the order
+            they were recorded.
+        '''
+
+        if len(self.columns['vehicle']):
+            self.chunks.append(self._pack())
+        if not self.chunks:
+            return np.empty(0,dtype=ROW_TYPE)
+        if len(self.chunks) > 1:
+            self.chunks = [np.concatenate(self.chunks)]
+
+        return self.chunks[0]
+
+    #--------------------------------------------------------------------------
+
+    def to_dataframe(self):
+
+        '''Returns:
+        --------
+        pandas.DataFrame
+            All rows with the move type codes replaced by their move type.
+        '''
+
+        pd = get_pandas()
+        table = self.to_array()
+        data = {name:table[name] for name in ROW_TYPE.names}
+        data['move_type'] = np.array(self.move_types,
+                                     dtype=object)[table['move_type']]
+
+        return pd.DataFrame(data)
+
+    #--------------------------------------------------------------------------
+
+    def vehicle_ids(self)->np.ndarray:
+        return np.unique(self.to_array()['vehicle'])
+
+    #--------------------------------------------------------------------------
+
+    def vehicle_view(self,vehicle_id:int)->dict:
+
+        '''The rows of a single vehicle in the form of
+        Vehicle.movement_record
+
+        Parameters:
+        -----------
+        vehicle_id: int
+            See Vehicle.trajectory_id
+
+        Returns:
+        --------
+        dict
+            >>> {'time':list,
+            ...  'distance':list,
+            ...  'nodes':list,
+            ...  'move type':list,
+            ...  'velocity':list}
+        '''
+
+        table = self.to_array()
+        rows = table[table['vehicle'] == vehicle_id]
+
+        return {'time':rows['time'].tolist(),
+                'distance':rows['distance'].tolist(),
+                'nodes':rows['nodes'].tolist(),
+                'move type':[self.move_types[code] for code in rows['move_type']],
+                'velocity':rows['velocity'].tolist()}
+
+    #--------------------------------------------------------------------------
+
+    def __len__(self):
+        return (sum(len(chunk) for chunk in self.chunks) + 
+                len(self.columns['vehicle']))
+
+    #--------------------------------------------------------------------------
+
+    def __repr__(self):
+        return 'TrajectoryStore ({0} rows)'.format(len(self))
+
+#------------------------------------------------------------------------------
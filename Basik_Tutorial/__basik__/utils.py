@@ -1,12 +1,12 @@
 
 
+import os
 import numpy as np
+from .lazy_imports import plt,read_csv,IMAGE_DIRECTORY
 import math as m
-import matplotlib.pyplot as plt
-from matplotlib import gridspec
 import warnings
 from collections import OrderedDict
-from pandas import read_csv
+from bisect import bisect_right
 
 try:
     import cPickle as pickle
@@ -164,6 +164,7 @@ def axes_grid(n_row:int,n_col:int,scale=1):
     width = (n_col+1)*scale
     figure = plt.figure(figsize=(width,height)) 
     
+    from matplotlib import gridspec
     grid = gridspec.GridSpec(n_row, n_col,
                              wspace=0.0,
                              hspace=0.0, 
@@ -187,7 +188,7 @@ def axes_grid(n_row:int,n_col:int,scale=1):
 
 
 def fill_axes_grid(AxesSubplotArray:np.ndarray,
-                   image_path_name:str='__basik__/Images/crop1.jpg'):
+                   image_path_name:str=os.path.join(IMAGE_DIRECTORY,'crop1.jpg')):
     
     '''This function takes a numpy array that contains
     matplotlib.axes._subplots.AxesSubplot as its array elements and fills any
@@ -363,26 +364,95 @@ def cycle_list(list_:list)->'list entry':
     
 _last_idx = 0
 
-def shuffle_list(list_:list,repeats_allowed=False):
+def shuffle_list(list_:list,repeats_allowed=False,rng=None):
     
     assert isinstance(list_,list)
     
     global _last_idx
     
+    if rng is None:
+        rng = np.random
+    
     N = len(list_)
     
     if repeats_allowed:
-        idx = np.random.choice(range(N))
+        idx = rng.choice(range(N))
     else:
-        idx = np.random.choice(range(N))
+        idx = rng.choice(range(N))
         while idx == _last_idx:
-            idx = np.random.choice(range(N))
+            idx = rng.choice(range(N))
     
     _last_idx = idx
             
     return list_[idx]
     
 #------------------------------------------------------------------------------
+
+class CycleSequence(object):
+
+    '''Iterates over the cycles of a traffic light one at a time. It is used
+    by the lazy setup_cycles of a TrafficLight or FlaredTrafficLight.
+
+    The cycles follow the same rule as those of the eager setup_cycles: the
+    first cycle of the cycle_schedule followed by cycle_list (fixed_cycle) or
+    shuffle_list (not fixed_cycle). The sequence works on its own copy of the
+    cycle_schedule and remembers its own last index. Several traffic lights
+    can therefore draw their cycles in any interleaved order. Shuffled cycles
+    are only in the same order as the eager ones if nothing else draws from
+    the rng of the traffic light in the meantime.
+
+    Attributes:
+    -----------
+    traffic_light:
+        TrafficLight or FlaredTrafficLight
+    cycle_class:
+        TrafficLightCycle or FlaredTrafficLightCycle
+    t: float
+        The start time of the next cycle.
+    '''
+
+    def __init__(self,traffic_light,cycle_class,end_time,
+                      start_time=0,fixed_cycle=True):
+
+        self.traffic_light = traffic_light
+        self.cycle_class = cycle_class
+        self.cycle_schedule = list(traffic_light.cycle_schedule)
+        self.end_time = end_time
+        self.t = start_time
+        self.fixed_cycle = fixed_cycle
+        self.last_idx = 0
+        self.started = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+
+        if self.t >= self.end_time and self.started:
+            raise StopIteration
+
+        if not self.started:
+            cycle_specs = self.cycle_schedule[0]
+            self.started = True
+        elif self.fixed_cycle:
+            cycle_specs = cycle_list(self.cycle_schedule)
+        else:
+            # See shuffle_list
+            rng = self.traffic_light.rng
+            N = len(self.cycle_schedule)
+            idx = rng.choice(range(N))
+            while idx == self.last_idx:
+                idx = rng.choice(range(N))
+            self.last_idx = idx
+            cycle_specs = self.cycle_schedule[idx]
+
+        cycle = self.cycle_class(self.t,cycle_specs,
+                                 traffic_light=self.traffic_light)
+        self.t = cycle.end_time
+
+        return cycle
+
+#------------------------------------------------------------------------------
     
 
 def normalize(array):
@@ -546,6 +616,94 @@ def check_tpm(tpm):
         raise ValueError('tpm must be a nested dict, list of lists or a '+
                          ' numpy array.')
 
+#------------------------------------------------------------------------------
+
+def cumulative_probabilities(p)->'list or None':
+    
+    '''The normalised cumulative probabilities of p as numpy.random.choice
+    computes them. None is returned if p is not a probability distribution 
+    e.g. the all-zero row of an entrance that is locked.
+    '''
+    
+    p = np.asarray(p,dtype=np.float64)
+    if p.size == 0 or np.any(p < 0) or abs(p.sum() - 1) > np.sqrt(np.finfo(np.float64).eps):
+        return None
+    cdf = p.cumsum()
+    cdf /= cdf[-1]
+    
+    return cdf.tolist()
+
+#------------------------------------------------------------------------------
+
+def choose_index(cdf:list,rng)->int:
+    
+    '''Samples an index from a row of cumulative probabilities using a 
+    single uniform draw of rng. This is what numpy.random.choice(a=idxs,p=p)
+    does (for idxs = [0,1,...]) without having to check and sum p every time.
+    Hence, the same index is drawn for the same state of rng.
+    
+    Parameters:
+    -----------
+    cdf: list or None
+        See cumulative_probabilities and TransitionMatrix.
+    rng: numpy.random.Generator or __basik__.random_streams.GlobalStream
+    
+    Raises:
+    -------
+    ValueError:
+        If cdf is None i.e. the probabilities were not valid.
+    
+    Returns:
+    --------
+    int
+    '''
+    
+    if cdf is None:
+        raise ValueError('probabilities are negative or do not sum to 1')
+    
+    return bisect_right(cdf,rng.random())
+
+#------------------------------------------------------------------------------
+
+class TransitionMatrix(object):
+    
+    '''A tpm attribute of a component (e.g. a traffic light) that prepares
+    its cumulative probabilities whenever it is set. They can be found under
+    the same name with a _cdf suffix (e.g. tpm_cdf): a list with one list per
+    row or a single list if the tpm is one dimensional.
+    
+    Note: set the whole tpm again after altering its entries.
+    
+    Example:
+    --------
+    >>> class TrafficLight(object):
+    ...     tpm = TransitionMatrix()
+    >>> light.tpm = tpm   # light.tpm_cdf is now ready
+    >>> exit_idx = choose_index(light.tpm_cdf[entrance_idx],light.rng)
+    '''
+    
+    def __set_name__(self,owner,name):
+        self.name = name
+        self.cdf_name = name + '_cdf'
+        
+    def __get__(self,instance,owner):
+        if instance is None:
+            return self
+        return instance.__dict__.get(self.name)
+    
+    def __set__(self,instance,tpm):
+        instance.__dict__[self.name] = tpm
+        if tpm is None:
+            cdf = None
+        elif np.ndim(tpm) == 1:
+            cdf = cumulative_probabilities(tpm)
+        else:
+            cdf = [cumulative_probabilities(row) for row in tpm]
+        instance.__dict__[self.cdf_name] = cdf
+        
+    def __repr__(self):
+        return 'TransitionMatrix ({0})'.format(self.name)
+
 
 
 #------------------------------------------------------------------------------
@@ -0,0 +1,38 @@
+'''
+Shared set up of the __basik__ tests. Run them from the repository root with
+
+>>> python -m pytest Basik_Tutorial/tests
+'''
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import __basik__.core as bk
+from __basik__ import global_queue
+from __basik__ import utils
+
+#------------------------------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def isolated_queue():
+
+    # Every test starts with its own Queue, a fresh source count and vehicle
+    # IDs and a fixed global numpy.random state. The Queue that was in use
+    # is put back afterwards.
+
+    previous_Queue = global_queue.Queue
+    previous_state = np.random.get_state()
+    bk.reset_source_count(0)
+    utils._last_idx = 0
+    np.random.seed(0)
+    yield
+    if previous_Queue is not None:
+        bk.GlobalQueue.reload(previous_Queue)
+    np.random.set_state(previous_state)
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,55 @@
+'''
+Small scenarios shared by the tests.
+'''
+
+import __basik__.core as bk
+from __basik__.FlowFunctions import non_flared
+
+#------------------------------------------------------------------------------
+
+def traffic_light_session(seed=1,rate=0.2,length=40,name='intersection.pkl',
+                          Queue=None):
+
+    '''A four-way traffic light fed by a source on every approach with a
+    record at the end of every exit lane. Sources and cycles are not
+    scheduled (see Session.run). Queue defaults to a new IndexedQueue.
+    '''
+
+    bk.reset_source_count(0)
+    if Queue is None:
+        Queue = bk.IndexedQueue()
+    session = bk.Session(name,Queue=Queue,seed=seed)
+    objects = dict()
+    in_nodes = dict()
+    out_nodes = dict()
+    for direction in 'NESW':
+        lane_in = bk.Lane(length)
+        lane_out = bk.Lane(length)
+        objects[direction + ' in'] = lane_in
+        objects[direction + ' out'] = lane_out
+        objects[direction + ' source'] = bk.Source(
+                                        vehicle_velocity=16.67,
+                                        target_node=lane_in.IN,
+                                        rate_schedule={1e9:bk.Rate(rate)})
+        objects[direction + ' record'] = bk.Record(lane_out.OUT)
+        in_nodes[direction] = lane_in.OUT
+        out_nodes[direction] = lane_out.IN
+    cycle_schedule = [non_flared.N_S_flow(20,0.8,0.8),
+                      non_flared.N_S_overwash(3),
+                      non_flared.W_E_flow(20,0.8,0.8),
+                      non_flared.W_E_overwash(3)]
+    objects['traffic light'] = bk.TrafficLight(in_nodes=in_nodes,
+                                               out_nodes=out_nodes,
+                                               cycle_schedule=cycle_schedule)
+    session.add(objects)
+
+    return session
+
+#------------------------------------------------------------------------------
+
+def recordings(session):
+    # The time-stamps and source IDs of every record of a session.
+    return {name:(record.time_stamps,record.source_IDs)
+            for name,record in session.record_objects.items()}
+
+#------------------------------------------------------------------------------
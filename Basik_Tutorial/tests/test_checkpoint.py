@@ -0,0 +1,80 @@
+'''
+A run that is checkpointed, restored and resumed must record exactly what
+an uninterrupted run records.
+'''
+
+import numpy as np
+
+import __basik__.core as bk
+from __basik__ import utils
+from scenarios import traffic_light_session,recordings
+
+END_TIME = 1500
+
+#------------------------------------------------------------------------------
+
+def fresh_session():
+    # The same scenario in the same global state every time.
+    np.random.seed(0)
+    utils._last_idx = 0
+    return traffic_light_session(seed=4,rate=0.3)
+
+#------------------------------------------------------------------------------
+
+def uninterrupted():
+    session = fresh_session()
+    session.run(END_TIME,display_vehicles=False)
+    return recordings(session),session.sim_queue.t
+
+#------------------------------------------------------------------------------
+
+def test_checkpoints_do_not_change_a_run(tmp_path):
+    expected,t = uninterrupted()
+    session = fresh_session()
+    session.run(END_TIME,display_vehicles=False,checkpoint_every=250,
+                checkpoint_file=str(tmp_path/'run.ckpt'))
+
+    assert recordings(session) == expected
+    assert session.sim_queue.t == t
+
+#------------------------------------------------------------------------------
+
+def test_restore_and_resume_equals_an_uninterrupted_run(tmp_path):
+    expected,t = uninterrupted()
+    file_name = str(tmp_path/'run.ckpt')
+
+    # Interrupted part of the way: only the checkpoint file survives.
+    session = fresh_session()
+    session.run(END_TIME,display_vehicles=False,checkpoint_every=400,
+                checkpoint_file=file_name)
+    del session
+    np.random.seed(12345)  # the restore must not depend on the global state
+    bk.reset_source_count(99)
+
+    restored = bk.Session.restore(file_name)
+    assert 0 < restored.sim_queue.t < END_TIME
+    assert restored.end_time == END_TIME
+    restored.resume()
+
+    assert recordings(restored) == expected
+    assert restored.sim_queue.t == t
+
+#------------------------------------------------------------------------------
+
+def test_a_snapshot_continues_like_the_session():
+    expected,t = uninterrupted()
+    session = fresh_session()
+    session.schedule_sources(END_TIME,0)
+    session.schedule_cycles(END_TIME,0)
+    session.run(END_TIME/2,display_vehicles=False,schedule_sources=False,
+                schedule_cycles=False)
+    snapshot = session.snapshot()
+
+    copy = bk.Session.from_snapshot(snapshot,activate=True)
+    copy.resume(END_TIME)
+    assert recordings(copy) == expected
+
+    # The snapshot is frozen: a second copy gives the same.
+    again = bk.Session.from_snapshot(snapshot,activate=True)
+    again.resume(END_TIME)
+    assert recordings(again) == expected
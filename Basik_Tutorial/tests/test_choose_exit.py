@@ -0,0 +1,87 @@
+'''
+Exits are chosen from cumulative tables (see utils.choose_index). They must
+be the exits numpy.random.choice would have chosen and the exit a traffic
+light reports must be the one its vehicles take.
+'''
+
+import numpy as np
+import pytest
+
+from __basik__.utils import choose_index,cumulative_probabilities
+from __basik__.random_streams import GLOBAL_RNG
+from scenarios import traffic_light_session
+
+ROWS = [[0,0.1,0.8,0.1],
+        [0.3,0,0.4,0.3],
+        [0,0,1,0],
+        [0.25,0.25,0.25,0.25],
+        [0.5,0.5]]
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('row',ROWS)
+def test_choose_index_draws_what_numpy_choice_draws(row):
+    idxs = np.arange(len(row))
+    cdf = cumulative_probabilities(row)
+    rng = np.random.default_rng(11)
+    expected_rng = np.random.default_rng(11)
+
+    chosen = [choose_index(cdf,rng) for _ in range(2000)]
+    expected = [expected_rng.choice(a=idxs,p=row) for _ in range(2000)]
+
+    assert chosen == expected
+    assert all(row[idx] > 0 for idx in chosen)
+
+#------------------------------------------------------------------------------
+
+def test_choose_index_draws_what_numpy_choice_draws_from_the_global_state():
+    row = ROWS[0]
+    cdf = cumulative_probabilities(row)
+    np.random.seed(3)
+    chosen = [choose_index(cdf,GLOBAL_RNG) for _ in range(500)]
+    np.random.seed(3)
+    expected = [np.random.choice(a=4,p=row) for _ in range(500)]
+
+    assert chosen == expected
+
+#------------------------------------------------------------------------------
+
+def test_choose_index_refuses_a_row_that_is_not_a_distribution():
+    assert cumulative_probabilities([0,0,0,0]) is None
+    assert cumulative_probabilities([0.5,-0.5,1]) is None
+    with pytest.raises(ValueError):
+        choose_index(cumulative_probabilities([0,0,0,0]),GLOBAL_RNG)
+
+#------------------------------------------------------------------------------
+
+def test_traffic_light_exit_idx_is_the_exit_taken():
+    session = traffic_light_session(seed=2,rate=0.3)
+    light = session.simulation_objects['traffic light']
+    chosen_exits = dict()  # id(vehicle) -> the exit it was last given
+    recorded_exits = []
+
+    choose_exit = light.choose_exit
+    def recording_choose_exit(idx):
+        choose_exit(idx)
+        vehicle = light.entrances[idx].behind.vehicle
+        assert light.current_exit is light.exits[light.exit_idx]
+        assert light.entrances[idx].front is light.current_exit
+        chosen_exits[id(vehicle)] = light.keys[light.exit_idx]
+        return None
+    light.choose_exit = recording_choose_exit
+
+    # A vehicle that must wait at a yellow light chooses again. Hence, only
+    # its last choice must agree with the exit lane on which it is recorded.
+    for direction in light.keys:
+        record = session.record_objects[direction + ' record']
+        def recording_place_record(vehicle,record=record,direction=direction):
+            recorded_exits.append((chosen_exits.pop(id(vehicle)),direction))
+            return type(record).place_record(record,vehicle)
+        record.place_record = recording_place_record
+
+    session.run(1500,display_vehicles=False)
+
+    assert len(recorded_exits) > 100
+    assert all(chosen == taken for chosen,taken in recorded_exits)
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,142 @@
+'''
+Events are performed by the fire method of their class unless a handler is
+registered for their EVENT_KIND.
+'''
+
+import numpy as np
+import pytest
+
+from __basik__ import global_queue
+from __basik__.global_queue import (GlobalQueue,IndexedQueue,
+                                    register_event_kind,get_event_handler)
+from __basik__.TrafficLightObject.traffic_light_cycle import TrafficLightCycle
+from scenarios import traffic_light_session
+
+#------------------------------------------------------------------------------
+
+class Detector(object):
+
+    # A kind of event that the queue knows nothing about: it samples every
+    # interval seconds until end_time.
+
+    EVENT_KIND = 'detector'
+
+    def __init__(self,interval,end_time):
+        self.time = interval
+        self.interval = interval
+        self.end_time = end_time
+        self.samples = []
+
+    def fire(self,queue):
+        queue.t = self.time
+        self.samples.append(self.time)
+        self.time += self.interval
+        if self.time <= self.end_time:
+            queue.push(self)
+        return True
+
+    def __lt__(self,other):
+        return self.time < other.time
+
+#------------------------------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def restore_handlers():
+    # Handlers are global: every test leaves them as it found them.
+    handlers = dict(global_queue.event_handlers)
+    yield
+    global_queue.event_handlers.clear()
+    global_queue.event_handlers.update(handlers)
+    global_queue._handlers_by_type.clear()
+
+#------------------------------------------------------------------------------
+
+def drain(queue):
+    while queue.Q:
+        assert queue.run_single_event()
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('Queue',[GlobalQueue,IndexedQueue])
+def test_new_kinds_fire_without_registration(Queue):
+    queue = Queue()
+    detector = Detector(2.5,20)
+    queue.push(detector)
+    drain(queue)
+
+    assert detector.samples == [2.5*k for k in range(1,9)]
+    assert queue.t == 20
+    assert get_event_handler(Detector) == Detector.fire
+
+#------------------------------------------------------------------------------
+
+def test_a_registered_handler_replaces_fire_until_it_is_removed():
+    queue = IndexedQueue()
+    detector = Detector(1,3)
+    handled = []
+    def handler(event,queue):
+        handled.append(event.time)
+        return Detector.fire(event,queue)
+
+    queue.push(detector)
+    queue.run_single_event()  # resolves and caches Detector.fire
+    register_event_kind('detector',handler)
+    queue.run_single_event()
+    register_event_kind('detector',None)
+    queue.run_single_event()
+
+    assert handled == [2]
+    assert detector.samples == [1,2,3]
+
+#------------------------------------------------------------------------------
+
+def test_a_handler_can_stop_the_simulation():
+    queue = GlobalQueue()
+    detector = Detector(1,10)
+    register_event_kind('detector',lambda event,queue: event.time < 4 and
+                                                       event.fire(queue))
+    queue.push(detector)
+    queue.run()
+
+    # The event at 4 was extracted but not performed.
+    assert detector.samples == [1,2,3]
+    assert queue.Q == []
+
+#------------------------------------------------------------------------------
+
+def test_objects_without_the_protocol_are_refused():
+    queue = GlobalQueue()
+    event = type('NotAnEvent',(object,),{'time':1.0,
+                                         '__lt__':lambda self,other:False})()
+    queue.push(event)
+    with pytest.raises(TypeError):
+        queue.run_single_event()
+    with pytest.raises(AssertionError):
+        register_event_kind('detector','not callable')
+
+#------------------------------------------------------------------------------
+
+def test_the_built_in_kinds_dispatch_by_type():
+    # Counting the cycles of a traffic light through a handler of the 'cycle'
+    # kind must not change the run.
+    expected = []
+    for count in (False,True):
+        np.random.seed(0)
+        session = traffic_light_session(seed=8)
+        if count:
+            cycles = []
+            def handler(cycle,queue):
+                cycles.append(cycle.start_time)
+                return TrafficLightCycle.fire(cycle,queue)
+            register_event_kind('cycle',handler)
+        session.run(300,display_vehicles=False)
+        expected.append({name:record.time_stamps.tolist()
+                         for name,record in session.record_objects.items()})
+
+    assert expected[0] == expected[1]
+    assert cycles[0] == 0
+    assert len(cycles) > 10
+    assert np.all(np.diff(cycles) > 0)
+    assert global_queue._handlers_by_type[TrafficLightCycle] is handler
+
+#------------------------------------------------------------------------------
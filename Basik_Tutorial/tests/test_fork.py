@@ -0,0 +1,70 @@
+'''
+Copies of a populated session that are made from the same snapshot with the
+same seed must record exactly the same. Different seeds must not.
+'''
+
+import numpy as np
+
+import __basik__.core as bk
+from __basik__ import utils
+from scenarios import traffic_light_session,recordings
+
+WARM_UP = 400
+END_TIME = 1000
+
+#------------------------------------------------------------------------------
+
+def populated_session():
+    np.random.seed(0)
+    utils._last_idx = 0
+    session = traffic_light_session(seed=7,rate=0.3)
+    session.schedule_sources(END_TIME)
+    session.schedule_cycles(END_TIME)
+    session.run(WARM_UP,display_vehicles=False,schedule_sources=False,
+                schedule_cycles=False)
+    return session
+
+#------------------------------------------------------------------------------
+
+def resumed(copy,global_seed):
+    # The copy must not depend on the global numpy.random state.
+    np.random.seed(global_seed)
+    copy.resume(END_TIME,reset_records=True)
+    return recordings(copy),copy.sim_queue.t
+
+#------------------------------------------------------------------------------
+
+def test_copies_with_the_same_seed_are_identical():
+    session = populated_session()
+    snapshot = session.snapshot()
+
+    first = resumed(bk.Session.from_snapshot(snapshot,seed=11),global_seed=1)
+    second = resumed(bk.Session.from_snapshot(snapshot,seed=11),global_seed=2)
+    other = resumed(bk.Session.from_snapshot(snapshot,seed=12),global_seed=1)
+
+    assert first == second
+    assert first[0] != other[0]
+    assert all(len(time_stamps) > 20 for time_stamps,_ in first[0].values())
+    # The warm-up was discarded.
+    assert all(min(time_stamps) > WARM_UP
+               for time_stamps,_ in first[0].values())
+
+#------------------------------------------------------------------------------
+
+def test_forks_are_reproducible_and_leave_the_session_as_it_was():
+    session = populated_session()
+    # Copies, not views, of what the session recorded.
+    expected = ({name:(time_stamps.tolist(),source_IDs.tolist())
+                 for name,(time_stamps,source_IDs) in recordings(session).items()},
+                session.sim_queue.t)
+
+    forks = [resumed(copy,global_seed=idx)
+             for idx,copy in enumerate(session.fork(2,seed=5))]
+    again = [resumed(copy,global_seed=10 + idx)
+             for idx,copy in enumerate(session.fork(2,seed=5))]
+
+    assert forks == again
+    assert forks[0][0] != forks[1][0]
+    assert (recordings(session),session.sim_queue.t) == expected
+
+#------------------------------------------------------------------------------
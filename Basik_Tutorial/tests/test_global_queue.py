@@ -0,0 +1,143 @@
+'''
+IndexedQueue must extract events in the same order as GlobalQueue, also
+once events are rescheduled or cancelled.
+'''
+
+import numpy as np
+import pytest
+
+from __basik__.global_queue import GlobalQueue,IndexedQueue
+
+#------------------------------------------------------------------------------
+
+class Event(object):
+
+    # A minimal object that follows the event protocol.
+
+    EVENT_KIND = 'test'
+
+    def __init__(self,time,name):
+        self.time = time
+        self.name = name
+
+    def fire(self,queue):
+        queue.t = self.time
+        queue.fired.append(self.name)
+        return True
+
+    def __lt__(self,other):
+        return self.time < other.time
+
+#------------------------------------------------------------------------------
+
+def drain(queue):
+    queue.fired = []
+    while queue.Q:
+        queue.run_single_event()
+    return queue.fired
+
+#------------------------------------------------------------------------------
+
+def distinct_times(n,seed):
+    # Distinct times avoid ties, whose order GlobalQueue does not define.
+    rng = np.random.default_rng(seed)
+    return rng.permutation(n) + rng.uniform(0,0.5,size=n)
+
+#------------------------------------------------------------------------------
+
+def test_same_order_as_global_queue():
+    times = distinct_times(200,1)
+    orders = []
+    for Queue in (GlobalQueue,IndexedQueue):
+        queue = Queue()
+        for name,time in enumerate(times):
+            queue.push(Event(time,name))
+        orders.append(drain(queue))
+
+    assert orders[0] == orders[1] == list(np.argsort(times))
+
+#------------------------------------------------------------------------------
+
+def test_reschedule_and_cancel_agree_with_global_queue():
+    times = distinct_times(100,2)
+    new_times = distinct_times(100,3) + 0.25
+    orders = []
+    for Queue in (GlobalQueue,IndexedQueue):
+        queue = Queue()
+        events = [Event(time,name) for name,time in enumerate(times)]
+        for event in events:
+            queue.push(event)
+        moved = events[::3]
+        for event in moved:
+            event.time = new_times[event.name]
+        queue.reschedule(*moved)
+        for event in events[1::7]:
+            assert queue.cancel(event)
+        assert not queue.cancel(Event(0,'never pushed'))
+        orders.append(drain(queue))
+
+    assert orders[0] == orders[1]
+    assert len(orders[1]) == 100 - len(range(1,100,7))
+
+#------------------------------------------------------------------------------
+
+def test_indexed_queue_keeps_an_object_once():
+    queue = IndexedQueue()
+    event = Event(5,'a')
+    queue.push(event)
+    event.time = 1
+    queue.push(event)  # rescheduled rather than added again
+    queue.push(Event(3,'b'))
+
+    assert len(queue.Q) == 2
+    assert queue.is_scheduled(event)
+    assert drain(queue) == ['a','b']
+    assert not queue.is_scheduled(event)
+
+#------------------------------------------------------------------------------
+
+def test_indexed_queue_breaks_ties_in_scheduling_order():
+    queue = IndexedQueue()
+    for name in 'abcd':
+        queue.push(Event(1.0,name))
+
+    assert drain(queue) == list('abcd')
+
+#------------------------------------------------------------------------------
+
+def test_indexed_queue_refuses_a_time_altered_in_place():
+    queue = IndexedQueue()
+    early = Event(1,'early')
+    queue.push(early)
+    queue.push(Event(2,'late'))
+    early.time = 3  # altered without reschedule
+
+    with pytest.raises(ValueError,match='reschedule'):
+        queue.pop()
+    queue.reschedule(early)
+    assert drain(queue) == ['late','early']
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('time',[np.nan,np.inf,-np.inf])
+def test_indexed_queue_rejects_times_that_are_not_finite(time):
+    queue = IndexedQueue()
+    with pytest.raises(ValueError):
+        queue.push(Event(time,'never'))
+    assert not queue.Q
+
+    event = Event(1,'a')
+    queue.push(event)
+    event.time = time
+    with pytest.raises(ValueError):
+        queue.reschedule(event)
+    with pytest.raises(ValueError):
+        queue.pop()  # NaN != NaN used to repair the root forever
+    with pytest.raises(ValueError):
+        queue.heapify()
+
+#------------------------------------------------------------------------------
+
+def test_pop_from_empty_indexed_queue():
+    with pytest.raises(IndexError):
+        IndexedQueue().pop()
@@ -0,0 +1,118 @@
+'''
+The occupancy index of a Lane is kept up to date by its nodes. It must always
+agree with a scan of the nodes themselves.
+'''
+
+import numpy as np
+
+import __basik__.core as bk
+from scenarios import traffic_light_session
+
+#------------------------------------------------------------------------------
+
+def assert_index_agrees(lane):
+    occupied = [idx for idx,node in enumerate(lane.nodes) if node.occupied]
+    service = [idx for idx,node in enumerate(lane.nodes) if node.service_node]
+    n_vacant = sum(not (node.occupied or node.service_node) 
+                   for node in lane.nodes)
+
+    assert lane.occupied_positions == occupied
+    assert lane.service_positions == service
+    assert lane.n_vacant == n_vacant
+    assert lane.n_occupied == len(occupied)
+    assert lane.is_full == (n_vacant == 0)
+
+    for position in range(lane.length):
+        ahead = [idx for idx in occupied if idx > position]
+        assert lane.next_occupied(position) == (ahead[0] if ahead else None)
+        ahead = [idx for idx in service if idx > position]
+        assert lane.next_service(position) == (ahead[0] if ahead else None)
+
+    tail = None
+    idx = lane.length - 1
+    while idx >= 0 and lane.nodes[idx].occupied:
+        tail = idx
+        idx -= 1
+    assert lane.queue_tail == tail
+
+#------------------------------------------------------------------------------
+
+def test_index_follows_random_changes_of_the_nodes():
+    lane = bk.Lane(30)
+    rng = np.random.default_rng(1)
+    for _ in range(2000):
+        node = lane.nodes[rng.integers(lane.length)]
+        if rng.random() < 0.8:
+            node.occupied = rng.random() < 0.6
+        else:
+            node.service_node = not node.service_node
+        assert_index_agrees(lane)
+
+#------------------------------------------------------------------------------
+
+def test_setting_the_same_state_twice_leaves_the_index_alone():
+    lane = bk.Lane(10)
+    lane.nodes[4].occupied = True
+    lane.nodes[4].occupied = True
+    lane.nodes[6].service_node = True
+    lane.nodes[6].service_node = True
+
+    assert lane.occupied_positions == [4]
+    assert lane.service_positions == [6]
+    assert_index_agrees(lane)
+
+#------------------------------------------------------------------------------
+
+def test_full_lane_and_queue_tail():
+    lane = bk.Lane(8)
+    for node in lane.nodes[3:]:
+        node.occupied = True
+    assert lane.queue_tail == 3
+    assert not lane.is_full
+    lane.nodes[1].occupied = True
+    assert lane.queue_tail == 3
+    for node in lane.nodes:
+        node.occupied = True
+    assert lane.is_full and lane.queue_tail == 0
+    assert lane.distance_ahead(lane.nodes[0]) == bk.Node.distance
+
+#------------------------------------------------------------------------------
+
+def test_index_agrees_throughout_a_simulation():
+    session = traffic_light_session(seed=3,rate=0.4,length=25)
+    end_time = 900
+    session.schedule_sources(end_time,0)
+    session.schedule_cycles(end_time,0)
+    queue = session.sim_queue
+    queue.end_time = end_time
+    lanes = [lane for lane in session.simulation_objects.values()
+             if isinstance(lane,bk.Lane)]
+
+    n_events = 0
+    n_occupied = 0
+    while queue.run_single_event():
+        n_events += 1
+        if n_events % 25 == 0:
+            for lane in lanes:
+                assert_index_agrees(lane)
+                n_occupied += lane.n_occupied
+
+    assert n_events > 1000
+    assert n_occupied > 0  # the lanes were not empty throughout
+
+#------------------------------------------------------------------------------
+
+def test_is_empty_reads_the_nodes_lazily():
+    lane = bk.Lane(6)
+    status,occupancy = lane.is_empty
+    assert status is False
+    assert True not in occupancy and False in occupancy
+
+    lane.nodes[2].occupied = True
+    status,_ = lane.is_empty
+    assert status is True
+    # The same object follows the nodes.
+    assert True in occupancy and occupancy[2] and not occupancy[1]
+    assert list(occupancy) == lane.occupied_list() == \
+           [False,False,True,False,False,False]
+    assert len(occupancy) == 6
@@ -0,0 +1,115 @@
+'''
+A lazy source only ever has a single arrival waiting in the queue and must
+otherwise produce the same arrivals as a source that schedules them all at
+once. (What is recorded differs as vehicles draw from the stream when they 
+are produced.)
+'''
+
+import pickle
+
+import numpy as np
+import pytest
+
+import __basik__.core as bk
+from __basik__.random_streams import make_rng
+
+END_TIME = 400
+
+#------------------------------------------------------------------------------
+
+class PendingArrivals(bk.IndexedQueue):
+
+    # An IndexedQueue that keeps the largest amount of vehicles that were
+    # waiting in it to arrive.
+
+    def __init__(self):
+        super().__init__()
+        self.max_pending = 0
+
+    def pop(self):
+        pending = sum(getattr(event,'arrival',False) for event in self.Q)
+        self.max_pending = max(self.max_pending,pending)
+        return super().pop()
+
+#------------------------------------------------------------------------------
+
+def run(rate_schedule,lazy,n_sources=2):
+    # n_sources sources that feed a lane each. Returns the arrivals that
+    # every source produced, its record and the queue.
+    Queue = bk.GlobalQueue.new(PendingArrivals())
+    bk.reset_source_count(0)
+    arrivals = []
+    records = []
+    for _ in range(n_sources):
+        lane = bk.Lane(15)
+        source = bk.Source(vehicle_velocity=16.67,target_node=lane.IN,
+                           rate_schedule=rate_schedule)
+        source.rng = make_rng(1,'source')
+        produced = []
+        def logging_produce_arrival(t,produce_arrival=source._produce_arrival,
+                                      produced=produced):
+            produced.append(t)
+            return produce_arrival(t)
+        source._produce_arrival = logging_produce_arrival
+        arrivals.append(produced)
+        records.append(bk.Record(lane.OUT))
+        source.setup_arrivals(END_TIME,lazy=lazy)
+        if lazy:
+            assert source.arrival_times is None
+    Queue.run(END_TIME)
+    return arrivals,records,Queue
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.filterwarnings('ignore:Simulation ended')
+def test_lazy_trace_arrivals_equal_eager_ones(tmp_path):
+    pd = pytest.importorskip('pandas')
+    file_name = str(tmp_path/'arrivals.csv')
+    time_stamps = np.sort(np.random.default_rng(2).uniform(0,END_TIME,300))
+    pd.DataFrame({'time-stamps':time_stamps}).to_csv(file_name,index=False)
+
+    expected,_,eager_queue = run({END_TIME:file_name},lazy=False)
+    arrivals,records,lazy_queue = run({END_TIME:file_name},lazy=True)
+
+    # Every arrival of the trace (shifted to start at 0) was produced.
+    assert arrivals == expected
+    for produced in arrivals:
+        assert np.allclose(produced,time_stamps - time_stamps[0])
+    assert all(len(record.time_stamps) > 200 for record in records)
+    # Every source has a single arrival waiting at most.
+    assert lazy_queue.max_pending == 2
+    assert eager_queue.max_pending > 500
+
+#------------------------------------------------------------------------------
+
+def test_lazy_rate_arrivals():
+    (arrivals,),_,queue = run({1e9:bk.Rate(0.5)},lazy=True,n_sources=1)
+
+    assert queue.max_pending == 1
+    assert np.all(np.diff(arrivals) > 0)
+    # The last arrival is produced once the one before it occurred. It is 
+    # hence the only one that may be scheduled after the end.
+    assert all(t < END_TIME for t in arrivals[:-1])
+    # About 0.5 vehicles per second (three standard deviations).
+    assert abs(len(arrivals) - 0.5*END_TIME) < 3*np.sqrt(0.5*END_TIME)
+
+#------------------------------------------------------------------------------
+
+def test_pending_arrivals_can_be_pickled_part_of_the_way():
+    lane = bk.Lane(5)
+    source = bk.Source(vehicle_velocity=16.67,target_node=lane.IN,
+                       rate_schedule={1e9:bk.Rate(0.5)})
+    source.rng = make_rng(3,'source')
+    source.chunk_duration = 50
+    source.setup_arrivals(END_TIME,lazy=True)
+    for _ in range(40):
+        next(source.pending_arrivals)
+
+    copy = pickle.loads(pickle.dumps(source.pending_arrivals))
+    remaining = list(source.pending_arrivals)
+
+    assert list(copy) == remaining
+    assert len(remaining) > 20
+    assert all(time < END_TIME for time in remaining)
+
+#------------------------------------------------------------------------------
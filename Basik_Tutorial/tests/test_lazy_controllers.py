@@ -0,0 +1,145 @@
+'''
+Traffic light cycles, pedestrian crossings and obstructions that schedule
+their successors (lazy=True) must perform the same events as the ones that
+are scheduled in advance.
+'''
+
+import numpy as np
+
+import __basik__.core as bk
+from __basik__ import utils
+from scenarios import traffic_light_session,recordings
+
+END_TIME = 600
+
+#------------------------------------------------------------------------------
+
+class EventLog(bk.IndexedQueue):
+
+    # An IndexedQueue that keeps the kind and time of every event it hands
+    # out.
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def pop(self):
+        event = super().pop()
+        self.events.append((type(event).__name__,event.time))
+        return event
+
+#------------------------------------------------------------------------------
+
+def run(session):
+    # Session.run is not used as it shifts the events already in the queue
+    # (see Session.reset_time) but not the ones a lazy controller has yet to
+    # place into it. Returns the events and what was recorded.
+    session.schedule_sources(END_TIME)
+    session.sim_queue.run(END_TIME)
+    return session.sim_queue.events,recordings(session)
+
+#------------------------------------------------------------------------------
+
+def traffic_light_events(lazy):
+    np.random.seed(0)
+    utils._last_idx = 0
+    session = traffic_light_session(seed=5,rate=0.3,Queue=EventLog())
+    session.schedule_cycles(END_TIME,lazy=lazy)
+    return run(session)
+
+#------------------------------------------------------------------------------
+
+def shuffled_cycles(lazy):
+    # Without vehicles, nothing but the cycles draws from the stream of the
+    # traffic light.
+    utils._last_idx = 0
+    session = traffic_light_session(seed=5,Queue=EventLog())
+    session.schedule_cycles(END_TIME,fixed_cycle=False,lazy=lazy)
+    session.sim_queue.run(END_TIME)
+    return session.sim_queue.events,recordings(session)
+
+#------------------------------------------------------------------------------
+
+def pedestrian_crossing_events(lazy):
+    np.random.seed(0)
+    utils._last_idx = 0
+    bk.reset_source_count(0)
+    session = bk.Session('crossing.pkl',Queue=EventLog(),seed=5)
+    objects = dict()
+    for direction in ('W to E','E to W'):
+        lane_in = bk.Lane(20)
+        lane_out = bk.Lane(20)
+        objects[direction + ' in'] = lane_in
+        objects[direction + ' out'] = lane_out
+        objects[direction + ' source'] = bk.Source(
+                                        vehicle_velocity=16.67,
+                                        target_node=lane_in.IN,
+                                        rate_schedule={1e9:bk.Rate(0.3)})
+        objects[direction + ' record'] = bk.Record(lane_out.OUT)
+    objects['crossing'] = bk.PedestrianCrossing(
+                            W_to_E_in_node=objects['W to E in'].OUT,
+                            E_to_W_in_node=objects['E to W in'].OUT,
+                            W_to_E_out_node=objects['W to E out'].IN,
+                            E_to_W_out_node=objects['E to W out'].IN,
+                            on_duration=10,
+                            off_duration=30,
+                            on_initial_probability=0.5)
+    session.add(objects)
+    session.schedule_cycles(END_TIME,lazy=lazy)
+    return run(session)
+
+#------------------------------------------------------------------------------
+
+def obstruction_events(lazy):
+    np.random.seed(0)
+    utils._last_idx = 0
+    bk.reset_source_count(0)
+    session = bk.Session('obstructed.pkl',Queue=EventLog(),seed=5)
+    lane = bk.Lane(30)
+    session.add({'lane':lane,
+                 'source':bk.Source(vehicle_velocity=16.67,
+                                    target_node=lane.IN,
+                                    rate_schedule={1e9:bk.Rate(0.5)}),
+                 'record':bk.Record(lane.OUT)})
+    # The second obstruction starts before the first one ends.
+    lane.nodes[10].schedule_obstructions([50,55,200,400],[10,10,20,5],
+                                         lazy=lazy)
+    return run(session)
+
+#------------------------------------------------------------------------------
+
+def assert_same_events(make_events):
+    expected_events,expected_recordings = make_events(lazy=False)
+    lazy_events,lazy_recordings = make_events(lazy=True)
+
+    assert lazy_events == expected_events
+    assert lazy_recordings == expected_recordings
+    return expected_events
+
+#------------------------------------------------------------------------------
+
+def test_lazy_traffic_light_cycles():
+    events = assert_same_events(traffic_light_events)
+    assert sum(kind == 'TrafficLightCycle' for kind,_ in events) > 20
+
+#------------------------------------------------------------------------------
+
+def test_lazy_shuffled_traffic_light_cycles():
+    events = assert_same_events(shuffled_cycles)
+    durations = np.diff([time for _,time in events])
+    assert len(events) > 20
+    assert {3,20} <= set(durations)
+
+#------------------------------------------------------------------------------
+
+def test_lazy_pedestrian_crossings():
+    events = assert_same_events(pedestrian_crossing_events)
+    assert sum(kind == 'PedestrianCrossingEvent' for kind,_ in events) > 10
+
+#------------------------------------------------------------------------------
+
+def test_lazy_obstructions():
+    events = assert_same_events(obstruction_events)
+    assert sum(kind == 'Obstruction' for kind,_ in events) == 8
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,64 @@
+'''
+Importing __basik__ prints nothing and still places plt into __main__. Its
+first use warns that bk.plt is to be used instead.
+'''
+
+import os
+import subprocess
+import sys
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+
+#------------------------------------------------------------------------------
+
+def run_script(lines):
+    # Runs lines as the __main__ of a new process. Returns what it printed
+    # and the warnings it showed. Figures are drawn with the Agg backend if
+    # Matplotlib is imported before the lines are run.
+    code = '\n'.join(['import sys; sys.path[:0] = [{0!r}]'.format(
+                                                os.path.dirname(TESTS))] + lines)
+    process = subprocess.run([sys.executable,'-c',code],check=True,
+                             capture_output=True,text=True)
+    return process.stdout,process.stderr
+
+HEADLESS_PYPLOT = ["import matplotlib; matplotlib.use('Agg')",
+                   'import matplotlib.pyplot']
+
+#------------------------------------------------------------------------------
+
+def test_importing_places_a_deprecated_plt_into_main():
+    output,errors = run_script([
+        'import __basik__ as bk',
+        "print('plt' in globals())"] + HEADLESS_PYPLOT + [
+        'figure = plt.figure()',
+        'plt.close(figure)',
+        'print(type(figure).__name__)',
+        'print(plt.figure is bk.plt.figure)'])
+
+    # Nothing is printed on import.
+    assert output.split() == ['True','Figure','True']
+    assert errors.count('DeprecationWarning') == 1
+    assert 'bk.plt' in errors
+
+#------------------------------------------------------------------------------
+
+def test_a_plt_of_main_is_left_alone():
+    output,errors = run_script([
+        'plt = None',
+        'import __basik__',
+        'print(plt)'])
+
+    assert output.split() == ['None']
+    assert 'DeprecationWarning' not in errors
+
+#------------------------------------------------------------------------------
+
+def test_bk_plt_does_not_warn():
+    _,errors = run_script(HEADLESS_PYPLOT + [
+        'import __basik__ as bk',
+        'plt = bk.plt',
+        'plt.close(plt.figure())'])
+
+    assert 'DeprecationWarning' not in errors
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,138 @@
+'''
+A Node keeps its roles in the bits of Node.roles and its component data in
+a NodeComponents object. Every attribute a node used to have must still be
+found under its former name.
+'''
+
+import pickle
+
+import pytest
+
+from __basik__.node import (Node,NodeComponents,ROLES,ROLE_NAMES,
+                            COMPONENT_ATTRIBUTES,role_mask)
+from __basik__.VehicleObject.vehicle import FRONT_ROLES,CURRENT_ROLES
+
+#------------------------------------------------------------------------------
+
+# The attributes that a Node set in its __init__ before it had __slots__.
+
+FORMER_ATTRIBUTES = ('behind','buffer_end','buffer_node','buffer_start',
+    'car_length','car_width','circle','circle_display','circle_entrance',
+    'circle_exit','circle_node','circle_track_idx','contains_obstruction',
+    'display_axes','display_coord','end_time','flared_traffic_light',
+    'flared_traffic_light_display','flared_traffic_light_entrance',
+    'flared_traffic_light_exit','front','icon_image','idx','intersection',
+    'intersection_entrance','intersection_exit','lane','left','left_lane',
+    'locked','main_flow','new_velocity','obstructed','obstruction',
+    'occupied','off_ramp','off_ramp_display','off_ramp_entrance',
+    'off_ramp_exit','off_ramp_standard_entrance','off_ramp_standard_exit',
+    'on_ramp','on_ramp_display','on_ramp_exit','on_ramp_node',
+    'on_ramp_standard_node','overflow_protection','pedestrian_crossing',
+    'pedestrian_crossing_buffer_entrance','pedestrian_crossing_buffer_exit',
+    'pedestrian_crossing_buffer_node','pedestrian_crossing_display',
+    'pedestrian_crossing_entrance','pedestrian_crossing_exit','record',
+    'record_object','right','road_display_object','service_node','source',
+    'source_attached','stop_street','stop_street_display',
+    'stop_street_entrance','stop_street_exit','sub_flow','traffic_light',
+    'traffic_light_display','traffic_light_entrance','traffic_light_exit',
+    'unlock_time','vehicle','velocity_change')
+
+#------------------------------------------------------------------------------
+
+def test_former_attributes_keep_their_names_and_defaults():
+    node = Node()
+    for name in FORMER_ATTRIBUTES:
+        value = getattr(node,name)
+        if name in ROLE_NAMES:
+            assert value is False
+        elif name not in ('occupied','service_node','locked','obstructed',
+                          'contains_obstruction'):
+            assert value is None,name
+    assert not node.occupied and not node.service_node
+    assert node.roles == 0
+    assert node.components is None
+
+#------------------------------------------------------------------------------
+
+def test_names_are_not_shared_between_roles_components_and_slots():
+    names = ROLE_NAMES + COMPONENT_ATTRIBUTES + Node.__slots__
+    assert len(set(names)) == len(names)
+    assert set(ROLES.values()) == {1 << bit for bit in range(len(ROLE_NAMES))}
+
+#------------------------------------------------------------------------------
+
+def test_nodes_have_no_instance_dictionary():
+    node = Node()
+    assert not hasattr(node,'__dict__')
+    with pytest.raises(AttributeError):
+        node.circle_entrence = True   # misspelt
+    with pytest.raises(AttributeError):
+        NodeComponents().circle_entrance = True
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('name',ROLE_NAMES)
+def test_every_role_is_a_single_bit(name):
+    node = Node()
+    node.traffic_light_exit = True if name != 'traffic_light_exit' else False
+    others = node.roles
+
+    setattr(node,name,1)
+    assert getattr(node,name) is True
+    assert node.roles == others | ROLES[name]
+    assert node.roles & role_mask(name)
+    setattr(node,name,0)
+    assert getattr(node,name) is False
+    assert node.roles == others
+
+#------------------------------------------------------------------------------
+
+def test_role_masks_agree_with_the_roles():
+    # Vehicle.schedule_move takes the standard move if neither mask matches.
+    front_roles = {'stop_street_entrance','traffic_light_entrance',
+                   'circle_entrance','source_attached'}
+    current_roles = {'off_ramp_entrance','off_ramp_standard_entrance',
+                     'on_ramp_node','on_ramp_standard_node',
+                     'flared_traffic_light_entrance','buffer_node',
+                     'intersection_entrance','pedestrian_crossing_entrance',
+                     'pedestrian_crossing_buffer_exit',
+                     'pedestrian_crossing_buffer_node'}
+    node = Node()
+    for name in ROLE_NAMES:
+        setattr(node,name,True)
+        assert bool(node.roles & FRONT_ROLES) == (name in front_roles)
+        assert bool(node.roles & CURRENT_ROLES) == (name in current_roles)
+        setattr(node,name,False)
+    assert role_mask() == 0
+    assert role_mask('record','record') == ROLES['record']
+
+#------------------------------------------------------------------------------
+
+def test_components_are_only_created_once_required():
+    node = Node()
+    node.traffic_light = None
+    assert node.components is None
+
+    node.idx = 3
+    assert isinstance(node.components,NodeComponents)
+    assert node.idx == 3
+    assert all(getattr(node,name) is None for name in COMPONENT_ATTRIBUTES
+               if name != 'idx')
+    node.idx = None
+    assert node.idx is None
+
+#------------------------------------------------------------------------------
+
+def test_nodes_can_be_pickled():
+    node = Node(front=Node())
+    node.circle_exit = True
+    node.key = 'N'
+    node.count = 4
+
+    copy = pickle.loads(pickle.dumps(node))
+
+    assert copy.roles == node.roles and copy.circle_exit
+    assert copy.key == 'N' and copy.count == 4
+    assert isinstance(copy.front,Node) and copy.front.components is None
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,105 @@
+'''
+Vehicles share the null_display until they reach a display component. Only
+then is a VehicleDisplay built for them, in the colour that they drew when
+they were produced.
+'''
+
+import pytest
+
+from __basik__.node import Node
+from __basik__.random_streams import make_rng
+from __basik__.VehicleObject import vehicle as vehicle_module
+from __basik__.VehicleObject.vehicle import Vehicle
+from __basik__.VehicleObject.vehicle_colors import color_list
+from __basik__.VehicleObject.vehicle_display import (VehicleDisplay,
+                                                     NullVehicleDisplay,
+                                                     null_display,
+                                                     choose_color)
+from scenarios import traffic_light_session
+
+#------------------------------------------------------------------------------
+
+@pytest.fixture
+def built_displays(monkeypatch):
+    # Every VehicleDisplay that a vehicle builds.
+    built = []
+    class CountedVehicleDisplay(VehicleDisplay):
+        def __init__(self,*args,**kwargs):
+            super().__init__(*args,**kwargs)
+            built.append(self)
+    monkeypatch.setattr(vehicle_module,'VehicleDisplay',CountedVehicleDisplay)
+    return built
+
+#------------------------------------------------------------------------------
+
+def new_vehicle(seed,color='random'):
+    return Vehicle(16.67,0.0,Node(),source_ID=0,color=color,
+                   rng=make_rng(seed,'vehicle'))
+
+#------------------------------------------------------------------------------
+
+def test_a_headless_run_builds_no_vehicle_display(built_displays):
+    session = traffic_light_session(seed=3)
+    vehicles = []
+    for source in session.source_objects.values():
+        def collecting_produce_arrival(t,produce_arrival=source._produce_arrival):
+            vehicle = produce_arrival(t)
+            vehicles.append(vehicle)
+            return vehicle
+        source._produce_arrival = collecting_produce_arrival
+    session.run(300,display_vehicles=False)
+
+    assert len(vehicles) > 50
+    assert built_displays == []
+    for vehicle in vehicles:
+        assert vehicle.vehicle_display is null_display
+        assert vehicle.display_color in color_list
+        assert vehicle.display_color != 'random'
+
+#------------------------------------------------------------------------------
+
+def test_the_colour_is_drawn_when_the_vehicle_is_produced():
+    # The draw does not wait for a display: later draws from the stream are
+    # the same whether or not the vehicle is ever displayed.
+    vehicle = new_vehicle(4)
+    rng = make_rng(4,'vehicle')
+
+    assert vehicle.display_color == choose_color('random',rng)
+    assert vehicle.rng.random() == rng.random()
+    assert new_vehicle(4,color='red').display_color == 'red'
+
+#------------------------------------------------------------------------------
+
+def test_a_display_is_built_once_on_the_first_display_component(built_displays):
+    vehicle = new_vehicle(5)
+    component = object()
+
+    vehicle.display_component = None
+    assert built_displays == []
+    vehicle.display_component = component
+    vehicle.display_component = object()
+    vehicle.display_component = None
+
+    assert len(built_displays) == 1
+    assert vehicle.vehicle_display is built_displays[0]
+    assert vehicle.vehicle_display.color == vehicle.display_color
+    assert vehicle.display_component is None
+
+#------------------------------------------------------------------------------
+
+def test_the_null_display_holds_no_state():
+    assert isinstance(null_display,NullVehicleDisplay)
+    null_display.coords = [1,2]
+    null_display.axes = 'axes'
+
+    assert not hasattr(null_display,'coords')
+    assert null_display.axes is None and null_display.track is None
+    for name in ('show','hide','reset_bearings','adjust_bearings',
+                 'reset_axes','reset_coords','adjust_coords','setup_track',
+                 'cycle_track','single_move','multi_move','move_along_track',
+                 'move','shake','swivel','flicker'):
+        assert hasattr(VehicleDisplay,name)
+        assert getattr(null_display,name)(1,2,key=3) is None
+    assert new_vehicle(6).vehicle_display is new_vehicle(7).vehicle_display
+
+#------------------------------------------------------------------------------
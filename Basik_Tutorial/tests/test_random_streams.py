@@ -0,0 +1,203 @@
+'''
+The stream of a component only depends on the session seed and the name of
+the component. A BufferedStream hands out the same values as its Generator.
+'''
+
+import hashlib
+import pickle
+
+import numpy as np
+import pytest
+
+from __basik__.random_streams import (GLOBAL_RNG,BufferedStream,NAME_KEY_WORDS,
+                                      stream_seed,make_rng,seed_component)
+from scenarios import traffic_light_session,recordings
+
+END_TIME = 300
+
+#------------------------------------------------------------------------------
+
+class Component(object):
+
+    # Stands in for a source: it has a stream for itself and one for its
+    # vehicles.
+
+    def __init__(self):
+        self.rng = GLOBAL_RNG
+        self.vehicle_rng = GLOBAL_RNG
+
+#------------------------------------------------------------------------------
+
+def draws(rng,n=5):
+    return [rng.normal(),rng.uniform(),rng.choice(10)] + \
+           rng.random(n).tolist()
+
+#------------------------------------------------------------------------------
+
+def test_stream_seeds_depend_on_the_seed_and_name_only():
+    first = [stream_seed(3,name).generate_state(4).tolist()
+             for name in ('N source','S source')]
+    second = [stream_seed(3,name).generate_state(4).tolist()
+              for name in ('S source','N source')]
+
+    assert first == second[::-1]
+    assert first[0] != first[1]
+    assert stream_seed(4,'N source').generate_state(4).tolist() != first[0]
+
+#------------------------------------------------------------------------------
+
+def test_names_add_words_of_their_digest_to_the_spawn_key():
+    parent = np.random.SeedSequence(5).spawn(2)[1]
+    seed = stream_seed(parent,'traffic light')
+    digest = hashlib.sha256('traffic light'.encode('utf-8')).digest()
+
+    assert seed.entropy == parent.entropy
+    assert seed.spawn_key[:1] == parent.spawn_key
+    assert len(seed.spawn_key) == 1 + NAME_KEY_WORDS
+    assert seed.spawn_key[1:] == tuple(
+        int(word) for word in np.frombuffer(digest,'<u4')[:NAME_KEY_WORDS])
+    # The parent is left as it was.
+    assert parent.n_children_spawned == 0
+
+#------------------------------------------------------------------------------
+
+def test_seed_component_is_reproducible():
+    first,second = Component(),Component()
+    assert seed_component(first,8,'W source')
+    np.random.seed(1)
+    assert seed_component(second,8,'W source')
+
+    assert isinstance(first.rng,BufferedStream)
+    assert draws(first.rng) == draws(second.rng)
+    assert draws(first.vehicle_rng) == draws(second.vehicle_rng)
+    assert draws(make_rng(8,'W source vehicles')) == \
+           draws(make_rng(8,'W source vehicles'))
+    # The vehicles of a source do not draw from its own stream.
+    assert draws(make_rng(8,'W source')) != \
+           draws(make_rng(8,'W source vehicles'))
+
+#------------------------------------------------------------------------------
+
+def test_seed_component_in_place_keeps_the_stream_object():
+    component = Component()
+    seed_component(component,9,'N in')
+    rng = component.rng
+    rng.normal()
+    assert rng._normals
+
+    assert seed_component(component,10,'N in',in_place=True)
+    assert component.rng is rng
+    assert rng._normals == [] and rng._uniforms == []
+    assert draws(rng) == draws(make_rng(10,'N in'))
+
+#------------------------------------------------------------------------------
+
+def test_objects_without_a_stream_are_left_alone():
+    component = object()
+    assert not seed_component(component,1,'figure')
+
+#------------------------------------------------------------------------------
+
+def produced_arrivals(seed,global_seed,length=40):
+    # The recordings of the traffic light scenario and the arrival times of
+    # every source.
+    np.random.seed(global_seed)
+    session = traffic_light_session(seed=seed,length=length)
+    arrivals = dict()
+    for name,source in session.source_objects.items():
+        arrivals[name] = produced = []
+        def logging_produce_arrival(t,produce_arrival=source._produce_arrival,
+                                      produced=produced):
+            produced.append(t)
+            return produce_arrival(t)
+        source._produce_arrival = logging_produce_arrival
+    session.run(END_TIME,display_vehicles=False)
+    frozen = {name:(time_stamps.tolist(),source_IDs.tolist())
+              for name,(time_stamps,source_IDs) in recordings(session).items()}
+    return frozen,arrivals
+
+#------------------------------------------------------------------------------
+
+def test_seeded_sessions_do_not_depend_on_numpy_random():
+    first = produced_arrivals(seed=2,global_seed=0)
+    second = produced_arrivals(seed=2,global_seed=1)
+    other = produced_arrivals(seed=3,global_seed=0)
+
+    assert first == second
+    assert first[1] != other[1]
+    assert all(len(time_stamps) > 20 for time_stamps,_ in first[0].values())
+
+#------------------------------------------------------------------------------
+
+def test_sources_with_the_same_name_share_arrivals_between_designs():
+    # Common random numbers: shorter lanes change what the vehicles do but
+    # not when the sources produce them.
+    records,arrivals = produced_arrivals(seed=4,global_seed=0)
+    other_records,other_arrivals = produced_arrivals(seed=4,global_seed=0,
+                                                     length=20)
+
+    assert arrivals == other_arrivals
+    assert records != other_records
+
+#------------------------------------------------------------------------------
+
+def test_buffered_draws_equal_unbuffered_ones():
+    # A pool of n values is drawn as one standard_normal (or random) call of
+    # size n and handed out from its end.
+    pool_size = 16
+    rng = BufferedStream(np.random.default_rng(12),pool_size=pool_size)
+    expected = np.random.default_rng(12)
+    normals = expected.standard_normal(pool_size)[::-1]
+    uniforms = expected.random(pool_size)[::-1]
+
+    for idx in range(pool_size):
+        assert rng.normal(2.0,0.5) == 2.0 + 0.5*normals[idx]
+        assert rng.uniform(-1.0,3.0) == -1.0 + 4.0*uniforms[idx]
+    # The next pools follow the previous ones in the underlying stream.
+    assert rng.random() == expected.random(pool_size)[-1]
+    assert rng.normal() == expected.standard_normal(pool_size)[-1]
+
+#------------------------------------------------------------------------------
+
+def test_other_draws_are_passed_on_unbuffered():
+    rng = BufferedStream(np.random.default_rng(13))
+    expected = np.random.default_rng(13)
+
+    assert rng.normal(1.0,2.0,size=3).tolist() == \
+           expected.normal(1.0,2.0,size=3).tolist()
+    assert rng.uniform(0,5,size=4).tolist() == \
+           expected.uniform(0,5,size=4).tolist()
+    assert rng.random(2).tolist() == expected.random(2).tolist()
+    assert rng.choice(10,p=[0.1]*10) == expected.choice(10,p=[0.1]*10)
+    assert rng.exponential(3.0) == expected.exponential(3.0)
+    assert rng.poisson(2.5,size=5).tolist() == \
+           expected.poisson(2.5,size=5).tolist()
+    with pytest.raises(ValueError):
+        rng.normal(0,-1)
+
+#------------------------------------------------------------------------------
+
+def test_buffered_streams_have_the_same_distribution():
+    # A large sample of buffered scalar draws against one of the Generator.
+    rng = make_rng(14,'N source')
+    buffered = np.array([rng.normal(3.0,2.0) for _ in range(20000)])
+    uniforms = np.array([rng.uniform(1.0,2.0) for _ in range(20000)])
+
+    assert abs(buffered.mean() - 3.0) < 4*2.0/np.sqrt(20000)
+    assert abs(buffered.std() - 2.0) < 0.05
+    assert 1.0 <= uniforms.min() and uniforms.max() < 2.0
+    assert abs(uniforms.mean() - 1.5) < 4*np.sqrt(1/12/20000)
+
+#------------------------------------------------------------------------------
+
+def test_buffered_streams_can_be_pickled_with_their_pools():
+    rng = make_rng(15,'S source')
+    rng.normal()
+    rng.uniform()
+    copy = pickle.loads(pickle.dumps(rng))
+
+    assert draws(copy,n=10000) == draws(rng,n=10000)
+    assert [copy.normal() for _ in range(5000)] == \
+           [rng.normal() for _ in range(5000)]
+
+#------------------------------------------------------------------------------
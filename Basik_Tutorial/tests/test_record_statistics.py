@@ -0,0 +1,151 @@
+'''
+The online statistics of a Record must agree with numpy applied to the
+time-stamps it would have kept.
+'''
+
+import numpy as np
+import pytest
+
+import __basik__.core as bk
+from __basik__.record_statistics import IntervalStatistics
+from scenarios import traffic_light_session
+
+#------------------------------------------------------------------------------
+
+def time_stamps(seed,n=5000):
+    # Arrivals with exponential inter-arrival times with a mean of 8 seconds.
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.exponential(8,n)) + 100*seed
+
+#------------------------------------------------------------------------------
+
+def accumulate(time_stamps,**kwargs):
+    statistics = IntervalStatistics(**kwargs)
+    for t in time_stamps:
+        statistics.add(t)
+    return statistics
+
+#------------------------------------------------------------------------------
+
+def expected_histogram(intervals,histogram_range,n_bins):
+    # numpy.histogram along with the counts below and above the range.
+    low,high = histogram_range
+    counts,_ = np.histogram(intervals[(intervals >= low) & (intervals < high)],
+                            bins=n_bins,range=histogram_range)
+    return ([int(np.sum(intervals < low))] + counts.tolist() +
+            [int(np.sum(intervals >= high))])
+
+#------------------------------------------------------------------------------
+
+def test_moments_agree_with_numpy():
+    stamps = time_stamps(1)
+    intervals = np.diff(stamps)
+    statistics = accumulate(stamps)
+
+    assert statistics.count == len(stamps)
+    assert statistics.n_intervals == len(intervals)
+    assert statistics.mean == pytest.approx(intervals.mean(),rel=1e-12)
+    assert statistics.variance == pytest.approx(intervals.var(ddof=1),rel=1e-10)
+    assert statistics.std == pytest.approx(intervals.std(ddof=1),rel=1e-10)
+    assert statistics.minimum == intervals.min()
+    assert statistics.maximum == intervals.max()
+    assert statistics.rate() == pytest.approx(1/intervals.mean())
+
+#------------------------------------------------------------------------------
+
+def test_moments_are_stable_far_from_zero():
+    # A naive sum of squares loses most of its digits here. Welford does not.
+    stamps = 1e9 + np.cumsum(np.full(1000,1e-3) +
+                             np.random.default_rng(2).uniform(0,1e-6,1000))
+    intervals = np.diff(stamps)
+    statistics = accumulate(stamps)
+
+    assert statistics.mean == pytest.approx(intervals.mean(),rel=1e-9)
+    assert statistics.variance == pytest.approx(intervals.var(ddof=1),rel=1e-6)
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('histogram_range,n_bins',[((0,60),60),
+                                                   ((2,20),7),
+                                                   ((0,10),1)])
+def test_histogram_agrees_with_numpy(histogram_range,n_bins):
+    stamps = time_stamps(3)
+    statistics = accumulate(stamps,histogram_range=histogram_range,
+                            n_bins=n_bins)
+
+    assert np.array_equal(statistics.bin_edges,
+                          np.linspace(*histogram_range,n_bins + 1))
+    assert statistics.histogram == expected_histogram(np.diff(stamps),
+                                                      histogram_range,n_bins)
+    assert sum(statistics.histogram) == statistics.n_intervals
+
+#------------------------------------------------------------------------------
+
+def test_histogram_bin_edges():
+    # A bin holds its lower edge but not its upper edge. The upper edge of the
+    # range is above it.
+    statistics = accumulate([0,1,3,3.5,13.5,23.5],histogram_range=(1,10),
+                            n_bins=3)
+    # intervals: 1, 2, 0.5, 10, 10
+    assert statistics.histogram == [1,2,0,0,2]
+
+#------------------------------------------------------------------------------
+
+def test_quantiles_are_within_the_relative_accuracy():
+    stamps = time_stamps(4)
+    intervals = np.sort(np.diff(stamps))
+    statistics = accumulate(stamps,relative_accuracy=0.01)
+
+    for q in (0,0.1,0.5,0.9,0.99,1):
+        exact = intervals[int(q*(len(intervals) - 1))]
+        assert statistics.quantile(q) == pytest.approx(exact,rel=0.01)
+
+#------------------------------------------------------------------------------
+
+def test_merged_statistics_agree_with_numpy():
+    parts = [time_stamps(seed,n) for seed,n in ((5,1000),(6,1),(7,3000))]
+    intervals = np.concatenate([np.diff(stamps) for stamps in parts])
+    merged = accumulate(parts[0])
+    for stamps in parts[1:]:
+        merged.merge(accumulate(stamps))
+
+    assert merged.count == sum(len(stamps) for stamps in parts)
+    assert merged.n_intervals == len(intervals)
+    assert merged.mean == pytest.approx(intervals.mean(),rel=1e-12)
+    assert merged.variance == pytest.approx(intervals.var(ddof=1),rel=1e-10)
+    assert merged.histogram == expected_histogram(intervals,(0,60),60)
+    assert merged.first_time == parts[0][0]
+    assert merged.last_time == parts[-1][-1]
+
+    with pytest.raises(ValueError):
+        merged.merge(IntervalStatistics(n_bins=10))
+
+#------------------------------------------------------------------------------
+
+def test_record_statistics_of_a_run():
+    session = traffic_light_session(seed=3,rate=0.3)
+    for record in session.record_objects.values():
+        record.statistics = bk.RecordStatistics(histogram_range=(0,30),
+                                                n_bins=15)
+    session.run(1500,display_vehicles=False)
+
+    for record in session.record_objects.values():
+        stamps = np.asarray(record.time_stamps)
+        source_IDs = np.asarray(record.source_IDs)
+        statistics = record.statistics
+        intervals = np.diff(stamps)
+        assert statistics.total.count == len(stamps) > 50
+        assert statistics.total.mean == pytest.approx(intervals.mean())
+        assert statistics.total.variance == pytest.approx(intervals.var(ddof=1))
+        assert statistics.total.histogram == expected_histogram(intervals,
+                                                                (0,30),15)
+
+        assert set(statistics.sources) == set(source_IDs.tolist())
+        for source_ID,by_source in statistics.sources.items():
+            intervals = np.diff(stamps[source_IDs == source_ID])
+            assert by_source.n_intervals == len(intervals)
+            if len(intervals) > 1:
+                assert by_source.mean == pytest.approx(intervals.mean())
+                assert by_source.variance == pytest.approx(intervals.var(ddof=1))
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,143 @@
+'''
+A RecordStore must give back exactly what was appended to it, and a Record
+that streams to one must record the same as one that does not.
+'''
+
+import pickle
+from array import array
+
+import numpy as np
+import pytest
+
+import __basik__.core as bk
+from scenarios import traffic_light_session
+
+#------------------------------------------------------------------------------
+
+def test_store_round_trip(tmp_path):
+    store = bk.RecordStore(str(tmp_path),fields=['velocity'])
+    rng = np.random.default_rng(1)
+    chunks = []
+    for size in (5,0,17,1):
+        chunk = {'time_stamps':array('d',np.sort(rng.uniform(0,100,size))),
+                 'source_IDs':array('q',rng.integers(0,2**40,size)),
+                 'velocity':rng.normal(16,2,size).tolist()}
+        store.append(chunk)
+        chunks.append(chunk)
+
+    reopened = bk.RecordStore(str(tmp_path))
+    assert reopened.fields == {'time_stamps':'float64','source_IDs':'int64',
+                               'velocity':'float64'}
+    assert len(reopened) == 23
+    for name in reopened.fields:
+        expected = np.concatenate([np.asarray(chunk[name],dtype=np.float64)
+                                   if name != 'source_IDs' else
+                                   np.asarray(chunk[name],dtype=np.int64)
+                                   for chunk in chunks])
+        column = reopened.column(name)
+        assert column.dtype == expected.dtype
+        assert np.array_equal(column,expected)
+
+    reopened.truncate()
+    assert len(reopened) == 0
+    assert reopened.time_stamps.size == 0
+
+#------------------------------------------------------------------------------
+
+def test_missing_store(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        bk.RecordStore(str(tmp_path/'nothing here'))
+
+#------------------------------------------------------------------------------
+
+def test_iter_time_stamps_in_chunks(tmp_path):
+    store = bk.RecordStore(str(tmp_path),fields=[])
+    time_stamps = np.arange(10,60,dtype=np.float64)
+    store.append({'time_stamps':time_stamps,
+                  'source_IDs':np.zeros(50,dtype=np.int64)})
+
+    assert list(store.iter_time_stamps(chunk_size=3)) == time_stamps.tolist()
+    shifted = list(store.iter_time_stamps(start_time=0,end_time=20,
+                                          chunk_size=4))
+    assert shifted == (time_stamps - 10)[time_stamps - 10 <= 20].tolist()
+
+    # An iterator that is pickled part of the way continues where it was.
+    iterator = store.iter_time_stamps(chunk_size=7)
+    first = [next(iterator) for _ in range(12)]
+    rest = list(pickle.loads(pickle.dumps(iterator)))
+    assert first + rest == time_stamps.tolist()
+
+#------------------------------------------------------------------------------
+
+def test_streaming_record_matches_one_in_memory(tmp_path):
+    sessions = []
+    for stream in (False,True):
+        session = traffic_light_session(seed=2)
+        if stream:
+            for name,record in session.record_objects.items():
+                record.stream_to(str(tmp_path/name),fields=['velocity'],
+                                 chunk_size=7)
+        session.run(1200,display_vehicles=False)
+        sessions.append(session)
+    memory,streamed = sessions
+
+    for name,record in streamed.record_objects.items():
+        expected = memory.record_objects[name]
+        assert record.n_records == expected.n_records > 7
+        assert np.array_equal(record.get_time_stamps(),
+                              expected.get_time_stamps())
+        assert np.array_equal(record.get_source_IDs(),
+                              expected.get_source_IDs())
+        # Only the recordings since the last flush are held in memory.
+        assert len(record.time_stamps) < 7
+        store = bk.RecordStore(str(tmp_path/name))
+        assert len(store) == record.n_records
+        assert np.all(np.isfinite(store.column('velocity')))
+
+#------------------------------------------------------------------------------
+
+def test_record_recordings_are_read_only_views():
+    session = traffic_light_session(seed=2)
+    # Vehicles keep arriving after the run is resumed.
+    session.schedule_sources(900)
+    session.schedule_cycles(900)
+    session.run(600,display_vehicles=False,schedule_sources=False,
+                schedule_cycles=False)
+    record = session.record_objects['N record']
+    time_stamps = record.time_stamps
+
+    assert time_stamps == record.get_time_stamps().tolist()
+    assert record.source_IDs == record.get_source_IDs().tolist()
+    assert time_stamps[-1] == record.get_time_stamps()[-1]
+    assert np.asarray(record.source_IDs).dtype == np.int64
+    with pytest.raises(AttributeError):
+        time_stamps.append(-1.0)
+    with pytest.raises(TypeError):
+        time_stamps[0] = -1.0
+
+    # The view follows the recordings and assignment replaces them.
+    n = len(time_stamps)
+    session.resume(900)
+    assert len(time_stamps) > n
+    record.time_stamps = [1.0,2.0]
+    assert time_stamps == [1.0,2.0]
+
+    record.keep_time_stamps = False
+    with pytest.raises(ValueError):
+        record.process_records()
+
+#------------------------------------------------------------------------------
+
+def test_a_record_as_an_arrival_trace():
+    session = traffic_light_session(seed=2)
+    session.run(600,display_vehicles=False)
+    record = session.record_objects['N record']
+
+    lane = bk.Lane(10)
+    source = record.to_source(16.67,lane.IN)
+    source.setup_arrivals(600)
+    assert source.arrival_times is not None and len(source.arrival_times) > 0
+
+    untimed = bk.Record(bk.Lane(10).OUT,keep_time_stamps=False)
+    with pytest.raises(ValueError,match='arrival trace'):
+        untimed.to_source(16.67,bk.Lane(10).IN).setup_arrivals(600)
@@ -0,0 +1,45 @@
+'''
+replicate_until must leave a given SeedSequence as it was and must not run
+on with values that are not finite.
+'''
+
+import numpy as np
+import pytest
+
+import __basik__.core as bk
+from __basik__.random_streams import as_seed_sequence
+from __basik__.simulation_session import spawn_seeds
+from scenarios import traffic_light_session
+
+#------------------------------------------------------------------------------
+
+def test_a_given_seed_sequence_is_not_spawned_from():
+    seed = np.random.SeedSequence(7)
+    copy = as_seed_sequence(seed)
+
+    assert copy is not seed
+    assert (copy.entropy,copy.spawn_key) == (seed.entropy,seed.spawn_key)
+    first = [child.spawn_key for child in spawn_seeds(seed,3)]
+    assert first == [child.spawn_key for child in spawn_seeds(seed,3)]
+    assert seed.n_children_spawned == 0
+
+#------------------------------------------------------------------------------
+
+def test_the_same_seed_sequence_gives_the_same_study():
+    seed = np.random.SeedSequence(4)
+    studies = [bk.replicate_until(traffic_light_session(),300,'N record',
+                                  precision=0.5,metric='count',seed=seed,
+                                  min_replications=2,batch_size=2,
+                                  max_replications=4)
+               for _ in range(2)]
+
+    assert np.array_equal(studies[0]['values'],studies[1]['values'])
+    assert seed.n_children_spawned == 0
+
+#------------------------------------------------------------------------------
+
+def test_values_that_are_not_finite_raise():
+    with pytest.raises(ValueError,match='Replication 0'):
+        bk.replicate_until(traffic_light_session(),300,'N record',
+                           precision=0.1,metric=lambda summary: np.nan,
+                           seed=1,min_replications=2,max_replications=4)
@@ -0,0 +1,134 @@
+'''
+scenario_hash must give the same hash for the same scenario, wherever it is
+built, and another one for any change. ResultCache serves terminal runs and
+evicts the files used least recently.
+'''
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import __basik__.core as bk
+from __basik__ import utils
+from scenarios import traffic_light_session,recordings
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+
+#------------------------------------------------------------------------------
+
+def scenario_key(**kwargs):
+    np.random.seed(0)
+    utils._last_idx = 0
+    return bk.scenario_hash(traffic_light_session(**kwargs),end_time=600)
+
+#------------------------------------------------------------------------------
+
+def test_the_same_scenario_gives_the_same_hash():
+    assert scenario_key(seed=1) == scenario_key(seed=1)
+
+#------------------------------------------------------------------------------
+
+def test_the_hash_is_the_same_in_another_process():
+    code = ('import sys; sys.path[:0] = [{0!r},{1!r}]\n'
+            'import numpy as np\n'
+            'import __basik__.core as bk\n'
+            'from scenarios import traffic_light_session\n'
+            'np.random.seed(0)\n'
+            'print(bk.scenario_hash(traffic_light_session(seed=1),'
+            'end_time=600))').format(TESTS,os.path.dirname(TESTS))
+    output = subprocess.run([sys.executable,'-c',code],check=True,
+                            capture_output=True,text=True).stdout
+
+    assert output.split()[-1] == scenario_key(seed=1)
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('changed',[dict(seed=2),dict(rate=0.25),
+                                    dict(length=41)])
+def test_any_change_gives_another_hash(changed):
+    assert scenario_key(**changed) != scenario_key()
+
+def test_the_settings_are_part_of_the_hash():
+    session = traffic_light_session()
+    assert (bk.scenario_hash(session,end_time=600) != 
+            bk.scenario_hash(session,end_time=601))
+
+#------------------------------------------------------------------------------
+
+def test_put_get_and_least_recently_used_eviction(tmp_path):
+    cache = bk.ResultCache(str(tmp_path),max_bytes=10**6)
+    content = {'values':np.arange(1000.0)}
+    for second,key in enumerate('abc'):
+        assert cache.put(key,content)
+        os.utime(cache.file_name(key),(second,second))
+
+    assert cache.get('missing') is None
+    assert np.array_equal(cache.get('a')['values'],content['values'])
+    assert (cache.hits,cache.misses) == (1,1)
+    # a was read last, b was used longest ago
+    size = os.path.getsize(cache.file_name('a'))
+    cache.max_bytes = 2*size
+    assert cache.evict() == 1
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.size() == 2*size
+
+    assert not cache.put('large',{'values':np.zeros(10**6)})
+    cache.clear()
+    assert len(cache) == 0
+
+#------------------------------------------------------------------------------
+
+def cached_run(cache,terminal):
+    np.random.seed(0)
+    utils._last_idx = 0
+    session = traffic_light_session(seed=1)
+    session.run(900,display_vehicles=False,cache=cache,terminal=terminal)
+    return session
+
+#------------------------------------------------------------------------------
+
+def test_only_terminal_runs_are_served(tmp_path):
+    cache = bk.ResultCache(str(tmp_path))
+    expected = recordings(cached_run(cache,terminal=False))
+    assert len(cache) == 1 and cache.hits == 0
+
+    simulated = cached_run(cache,terminal=False)
+    assert cache.hits == 0 and not simulated.from_cache
+    served = cached_run(cache,terminal=True)
+    assert cache.hits == 1 and served.from_cache
+    assert recordings(simulated) == recordings(served) == expected
+    assert served.sim_queue.t == simulated.sim_queue.t
+
+    for continuation in (lambda: served.run(1000),
+                         lambda: served.resume(1000),
+                         lambda: served.populate(100),
+                         lambda: served.checkpoint(str(tmp_path/'x.ckpt')),
+                         lambda: served.snapshot(),
+                         lambda: served.fork(2)):
+        with pytest.raises(ValueError):
+            continuation()
+
+#------------------------------------------------------------------------------
+
+def test_replications_from_the_cache(tmp_path):
+    def summaries(results):
+        return [result['records'] for result in results]
+
+    uncached = bk.replicate(traffic_light_session(seed=1),3,600,seed=5)
+    cache = bk.ResultCache(str(tmp_path))
+    first = bk.replicate(traffic_light_session(seed=1),3,600,seed=5,
+                         cache=cache)
+    assert len(cache) == 3
+    second = bk.replicate(traffic_light_session(seed=1),3,600,seed=5,
+                          cache=cache)
+    assert cache.hits == 3
+
+    for one,other in ((uncached,first),(first,second)):
+        for a,b in zip(summaries(one),summaries(other)):
+            assert a.keys() == b.keys()
+            for name in a:
+                assert np.array_equal(a[name]['time_stamps'],
+                                      b[name]['time_stamps'])
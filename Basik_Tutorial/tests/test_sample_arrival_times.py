@@ -0,0 +1,92 @@
+'''
+sample_arrival_times thins a homogeneous process whose rate bounds every
+piece of the schedule. A bound below the rate would lose arrivals, hence the
+counts are compared with the integral of the rate intensity.
+'''
+
+import numpy as np
+import pytest
+
+from __basik__.source import Rate,sample_arrival_times,general_function
+
+#------------------------------------------------------------------------------
+
+def expected_count(rate,start_time,end_time,min_rate=5e-2):
+    # The integral of the rate intensity (with min_rate where it is not
+    # positive) by the trapezium rule.
+    t = np.linspace(start_time,end_time,200001)
+    intensity = general_function(t,rate.constant,rate.drift,
+                                 rate.drift_reference,rate.amplitude,
+                                 rate.prob,rate.T1,rate.T2)
+    intensity = np.where(intensity > 0,intensity,min_rate)
+    return float(np.sum((intensity[1:] + intensity[:-1])/2*np.diff(t)))
+
+#------------------------------------------------------------------------------
+
+def assert_poisson_count(count,mean):
+    # Within 5 standard deviations of a Poisson count.
+    assert abs(count - mean) < 5*np.sqrt(mean)
+
+#------------------------------------------------------------------------------
+
+def test_times_are_sorted_and_within_bounds():
+    times = sample_arrival_times({1e9:Rate(0.5)},end_time=500,start_time=100,
+                                 rng=np.random.default_rng(1))
+
+    assert times.dtype == np.float64
+    assert np.all(np.diff(times) >= 0)
+    assert times[0] >= 100 and times[-1] <= 500
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('rate',[Rate(0.3),
+                                 Rate(0.1,drift=2e-5,drift_reference=0),
+                                 Rate(0.1,drift=-2e-5,drift_reference=1e4),
+                                 Rate(0.2,amplitude=0.15,prob=0.3,
+                                      T1=600,T2=1700),
+                                 Rate(0.05,drift=1e-5,amplitude=0.2,prob=1,
+                                      T1=900)])
+def test_counts_match_the_rate_intensity(rate):
+    end_time = 2e4
+    times = sample_arrival_times({end_time:rate},end_time,
+                                 rng=np.random.default_rng(2))
+
+    assert_poisson_count(len(times),expected_count(rate,0,end_time))
+
+#------------------------------------------------------------------------------
+
+def test_every_piece_uses_its_own_rate():
+    schedule = {1e4:Rate(0.05),2e4:Rate(0.5),3e4:Rate(0.2,amplitude=0.1,T1=300)}
+    times = sample_arrival_times(schedule,3e4,rng=np.random.default_rng(3))
+
+    lower = 0
+    for upper,rate in schedule.items():
+        count = np.count_nonzero((times > lower) & (times <= upper))
+        assert_poisson_count(count,expected_count(rate,lower,upper))
+        lower = upper
+
+#------------------------------------------------------------------------------
+
+def test_the_last_rate_continues_after_its_end_time():
+    times = sample_arrival_times({100:Rate(0.4)},1e4,
+                                 rng=np.random.default_rng(4))
+
+    assert_poisson_count(len(times),0.4*1e4)
+
+#------------------------------------------------------------------------------
+
+def test_min_rate_where_the_rate_is_not_positive():
+    schedule = {1e4:Rate(0),2e4:Rate(-1)}
+    rng = np.random.default_rng(5)
+
+    assert len(sample_arrival_times(schedule,2e4,min_rate=None,rng=rng)) == 0
+    times = sample_arrival_times(schedule,2e4,min_rate=0.1,rng=rng)
+    assert_poisson_count(len(times),0.1*2e4)
+
+#------------------------------------------------------------------------------
+
+def test_only_rates_can_be_sampled():
+    with pytest.raises(TypeError):
+        sample_arrival_times({100:lambda t: 0.1},100)
+    with pytest.raises(AssertionError):
+        sample_arrival_times({100:Rate(0.1)},end_time=10,start_time=20)
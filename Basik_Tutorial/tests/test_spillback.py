@@ -0,0 +1,103 @@
+'''
+A spillback source holds the arrivals that can not enter a full lane as
+time-stamps and admits them one at a time, first in first out.
+'''
+
+import numpy as np
+import pytest
+
+import __basik__.core as bk
+
+END_TIME = 300
+
+#------------------------------------------------------------------------------
+
+def blocked_lane(lazy):
+
+    # A lane whose last node is obstructed long enough for it to fill up and
+    # for arrivals to spill back. The source is asked to admit its next 
+    # arrival at calls[0] (the start) and then whenever a vehicle has entered.
+    # admissions[k] = (time it was produced, arrival time) of vehicle k.
+
+    Queue = bk.GlobalQueue.new(bk.IndexedQueue())
+    lane = bk.Lane(10)
+    source = bk.Source(vehicle_velocity=16.67,
+                       target_node=lane.IN,
+                       rate_schedule={1e9:bk.Rate(0.8)})
+    record = bk.Record(lane.OUT)
+    lane.nodes[-1].schedule_obstructions([20],[60],duration_std=0.1)
+
+    calls = []
+    admissions = []
+    admit_next_arrival = source.admit_next_arrival
+    def logging_admit_next_arrival(t):
+        calls.append(t)
+        n_admissions = len(admissions)
+        admitted = admit_next_arrival(t)
+        if admitted:
+            admissions.append((source.current_time,source.entrance_time))
+        assert len(admissions) == n_admissions + admitted
+        return admitted
+    source.admit_next_arrival = logging_admit_next_arrival
+
+    source.setup_arrivals(END_TIME,lazy=lazy,spillback=True)
+    Queue.run(END_TIME)
+
+    return source,record,np.array(calls),np.array(admissions)
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('lazy',[False,True])
+def test_held_arrivals_enter_in_order_and_in_time(lazy):
+    source,record,calls,admissions = blocked_lane(lazy)
+    admitted_at,arrived_at = admissions.T
+    n = len(admissions)
+
+    # First in first out: the arrivals are admitted in the order they arrived.
+    assert np.all(np.diff(arrived_at) > 0)
+    if not lazy:
+        assert arrived_at.tolist() == source.arrival_times[:n]
+
+    # An arrival that already occurred when the vehicle in front entered is
+    # admitted right then. Any other arrival is admitted at its own time.
+    held = arrived_at <= calls[:n]
+    assert held.sum() > 10
+    assert np.all(admitted_at[held] == calls[:n][held])
+    assert np.all(admitted_at[~held] == arrived_at[~held])
+
+    source_IDs = record.source_IDs
+    assert 0 < len(source_IDs) <= n
+    assert source_IDs.tolist() == [source.ID]*len(source_IDs)
+
+#------------------------------------------------------------------------------
+
+def test_spillback_statistics():
+    source,record,calls,admissions = blocked_lane(lazy=False)
+    statistics = source.spillback_statistics()
+    admitted_at,arrived_at = admissions.T
+    end_time = source.current_time
+
+    # Every call after the first is the entry of the vehicle in front.
+    delays = calls[1:] - arrived_at[:len(calls)-1]
+    assert statistics['entered'] == len(delays)
+    assert statistics['mean entry delay'] == pytest.approx(delays.mean())
+    assert statistics['max entry delay'] == pytest.approx(delays.max())
+    assert statistics['max entry delay'] > 20
+
+    # The arrivals that occurred but were not admitted yet.
+    arrival_times = np.array(source.arrival_times)
+    held_arrivals = arrival_times[len(admissions):]
+    held_arrivals = held_arrivals[held_arrivals <= calls[-1]]
+    assert statistics['spillback'] == len(held_arrivals)
+    assert list(source.held_arrivals) == held_arrivals.tolist()
+
+    # At call k, the arrivals up to then less the k admitted before it.
+    lengths = [np.sum(arrival_times <= t) - k for k,t in enumerate(calls)]
+    assert statistics['max spillback'] == max(lengths)
+
+    held_time = (np.sum(admitted_at - arrived_at) + 
+                 np.sum(end_time - held_arrivals))
+    assert statistics['mean spillback'] == pytest.approx(held_time/end_time)
+    assert statistics['mean spillback'] > 1
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,132 @@
+'''
+MSER must find a warm-up that is known in advance and batch means must
+cover the steady-state mean as often as their confidence states.
+'''
+
+import numpy as np
+import pytest
+
+from __basik__.steady_state import (t_quantile,mser,batch_means,
+                                    steady_state_estimate)
+
+#------------------------------------------------------------------------------
+
+def warmed_up(seed,warm_up=100,n=1000,offset=5):
+    # White noise about zero that starts offset higher for warm_up
+    # observations.
+    series = np.random.default_rng(seed).normal(0,1,n)
+    series[:warm_up] += offset
+    return series
+
+#------------------------------------------------------------------------------
+
+def mser_statistics(series,batch_size):
+    # The MSER statistic of every truncation point, computed directly.
+    n_batches = len(series)//batch_size
+    batches = series[:n_batches*batch_size].reshape(n_batches,batch_size)
+    batches = batches.mean(axis=1)
+    return np.array([np.sum((batches[d:] - batches[d:].mean())**2)/
+                     (n_batches - d)**2 for d in range(n_batches)])
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('seed',range(10))
+def test_mser_finds_a_known_warm_up(seed):
+    truncation = mser(warmed_up(seed))
+
+    assert truncation['reliable']
+    assert truncation['n_batches'] == 200
+    assert 100 <= truncation['truncation'] <= 110
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('batch_size',[1,5,7])
+def test_mser_minimises_the_statistic_over_the_first_half(batch_size):
+    series = warmed_up(10,warm_up=60,offset=2)
+    statistics = mser_statistics(series,batch_size)
+    searched = statistics[:len(statistics)//2 + 1]
+    truncation = mser(series,batch_size)
+
+    assert truncation['truncation'] == int(np.argmin(searched))*batch_size
+    assert truncation['statistic'] == pytest.approx(searched.min())
+
+#------------------------------------------------------------------------------
+
+def test_mser_without_a_warm_up():
+    truncation = mser(warmed_up(11,warm_up=0))
+    assert truncation['reliable']
+    assert truncation['truncation'] < 100
+
+#------------------------------------------------------------------------------
+
+def test_mser_flags_a_transient_that_has_not_ended():
+    # A trend that lasts for the whole series.
+    series = np.linspace(10,0,1000) + np.random.default_rng(12).normal(0,0.1,1000)
+    truncation = mser(series)
+    assert not truncation['reliable']
+    assert truncation['truncation'] == 500
+
+    assert mser(np.ones(9))['reliable'] is False
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('p,df,expected',[(0.975,1,12.7062),
+                                          (0.975,2,4.3027),
+                                          (0.975,5,2.5706),
+                                          (0.975,19,2.0930),
+                                          (0.95,9,1.8331),
+                                          (0.995,29,2.7564)])
+def test_t_quantile_agrees_with_tables(p,df,expected):
+    assert t_quantile(p,df) == pytest.approx(expected,abs=2e-3)
+    assert t_quantile(1 - p,df) == pytest.approx(-expected,abs=2e-3)
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('confidence',[0.9,0.95])
+def test_batch_means_coverage(confidence):
+    # Correlated AR(1) series with mean 3: the intervals must contain 3 about
+    # as often as their confidence states.
+    n_replications = 1000
+    rng = np.random.default_rng(13)
+    noise = rng.normal(0,1,(4000,n_replications))
+    series = np.empty_like(noise)
+    series[0] = noise[0]/np.sqrt(1 - 0.5**2)
+    for idx in range(1,len(noise)):
+        series[idx] = 0.5*series[idx - 1] + noise[idx]
+    series += 3
+
+    covered = 0
+    for replication in series.T:
+        estimate = batch_means(replication,n_batches=20,confidence=confidence)
+        assert estimate['batch_size'] == 200
+        assert estimate['lower'] < estimate['mean'] < estimate['upper']
+        covered += estimate['lower'] <= 3 <= estimate['upper']
+
+    # Four standard deviations of the binomial count.
+    tolerance = 4*np.sqrt(confidence*(1 - confidence)/n_replications)
+    assert abs(covered/n_replications - confidence) < tolerance
+
+#------------------------------------------------------------------------------
+
+def test_batch_means_of_a_short_series():
+    estimate = batch_means([1.0,2.0,3.0],n_batches=5)
+    assert estimate['mean'] == 2.0
+    assert np.isnan(estimate['half_width'])
+    with pytest.raises(ValueError):
+        batch_means([1.0,2.0],n_batches=1)
+
+#------------------------------------------------------------------------------
+
+def test_steady_state_estimate_discards_the_warm_up():
+    series = warmed_up(14,warm_up=200,n=4000,offset=10)
+    times = np.arange(len(series))*30.0
+    estimate = steady_state_estimate(series,times=times)
+    d = estimate['truncation']
+
+    assert 200 <= d <= 210
+    assert estimate['truncation_time'] == times[d]
+    assert estimate['n_observations'] == len(series) - d
+    assert estimate['mean'] == pytest.approx(batch_means(series[d:])['mean'])
+    assert estimate['lower'] <= 0 <= estimate['upper']
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,42 @@
+'''
+The cached points of a sweep must only be reused by the same factory code.
+'''
+
+import functools
+
+from __basik__.sweep import factory_fingerprint
+
+#------------------------------------------------------------------------------
+
+def scenario(rate,green=20):
+    def helper():
+        return rate + 1
+    return helper
+
+def edited_scenario(rate,green=20):
+    def helper():
+        return rate + 2
+    return helper
+
+#------------------------------------------------------------------------------
+
+def test_fingerprint_follows_the_code():
+    assert factory_fingerprint(scenario) == factory_fingerprint(scenario)
+    # The code of nested functions counts, not their addresses.
+    edited_scenario.__qualname__ = scenario.__qualname__
+    assert factory_fingerprint(edited_scenario) != factory_fingerprint(scenario)
+
+#------------------------------------------------------------------------------
+
+def test_fingerprint_of_a_partial_includes_its_arguments():
+    partial = functools.partial(scenario,green=30)
+
+    assert factory_fingerprint(partial).startswith(
+                                        factory_fingerprint(scenario))
+    assert factory_fingerprint(partial) != factory_fingerprint(
+                                        functools.partial(scenario,green=40))
+
+#------------------------------------------------------------------------------
+
+def test_callables_without_code_give_their_name():
+    assert factory_fingerprint(len) == 'builtins.len'
@@ -0,0 +1,107 @@
+'''
+The movements that a TrajectoryStore records must be those that every
+vehicle records in its movement_record.
+'''
+
+import pickle
+
+import numpy as np
+import pytest
+
+from __basik__ import utils
+from __basik__.trajectory_store import ROW_TYPE
+from scenarios import traffic_light_session,recordings
+
+END_TIME = 600
+
+#------------------------------------------------------------------------------
+
+def run(sample_every=None,chunk_size=1000):
+
+    # The traffic light scenario with the vehicles of all sources in the order
+    # they were produced. Movements are recorded to a TrajectoryStore if
+    # sample_every is given and to every movement_record otherwise.
+
+    np.random.seed(0)
+    utils._last_idx = 0
+    session = traffic_light_session(seed=6,rate=0.3)
+    vehicles = []
+    for source in session.source_objects.values():
+        source.record_movement = sample_every is None
+        def collecting_produce_arrival(t,produce_arrival=source._produce_arrival):
+            vehicle = produce_arrival(t)
+            vehicles.append(vehicle)
+            return vehicle
+        source._produce_arrival = collecting_produce_arrival
+    if sample_every is not None:
+        session.record_trajectories(sample_every,chunk_size)
+    session.run(END_TIME,display_vehicles=False)
+
+    return session,vehicles
+
+#------------------------------------------------------------------------------
+
+@pytest.fixture
+def movement_records():
+    session,vehicles = run()
+    assert all(vehicle.trajectory_id is None for vehicle in vehicles)
+    return recordings(session),[vehicle.movement_record for vehicle in vehicles]
+
+#------------------------------------------------------------------------------
+
+@pytest.mark.parametrize('sample_every',[1,3])
+def test_store_matches_the_movement_records(movement_records,sample_every):
+    expected_recordings,expected = movement_records
+    session,vehicles = run(sample_every)
+    store = session.trajectories
+
+    # Recording to the store does not change the simulation.
+    assert recordings(session) == expected_recordings
+    assert len(vehicles) == len(expected) == store.n_registered
+
+    sampled = range(0,len(vehicles),sample_every)
+    assert store.vehicle_ids().tolist() == list(sampled)
+    for vehicle_id in sampled:
+        assert vehicles[vehicle_id].trajectory_id == vehicle_id
+        assert not hasattr(vehicles[vehicle_id],'movement_record')
+        assert store.vehicle_view(vehicle_id) == expected[vehicle_id]
+    assert len(store) == sum(len(expected[vehicle_id]['time'])
+                             for vehicle_id in sampled)
+    assert len(store) > 2*store.chunk_size
+
+#------------------------------------------------------------------------------
+
+def test_store_round_trip(movement_records):
+    _,expected = movement_records
+    session,_ = run(sample_every=1,chunk_size=777)
+    store = pickle.loads(pickle.dumps(session.trajectories))
+    table = store.to_array()
+
+    assert table.dtype == ROW_TYPE
+    assert len(table) == len(session.trajectories)
+    assert np.array_equal(table,session.trajectories.to_array())
+    # Rows are in the order in which they were recorded.
+    for vehicle_id,movement_record in enumerate(expected):
+        rows = table[table['vehicle'] == vehicle_id]
+        assert rows['time'].tolist() == movement_record['time']
+        assert [store.move_types[code] for code in rows['move_type']] == \
+               movement_record['move type']
+
+    pd = pytest.importorskip('pandas')
+    frame = store.to_dataframe()
+    assert isinstance(frame,pd.DataFrame)
+    assert frame['move_type'].tolist() == [store.move_types[code] for code
+                                           in table['move_type']]
+    assert np.array_equal(frame['time'].to_numpy(),table['time'])
+
+#------------------------------------------------------------------------------
+
+def test_reset_records_clears_the_store():
+    session,_ = run(sample_every=2)
+    n_registered = session.trajectories.n_registered
+    session.reset_records()
+
+    assert len(session.trajectories) == 0
+    assert session.trajectories.n_registered == n_registered
+
+#------------------------------------------------------------------------------